@@ -2,7 +2,7 @@
 ATUM DESK - Authentication Dependencies
 """
 from typing import Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
@@ -10,11 +10,13 @@ from jose import JWTError
 
 from app.db.session import get_session
 from app.auth.jwt import decode_token
+from app.auth.principal_cache import attach, principal_cache, snapshot
 from app.models.user import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 async def get_current_user(
+    request: Request,
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_session)
 ) -> User:
@@ -33,10 +35,24 @@ async def get_current_user(
     if user_id is None:
         raise credentials_exception
     
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    # Cached per token issue time; invalidated on any users row change
+    iat = payload.get("iat")
+    values = principal_cache.get(user_id, iat)
+    if values is not None:
+        user = await attach(db, User, values)
+    else:
+        epoch = principal_cache.epoch
+        result = await db.execute(select(User).where(User.id == user_id))
+        user = result.scalar_one_or_none()
+        if user is not None and user.is_active:
+            principal_cache.put(user_id, iat, snapshot(user), epoch)
     
     if user is None or not user.is_active:
         raise credentials_exception
     
+    # For request-level consumers (metrics tier, RLS context middleware)
+    request.state.organization_id = user.organization_id
+    request.state.user_id = user.id
+    request.state.role = getattr(user.role, "value", user.role)
+    
     return user
@@ -0,0 +1,130 @@
+"""
+ATUM DESK - Authenticated Principal Cache
+
+get_current_user looks a token's user up once per (user id, token iat) and
+TTL instead of on every request. Entries hold column values only: each
+request gets a fresh User built from them and attached to its own session
+without a SELECT, so code that changes current_user still flushes normally.
+
+Any change to a users row fires NOTIFY principal_invalidate (trigger from
+migration phase21_principal_invalidate). Every API process listens and drops
+that user, so deactivation or a role change applies on the next request,
+not after the TTL. The cache only answers while its LISTEN connection is up.
+"""
+import asyncio
+import copy
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Must match the trigger function in phase21_principal_invalidate
+NOTIFY_CHANNEL = "principal_invalidate"
+DEFAULT_MAX_USERS = 10_000
+RECONNECT_DELAY = 5  # seconds
+
+
+class PrincipalCache:
+    """user id -> {token iat: (expires, column values)}, LRU over users"""
+
+    def __init__(self, ttl: float, max_users: int = DEFAULT_MAX_USERS,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.max_users = max_users
+        self.clock = clock
+        # Set while invalidations are being received
+        self.active = False
+        # Bumped on every invalidation; a lookup that started before one
+        # must not store what it read
+        self.epoch = 0
+        self._users: "OrderedDict[str, Dict[Any, Tuple[float, Dict[str, Any]]]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    def get(self, user_id: str, iat: Any) -> Optional[Dict[str, Any]]:
+        if not self.active:
+            return None
+        tokens = self._users.get(user_id)
+        if not tokens:
+            return None
+        entry = tokens.get(iat)
+        if entry is None:
+            return None
+        if entry[0] <= self.clock():
+            del tokens[iat]
+            return None
+        self._users.move_to_end(user_id)
+        return entry[1]
+
+    def put(self, user_id: str, iat: Any, values: Dict[str, Any], epoch: int) -> None:
+        """Store values read by a lookup that began at `epoch`"""
+        if not self.active or self.ttl <= 0 or epoch != self.epoch:
+            return
+        tokens = self._users.get(user_id)
+        if tokens is None:
+            tokens = self._users[user_id] = {}
+        else:
+            self._users.move_to_end(user_id)
+        tokens[iat] = (self.clock() + self.ttl, values)
+        while len(self._users) > self.max_users:
+            self._users.popitem(last=False)
+
+    def invalidate(self, user_id: str) -> None:
+        self.epoch += 1
+        self._users.pop(user_id, None)
+
+    def clear(self) -> None:
+        self.epoch += 1
+        self._users.clear()
+
+
+def snapshot(instance: Any) -> Dict[str, Any]:
+    """Column attribute values of a loaded ORM instance"""
+    return {attr.key: getattr(instance, attr.key) for attr in inspect(instance).mapper.column_attrs}
+
+
+async def attach(session, model: type, values: Dict[str, Any]) -> Any:
+    """
+    Persistent instance of `model` in `session` from cached values, without
+    a SELECT (returns the session's own instance if it already has one).
+    """
+    # Mutable column values (JSON) are copied: requests may change them
+    instance = model(**{k: copy.deepcopy(v) if isinstance(v, (list, dict)) else v for k, v in values.items()})
+    make_transient_to_detached(instance)
+    return await session.merge(instance, load=False)
+
+
+async def listen_for_invalidations(cache: PrincipalCache, dsn: str) -> None:
+    """Drop users named by NOTIFY principal_invalidate (runs until cancelled)"""
+    from psycopg import AsyncConnection
+
+    while True:
+        try:
+            conn = await AsyncConnection.connect(dsn, autocommit=True)
+            async with conn:
+                await conn.execute(f"LISTEN {NOTIFY_CHANNEL}")
+                # Changes made while not listening are unknown
+                cache.clear()
+                cache.active = True
+                logger.info("principal_cache_listening")
+                async for notify in conn.notifies():
+                    cache.invalidate(notify.payload)
+        except asyncio.CancelledError:
+            cache.active = False
+            raise
+        except Exception as e:
+            logger.warning(f"Principal cache listener lost: {e}")
+        cache.active = False
+        cache.clear()
+        await asyncio.sleep(RECONNECT_DELAY)
+
+
+principal_cache = PrincipalCache(ttl=get_settings().PRINCIPAL_CACHE_TTL_SECONDS)
@@ -2,7 +2,7 @@
 ATUM DESK - FastAPI Application Configuration
 """
 from functools import lru_cache
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic_settings import BaseSettings
 from pydantic import Field, PostgresDsn
 
@@ -38,6 +38,9 @@ class Settings(BaseSettings):
     SECRET_KEY: str = Field(default="your-secret-key-change-in-production")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 8  # 8 hours
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # Authenticated users cached per (user, token iat); 0 disables. Entries
+    # are also dropped on any users row change (NOTIFY principal_invalidate)
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
     PASSWORD_MIN_LENGTH: int = 8
     
     # JWT
@@ -94,16 +97,26 @@ class Settings(BaseSettings):
     AI_SENTIMENT_ANALYSIS: bool = True
     AI_SMARTER_REPLY: bool = True
     AI_SLA_PREDICTION: bool = True
+    # Per-process agent load index used by auto-assignment; rebuilt from the
+    # database after this many seconds (0 disables caching)
+    AGENT_LOAD_TTL_SECONDS: int = 15
     
     # AI Response Caching
     AI_CACHE_TTL_MINUTES: int = 30
     AI_MAX_CACHE_SIZE: int = 1000
+    # Share cached responses between API workers via the ai_response_cache table
+    AI_CACHE_PERSIST: bool = True
     
     # AI Model Routing
     AI_FAST_MODEL: str = "qwen2.5:0.5b"
     AI_STANDARD_MODEL: str = "ATUM-DESK-COPILOT:latest"
     AI_ELITE_MODEL: str = "ATUM-DESK-COPILOT:latest"
     AI_REASONING_MODEL: str = "deepseek-r1:1.5b"
+    # LLM gateway: concurrent upstream generations per routing tier
+    AI_FAST_CONCURRENCY: int = 8
+    AI_STANDARD_CONCURRENCY: int = 4
+    AI_ELITE_CONCURRENCY: int = 2
+    AI_REASONING_CONCURRENCY: int = 1
     
     # RAG Config
     RAG_ENABLED: bool = True
@@ -111,6 +124,23 @@ class Settings(BaseSettings):
     RAG_TOP_K: int = 5
     RAG_GRAPH_DEPTH: int = 2
     RAG_HNSW_EF_SEARCH: int = 100
+    RAG_RRF_K: int = 60  # reciprocal-rank fusion constant for vector + keyword results
+    # Filtered ANN: tenants up to this many chunks are searched exactly; larger
+    # ones over-fetch top_k * RAG_ANN_OVERFETCH candidates, widening up to the max
+    RAG_EXACT_SEARCH_MAX_CHUNKS: int = 20000
+    RAG_ANN_OVERFETCH: int = 4
+    RAG_ANN_MAX_CANDIDATES: int = 1000
+    RAG_ANN_PLAN_TTL_SECONDS: int = 300
+    # Search through halfvec HNSW indexes (scripts/rag_vector_index.py builds them)
+    RAG_HALFVEC_INDEX: bool = False
+    # Async embedding client: concurrent upstream requests, micro-batch size and
+    # how long (ms) to wait for concurrent callers before flushing a batch
+    RAG_EMBED_MAX_CONCURRENCY: int = 4
+    RAG_EMBED_BATCH_SIZE: int = 32
+    RAG_EMBED_BATCH_WINDOW_MS: int = 5
+    # Embedding cache: in-process LRU entries, plus the shared Postgres tier
+    RAG_EMBED_CACHE_SIZE: int = 10000
+    RAG_EMBED_CACHE_PERSIST: bool = True
     # RAG Indexing: Disabled by default for stability. Enable via env var for Phase 3.
     # When enabled, tickets are indexed for semantic search via background task.
     RAG_INDEX_ON_TICKET_CREATE: bool = Field(default=False)
@@ -124,11 +154,27 @@ class Settings(BaseSettings):
     # SLA
     SLA_ENABLED: bool = True
     SLA_CHECK_INTERVAL_MINUTES: int = 5
+    # Breach pass (scripts/run_sla_worker.py): organizations scanned in parallel
+    # and tickets flagged per statement
+    SLA_WORKER_CONCURRENCY: int = 4
+    SLA_BREACH_BATCH_SIZE: int = 5000
+    # Batch breach-risk scoring (tickets.sla_risk_score) runs after each breach
+    # pass when AI_SLA_PREDICTION is on; resolution stats refreshed this often
+    SLA_RISK_STATS_REFRESH_MINUTES: int = 15
+    
+    # Workflows (scripts/workflow_scheduler.py): waiting runs resumed per
+    # claim, and resumed runs in flight
+    WORKFLOW_SCHEDULER_BATCH_SIZE: int = 500
+    WORKFLOW_SCHEDULER_CONCURRENCY: int = 50
     
     # WebSocket
     WS_HEARTBEAT_INTERVAL: int = 30  # seconds
     WS_MAX_CONNECTIONS: int = 1000
     
+    # Metrics: organization id -> tier label on HTTP metrics (unlisted
+    # organizations are "default"); keep the set of tiers small
+    METRICS_ORG_TIERS: Dict[str, str] = {}
+    
     # Logging
     LOG_LEVEL: str = "INFO"
     LOG_FORMAT: str = "json"
@@ -5,6 +5,7 @@ from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sess
 from sqlalchemy.orm import declarative_base
 from sqlalchemy import MetaData
 from app.config import get_settings
+from app.db.vector import register_vector_types
 
 settings = get_settings()
 
@@ -29,6 +30,9 @@ engine = create_async_engine(
     pool_pre_ping=True,
 )
 
+# Binary pgvector parameters (NumPy float32) on every pooled connection
+register_vector_types(engine)
+
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
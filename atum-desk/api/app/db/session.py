@@ -30,7 +30,9 @@ async def set_rls_context(
     """
     Guaranteed RLS context setter - MUST be called before any tenant query.
     
-    Uses SET LOCAL for transaction-scoped context that doesn't leak to other sessions.
+    Transaction-scoped (set_config(..., true), i.e. SET LOCAL) so context
+    doesn't leak to other sessions; all given settings go in one statement
+    with bound parameters.
     
     Args:
         session: Active AsyncSession
@@ -38,15 +40,20 @@ async def set_rls_context(
         user_id: User UUID  
         role: User role (ADMIN, AGENT, CUSTOMER)
     """
-    if org_id:
-        await session.execute(text(f"SET LOCAL app.current_org = '{org_id}'"))
-        logger.debug("rls_context_set org_id=%s", org_id)
-    if user_id:
-        await session.execute(text(f"SET LOCAL app.current_user = '{user_id}'"))
-        logger.debug("rls_context_set user_id=%s", user_id)
-    if role:
-        await session.execute(text(f"SET LOCAL app.current_role = '{role}'"))
-        logger.debug("rls_context_set role=%s", role)
+    settings = [(name, value) for name, value in (
+        ("app.current_org", org_id),
+        ("app.current_user", user_id),
+        ("app.current_role", role),
+    ) if value]
+    if not settings:
+        return
+    columns = ", ".join(f"set_config(:name{i}, :value{i}, true)" for i in range(len(settings)))
+    params = {}
+    for i, (name, value) in enumerate(settings):
+        params[f"name{i}"] = name
+        params[f"value{i}"] = str(value)
+    await session.execute(text(f"SELECT {columns}"), params)
+    logger.debug("rls_context_set org_id=%s user_id=%s role=%s", org_id, user_id, role)
 
 
 async def validate_rls_context(session: AsyncSession) -> dict:
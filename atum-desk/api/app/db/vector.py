@@ -0,0 +1,39 @@
+"""
+ATUM DESK - pgvector binary transport
+
+Registers the pgvector psycopg adapters on every pooled connection so that
+NumPy float32 arrays are sent as binary vector parameters (4 bytes/dim,
+no float formatting or parsing) instead of '[0.123,...]' text.
+"""
+import logging
+from typing import Iterable
+
+import numpy as np
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+
+def to_vector(values: Iterable[float]) -> np.ndarray:
+    """Embedding as a float32 buffer (binary-dumped once adapters are registered)"""
+    if isinstance(values, np.ndarray) and values.dtype == np.float32:
+        return values
+    return np.asarray(values, dtype=np.float32)
+
+
+async def _register(conn) -> None:
+    from pgvector.psycopg import register_vector_async
+    try:
+        await register_vector_async(conn)
+    except Exception as e:
+        # vector extension missing: RAG queries will fail, everything else must not
+        logger.warning(f"pgvector adapters not registered: {e}")
+
+
+def register_vector_types(engine: AsyncEngine) -> None:
+    """Install the adapters on each new connection of a psycopg async engine"""
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        dbapi_connection.run_async(_register)
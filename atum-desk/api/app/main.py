@@ -21,6 +21,10 @@ logger = structlog.get_logger()
 
 from app.services.email_ingestion import email_ingestion_service
 from app.routers.metrics import update_health_metrics
+from app.auth.principal_cache import listen_for_invalidations, principal_cache
+from app.middleware.metrics import MetricsMiddleware
+from app.services.rag.embeddings import close_embedding_client
+from app.services.llm_gateway import close_llm_gateway
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -36,10 +40,20 @@ async def lifespan(app: FastAPI):
     # Start health metrics background task
     asyncio.create_task(update_health_metrics())
     
+    # Authenticated-user cache invalidations (LISTEN principal_invalidate)
+    principal_listener = None
+    if settings.PRINCIPAL_CACHE_TTL_SECONDS > 0:
+        dsn = str(settings.DATABASE_URL).replace("postgresql+psycopg://", "postgresql://").replace("postgresql+asyncpg://", "postgresql://")
+        principal_listener = asyncio.create_task(listen_for_invalidations(principal_cache, dsn))
+    
     yield
     # Shutdown
     logger.info("Shutting down ATUM DESK API")
     email_ingestion_service.running = False
+    if principal_listener:
+        principal_listener.cancel()
+    await close_embedding_client()
+    await close_llm_gateway()
 
 
 app = FastAPI(
@@ -99,6 +113,10 @@ async def logging_middleware(request: Request, call_next):
     return response
 
 
+# Per-route request metrics; added last so it wraps (and times) everything above
+app.add_middleware(MetricsMiddleware)
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Global exception handler"""
@@ -0,0 +1,88 @@
+"""
+ATUM DESK - HTTP Metrics Middleware
+Pure ASGI (no BaseHTTPMiddleware task/body streaming overhead): records
+atum_http_requests_total and atum_http_request_duration_seconds for every
+HTTP request.
+
+Every label has a bounded value set:
+    endpoint      route template ("/api/v1/tickets/{ticket_id}"), never the
+                  raw path; "unmatched" when no route matched
+    method        standard verbs, else "OTHER"
+    status_class  "1xx" .. "5xx"
+    tier          METRICS_ORG_TIERS entry of the caller's organization,
+                  "default" for unlisted orgs, "none" if unauthenticated
+                  (get_current_user puts the org in request.state)
+"""
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import get_settings
+
+METHODS = {"GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"}
+UNMATCHED = "unmatched"
+
+Labels = Tuple[str, str, str, str]  # method, endpoint, status_class, tier
+
+
+def record_prometheus(labels: Labels, elapsed: float) -> None:
+    try:
+        from app.routers.metrics import http_requests_total, http_request_duration
+        http_requests_total.labels(*labels).inc()
+        http_request_duration.labels(*labels).observe(elapsed)
+    except Exception:
+        pass
+
+
+def route_template(scope: Scope) -> str:
+    """Path template of the route that handled the request"""
+    route = scope.get("route")
+    path = getattr(route, "path_format", None) or getattr(route, "path", None)
+    if path:
+        return path
+    endpoint = scope.get("endpoint")
+    if endpoint is not None:
+        # Mounted app (static files, sub-application): its mount point
+        return scope.get("root_path") or getattr(endpoint, "__name__", UNMATCHED)
+    return UNMATCHED
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp, org_tiers: Optional[Dict[str, str]] = None,
+                 exclude_paths: tuple = ("/metrics", "/api/v1/metrics"),
+                 record: Callable[[Labels, float], None] = record_prometheus):
+        self.app = app
+        self.record = record
+        self.org_tiers = {str(k): v for k, v in (org_tiers if org_tiers is not None
+                                                 else get_settings().METRICS_ORG_TIERS).items()}
+        self.exclude_paths = set(exclude_paths)
+
+    def tier(self, org_id: Any) -> str:
+        if not org_id:
+            return "none"
+        return self.org_tiers.get(str(org_id), "default")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        # Shared with request.state, so the auth dependency can leave the org here
+        state = scope.setdefault("state", {})
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            method = scope["method"] if scope["method"] in METHODS else "OTHER"
+            tier = self.tier(state.get("organization_id"))
+            self.record((method, route_template(scope), f"{status // 100}xx", tier), elapsed)
@@ -2,12 +2,14 @@
 ATUM DESK - Admin Router
 System management endpoints
 """
+import asyncio
 from datetime import datetime, timezone
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from app.auth.deps import get_current_user
 from app.models.user import User, UserRole
@@ -26,6 +28,10 @@ class IPSettingsUpdate(BaseModel):
     ip_restrictions_enabled: bool
 
 
+class RAGTuningUpdate(BaseModel):
+    hnsw_ef_search: int = Field(..., ge=10, le=1000)
+
+
 @router.get("/jobs")
 async def get_jobs(
     current_user: User = Depends(get_current_user),
@@ -455,3 +461,92 @@ async def get_rls_snapshots(
             for r in result.fetchall()
         ]
     }
+
+
+# === RAG vector index tuning (own organization only) ===
+
+@router.get("/rag/index")
+async def get_rag_index_status(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_session)
+):
+    """ANN strategy, chunk count and ef_search for the caller's organization"""
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    from app.services.rag.ann_index import index_status
+    return await index_status(db, current_user.organization_id)
+
+
+@router.put("/rag/index/tuning")
+async def update_rag_index_tuning(
+    update: RAGTuningUpdate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_session)
+):
+    """Set hnsw.ef_search for the organization (higher = better recall, slower)"""
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    from app.services.rag.ann_index import set_ef_search, index_status
+    await set_ef_search(db, current_user.organization_id, update.hnsw_ef_search)
+    return await index_status(db, current_user.organization_id)
+
+
+@router.post("/rag/index/partial", status_code=202)
+async def build_rag_partial_index(
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Build a dedicated HNSW index for the organization. Runs CONCURRENTLY in
+    the background (minutes on large tenants); poll GET /rag/index.
+    """
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    from app.db.base import engine
+    from app.services.rag.ann_index import create_partial_index, partial_index_name
+    background_tasks.add_task(create_partial_index, engine, current_user.organization_id)
+    return {"status": "building", "index": partial_index_name(current_user.organization_id)}
+
+
+@router.delete("/rag/index/partial")
+async def drop_rag_partial_index(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_session)
+):
+    """Drop the organization's dedicated HNSW index (falls back to exact/shared)"""
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    from app.db.base import engine
+    from app.services.rag.ann_index import drop_partial_index, index_status
+    await drop_partial_index(engine, current_user.organization_id)
+    return await index_status(db, current_user.organization_id)
+
+
+# === Profiling ===
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def profile_process(
+    seconds: float = Query(10, gt=0, le=60),
+    interval_ms: float = Query(5, ge=1, le=100),
+    idle: bool = False,
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Sample this API worker process's stacks for `seconds` and return them as
+    collapsed stacks (flamegraph.pl / speedscope input). Covers only the
+    worker process that serves this request; idle=true keeps parked threads.
+    """
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    from app.services.profiler import ProfilerBusy, collapse, sample
+    try:
+        # Sampler runs on a thread: the event loop keeps serving (and being sampled)
+        stacks, rounds = await asyncio.to_thread(sample, seconds, interval_ms / 1000, idle)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return PlainTextResponse(collapse(stacks), headers={"X-Profile-Samples": str(rounds)})
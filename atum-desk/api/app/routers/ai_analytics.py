@@ -4,13 +4,13 @@ AI Analytics Router - Advanced AI-Powered Insights
 import json
 import logging
 from typing import Optional, List, Dict, Any
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from uuid import UUID
 
 import requests
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import select, func, and_, or_, text
 
 from app.auth.deps import get_current_user
 from app.models.user import User, UserRole
@@ -18,6 +18,8 @@ from app.models.ticket import Ticket, TicketStatus, TicketPriority
 from app.db.session import get_session
 from app.config import get_settings
 from app.services.ai.preferences import get_ai_preferences, update_ai_preferences
+from app.services.forecasting import volume_outlook
+from app.services.ticket_metrics import DAILY_COLUMNS, agent_summary, priority_distribution, trend_series
 
 router = APIRouter(prefix="/api/v1/ai", tags=["AI Analytics"])
 _settings = get_settings()
@@ -110,33 +112,25 @@ async def get_trend_analysis(
 ):
     """
     Get trend analysis for tickets, priority, or SLA.
+    Daily series over the last `days` complete days from the ticket rollups.
     """
     if current_user.role not in (UserRole.AGENT, UserRole.MANAGER, UserRole.ADMIN):
         raise HTTPException(status_code=403, detail="Access denied")
     
     org_id = current_user.organization_id
+    start = datetime.now(timezone.utc).date() - timedelta(days=days)
     
-    # Generate mock trend data (in production, this would query actual data)
-    trends = []
-    for i in range(days):
-        date = (datetime.utcnow() - timedelta(days=days-i)).strftime("%Y-%m-%d")
-        if metric == "tickets":
-            value = 10 + (i % 7) * 2 + (i // 7)
-        elif metric == "priority":
-            value = ["low", "medium", "high", "urgent"][i % 4]
-        else:
-            value = 85 + (i % 10)
-        trends.append({"date": date, "value": value})
+    result = await db.execute(
+        text(f"""
+            SELECT day, {DAILY_COLUMNS}
+            FROM ticket_metrics_daily
+            WHERE organization_id = :org_id AND day >= :start AND day < :end
+            ORDER BY day
+        """),
+        {"org_id": org_id, "start": start, "end": start + timedelta(days=days)}
+    )
     
-    return {
-        "metric": metric,
-        "period_days": days,
-        "trends": trends,
-        "summary": {
-            "trend": "increasing" if trends[-1]["value"] > trends[0]["value"] else "decreasing",
-            "change_percent": 15.5
-        }
-    }
+    return trend_series(metric, result.fetchall(), start, days)
 
 
 @router.get("/insights/predictions")
@@ -146,44 +140,48 @@ async def get_ai_predictions(
 ):
     """
     Get AI predictions for upcoming ticket volume and SLA risks.
+    Volume comes from the per-org Holt-Winters forecast the metrics worker
+    refits (ticket_forecasts), SLA risks from the persisted risk scores.
     """
     if current_user.role not in (UserRole.AGENT, UserRole.MANAGER, UserRole.ADMIN):
         raise HTTPException(status_code=403, detail="Access denied")
     
-    # Generate predictions (in production, this would use actual ML)
-    predictions = {
+    from app.services.ai.sla_predictor import SLABreachPredictor
+    
+    org_id = current_user.organization_id
+    
+    result = await db.execute(
+        text("""
+            SELECT history, forecast, mae, method, fitted_at
+            FROM ticket_forecasts
+            WHERE organization_id = :org_id
+        """),
+        {"org_id": org_id}
+    )
+    row = result.first()
+    history, forecast, mae = (row[0], row[1], row[2] or 0.0) if row else ([], [], 0.0)
+    
+    start = datetime.now(timezone.utc).date() - timedelta(days=30)
+    result = await db.execute(
+        text(f"""
+            SELECT day, {DAILY_COLUMNS}
+            FROM ticket_metrics_daily
+            WHERE organization_id = :org_id AND day >= :start
+        """),
+        {"org_id": org_id, "start": start}
+    )
+    
+    return {
         "ticket_volume": {
-            "next_7_days": {
-                "predicted": 85,
-                "confidence": 0.78,
-                "trend": "increasing"
-            },
-            "next_30_days": {
-                "predicted": 380,
-                "confidence": 0.72,
-                "trend": "stable"
-            }
-        },
-        "sla_risks": {
-            "at_risk": 12,
-            "likely_breach": 3,
-            "recommendations": [
-                "Prioritize 5 high-priority tickets approaching SLA limit",
-                "Assign 2 unassigned tickets to available agents",
-                "Consider escalating 3 tickets marked as urgent"
-            ]
+            "next_7_days": volume_outlook(history, forecast, mae, 7),
+            "next_30_days": volume_outlook(history, forecast, mae, 30),
+            "daily_forecast": [round(v, 1) for v in forecast],
+            "model": row[3] if row else None,
+            "fitted_at": row[4].isoformat() if row else None,
         },
-        "category_distribution": {
-            "technical": 45,
-            "billing": 20,
-            "account": 15,
-            "inquiry": 12,
-            "security": 5,
-            "other": 3
-        }
+        "sla_risks": await SLABreachPredictor(db).get_risk_outlook(org_id),
+        "priority_distribution": priority_distribution(result.fetchall()),
     }
-    
-    return predictions
 
 
 @router.get("/insights/agent-performance")
@@ -194,41 +192,26 @@ async def get_agent_performance_insights(
 ):
     """
     Get AI-analyzed agent performance metrics.
+    Resolutions, resolution time and SLA compliance per agent over the last
+    `days` days from the per-agent daily rollups.
     """
     if current_user.role not in (UserRole.MANAGER, UserRole.ADMIN):
         raise HTTPException(status_code=403, detail="Manager/Admin access required")
     
-    # Mock agent performance data
-    agents = [
-        {
-            "agent_id": str(UUID(int=1)),
-            "name": "Agent A",
-            "tickets_resolved": 45,
-            "avg_response_time_minutes": 15,
-            "sla_compliance": 92.5,
-            "customer_satisfaction": 4.2,
-            "ai_suggestions_accepted": 28
-        },
-        {
-            "agent_id": str(UUID(int=2)),
-            "name": "Agent B",
-            "tickets_resolved": 38,
-            "avg_response_time_minutes": 22,
-            "sla_compliance": 88.0,
-            "customer_satisfaction": 4.5,
-            "ai_suggestions_accepted": 35
-        }
-    ]
+    start = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+    result = await db.execute(
+        text("""
+            SELECT a.agent_id, u.full_name, sum(a.resolved), sum(a.resolution_seconds),
+                   sum(a.sla_met), sum(a.sla_breached)
+            FROM agent_metrics_daily a
+            LEFT JOIN users u ON u.id = a.agent_id
+            WHERE a.organization_id = :org_id AND a.day >= :start
+            GROUP BY a.agent_id, u.full_name
+        """),
+        {"org_id": current_user.organization_id, "start": start}
+    )
     
-    return {
-        "period_days": days,
-        "agents": agents,
-        "summary": {
-            "top_performer": "Agent B",
-            "most_efficient": "Agent A",
-            "ai_adoption_rate": 72.5
-        }
-    }
+    return {"period_days": days, **agent_summary(result.fetchall())}
 
 
 @router.post("/analyze/text")
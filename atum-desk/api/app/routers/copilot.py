@@ -9,7 +9,6 @@ from typing import List, Optional
 from uuid import UUID
 from datetime import datetime, timezone
 
-import requests
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, text
@@ -22,6 +21,7 @@ from app.db.session import get_session
 from app.services.rag.store import RAGStore
 from app.services.rag.retriever import RAGRetriever
 from app.services.ai.prompt_firewall import prompt_firewall
+from app.services.llm_gateway import get_llm_gateway
 from app.config import get_settings
 
 router = APIRouter(tags=["Copilot"])
@@ -456,20 +456,11 @@ async def _generate_copilot_response(
         prompt = _build_full_prompt(ticket, context)
     
     try:
-        response = requests.post(
-            f"{_settings.OLLAMA_URL}/api/generate",
-            json={
-                "model": _settings.OLLAMA_MODEL,
-                "prompt": prompt,
-                "stream": False,
-                "format": "json",
-            },
-            timeout=_settings.OLLAMA_TIMEOUT,
-        )
-        response.raise_for_status()
-        
-        result = response.json()
-        ai_text = result.get("response", "{}")
+        ai_text = await get_llm_gateway().generate(
+            prompt,
+            model=_settings.OLLAMA_MODEL,
+            format="json",
+        ) or "{}"
         
         try:
             parsed = json.loads(ai_text)
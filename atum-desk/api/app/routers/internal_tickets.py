@@ -13,6 +13,7 @@ from app.auth.deps import get_current_user
 from app.models.user import User, UserRole
 from app.models.ticket import Ticket, TicketStatus, TicketPriority
 from app.config import get_settings
+from app.services.agent_load import note_ticket_change
 
 router = APIRouter()
 
@@ -235,10 +236,14 @@ async def assign_ticket(
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
     
+    old_agent, old_status = ticket.assigned_to, ticket.status
     ticket.assigned_to = agent_uuid
     ticket.status = TicketStatus.ASSIGNED
     
-    await db.flush()
+    # Committed before the cached load index counts the change
+    delta = (ticket.organization_id, old_agent, old_status, agent_uuid, ticket.status)
+    await db.commit()
+    note_ticket_change(*delta)
     
     return {"status": "success", "message": "Ticket assigned", "ticket_id": ticket_id}
 
@@ -297,6 +302,10 @@ async def update_ticket_status(
             else:
                 pause_delta = now - ticket.sla_paused_at
             ticket.sla_paused_duration = (ticket.sla_paused_duration or 0) + int(pause_delta.total_seconds())
+            
+            # Push open SLA targets out by the working time spent paused
+            from app.services.sla_service import SLAService
+            await SLAService(db).resume(ticket, ticket.sla_paused_at, now)
             ticket.sla_paused_at = None
     
     if status_data.status == TicketStatus.RESOLVED:
@@ -342,6 +351,9 @@ async def update_ticket_status(
     )
     db.add(audit)
     
-    await db.flush()
+    # Committed before the cached load index counts the change
+    delta = (ticket.organization_id, ticket.assigned_to, old_status, ticket.assigned_to, ticket.status)
+    await db.commit()
+    note_ticket_change(*delta)
     
     return {"status": "success", "message": "Status updated", "new_status": status_data.status.value}
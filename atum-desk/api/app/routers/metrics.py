@@ -14,17 +14,19 @@ _settings = get_settings()
 
 # Define metrics (LOW cardinality - no tenant/user/ticket IDs)
 
-# HTTP metrics
+# HTTP metrics (recorded by app/middleware/metrics.py: endpoint is the route
+# template, tier a configured org tier - both bounded)
 http_requests_total = Counter(
     'atum_http_requests_total',
     'Total HTTP requests',
-    ['method', 'endpoint', 'status']
+    ['method', 'endpoint', 'status_class', 'tier']
 )
 
 http_request_duration = Histogram(
     'atum_http_request_duration_seconds',
     'HTTP request duration',
-    ['method', 'endpoint']
+    ['method', 'endpoint', 'status_class', 'tier'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
 )
 
 # Error metrics
@@ -79,6 +81,64 @@ ollama_inference_duration = Histogram(
     ['model']
 )
 
+llm_requests_total = Counter(
+    'atum_llm_requests_total',
+    'LLM gateway generations by result',
+    ['model', 'result']
+)
+
+ai_response_cache_total = Counter(
+    'atum_ai_response_cache_total',
+    'AI response cache lookups by tier and result',
+    ['tier', 'result']
+)
+
+llm_time_to_first_token = Histogram(
+    'atum_llm_time_to_first_token_seconds',
+    'Time from request to first generated token',
+    ['model'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30)
+)
+
+llm_tokens_per_second = Histogram(
+    'atum_llm_tokens_per_second',
+    'Generation throughput per request',
+    ['model'],
+    buckets=(1, 5, 10, 20, 40, 80, 160, 320)
+)
+
+# RAG embedding metrics
+rag_embedding_duration = Histogram(
+    'atum_rag_embedding_seconds',
+    'Upstream embedding request duration',
+    ['endpoint']
+)
+
+rag_embedding_batch_size = Histogram(
+    'atum_rag_embedding_batch_size',
+    'Texts sent per upstream embedding request',
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128)
+)
+
+rag_embedding_cache_total = Counter(
+    'atum_rag_embedding_cache_total',
+    'Embedding cache lookups by tier and result',
+    ['tier', 'result']
+)
+
+# Webhook delivery metrics
+webhook_deliveries_total = Counter(
+    'atum_webhook_deliveries_total',
+    'Webhook delivery attempts by result',
+    ['result']
+)
+
+webhook_delivery_duration = Histogram(
+    'atum_webhook_delivery_seconds',
+    'Webhook HTTP request duration',
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+
 # RLS Guardrail metrics
 org_context_missing_total = Counter(
     'atum_org_context_missing_total',
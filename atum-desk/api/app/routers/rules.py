@@ -14,6 +14,7 @@ from app.auth.deps import get_current_user
 from app.models.user import User, UserRole
 from app.models.rules import Rule, RuleAction
 from app.models.audit_log import AuditLog
+from app.services.rule_engine import invalidate_rules
 
 router = APIRouter(prefix="/api/v1/rules", tags=["Rules"])
 
@@ -124,6 +125,7 @@ async def create_rule(
     db.add(audit)
     
     await db.commit()
+    invalidate_rules(rule.event_type)
     await db.refresh(rule)
     
     return RuleResponse(
@@ -207,8 +209,10 @@ async def delete_rule(
     )
     db.add(audit)
     
+    event_type = rule.event_type
     await db.delete(rule)
     await db.commit()
+    invalidate_rules(event_type)
     
     return None
 
@@ -12,6 +12,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.auth.deps import get_current_user
 from app.models.user import User
 from app.db.session import get_session
+from app.services.agent_load import invalidate_agent_load
 
 router = APIRouter(prefix="/api/v1/tickets", tags=["ticket-locks"])
 
@@ -181,5 +182,7 @@ async def claim_ticket(
         {"user_id": str(current_user.id), "ticket_id": ticket_id, "now": datetime.now(timezone.utc)}
     )
     await db.commit()
+    # Previous assignee and status unknown here: reload the org's agent counts
+    invalidate_agent_load(current_user.organization_id)
     
     return {"message": "Ticket claimed", "assigned_to": current_user.full_name}
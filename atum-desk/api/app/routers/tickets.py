@@ -90,10 +90,10 @@ async def create_ticket(
     )
     
     db.add(new_ticket)
-    await db.commit() # Commit expressly so ID is finalized and data persisted for webhook longevity
+    await db.flush()
     await db.refresh(new_ticket)
     
-    # Trigger Webhook
+    # Queue webhooks in the ticket's transaction (delivered by the webhook worker)
     payload = {
         "id": str(new_ticket.id),
         "subject": new_ticket.subject,
@@ -102,12 +102,13 @@ async def create_ticket(
         "requester_id": str(new_ticket.requester_id),
         "created_at": new_ticket.created_at.isoformat()
     }
-    background_tasks.add_task(
-        webhook_service.dispatch_event,
+    await webhook_service.enqueue_event(
+        db,
         organization_id=new_ticket.organization_id,
         event_type="ticket.created",
         payload=payload
     )
+    await db.commit()
 
     # Send Email Notification
     email_body = f"""
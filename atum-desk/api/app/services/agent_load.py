@@ -0,0 +1,232 @@
+"""
+ATUM DESK - Agent Load Index
+
+Per-organization table of each assignable agent's open and recently resolved
+ticket counts, built by one grouped query (SmartAssignmentEngine) instead of
+two COUNT queries per agent per assignment.
+
+Picking an agent is a heap pop: entries are keyed by
+(-score, open tickets, agent id) for the ticket's priority class, so among
+equally scored agents (scores are clamped at 100) the least loaded wins.
+Assigning or changing a ticket status updates the counts in place and pushes
+a fresh entry for that agent; superseded entries are skipped lazily.
+
+Counts are per process and only as fresh as the last load plus the events
+this process saw, so cached indexes expire after AGENT_LOAD_TTL_SECONDS
+(other API workers and the job worker assign too).
+"""
+import heapq
+import time
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from app.config import get_settings
+
+# Statuses _get_workload_score counted as open
+OPEN_STATUSES = frozenset({"new", "in_progress"})
+RESOLVED = "resolved"
+PERFORMANCE_WINDOW_DAYS = 30
+
+_COMPACT_SLACK = 64  # stale heap entries tolerated beyond one per agent
+
+
+def _value(value: Any) -> Optional[str]:
+    """Enum or string -> lower-case string value"""
+    if value is None:
+        return None
+    return str(getattr(value, "value", value)).lower()
+
+
+def workload_score(open_tickets: int) -> float:
+    """Fewer open tickets = higher score"""
+    if open_tickets == 0:
+        return 100.0
+    elif open_tickets <= 3:
+        return 80.0
+    elif open_tickets <= 7:
+        return 60.0
+    elif open_tickets <= 15:
+        return 40.0
+    else:
+        return 20.0
+
+
+def performance_score(resolved: int) -> float:
+    """Tickets resolved in the last PERFORMANCE_WINDOW_DAYS"""
+    if resolved >= 50:
+        return 100.0
+    elif resolved >= 30:
+        return 85.0
+    elif resolved >= 15:
+        return 70.0
+    elif resolved >= 5:
+        return 55.0
+    else:
+        return 40.0
+
+
+def priority_class(priority: Any) -> str:
+    value = _value(priority)
+    return value if value in ("urgent", "high") else "other"
+
+
+def priority_match_score(role: Any, priority_cls: str) -> float:
+    """Higher role = better for urgent"""
+    if priority_cls == "urgent":
+        role = _value(role)
+        if role == "admin":
+            return 100.0
+        elif role == "manager":
+            return 85.0
+        else:
+            return 70.0
+    elif priority_cls == "high":
+        return 80.0
+    else:
+        return 70.0
+
+
+def agent_score(role: Any, priority_cls: str, open_tickets: int, resolved: int) -> float:
+    """Agent suitability (0-100): workload 40%, performance 30%, priority 20%, availability 10%"""
+    workload = workload_score(open_tickets)
+    score = 50.0
+    score += workload * 0.4
+    score += performance_score(resolved) * 0.3
+    score += priority_match_score(role, priority_cls) * 0.2
+    score += (1.0 if workload < 30 else 0.5) * 0.1
+    return min(100.0, max(0.0, score))
+
+
+class AgentLoad:
+    __slots__ = ("agent_id", "role", "open", "resolved", "version")
+
+    def __init__(self, agent_id: Hashable, role: Any, open_tickets: int, resolved: int):
+        self.agent_id = agent_id
+        self.role = role
+        self.open = open_tickets
+        self.resolved = resolved
+        self.version = 0
+
+
+class AgentLoadIndex:
+    """Open / recently resolved counts of one organization's agents"""
+
+    def __init__(self, rows: Iterable[Tuple[Hashable, Any, int, int]], loaded_at: Optional[float] = None):
+        """rows: (agent id, role, open tickets, resolved in window)"""
+        self.agents: Dict[Hashable, AgentLoad] = {
+            agent_id: AgentLoad(agent_id, role, open_tickets or 0, resolved or 0)
+            for agent_id, role, open_tickets, resolved in rows
+        }
+        self.loaded_at = time.monotonic() if loaded_at is None else loaded_at
+        # priority class -> heap of (-score, open, str(id), version, id); built on first use
+        self._heaps: Dict[str, List[tuple]] = {}
+
+    def __len__(self) -> int:
+        return len(self.agents)
+
+    def copy(self) -> "AgentLoadIndex":
+        """Independent counts to plan a batch on before it is committed"""
+        return AgentLoadIndex(
+            ((a.agent_id, a.role, a.open, a.resolved) for a in self.agents.values()), self.loaded_at,
+        )
+
+    def _entry(self, agent: AgentLoad, priority_cls: str) -> tuple:
+        score = agent_score(agent.role, priority_cls, agent.open, agent.resolved)
+        return (-score, agent.open, str(agent.agent_id), agent.version, agent.agent_id)
+
+    def _heap(self, priority_cls: str) -> List[tuple]:
+        heap = self._heaps.get(priority_cls)
+        if heap is None or len(heap) > 2 * len(self.agents) + _COMPACT_SLACK:
+            heap = [self._entry(agent, priority_cls) for agent in self.agents.values()]
+            heapq.heapify(heap)
+            self._heaps[priority_cls] = heap
+        return heap
+
+    def best(self, priority: Any) -> Optional[Hashable]:
+        """Highest scoring agent for a ticket priority, without assigning"""
+        heap = self._heap(priority_class(priority))
+        agents = self.agents
+        while heap:
+            entry = heap[0]
+            agent = agents.get(entry[4])
+            if agent is not None and agent.version == entry[3]:
+                return entry[4]
+            heapq.heappop(heap)
+        return None
+
+    def top(self, priority: Any, k: int) -> List[Tuple[Hashable, float]]:
+        """k best (agent id, score), best first"""
+        cls = priority_class(priority)
+        entries = heapq.nsmallest(k, (self._entry(agent, cls) for agent in self.agents.values()))
+        return [(entry[4], -entry[0]) for entry in entries]
+
+    def pick(self, priority: Any, status: Any = "in_progress") -> Optional[Hashable]:
+        """best() and count the ticket (now in `status`) against that agent"""
+        agent_id = self.best(priority)
+        if agent_id is not None:
+            self.apply(None, None, agent_id, status)
+        return agent_id
+
+    def apply(self, old_agent: Optional[Hashable], old_status: Any,
+              new_agent: Optional[Hashable], new_status: Any) -> None:
+        """A ticket moved from (old agent, old status) to (new agent, new status)"""
+        old_status, new_status = _value(old_status), _value(new_status)
+        if old_agent == new_agent and old_status == new_status:
+            return
+        self._count(old_agent, old_status, -1)
+        self._count(new_agent, new_status, 1)
+
+    def remove(self, agent_id: Hashable) -> None:
+        """Agent no longer assignable (deactivated, role changed)"""
+        self.agents.pop(agent_id, None)
+
+    def _count(self, agent_id: Optional[Hashable], status: Optional[str], delta: int) -> None:
+        if agent_id is None:
+            return
+        agent = self.agents.get(agent_id)
+        if agent is None:
+            return
+        if status in OPEN_STATUSES:
+            agent.open = max(0, agent.open + delta)
+        elif status == RESOLVED:
+            agent.resolved = max(0, agent.resolved + delta)
+        else:
+            return
+        agent.version += 1
+        for cls, heap in self._heaps.items():
+            heapq.heappush(heap, self._entry(agent, cls))
+
+
+# organization id -> index, per process
+_indexes: Dict[Hashable, AgentLoadIndex] = {}
+
+
+def cached_index(organization_id: Hashable) -> Optional[AgentLoadIndex]:
+    index = _indexes.get(organization_id)
+    if index is None:
+        return None
+    ttl = get_settings().AGENT_LOAD_TTL_SECONDS
+    if time.monotonic() - index.loaded_at >= ttl:
+        _indexes.pop(organization_id, None)
+        return None
+    return index
+
+
+def store_index(organization_id: Hashable, index: AgentLoadIndex) -> None:
+    if get_settings().AGENT_LOAD_TTL_SECONDS > 0:
+        _indexes[organization_id] = index
+
+
+def note_ticket_change(organization_id: Hashable, old_agent: Optional[Hashable], old_status: Any,
+                       new_agent: Optional[Hashable], new_status: Any) -> None:
+    """Keep a cached index current after an assignment or status change"""
+    index = _indexes.get(organization_id)
+    if index is not None:
+        index.apply(old_agent, old_status, new_agent, new_status)
+
+
+def invalidate_agent_load(organization_id: Optional[Hashable] = None) -> None:
+    """Drop cached indexes (all organizations when None) in this process"""
+    if organization_id is None:
+        _indexes.clear()
+    else:
+        _indexes.pop(organization_id, None)
@@ -2,13 +2,14 @@
 ATUM DESK - AI Router Service
 Multi-model routing for different task types
 """
-import hashlib
+import asyncio
 import logging
 import time
-from typing import Optional, Dict, Any, List
+from typing import Dict, Any, List, AsyncIterator
 from datetime import datetime, timedelta
-import requests
 from app.config import get_settings
+from app.services.llm_gateway import get_llm_gateway
+from app.services.ai_response_cache import get_ai_response_cache
 
 logger = logging.getLogger(__name__)
 _settings = get_settings()
@@ -45,41 +46,14 @@ MODEL_ROUTING = {
     }
 }
 
-# In-memory cache (production would use Redis or DB)
-_response_cache: Dict[str, Dict[str, Any]] = {}
-CACHE_TTL_SECONDS = 1800  # 30 minutes
-
 
 class AIRouter:
     """Intelligent AI request router with caching"""
     
     def __init__(self):
-        self.cache = _response_cache
-    
-    def _get_cache_key(self, prompt: str, model: str) -> str:
-        """Generate cache key from prompt and model"""
-        content = f"{model}:{prompt[:500]}"
-        return hashlib.sha256(content.encode()).hexdigest()
-    
-    def _get_cached_response(self, cache_key: str) -> Optional[str]:
-        """Check cache for existing response"""
-        if cache_key in self.cache:
-            entry = self.cache[cache_key]
-            if time.time() - entry["timestamp"] < CACHE_TTL_SECONDS:
-                logger.info(f"Cache hit for key {cache_key[:8]}...")
-                return entry["response"]
-            else:
-                del self.cache[cache_key]
-        return None
+        self.cache = get_ai_response_cache()
     
-    def _set_cached_response(self, cache_key: str, response: str):
-        """Cache the response"""
-        self.cache[cache_key] = {
-            "response": response,
-            "timestamp": time.time()
-        }
-    
-    def route_task(self, task_type: str, prompt: str, use_cache: bool = True) -> Dict[str, Any]:
+    async def route_task(self, task_type: str, prompt: str, use_cache: bool = True) -> Dict[str, Any]:
         """
         Route task to appropriate model.
         
@@ -95,12 +69,11 @@ class AIRouter:
         config = MODEL_ROUTING[task_type]
         model = config["model"]
         
-        # Check cache
-        cache_key = None
+        # Check cache (keyed on the full prompt and generation params)
+        params = self._options(config)
         if use_cache:
-            cache_key = self._get_cache_key(prompt, model)
-            cached = self._get_cached_response(cache_key)
-            if cached:
+            cached = await self.cache.get(model, prompt, params)
+            if cached is not None:
                 return {
                     "model": model,
                     "response": cached,
@@ -110,16 +83,11 @@ class AIRouter:
         
         # Generate response
         try:
-            response = self._generate(
-                model=model,
-                prompt=prompt,
-                temperature=config["temperature"],
-                max_tokens=config["max_tokens"]
-            )
+            response = await self._generate(task_type, prompt)
             
             # Cache if enabled
-            if use_cache and cache_key:
-                self._set_cached_response(cache_key, response)
+            if use_cache:
+                await self.cache.put(model, prompt, params, response)
             
             return {
                 "model": model,
@@ -137,47 +105,49 @@ class AIRouter:
                 "duration_ms": int((time.time() - start_time) * 1000)
             }
     
-    def _generate(self, model: str, prompt: str, temperature: float, max_tokens: int) -> str:
-        """Generate response from Ollama"""
-        response = requests.post(
-            f"{_settings.OLLAMA_URL}/api/generate",
-            json={
-                "model": model,
-                "prompt": prompt,
-                "stream": False,
-                "temperature": temperature,
-                "num_predict": max_tokens
-            },
-            timeout=_settings.OLLAMA_TIMEOUT
+    async def stream_task(self, task_type: str, prompt: str) -> AsyncIterator[str]:
+        """Stream the routed model's response piece by piece (uncached)"""
+        if task_type not in MODEL_ROUTING:
+            task_type = "standard"
+        config = MODEL_ROUTING[task_type]
+        async for piece in get_llm_gateway().stream(
+            prompt,
+            model=config["model"],
+            tier=task_type,
+            options=self._options(config),
+        ):
+            yield piece
+    
+    @staticmethod
+    def _options(config: Dict[str, Any]) -> Dict[str, Any]:
+        return {"temperature": config["temperature"], "num_predict": config["max_tokens"]}
+    
+    async def _generate(self, task_type: str, prompt: str) -> str:
+        """Generate response through the shared LLM gateway"""
+        config = MODEL_ROUTING[task_type]
+        return await get_llm_gateway().generate(
+            prompt,
+            model=config["model"],
+            tier=task_type,
+            options=self._options(config),
         )
-        response.raise_for_status()
-        result = response.json()
-        return result.get("response", "")
     
-    def batch_generate(self, prompts: List[str], task_type: str = "standard") -> List[Dict[str, Any]]:
-        """Generate responses for multiple prompts"""
-        results = []
-        for prompt in prompts:
-            result = self.route_task(task_type, prompt)
-            results.append(result)
-        return results
+    async def batch_generate(self, prompts: List[str], task_type: str = "standard") -> List[Dict[str, Any]]:
+        """Generate responses for multiple prompts concurrently (bounded by the tier limit)"""
+        return list(await asyncio.gather(*(self.route_task(task_type, prompt) for prompt in prompts)))
     
-    def get_model_status(self) -> Dict[str, Any]:
+    async def get_model_status(self) -> Dict[str, Any]:
         """Get status of all available models"""
+        gateway = get_llm_gateway()
         status = {
             "available_models": [],
-            "cache_size": len(self.cache),
-            "routing": MODEL_ROUTING
+            "cache": self.cache.stats(),
+            "routing": MODEL_ROUTING,
+            "gateway": gateway.stats(),
         }
         
         try:
-            response = requests.get(
-                f"{_settings.OLLAMA_URL}/api/tags",
-                timeout=5
-            )
-            if response.status_code == 200:
-                models = response.json().get("models", [])
-                status["available_models"] = [m["name"] for m in models]
+            status["available_models"] = await gateway.list_models()
         except Exception as e:
             status["error"] = str(e)
         
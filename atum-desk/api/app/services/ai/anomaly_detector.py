@@ -1,23 +1,39 @@
 """
 Anomaly Detection Service
 Detects unusual patterns in ticket data
+
+Ticket anomalies are z-scores against seasonal baselines the metrics worker
+keeps online (app/services/anomaly_baselines.py); agent anomalies compare
+each agent's open tickets, one grouped count over ix_tickets_open_assignee.
 """
 import logging
 from typing import Dict, Any, List, Optional
 from uuid import UUID
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from collections import defaultdict
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
+from sqlalchemy import text
 
-from app.models.ticket import Ticket, TicketStatus, TicketPriority
-from app.models.user import User
 from app.config import get_settings
+from app.services.anomaly_baselines import summarize
 
 logger = logging.getLogger(__name__)
 _settings = get_settings()
 
+MAX_ANOMALIES = 100
+
+# Open tickets per assignee; the status predicate matches the partial index
+# ix_tickets_open_assignee (statuses as in agent_load.OPEN_STATUSES)
+OPEN_TICKETS_SQL = text("""
+    SELECT t.assigned_to, u.full_name, count(*)
+    FROM tickets t
+    JOIN users u ON u.id = t.assigned_to
+    WHERE t.organization_id = :org_id AND t.assigned_to IS NOT NULL
+      AND lower(t.status::text) IN ('new', 'in_progress')
+    GROUP BY t.assigned_to, u.full_name
+""")
+
 
 class AnomalyDetector:
     """Detects anomalous patterns in ticket data"""
@@ -31,175 +47,44 @@ class AnomalyDetector:
         days: int = 7
     ) -> Dict[str, Any]:
         """
-        Detect anomalies in ticket patterns for an organization.
+        Detect anomalies in ticket patterns for an organization: hours of
+        the last `days` days whose volume, urgent, resolved or SLA breach
+        counts left their baseline, newest first.
         """
-        since = datetime.utcnow() - timedelta(days=days)
-        
-        # Get ticket statistics
-        stats = await self._get_ticket_stats(organization_id, since)
-        
-        # Get historical baseline (30 days before)
-        historical_since = since - timedelta(days=30)
-        historical_stats = await self._get_ticket_stats(organization_id, historical_since)
-        
-        anomalies = []
-        
-        # Check for volume anomaly
-        if stats["total_tickets"] > historical_stats["avg_daily"] * 2:
-            anomalies.append({
-                "type": "volume_spike",
-                "severity": "high",
-                "message": f"Ticket volume 2x higher than average",
-                "details": {
-                    "current": stats["total_tickets"],
-                    "historical_avg": historical_stats["avg_daily"]
-                },
-                "recommendation": "Consider scaling support team or investigating root cause"
-            })
-        
-        # Check for priority distribution anomaly
-        urgent_pct = stats["urgent_pct"]
-        if urgent_pct > 30:
-            anomalies.append({
-                "type": "high_urgent_rate",
-                "severity": "medium",
-                "message": f"High volume of urgent tickets ({urgent_pct}%)",
-                "recommendation": "Review urgent ticket categorization for accuracy"
-            })
-        
-        # Check for unassigned tickets backlog
-        if stats["unassigned_count"] > 20:
-            anomalies.append({
-                "type": "backlog",
-                "severity": "high",
-                "message": f"{stats['unassigned_count']} tickets unassigned",
-                "recommendation": "Enable auto-assignment or add capacity"
-            })
-        
-        # Check for SLA breach pattern
-        if stats["breached_count"] > 5:
-            anomalies.append({
-                "type": "sla_breaches",
-                "severity": "high",
-                "message": f"{stats['breached_count']} SLA breaches in {days} days",
-                "recommendation": "Review SLA policies and team capacity"
-            })
-        
-        # Check for response time anomaly
-        if stats["avg_response_hours"] > 24:
-            anomalies.append({
-                "type": "slow_response",
-                "severity": "medium",
-                "message": f"Average response time: {stats['avg_response_hours']:.1f}h",
-                "recommendation": "Review agent workload distribution"
-            })
-        
-        return {
-            "anomalies": anomalies,
-            "anomaly_count": len(anomalies),
-            "period_days": days,
-            "severity_counts": {
-                "high": len([a for a in anomalies if a["severity"] == "high"]),
-                "medium": len([a for a in anomalies if a["severity"] == "medium"])
+        result = await self.db.execute(
+            text("""
+                SELECT metric, bucket, value, expected, z_score, partial
+                FROM ticket_anomalies
+                WHERE organization_id = :org_id AND bucket >= :since
+                ORDER BY bucket DESC, metric
+                LIMIT :limit
+            """),
+            {
+                "org_id": organization_id,
+                "since": datetime.now(timezone.utc) - timedelta(days=days),
+                "limit": MAX_ANOMALIES,
             }
-        }
-    
-    async def _get_ticket_stats(
-        self,
-        organization_id: UUID,
-        since: datetime
-    ) -> Dict[str, Any]:
-        """Get ticket statistics for a period"""
-        # Total tickets
-        total_result = await self.db.execute(
-            select(func.count(Ticket.id)).where(
-                and_(
-                    Ticket.organization_id == organization_id,
-                    Ticket.created_at >= since
-                )
-            )
-        )
-        total_tickets = total_result.scalar() or 0
-        
-        # By priority
-        priority_result = await self.db.execute(
-            select(Ticket.priority, func.count(Ticket.id)).where(
-                and_(
-                    Ticket.organization_id == organization_id,
-                    Ticket.created_at >= since
-                )
-            ).group_by(Ticket.priority)
-        )
-        priority_counts = {str(p): c for p, c in priority_result.fetchall()}
-        
-        # Unassigned count
-        unassigned_result = await self.db.execute(
-            select(func.count(Ticket.id)).where(
-                and_(
-                    Ticket.organization_id == organization_id,
-                    Ticket.created_at >= since,
-                    Ticket.assigned_to.is_(None),
-                    Ticket.status.in_([TicketStatus.NEW, TicketStatus.ASSIGNED])
-                )
-            )
-        )
-        unassigned_count = unassigned_result.scalar() or 0
-        
-        # Breached count
-        breached_result = await self.db.execute(
-            select(func.count(Ticket.id)).where(
-                and_(
-                    Ticket.organization_id == organization_id,
-                    Ticket.created_at >= since,
-                    Ticket.sla_due_at < datetime.utcnow(),
-                    Ticket.status.in_([TicketStatus.NEW, TicketStatus.IN_PROGRESS, TicketStatus.ASSIGNED])
-                )
-            )
         )
-        breached_count = breached_result.scalar() or 0
-        
-        days_span = max(1, (datetime.utcnow() - since).days)
-        
-        return {
-            "total_tickets": total_tickets,
-            "avg_daily": total_tickets / days_span,
-            "priority_counts": priority_counts,
-            "urgent_pct": (priority_counts.get("urgent", 0) / max(1, total_tickets)) * 100,
-            "unassigned_count": unassigned_count,
-            "breached_count": breached_count,
-            "avg_response_hours": 18.5  # Placeholder - would calculate from actual data
-        }
+        anomalies = [dict(row._mapping) for row in result.fetchall()]
+        return summarize(anomalies, days)
     
     async def detect_agent_anomalies(
         self,
         organization_id: UUID,
         days: int = 7
     ) -> Dict[str, Any]:
-        """Detect anomalies in agent performance"""
-        since = datetime.utcnow() - timedelta(days=days)
-        
-        # Get agent ticket counts
-        result = await self.db.execute(
-            select(
-                User.id,
-                User.full_name,
-                func.count(Ticket.id).label("ticket_count")
-            ).join(
-                Ticket, Ticket.assigned_to == User.id
-            ).where(
-                and_(
-                    User.organization_id == organization_id,
-                    Ticket.created_at >= since
-                )
-            ).group_by(User.id, User.full_name)
-        )
+        """
+        Detect agents carrying far more (or far fewer) open tickets than the
+        team average. Load is current, so `days` does not narrow it.
+        """
+        result = await self.db.execute(OPEN_TICKETS_SQL, {"org_id": organization_id})
         
         agent_stats = []
         for user_id, name, count in result.fetchall():
             agent_stats.append({
                 "agent_id": str(user_id),
                 "name": name,
-                "tickets": count
+                "tickets": int(count)
             })
         
         if not agent_stats:
@@ -1,20 +1,21 @@
 """
 Customer Sentiment Tracking Service
 Tracks sentiment trends for customers over time
+
+Served from the daily sentiment rollups the SENTIMENT_ANALYSIS job keeps
+current (app/services/sentiment_rollups.py): reads are O(days), not
+O(tickets).
 """
 import logging
 from typing import Dict, Any, List, Optional
 from uuid import UUID
 from datetime import datetime, timedelta
-from collections import defaultdict
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
+from sqlalchemy import text
 
-from app.models.ticket import Ticket
-from app.models.user import User
-from app.models.comment import Comment
 from app.config import get_settings
+from app.services.sentiment_rollups import daily_series, profile_label, split_trend, totals
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -33,64 +34,51 @@ class SentimentTracker:
         """
         Get sentiment profile for a customer.
         """
-        # Get all tickets for this user
         result = await self.db.execute(
-            select(Ticket).where(
-                Ticket.requester_id == user_id
-            ).order_by(Ticket.created_at.desc())
+            text("""
+                SELECT day, positive, neutral, negative, score_sum, tickets
+                FROM customer_sentiment_daily
+                WHERE requester_id = :user_id AND tickets > 0
+                ORDER BY day
+            """),
+            {"user_id": user_id}
+        )
+        rows = result.fetchall()
+        summary = totals(rows)
+        
+        # Every ticket of the customer, analysed or not (requester_id index)
+        count_result = await self.db.execute(
+            text("SELECT count(*) FROM tickets WHERE requester_id = :user_id"),
+            {"user_id": user_id}
         )
-        tickets = result.scalars().all()
+        total_tickets = count_result.scalar() or 0
         
-        if not tickets:
+        if not total_tickets:
             return {
                 "total_tickets": 0,
                 "sentiment_profile": "neutral",
                 "message": "No ticket history"
             }
         
-        # Calculate sentiment distribution
-        sentiment_counts = defaultdict(int)
-        recent_trend = []
-        
-        for ticket in tickets:
-            # Store sentiment data (would be populated by sentiment analysis job)
-            sentiment = getattr(ticket, 'sentiment_score', None) or 0
-            if sentiment > 0.2:
-                sentiment_counts["positive"] += 1
-            elif sentiment < -0.2:
-                sentiment_counts["negative"] += 1
-            else:
-                sentiment_counts["neutral"] += 1
-            
-            recent_trend.append(sentiment)
-        
-        # Calculate overall profile
-        total = len(tickets)
-        positive_pct = (sentiment_counts["positive"] / total) * 100
-        negative_pct = (sentiment_counts["negative"] / total) * 100
-        
-        if negative_pct > 40:
-            profile = "frustrated"
-        elif positive_pct > 60:
-            profile = "satisfied"
-        else:
-            profile = "neutral"
+        analyzed = summary["tickets"]
+        if not analyzed:
+            return {
+                "customer_id": str(user_id),
+                "total_tickets": total_tickets,
+                "analyzed_tickets": 0,
+                "sentiment_profile": "neutral",
+                "message": "No analyzed tickets yet"
+            }
         
-        # Calculate trend
-        trend = "stable"
-        if len(recent_trend) >= 5:
-            first_half = sum(recent_trend[:len(recent_trend)//2]) / (len(recent_trend)//2)
-            second_half = sum(recent_trend[len(recent_trend)//2:]) / (len(recent_trend) - len(recent_trend)//2)
-            if second_half > first_half + 0.2:
-                trend = "improving"
-            elif second_half < first_half - 0.2:
-                trend = "declining"
+        profile = profile_label(summary["distribution"], analyzed)
+        trend = split_trend(rows)
         
         return {
             "customer_id": str(user_id),
-            "total_tickets": total,
+            "total_tickets": total_tickets,
+            "analyzed_tickets": analyzed,
             "sentiment_profile": profile,
-            "distribution": dict(sentiment_counts),
+            "distribution": summary["distribution"],
             "trend": trend,
             "recommendation": self._get_recommendation(profile, trend)
         }
@@ -105,52 +93,57 @@ class SentimentTracker:
             return "Consider for customer loyalty program"
         return "Standard handling"
     
+    async def _org_days(self, organization_id: UUID, since) -> list:
+        result = await self.db.execute(
+            text("""
+                SELECT day, positive, neutral, negative, score_sum, tickets
+                FROM org_sentiment_daily
+                WHERE organization_id = :org_id AND day >= :since AND tickets > 0
+                ORDER BY day
+            """),
+            {"org_id": organization_id, "since": since}
+        )
+        return result.fetchall()
+    
     async def get_org_sentiment_summary(
         self,
         organization_id: UUID,
         days: int = 30
     ) -> Dict[str, Any]:
         """
-        Get overall sentiment summary for an organization.
+        Get overall sentiment summary for an organization. total_tickets and
+        unique_customers cover every ticket created in the period; the
+        distribution and score cover the analyzed_tickets among them.
         """
-        since = datetime.utcnow() - timedelta(days=days)
-        
-        result = await self.db.execute(
-            select(
-                func.count(Ticket.id).label("total"),
-                func.avg(Ticket.priority).label("avg_priority")
-            ).where(
-                and_(
-                    Ticket.organization_id == organization_id,
-                    Ticket.created_at >= since
-                )
-            )
-        )
-        stats = result.one()
+        since = (datetime.utcnow() - timedelta(days=days)).date()
+        rows = await self._org_days(organization_id, since)
+        summary = totals(rows)
         
-        # Get unique customers
-        customers_result = await self.db.execute(
-            select(func.count(func.distinct(Ticket.requester_id))).where(
-                and_(
-                    Ticket.organization_id == organization_id,
-                    Ticket.created_at >= since
-                )
-            )
+        # Ticket volume over every ticket of the period, not only the analysed
+        # ones: the daily ticket rollup and the (organization_id, created_at)
+        # range of tickets
+        volume_result = await self.db.execute(
+            text("""
+                SELECT
+                    (SELECT coalesce(sum(created), 0) FROM ticket_metrics_daily
+                     WHERE organization_id = :org_id AND day >= :since),
+                    (SELECT count(DISTINCT requester_id) FROM tickets
+                     WHERE organization_id = :org_id AND created_at >= :since)
+            """),
+            {"org_id": organization_id, "since": since}
         )
-        unique_customers = customers_result.scalar() or 0
+        total_tickets, unique_customers = volume_result.one()
         
-        # Sentiment distribution (mock for now - would be from actual sentiment data)
+        # -1..1 mean sentiment as 0-100
+        mean = summary["mean_score"]
         return {
             "period_days": days,
-            "total_tickets": stats.total or 0,
-            "unique_customers": unique_customers,
-            "sentiment_distribution": {
-                "positive": int((stats.total or 0) * 0.4),
-                "neutral": int((stats.total or 0) * 0.4),
-                "negative": int((stats.total or 0) * 0.2)
-            },
-            "satisfaction_score": 72.5,  # Would be calculated from CSAT + sentiment
-            "trend": "stable"
+            "total_tickets": total_tickets or 0,
+            "analyzed_tickets": summary["tickets"],
+            "unique_customers": unique_customers or 0,
+            "sentiment_distribution": summary["distribution"],
+            "satisfaction_score": round((mean + 1) * 50, 1) if mean is not None else None,
+            "trend": split_trend(rows)
         }
     
     async def get_sentiment_trend(
@@ -161,24 +154,9 @@ class SentimentTracker:
         """
         Get daily sentiment trend data.
         """
-        trends = []
-        
-        for i in range(days):
-            date = datetime.utcnow() - timedelta(days=days-i-1)
-            date_str = date.strftime("%Y-%m-%d")
-            
-            # Mock data - in production would query actual sentiment scores
-            base_score = 0.1
-            variation = (i % 7 - 3) * 0.05
-            
-            trends.append({
-                "date": date_str,
-                "sentiment_score": round(base_score + variation, 2),
-                "ticket_count": 10 + (i % 5) * 2,
-                "avg_resolution_hours": 18 + (i % 10)
-            })
-        
-        return trends
+        start = (datetime.utcnow() - timedelta(days=days - 1)).date()
+        rows = await self._org_days(organization_id, start)
+        return daily_series(rows, start, days)
 
 
 async def get_customer_profile(
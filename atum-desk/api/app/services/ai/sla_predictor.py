@@ -5,23 +5,62 @@ Predicts when tickets will breach SLA based on historical patterns
 import logging
 from typing import Dict, Any, List, Optional
 from uuid import UUID
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
+import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, func, and_, text, bindparam
 
 from app.models.ticket import Ticket, TicketStatus, TicketPriority
 from app.config import get_settings
+from app.services.sla_risk import (
+    PRIORITY_HOURS, RISK_THRESHOLD, SCORED_STATUSES, STATS_WINDOW_DAYS, WILL_BREACH_PROBABILITY,
+    average_hours, breach_probability, factor_risk, recommendations, will_breach,
+)
 
 logger = logging.getLogger(__name__)
 _settings = get_settings()
 
-PRIORITY_HOURS = {
-    "urgent": 1,
-    "high": 4,
-    "medium": 24,
-    "low": 72
-}
+# Precomputed scores (scripts/run_sla_worker.py). The threshold is a literal
+# so the planner can use the partial index ix_tickets_sla_risk
+AT_RISK_SQL = text("""
+    SELECT t.id, t.subject, lower(t.priority::text), t.sla_due_at, t.assigned_to IS NOT NULL,
+           t.sla_risk_score, s.avg_hours
+    FROM tickets t
+    LEFT JOIN sla_resolution_stats s
+           ON s.organization_id = t.organization_id AND s.priority = lower(t.priority::text)
+    WHERE t.organization_id = :org_id
+    AND t.sla_risk_score > {threshold}
+    AND lower(t.status::text) IN :statuses
+    AND t.sla_due_at > now()
+    ORDER BY t.sla_due_at
+    LIMIT :limit
+""".format(threshold=RISK_THRESHOLD)).bindparams(bindparam("statuses", expanding=True))
+
+# Counts over the same at-risk set: likely breaches (will_breach in SQL,
+# with the default hours for priorities without recent stats), unassigned
+# and high / urgent tickets
+RISK_OUTLOOK_SQL = text("""
+    SELECT count(*),
+           count(*) FILTER (
+               WHERE t.sla_risk_score > {will_breach}
+               OR coalesce(s.avg_hours, CASE lower(t.priority::text) {default_hours} ELSE 24 END) * 3600
+                  > extract(epoch FROM t.sla_due_at - now())
+           ),
+           count(*) FILTER (WHERE t.assigned_to IS NULL),
+           count(*) FILTER (WHERE lower(t.priority::text) IN ('high', 'urgent'))
+    FROM tickets t
+    LEFT JOIN sla_resolution_stats s
+           ON s.organization_id = t.organization_id AND s.priority = lower(t.priority::text)
+    WHERE t.organization_id = :org_id
+    AND t.sla_risk_score > {threshold}
+    AND lower(t.status::text) IN :statuses
+    AND t.sla_due_at > now()
+""".format(
+    threshold=RISK_THRESHOLD,
+    will_breach=WILL_BREACH_PROBABILITY,
+    default_hours=" ".join(f"WHEN '{p}' THEN {h}" for p, h in PRIORITY_HOURS.items()),
+)).bindparams(bindparam("statuses", expanding=True))
 
 
 class SLABreachPredictor:
@@ -54,33 +93,25 @@ class SLABreachPredictor:
             ticket.priority.value if hasattr(ticket.priority, 'value') else str(ticket.priority)
         )
         
-        # Calculate breach probability
-        will_breach = False
-        breach_probability = 0.0
-        
-        if time_until_due > 0:
-            # More time needed than available
-            if avg_resolution_hours > time_until_due:
-                will_breach = True
-                breach_probability = min(0.95, (avg_resolution_hours - time_until_due) / avg_resolution_hours + 0.3)
-            else:
-                # Check for other risk factors
-                risk_score = await self._calculate_risk_score(ticket)
-                breach_probability = risk_score * 0.5
-                will_breach = risk_score > 0.7
+        # Calculate breach probability (same scoring as the batch pass)
+        risk_score = await self._calculate_risk_score(ticket)
+        probability = float(breach_probability(
+            np.array([time_until_due]), np.array([avg_resolution_hours]), np.array([risk_score])
+        )[0])
+        breach = will_breach(probability, time_until_due, avg_resolution_hours)
         
         # Generate recommendations
-        recommendations = []
-        if will_breach or breach_probability > 0.5:
-            recommendations = self._generate_recommendations(ticket, time_until_due, avg_resolution_hours)
+        recs = []
+        if breach or probability > 0.5:
+            recs = self._generate_recommendations(ticket, time_until_due, avg_resolution_hours)
         
         return {
-            "will_breach": will_breach,
-            "breach_probability": round(breach_probability, 2),
+            "will_breach": breach,
+            "breach_probability": round(probability, 2),
             "time_until_due_hours": round(time_until_due, 1),
             "estimated_resolution_hours": round(avg_resolution_hours, 1),
             "confidence": 0.75,
-            "recommendations": recommendations,
+            "recommendations": recs,
             "predicted_at": now.isoformat()
         }
     
@@ -90,8 +121,20 @@ class SLABreachPredictor:
         priority: str
     ) -> float:
         """Get average resolution time for similar tickets"""
+        # Refreshed by the SLA worker; computed here only before its first pass
+        result = await self.db.execute(
+            text("""
+                SELECT avg_hours FROM sla_resolution_stats
+                WHERE organization_id = :org_id AND priority = :priority
+            """),
+            {"org_id": organization_id, "priority": priority.lower()}
+        )
+        row = result.first()
+        if row is not None and row[0] is not None:
+            return float(row[0])
+        
         # Get resolved tickets in last 30 days
-        since = datetime.utcnow() - timedelta(days=30)
+        since = datetime.utcnow() - timedelta(days=STATS_WINDOW_DAYS)
         
         result = await self.db.execute(
             select(
@@ -118,32 +161,15 @@ class SLABreachPredictor:
     
     async def _calculate_risk_score(self, ticket: Ticket) -> float:
         """Calculate risk score based on various factors"""
-        risk = 0.0
-        
-        # Factor 1: Unassigned
-        if not ticket.assigned_to:
-            risk += 0.3
-        
-        # Factor 2: High priority
-        if ticket.priority in [TicketPriority.HIGH, TicketPriority.URGENT]:
-            risk += 0.2
-        
-        # Factor 3: Age of ticket
         age_hours = (datetime.utcnow() - ticket.created_at).total_seconds() / 3600
-        if age_hours > 24:
-            risk += 0.2
-        elif age_hours > 48:
-            risk += 0.3
-        
-        # Factor 4: Escalation level
-        if ticket.escalation_level > 0:
-            risk += ticket.escalation_level * 0.1
-        
-        # Factor 5: Current status
-        if ticket.status == TicketStatus.WAITING_CUSTOMER:
-            risk += 0.15
-        
-        return min(1.0, risk)
+        risk = factor_risk(
+            np.array([age_hours]),
+            np.array([0.0 if ticket.assigned_to else 1.0]),
+            np.array([1.0 if ticket.priority in [TicketPriority.HIGH, TicketPriority.URGENT] else 0.0]),
+            np.array([float(ticket.escalation_level or 0)]),
+            np.array([1.0 if ticket.status == TicketStatus.WAITING_CUSTOMER else 0.0]),
+        )
+        return float(risk[0])
     
     def _generate_recommendations(
         self,
@@ -152,55 +178,68 @@ class SLABreachPredictor:
         est_resolution: float
     ) -> List[str]:
         """Generate actionable recommendations"""
-        recs = []
-        
-        if not ticket.assigned_to:
-            recs.append("Assign ticket to an agent immediately")
-        
-        if time_until_due < est_resolution:
-            recs.append(f"Priority override needed - only {time_until_due:.1f}h remaining but ~{est_resolution:.1f}h needed")
-        
-        if ticket.priority == TicketPriority.LOW and time_until_due < 4:
-            recs.append("Consider upgrading priority to high/urgent")
-        
-        recs.append("Notify team lead for potential escalation")
-        
-        return recs
+        priority = ticket.priority.value if hasattr(ticket.priority, 'value') else str(ticket.priority)
+        return recommendations(bool(ticket.assigned_to), priority, time_until_due, est_resolution)
     
     async def get_breach_risk_tickets(
         self,
         organization_id: UUID,
         limit: int = 10
     ) -> List[Dict[str, Any]]:
-        """Get all tickets at risk of SLA breach"""
-        result = await self.db.execute(
-            select(Ticket).where(
-                and_(
-                    Ticket.organization_id == organization_id,
-                    Ticket.status.in_([TicketStatus.NEW, TicketStatus.IN_PROGRESS, TicketStatus.ASSIGNED]),
-                    Ticket.sla_due_at.isnot(None),
-                    Ticket.sla_due_at > datetime.utcnow()
-                )
-            ).order_by(Ticket.sla_due_at)
-            .limit(limit)
-        )
+        """
+        Get tickets at risk of SLA breach, soonest due first, from the
+        scores the SLA worker persists for every open ticket.
+        """
+        result = await self.db.execute(AT_RISK_SQL, {
+            "org_id": organization_id,
+            "statuses": SCORED_STATUSES,
+            "limit": limit,
+        })
         
-        tickets = result.scalars().all()
+        now = datetime.now(timezone.utc)
         risk_tickets = []
-        
-        for ticket in tickets:
-            prediction = await self.predict_breach(ticket)
-            if prediction["breach_probability"] > 0.3:
-                risk_tickets.append({
-                    "ticket_id": str(ticket.id),
-                    "subject": ticket.subject,
-                    "priority": ticket.priority.value if hasattr(ticket.priority, 'value') else str(ticket.priority),
-                    "sla_due_at": ticket.sla_due_at.isoformat() if ticket.sla_due_at else None,
-                    **prediction
-                })
+        for ticket_id, subject, priority, sla_due_at, assigned, score, avg_hours in result.fetchall():
+            due = sla_due_at if sla_due_at.tzinfo else sla_due_at.replace(tzinfo=timezone.utc)
+            time_until_due = (due - now).total_seconds() / 3600
+            est_resolution = float(avg_hours) if avg_hours is not None else average_hours({}, priority)
+            breach = will_breach(score, time_until_due, est_resolution)
+            risk_tickets.append({
+                "ticket_id": str(ticket_id),
+                "subject": subject,
+                "priority": priority,
+                "sla_due_at": sla_due_at.isoformat(),
+                "will_breach": breach,
+                "breach_probability": round(score, 2),
+                "time_until_due_hours": round(time_until_due, 1),
+                "estimated_resolution_hours": round(est_resolution, 1),
+                "confidence": 0.75,
+                "recommendations": (
+                    recommendations(assigned, priority, time_until_due, est_resolution)
+                    if breach or score > 0.5 else []
+                ),
+                "predicted_at": now.isoformat()
+            })
         
         return risk_tickets
 
+    async def get_risk_outlook(self, organization_id: UUID) -> Dict[str, Any]:
+        """At-risk and likely-breach counts with org-level recommendations"""
+        result = await self.db.execute(RISK_OUTLOOK_SQL, {
+            "org_id": organization_id,
+            "statuses": SCORED_STATUSES,
+        })
+        at_risk, likely, unassigned, high = result.one()
+
+        recs = []
+        if high:
+            recs.append(f"Prioritize {high} high-priority tickets approaching SLA limit")
+        if unassigned:
+            recs.append(f"Assign {unassigned} unassigned at-risk tickets to available agents")
+        if likely:
+            recs.append(f"Consider escalating {likely} tickets likely to breach SLA")
+
+        return {"at_risk": at_risk, "likely_breach": likely, "recommendations": recs}
+
 
 class EstimatedResolutionTime:
     """Predicts estimated time to resolve tickets"""
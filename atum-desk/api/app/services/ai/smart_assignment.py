@@ -2,18 +2,23 @@
 Smart Auto-Assignment Service - AI-Powered Ticket Routing
 """
 import logging
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable
 from uuid import UUID
 from datetime import datetime, timedelta
 
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, func, and_, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.ticket import Ticket, TicketPriority, TicketStatus
 from app.models.user import User, UserRole
+from app.services.agent_load import (
+    PERFORMANCE_WINDOW_DAYS, AgentLoadIndex, cached_index, note_ticket_change, store_index,
+)
 
 logger = logging.getLogger(__name__)
 
+ASSIGNABLE_ROLES = [UserRole.AGENT, UserRole.MANAGER]
+
 
 class SmartAssignmentEngine:
     """
@@ -23,11 +28,48 @@ class SmartAssignmentEngine:
     - Historical performance
     - Priority matching
     - Skills/categories
+
+    Agent counts come from the organization's AgentLoadIndex (one grouped
+    query, cached per process) and the best agent is a heap pop.
     """
     
     def __init__(self, db: AsyncSession):
         self.db = db
     
+    async def load_index(self, organization_id: UUID, refresh: bool = False) -> AgentLoadIndex:
+        """Open and recently resolved ticket counts of every assignable agent in org"""
+        if not refresh:
+            index = cached_index(organization_id)
+            if index is not None:
+                return index
+        
+        since = datetime.utcnow() - timedelta(days=PERFORMANCE_WINDOW_DAYS)
+        is_open = Ticket.status.in_([TicketStatus.NEW, TicketStatus.IN_PROGRESS])
+        recently_resolved = and_(Ticket.status == TicketStatus.RESOLVED, Ticket.updated_at >= since)
+        result = await self.db.execute(
+            select(
+                User.id,
+                User.role,
+                func.count(Ticket.id).filter(is_open),
+                func.count(Ticket.id).filter(recently_resolved),
+            )
+            .select_from(User)
+            .outerjoin(Ticket, and_(
+                Ticket.assigned_to == User.id,
+                Ticket.organization_id == organization_id,
+                or_(is_open, recently_resolved),
+            ))
+            .where(
+                User.organization_id == organization_id,
+                User.is_active == True,
+                User.role.in_(ASSIGNABLE_ROLES)
+            )
+            .group_by(User.id, User.role)
+        )
+        index = AgentLoadIndex(result.all())
+        store_index(organization_id, index)
+        return index
+    
     async def find_best_agent(
         self,
         ticket_priority: str,
@@ -38,140 +80,31 @@ class SmartAssignmentEngine:
         Find the best available agent for a ticket.
         Returns None if no suitable agent found.
         """
-        # Get all active agents in org
-        agents_result = await self.db.execute(
-            select(User).where(
-                and_(
-                    User.organization_id == organization_id,
-                    User.is_active == True,
-                    User.role.in_([UserRole.AGENT, UserRole.MANAGER])
-                )
-            )
-        )
-        agents = agents_result.scalars().all()
-        
-        if not agents:
-            logger.warning(f"No agents found for org {organization_id}")
-            return None
-        
-        # Score each agent
-        agent_scores = []
-        for agent in agents:
-            score = await self._calculate_agent_score(
-                agent=agent,
-                ticket_priority=ticket_priority,
-                ticket_category=ticket_category,
-                organization_id=organization_id
-            )
-            agent_scores.append((agent, score))
-        
-        # Sort by score (highest first)
-        agent_scores.sort(key=lambda x: x[1], reverse=True)
-        
-        # Return best agent
-        best_agent = agent_scores[0][0] if agent_scores else None
+        index = await self.load_index(organization_id)
+        best_agent = await self._select(index, ticket_priority, organization_id)
         logger.info(f"Smart assignment: selected agent {best_agent.email if best_agent else 'None'}")
-        
         return best_agent
     
-    async def _calculate_agent_score(
-        self,
-        agent: User,
-        ticket_priority: str,
-        ticket_category: Optional[str],
-        organization_id: UUID
-    ) -> float:
-        """
-        Calculate agent suitability score (0-100).
-        """
-        score = 50.0  # Base score
-        
-        # Factor 1: Current workload (40% weight)
-        workload_score = await self._get_workload_score(agent.id, organization_id)
-        score += workload_score * 0.4
-        
-        # Factor 2: Performance history (30% weight)
-        perf_score = await self._get_performance_score(agent.id, organization_id)
-        score += perf_score * 0.3
-        
-        # Factor 3: Priority handling (20% weight)
-        priority_score = self._get_priority_match_score(agent, ticket_priority)
-        score += priority_score * 0.2
-        
-        # Factor 4: Availability (10% weight)
-        # Check if agent is currently locked/assigned many tickets
-        availability_score = 1.0 if workload_score < 30 else 0.5
-        score += availability_score * 0.1
-        
-        return min(100.0, max(0.0, score))
-    
-    async def _get_workload_score(self, agent_id: UUID, org_id: UUID) -> float:
-        """Get workload score - fewer open tickets = higher score."""
-        result = await self.db.execute(
-            select(func.count(Ticket.id)).where(
-                and_(
-                    Ticket.assigned_to == agent_id,
-                    Ticket.organization_id == org_id,
-                    Ticket.status.in_([TicketStatus.NEW, TicketStatus.IN_PROGRESS])
-                )
-            )
-        )
-        open_tickets = result.scalar() or 0
-        
-        # Fewer tickets = higher score
-        if open_tickets == 0:
-            return 100.0
-        elif open_tickets <= 3:
-            return 80.0
-        elif open_tickets <= 7:
-            return 60.0
-        elif open_tickets <= 15:
-            return 40.0
-        else:
-            return 20.0
-    
-    async def _get_performance_score(self, agent_id: UUID, org_id: UUID) -> float:
-        """Get performance score based on resolution history."""
-        # Get tickets resolved in last 30 days
-        since = datetime.utcnow() - timedelta(days=30)
-        result = await self.db.execute(
-            select(func.count(Ticket.id)).where(
-                and_(
-                    Ticket.assigned_to == agent_id,
-                    Ticket.organization_id == org_id,
-                    Ticket.status == TicketStatus.RESOLVED,
-                    Ticket.updated_at >= since
-                )
-            )
-        )
-        resolved = result.scalar() or 0
-        
-        # Score based on resolution count
-        if resolved >= 50:
-            return 100.0
-        elif resolved >= 30:
-            return 85.0
-        elif resolved >= 15:
-            return 70.0
-        elif resolved >= 5:
-            return 55.0
-        else:
-            return 40.0
+    async def _select(self, index: AgentLoadIndex, ticket_priority: Any, organization_id: UUID) -> Optional[User]:
+        """Best agent of the index that is still assignable (drops stale ones)"""
+        while True:
+            agent_id = index.best(ticket_priority)
+            if agent_id is None:
+                logger.warning(f"No agents found for org {organization_id}")
+                return None
+            agent = await self.db.get(User, agent_id)
+            if (agent is not None and agent.is_active and agent.organization_id == organization_id
+                    and agent.role in ASSIGNABLE_ROLES):
+                return agent
+            index.remove(agent_id)
     
-    def _get_priority_match_score(self, agent: User, ticket_priority: str) -> float:
-        """Check if agent is suitable for priority level."""
-        # Higher role = better for urgent
-        if ticket_priority == "urgent":
-            if agent.role == UserRole.ADMIN:
-                return 100.0
-            elif agent.role == UserRole.MANAGER:
-                return 85.0
-            else:
-                return 70.0
-        elif ticket_priority == "high":
-            return 80.0
-        else:
-            return 70.0
+    def _assign(self, ticket: Ticket, agent: User) -> tuple:
+        """Assign the ticket; returns the index delta (AgentLoadIndex.apply args) to count once committed"""
+        delta = (None, ticket.status, agent.id, TicketStatus.IN_PROGRESS)
+        ticket.assigned_to = agent.id
+        ticket.status = TicketStatus.IN_PROGRESS
+        ticket.updated_at = datetime.utcnow()
+        return delta
     
     async def auto_assign_ticket(self, ticket: Ticket) -> bool:
         """
@@ -182,21 +115,48 @@ class SmartAssignmentEngine:
             logger.info(f"Ticket {ticket.id} already assigned")
             return False
         
-        best_agent = await self.find_best_agent(
-            ticket_priority=ticket.priority.value if hasattr(ticket.priority, 'value') else str(ticket.priority),
-            ticket_category=None,
-            organization_id=ticket.organization_id
-        )
+        index = await self.load_index(ticket.organization_id)
+        best_agent = await self._select(index, ticket.priority, ticket.organization_id)
         
         if best_agent:
-            ticket.assigned_to = best_agent.id
-            ticket.status = TicketStatus.IN_PROGRESS
-            ticket.updated_at = datetime.utcnow()
+            delta = self._assign(ticket, best_agent)
             await self.db.commit()
+            index.apply(*delta)
             logger.info(f"Auto-assigned ticket {ticket.id} to {best_agent.email}")
             return True
         
         return False
+    
+    async def assign_many(self, tickets: Iterable[Ticket]) -> Dict[str, UUID]:
+        """
+        Backlog assignment: each unassigned ticket, in order, goes to the best
+        agent given the assignments made before it. One index load per
+        organization and a single commit. Returns ticket id -> agent id.
+        """
+        # Planned on copies: the cached indexes only count the batch once committed
+        indexes: Dict[UUID, AgentLoadIndex] = {}
+        deltas: List[tuple] = []
+        assigned: Dict[str, UUID] = {}
+        for ticket in tickets:
+            if ticket.assigned_to:
+                continue
+            index = indexes.get(ticket.organization_id)
+            if index is None:
+                index = indexes[ticket.organization_id] = (await self.load_index(ticket.organization_id)).copy()
+            agent = await self._select(index, ticket.priority, ticket.organization_id)
+            if agent is None:
+                continue
+            delta = self._assign(ticket, agent)
+            index.apply(*delta)
+            deltas.append((ticket.organization_id, delta))
+            assigned[str(ticket.id)] = agent.id
+        
+        if assigned:
+            await self.db.commit()
+            for organization_id, delta in deltas:
+                note_ticket_change(organization_id, *delta)
+        logger.info(f"Bulk assignment: {len(assigned)} tickets assigned")
+        return assigned
 
 
 async def smart_assign_ticket(db: AsyncSession, ticket: Ticket) -> bool:
@@ -0,0 +1,199 @@
+"""
+ATUM DESK - AI Response Cache
+
+Tier 1: bounded in-process LRU with per-entry TTL
+Tier 2: ai_response_cache table in Postgres, shared by every API worker and
+        surviving restarts (NO REDIS - architecture constraint)
+
+Keys are sha256(model, full prompt, generation params): two prompts that
+differ anywhere (e.g. only in the ticket body after a shared preamble) never
+share an entry, and neither do the same prompt at different temperatures.
+
+Expired rows are deleted by the writers themselves: at most once per
+PURGE_INTERVAL per process, a write also removes up to PURGE_BATCH expired
+rows (ix_ai_response_cache_expires), so the table does not grow without
+bound when no CLEANUP_LOGS job is scheduled.
+"""
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import text
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_settings = get_settings()
+
+PURGE_INTERVAL = 300  # seconds between expired-row purges per process
+PURGE_BATCH = 5000
+
+PURGE_EXPIRED_SQL = text("""
+    DELETE FROM ai_response_cache
+    WHERE cache_key IN (
+        SELECT cache_key FROM ai_response_cache
+        WHERE expires_at < now()
+        ORDER BY expires_at
+        LIMIT :limit
+    )
+""")
+
+
+def response_key(model: str, prompt: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """sha256 hex digest of everything that determines the response"""
+    payload = json.dumps([model, prompt, params or {}], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _count(tier: str, result: str) -> None:
+    try:
+        from app.routers.metrics import ai_response_cache_total
+        ai_response_cache_total.labels(tier=tier, result=result).inc()
+    except Exception:
+        pass
+
+
+class AIResponseCache:
+    """LRU + TTL + Postgres cache for generated responses"""
+
+    def __init__(
+        self,
+        max_size: Optional[int] = None,
+        ttl_seconds: Optional[int] = None,
+        persist: Optional[bool] = None,
+    ):
+        self.max_size = max_size or _settings.AI_MAX_CACHE_SIZE
+        self.ttl = ttl_seconds or _settings.AI_CACHE_TTL_MINUTES * 60
+        self.persist = _settings.AI_CACHE_PERSIST if persist is None else persist
+        # key -> (expires_at epoch seconds, response)
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._last_purge: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # === Memory tier ===
+
+    def get_local(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put_local(self, key: str, response: str, expires_at: Optional[float] = None) -> None:
+        self._entries[key] = (expires_at or time.time() + self.ttl, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    # === Both tiers ===
+
+    async def get(self, model: str, prompt: str, params: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        key = response_key(model, prompt, params)
+
+        response = self.get_local(key)
+        if response is not None:
+            _count("memory", "hit")
+            self.hits += 1
+            return response
+        _count("memory", "miss")
+
+        if self.persist:
+            stored = await self._load(key)
+            if stored is not None:
+                expires_at, response = stored
+                self.put_local(key, response, expires_at)
+                _count("postgres", "hit")
+                self.hits += 1
+                return response
+            _count("postgres", "miss")
+
+        self.misses += 1
+        return None
+
+    async def put(self, model: str, prompt: str, params: Optional[Dict[str, Any]], response: str) -> None:
+        """Cache a successful response in both tiers (empty responses are skipped)"""
+        if not response:
+            return
+        key = response_key(model, prompt, params)
+        self.put_local(key, response)
+        if self.persist:
+            await self._store(key, model, response)
+
+    def clear(self) -> None:
+        """Drop the memory tier (Postgres entries expire on their own)"""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "shared": self.persist,
+        }
+
+    # === Postgres tier ===
+
+    async def _load(self, key: str) -> Optional[Tuple[float, str]]:
+        try:
+            from app.db.base import engine
+            async with engine.connect() as conn:
+                result = await conn.execute(
+                    text("""
+                        SELECT extract(epoch FROM expires_at), response
+                        FROM ai_response_cache
+                        WHERE cache_key = :key AND expires_at > now()
+                    """),
+                    {"key": key},
+                )
+                row = result.fetchone()
+                return (float(row[0]), row[1]) if row else None
+        except Exception as e:
+            logger.warning(f"AI response cache lookup failed: {e}")
+            return None
+
+    async def _store(self, key: str, model: str, response: str) -> None:
+        try:
+            from app.db.base import engine
+            async with engine.begin() as conn:
+                await conn.execute(
+                    text("""
+                        INSERT INTO ai_response_cache (cache_key, model, response, expires_at)
+                        VALUES (:key, :model, :response, now() + make_interval(secs => :ttl))
+                        ON CONFLICT (cache_key) DO UPDATE
+                        SET response = EXCLUDED.response, expires_at = EXCLUDED.expires_at
+                    """),
+                    {"key": key, "model": model, "response": response, "ttl": self.ttl},
+                )
+                if self._last_purge is None or time.monotonic() - self._last_purge >= PURGE_INTERVAL:
+                    self._last_purge: Optional[float] = None
+                    result = await conn.execute(PURGE_EXPIRED_SQL, {"limit": PURGE_BATCH})
+                    if result.rowcount:
+                        logger.info(f"Purged {result.rowcount} expired AI responses")
+        except Exception as e:
+            logger.warning(f"AI response cache write failed: {e}")
+
+
+# Process-wide cache shared by the AI router
+_cache: Optional[AIResponseCache] = None
+
+
+def get_ai_response_cache() -> AIResponseCache:
+    global _cache
+    if _cache is None:
+        _cache = AIResponseCache()
+    return _cache
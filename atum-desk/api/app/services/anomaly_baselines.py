@@ -0,0 +1,375 @@
+"""
+ATUM DESK - Online Anomaly Baselines
+
+Streaming detector for hourly ticket metrics per organization:
+
+    created       tickets created in the hour         spikes and drops
+    urgent        urgent tickets created              spikes
+    resolved      tickets resolved                    drops
+    sla_breached  resolutions past their SLA due time spikes
+
+Each (organization, metric) keeps an exponentially weighted mean and
+variance per seasonal slot (hour of day, weekdays and weekends apart), so
+a Monday 10:00 is compared with earlier weekday 10:00s. A closed hour is
+scored against its slot before updating it (anomalous values are clamped to
+the threshold first so one burst does not become the new normal); the hour
+still open is checked for spikes on its running totals, so a burst shows
+up before the hour ends. Scores are z = (value - mean) / sd with a Poisson
+floor on the variance, which keeps low-volume orgs from alerting on one
+extra ticket.
+
+scripts/metrics_snapshot_worker.py holds the detector in memory, feeds it
+the hourly totals each metric fold returns (app/services/ticket_metrics.py),
+persists baselines every BASELINE_PERSIST_INTERVAL seconds and anomalies
+every cycle. The /anomalies route reads ticket_anomalies.
+scripts/replay_anomalies.py replays history through the detector.
+"""
+import json
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+METRICS = ("created", "urgent", "resolved", "sla_breached")
+# Which side of the baseline is reported, per metric
+SPIKES = np.array([True, True, False, True])
+DROPS = np.array([True, False, True, False])
+
+SLOTS = 48
+ALPHA = 0.15
+Z_THRESHOLD = 4.0
+Z_HIGH = 6.0
+# Observations of a slot before it is scored
+MIN_OBSERVATIONS = 5
+# Smallest |value - expected| reported, whatever the z-score (a quiet hour
+# with 4 tickets instead of 0.5 is not worth an alert)
+MIN_DEVIATION = 5.0
+KEEP_ANOMALIES = 500
+HOUR = timedelta(hours=1)
+
+# Types, messages and recommendations of reported anomalies: (metric, spike?)
+DESCRIPTIONS = {
+    ("created", True): ("volume_spike", "{value:.0f} tickets created at {hour}, expected ~{expected:.0f}",
+                        "Consider scaling support team or investigating root cause"),
+    ("created", False): ("volume_drop", "Only {value:.0f} tickets created at {hour}, expected ~{expected:.0f}",
+                         "Check inbound channels (email, portal, integrations) for outages"),
+    ("urgent", True): ("urgent_spike", "{value:.0f} urgent tickets at {hour}, expected ~{expected:.0f}",
+                       "Review urgent ticket categorization for accuracy"),
+    ("resolved", False): ("resolution_drop", "Only {value:.0f} tickets resolved at {hour}, expected ~{expected:.0f}",
+                          "Review agent availability and workload distribution"),
+    ("sla_breached", True): ("sla_breach_spike", "{value:.0f} SLA breaches at {hour}, expected ~{expected:.0f}",
+                             "Review SLA policies and team capacity"),
+}
+
+# Hourly rollup totals of one organization after %(after)s, in METRICS
+# order (warm start / replay)
+HOURLY_SQL = """
+    SELECT bucket, created, created_urgent, resolved, sla_breached
+    FROM ticket_metrics_hourly
+    WHERE organization_id = %(org_id)s::uuid AND bucket > %(after)s
+    ORDER BY bucket
+"""
+
+LOAD_BASELINES_SQL = "SELECT organization_id, state FROM anomaly_baselines"
+
+SAVE_BASELINES_SQL = """
+    INSERT INTO anomaly_baselines (organization_id, state, updated_at)
+    SELECT * FROM unnest(%(org_ids)s::uuid[], %(states)s::jsonb[], %(updated_at)s::timestamptz[])
+    ON CONFLICT (organization_id) DO UPDATE
+    SET state = EXCLUDED.state, updated_at = EXCLUDED.updated_at
+"""
+
+SAVE_ANOMALIES_SQL = """
+    INSERT INTO ticket_anomalies
+           (organization_id, metric, bucket, value, expected, z_score, partial, detected_at)
+    VALUES (%(organization_id)s::uuid, %(metric)s, %(bucket)s, %(value)s, %(expected)s, %(z_score)s, %(partial)s, now())
+    ON CONFLICT (organization_id, metric, bucket) DO UPDATE
+    SET value = EXCLUDED.value, expected = EXCLUDED.expected, z_score = EXCLUDED.z_score,
+        partial = EXCLUDED.partial, detected_at = EXCLUDED.detected_at
+"""
+
+# An hour flagged while open that closed inside its baseline
+RETRACT_ANOMALY_SQL = """
+    DELETE FROM ticket_anomalies
+    WHERE organization_id = %(organization_id)s::uuid AND metric = %(metric)s AND bucket = %(bucket)s
+"""
+
+# Hours flagged while open, to be confirmed or retracted when they close
+LOAD_PARTIAL_SQL = """
+    SELECT organization_id, metric, bucket, value, expected, z_score
+    FROM ticket_anomalies WHERE partial
+"""
+
+PRUNE_ANOMALIES_SQL = "DELETE FROM ticket_anomalies WHERE bucket < now() - make_interval(days => %(days)s)"
+
+
+def hour_start(ts: datetime) -> datetime:
+    ts = ts.astimezone(timezone.utc) if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def slot(hour: datetime) -> int:
+    """Seasonal slot: hour of day, weekend hours after weekday ones"""
+    return hour.hour + (24 if hour.weekday() >= 5 else 0)
+
+
+def z_scores(values: np.ndarray, mean: np.ndarray, var: np.ndarray) -> np.ndarray:
+    return (values - mean) / np.sqrt(np.maximum(np.maximum(var, mean), 1.0))
+
+
+class OrgBaseline:
+    """EWMA mean / variance per metric and slot for one organization"""
+
+    __slots__ = ("mean", "var", "count", "last_closed", "pending")
+
+    def __init__(self):
+        self.mean = np.zeros((len(METRICS), SLOTS), dtype=np.float32)
+        self.var = np.zeros((len(METRICS), SLOTS), dtype=np.float32)
+        self.count = np.zeros(SLOTS, dtype=np.uint16)
+        self.last_closed: Optional[datetime] = None
+        # Running totals of hours not yet closed
+        self.pending: Dict[datetime, np.ndarray] = {}
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            "metrics": list(METRICS),
+            "mean": self.mean.round(4).tolist(),
+            "var": self.var.round(4).tolist(),
+            "count": self.count.tolist(),
+            "last_closed": self.last_closed.isoformat() if self.last_closed else None,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "OrgBaseline":
+        baseline = cls()
+        if state.get("metrics") == list(METRICS):
+            baseline.mean[:] = state["mean"]
+            baseline.var[:] = state["var"]
+            baseline.count[:] = state["count"]
+            if state.get("last_closed"):
+                baseline.last_closed = datetime.fromisoformat(state["last_closed"])
+        return baseline
+
+
+class OnlineAnomalyDetector:
+    """
+    In-memory baselines for many organizations. Feed hourly totals with
+    observe() and move time forward with advance(); the drain_* methods
+    return what to persist since the previous call.
+    """
+
+    def __init__(self, alpha: float = ALPHA, z_threshold: float = Z_THRESHOLD,
+                 min_observations: int = MIN_OBSERVATIONS):
+        self.alpha = alpha
+        self.z_threshold = z_threshold
+        self.min_observations = min_observations
+        self.orgs: Dict[str, OrgBaseline] = {}
+        self.recent: Dict[str, OrderedDict] = {}
+        self._partial: set = set()
+        self._dirty: set = set()
+        self._found: Dict[Tuple[str, str, datetime], Dict[str, Any]] = {}
+        self._retracted: set = set()
+        self.late = 0
+
+    def baseline(self, org_id: str) -> OrgBaseline:
+        baseline = self.orgs.get(org_id)
+        if baseline is None:
+            baseline = self.orgs[org_id] = OrgBaseline()
+        return baseline
+
+    def load(self, org_id: str, state: Dict[str, Any]) -> None:
+        self.orgs[org_id] = OrgBaseline.from_state(state)
+
+    def load_partial(self, org_id: str, metric: str, bucket: datetime, value: float, expected: float,
+                     z_score: float) -> None:
+        """
+        A stored open-hour anomaly (after load()); hours the baseline has
+        already closed are retracted, the others are settled when they close
+        """
+        hour = hour_start(bucket)
+        key = (org_id, metric, hour)
+        baseline = self.orgs.get(org_id)
+        if baseline is not None and baseline.last_closed is not None and hour <= baseline.last_closed:
+            self._retracted.add(key)
+            return
+        self._partial.add(key)
+        self.recent.setdefault(org_id, OrderedDict())[(metric, hour)] = {
+            "organization_id": org_id,
+            "metric": metric,
+            "bucket": hour,
+            "value": float(value),
+            "expected": float(expected),
+            "z_score": float(z_score),
+            "partial": True,
+        }
+
+    def observe(self, org_id: str, bucket: datetime, values: Sequence[float]) -> None:
+        """Latest totals of an hour (METRICS order); hours already closed are ignored"""
+        hour = hour_start(bucket)
+        baseline = self.baseline(org_id)
+        if baseline.last_closed is not None and hour <= baseline.last_closed:
+            self.late += 1
+            return
+        x = np.asarray(values, dtype=np.float32)
+        baseline.pending[hour] = x
+        self._score(org_id, baseline, hour, x, closed=False)
+
+    def advance(self, now: datetime) -> None:
+        """Close every hour before the current one (hours without events count as zeros)"""
+        current = hour_start(now)
+        for org_id in self.orgs:
+            self.advance_org(org_id, current)
+
+    def advance_org(self, org_id: str, now: datetime) -> None:
+        baseline = self.orgs.get(org_id)
+        if baseline is None:
+            return
+        if baseline.last_closed is not None:
+            hour = baseline.last_closed + HOUR
+        elif baseline.pending:
+            hour = min(baseline.pending)
+        else:
+            return
+        current = hour_start(now)
+        zeros = np.zeros(len(METRICS), dtype=np.float32)
+        while hour < current:
+            self._close(org_id, baseline, hour, baseline.pending.pop(hour, zeros))
+            hour += HOUR
+
+    def replay(self, org_id: str, rows: Iterable[Sequence[Any]]) -> None:
+        """Hourly rows (bucket, *METRICS values) in time order, each hour closed before the next"""
+        for bucket, *values in rows:
+            self.advance_org(org_id, bucket)
+            self.observe(org_id, bucket, values)
+
+    def _close(self, org_id: str, baseline: OrgBaseline, hour: datetime, x: np.ndarray) -> None:
+        s = slot(hour)
+        z = self._score(org_id, baseline, hour, x, closed=True)
+        mean, var = baseline.mean[:, s], baseline.var[:, s]
+        if baseline.count[s] == 0:
+            mean[:] = x
+        else:
+            # Anomalous values move the baseline only as far as the threshold
+            sd = np.sqrt(np.maximum(np.maximum(var, mean), 1.0))
+            x = np.clip(x, mean - self.z_threshold * sd, mean + self.z_threshold * sd) if z is not None else x
+            diff = x - mean
+            increment = self.alpha * diff
+            mean += increment
+            var[:] = (1 - self.alpha) * (var + diff * increment)
+        baseline.count[s] = min(int(baseline.count[s]) + 1, np.iinfo(np.uint16).max)
+        baseline.last_closed = hour
+        self._dirty.add(org_id)
+
+    def _score(self, org_id: str, baseline: OrgBaseline, hour: datetime, x: np.ndarray,
+               closed: bool) -> Optional[np.ndarray]:
+        s = slot(hour)
+        if baseline.count[s] < self.min_observations:
+            return None
+        mean = baseline.mean[:, s]
+        z = z_scores(x, mean, baseline.var[:, s])
+        # A running total can only be judged as too high
+        flagged = (SPIKES & (z >= self.z_threshold)) | (closed & DROPS & (z <= -self.z_threshold))
+        flagged &= np.abs(x - mean) >= MIN_DEVIATION
+        if not flagged.any() and not (closed and self._partial):
+            return z
+        for i, metric in enumerate(METRICS):
+            key = (org_id, metric, hour)
+            if flagged[i]:
+                anomaly = {
+                    "organization_id": org_id,
+                    "metric": metric,
+                    "bucket": hour,
+                    "value": float(x[i]),
+                    "expected": round(float(mean[i]), 2),
+                    "z_score": round(float(z[i]), 2),
+                    "partial": not closed,
+                }
+                self._found[key] = anomaly
+                self._retracted.discard(key)
+                if closed:
+                    self._partial.discard(key)
+                else:
+                    self._partial.add(key)
+                recent = self.recent.setdefault(org_id, OrderedDict())
+                recent[(metric, hour)] = anomaly
+                if len(recent) > KEEP_ANOMALIES:
+                    recent.popitem(last=False)
+            elif closed and key in self._partial:
+                self._partial.discard(key)
+                self._found.pop(key, None)
+                self._retracted.add(key)
+                self.recent.get(org_id, {}).pop((metric, hour), None)
+        return z
+
+    def anomalies(self, org_id: str, since: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        return [a for a in self.recent.get(org_id, {}).values() if since is None or a["bucket"] >= since]
+
+    def drain_anomalies(self) -> Tuple[List[Dict[str, Any]], List[Tuple[str, str, datetime]]]:
+        """(anomalies found or updated, anomalies retracted) since the last call"""
+        found, retracted = list(self._found.values()), list(self._retracted)
+        self._found, self._retracted = {}, set()
+        return found, retracted
+
+    def requeue(self, found: List[Dict[str, Any]], retracted: List[Tuple[str, str, datetime]]) -> None:
+        """Put back a drain that could not be saved (newer changes of the same hour win)"""
+        for anomaly in found:
+            key = (anomaly["organization_id"], anomaly["metric"], anomaly["bucket"])
+            if key not in self._retracted:
+                self._found.setdefault(key, anomaly)
+        self._retracted.update(key for key in retracted if key not in self._found)
+
+    def drain_baselines(self) -> Dict[str, Dict[str, Any]]:
+        """States of the baselines changed since the last call"""
+        states = {org_id: self.orgs[org_id].state() for org_id in self._dirty}
+        self._dirty = set()
+        return states
+
+
+def baseline_rows(states: Dict[str, Dict[str, Any]], now: datetime) -> Dict[str, list]:
+    """SAVE_BASELINES_SQL parameters"""
+    return {
+        "org_ids": list(states),
+        "states": [json.dumps(s) for s in states.values()],
+        "updated_at": [now] * len(states),
+    }
+
+
+def retraction_rows(retracted: Iterable[Tuple[str, str, datetime]]) -> List[Dict[str, Any]]:
+    """RETRACT_ANOMALY_SQL parameters"""
+    return [{"organization_id": org_id, "metric": metric, "bucket": bucket} for org_id, metric, bucket in retracted]
+
+
+def describe(anomaly: Dict[str, Any]) -> Dict[str, Any]:
+    """Stored anomaly -> /anomalies entry"""
+    spike = anomaly["z_score"] > 0
+    kind, message, recommendation = DESCRIPTIONS[(anomaly["metric"], spike)]
+    bucket = anomaly["bucket"]
+    hour = f"{bucket:%Y-%m-%d %H}:00 UTC" + (" (so far)" if anomaly["partial"] else "")
+    return {
+        "type": kind,
+        "severity": "high" if abs(anomaly["z_score"]) >= Z_HIGH else "medium",
+        "message": message.format(value=anomaly["value"], expected=anomaly["expected"], hour=hour),
+        "details": {
+            "metric": anomaly["metric"],
+            "hour": bucket.isoformat(),
+            "current": anomaly["value"],
+            "expected": anomaly["expected"],
+            "z_score": anomaly["z_score"],
+        },
+        "recommendation": recommendation,
+    }
+
+
+def summarize(anomalies: Iterable[Dict[str, Any]], days: int) -> Dict[str, Any]:
+    """Stored anomalies (newest first) -> detect_ticket_anomalies payload"""
+    entries = [describe(a) for a in anomalies]
+    return {
+        "anomalies": entries,
+        "anomaly_count": len(entries),
+        "period_days": days,
+        "severity_counts": {
+            "high": len([a for a in entries if a["severity"] == "high"]),
+            "medium": len([a for a in entries if a["severity"] == "medium"]),
+        },
+    }
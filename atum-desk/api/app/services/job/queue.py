@@ -10,6 +10,9 @@ import json
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+# Workers LISTEN on this channel (NOTIFY is delivered when the enqueue commits)
+JOB_NOTIFY_CHANNEL = "job_queue"
+
 
 class JobQueueService:
     """Service to enqueue jobs without blocking the request path"""
@@ -39,6 +42,7 @@ class JobQueueService:
             job_id
         """
         job_id = str(uuid4())
+        now = datetime.now(timezone.utc)
         
         query = """
             INSERT INTO job_queue (
@@ -59,9 +63,15 @@ class JobQueueService:
                 "payload": json.dumps(payload),
                 "priority": priority,
                 "run_after": run_after,
-                "now": datetime.now(timezone.utc),
+                "now": now,
             }
         )
+        if run_after is None or run_after <= now:
+            # Wake an idle worker now; delayed jobs are picked up by its poll
+            await self.db.execute(
+                text("SELECT pg_notify(:channel, :job_type)"),
+                {"channel": JOB_NOTIFY_CHANNEL, "job_type": job_type},
+            )
         await self.db.commit()
         
         return job_id
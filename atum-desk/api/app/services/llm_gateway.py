@@ -0,0 +1,254 @@
+"""
+ATUM DESK - LLM Gateway
+Shared async access to Ollama text generation
+
+One gateway per process (and event loop) is used by the AI router, the
+copilot and the job worker:
+- a single keep-alive httpx connection pool
+- per-tier concurrency limits (fast / standard / elite / reasoning), so a
+  burst of slow reasoning calls cannot starve quick triage
+- in-flight deduplication: identical concurrent requests share one upstream call
+- token streaming (Ollama NDJSON) with time-to-first-token and tokens/sec
+  histograms recorded for every request
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+import weakref
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+_settings = get_settings()
+
+DEFAULT_TIER = "standard"
+
+
+class LLMError(Exception):
+    """Generation backend failed or returned an unusable response"""
+
+
+def tier_limits() -> Dict[str, int]:
+    """Upstream concurrency per MODEL_ROUTING tier"""
+    return {
+        "fast": _settings.AI_FAST_CONCURRENCY,
+        "standard": _settings.AI_STANDARD_CONCURRENCY,
+        "elite": _settings.AI_ELITE_CONCURRENCY,
+        "reasoning": _settings.AI_REASONING_CONCURRENCY,
+    }
+
+
+def _observe(model: str, result: str, elapsed: float, ttft: Optional[float], tokens: int, gen_seconds: float) -> None:
+    try:
+        from app.routers.metrics import (
+            ollama_inference_duration, llm_requests_total,
+            llm_time_to_first_token, llm_tokens_per_second,
+        )
+        llm_requests_total.labels(model=model, result=result).inc()
+        if result != "ok":
+            return
+        ollama_inference_duration.labels(model=model).observe(elapsed)
+        if ttft is not None:
+            llm_time_to_first_token.labels(model=model).observe(ttft)
+        if tokens and gen_seconds > 0:
+            llm_tokens_per_second.labels(model=model).observe(tokens / gen_seconds)
+    except Exception:
+        pass
+
+
+class LLMGateway:
+    """
+    Async Ollama /api/generate client.
+
+    generate() returns the full text; stream() yields text pieces as they
+    arrive. Both stream from Ollama internally so TTFT is always measured.
+    Concurrent generate() calls with the same model, prompt and options are
+    coalesced; streams are never shared.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        timeout: Optional[float] = None,
+        limits: Optional[Dict[str, int]] = None,
+    ):
+        self.base_url = (base_url or _settings.OLLAMA_URL).rstrip("/")
+        self.timeout = timeout or _settings.OLLAMA_TIMEOUT
+        self.limits = limits or tier_limits()
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {
+            tier: asyncio.Semaphore(limit) for tier, limit in self.limits.items()
+        }
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+        self.request_count = 0
+        self.coalesced_count = 0
+        self.error_count = 0
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            pool = sum(self.limits.values())
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(self.timeout, connect=10.0),
+                limits=httpx.Limits(
+                    max_connections=pool,
+                    max_keepalive_connections=pool,
+                    keepalive_expiry=60.0,
+                ),
+            )
+        return self._client
+
+    def _semaphore(self, tier: str) -> asyncio.Semaphore:
+        return self._semaphores.get(tier) or self._semaphores[DEFAULT_TIER]
+
+    # === Public API ===
+
+    async def generate(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        tier: str = DEFAULT_TIER,
+        options: Optional[Dict[str, Any]] = None,
+        format: Optional[str] = None,
+    ) -> str:
+        """Full response text. Raises LLMError on backend failure."""
+        model = model or _settings.OLLAMA_MODEL
+        key = self._request_key(model, prompt, options, format)
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced_count += 1
+        else:
+            task = asyncio.ensure_future(self._collect(model, prompt, tier, options, format))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: one cancelled caller must not cancel the call others wait on
+        return await asyncio.shield(task)
+
+    async def stream(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        tier: str = DEFAULT_TIER,
+        options: Optional[Dict[str, Any]] = None,
+        format: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """Yield response pieces as Ollama produces them"""
+        model = model or _settings.OLLAMA_MODEL
+        async with self._semaphore(tier):
+            async for piece in self._stream(model, prompt, options, format):
+                yield piece
+
+    async def list_models(self) -> List[str]:
+        """Model names installed on the Ollama server"""
+        try:
+            response = await self._get_client().get("/api/tags", timeout=5.0)
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            raise LLMError(str(e)) from e
+        return [m["name"] for m in response.json().get("models", [])]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.request_count,
+            "coalesced": self.coalesced_count,
+            "errors": self.error_count,
+            "in_flight": len(self._inflight),
+            "limits": dict(self.limits),
+        }
+
+    async def aclose(self) -> None:
+        if self._inflight:
+            await asyncio.gather(*self._inflight.values(), return_exceptions=True)
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    # === Upstream ===
+
+    @staticmethod
+    def _request_key(model: str, prompt: str, options: Optional[Dict[str, Any]], format: Optional[str]) -> str:
+        payload = json.dumps([model, prompt, options or {}, format], sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    async def _collect(self, model: str, prompt: str, tier: str,
+                       options: Optional[Dict[str, Any]], format: Optional[str]) -> str:
+        async with self._semaphore(tier):
+            return "".join([piece async for piece in self._stream(model, prompt, options, format)])
+
+    async def _stream(self, model: str, prompt: str,
+                      options: Optional[Dict[str, Any]], format: Optional[str]) -> AsyncIterator[str]:
+        payload: Dict[str, Any] = {"model": model, "prompt": prompt, "stream": True}
+        if options:
+            payload["options"] = options
+        if format:
+            payload["format"] = format
+
+        self.request_count += 1
+        start = time.perf_counter()
+        ttft: Optional[float] = None
+        tokens = 0
+        gen_seconds = 0.0
+        result = "error"
+        try:
+            async with self._get_client().stream("POST", "/api/generate", json=payload) as response:
+                if response.status_code != 200:
+                    body = await response.aread()
+                    raise LLMError(f"Ollama returned {response.status_code}: {body[:200]!r}")
+
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    data = json.loads(line)
+                    if data.get("error"):
+                        raise LLMError(data["error"])
+                    piece = data.get("response", "")
+                    if piece:
+                        if ttft is None:
+                            ttft = time.perf_counter() - start
+                        tokens += 1
+                        yield piece
+                    if data.get("done"):
+                        # Ollama reports exact counts in the final message
+                        tokens = data.get("eval_count") or tokens
+                        eval_ns = data.get("eval_duration")
+                        gen_seconds = eval_ns / 1e9 if eval_ns else time.perf_counter() - start - (ttft or 0.0)
+                        break
+            result = "ok"
+        except LLMError:
+            self.error_count += 1
+            raise
+        except (httpx.HTTPError, ValueError) as e:
+            self.error_count += 1
+            logger.error(f"LLM request for {model} failed: {e}")
+            raise LLMError(str(e)) from e
+        finally:
+            _observe(model, result, time.perf_counter() - start, ttft, tokens, gen_seconds)
+
+
+# Shared gateways, one per event loop: a gateway's connection pool and
+# coalesced in-flight requests belong to the loop that created them
+_gateways: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, LLMGateway]" = weakref.WeakKeyDictionary()
+
+
+def get_llm_gateway() -> LLMGateway:
+    """Get the shared LLM gateway for the running event loop"""
+    loop = asyncio.get_running_loop()
+    gateway = _gateways.get(loop)
+    if gateway is None:
+        gateway = _gateways[loop] = LLMGateway()
+    return gateway
+
+
+async def close_llm_gateway() -> None:
+    """Close the running loop's shared gateway (application / worker shutdown)"""
+    gateway = _gateways.pop(asyncio.get_running_loop(), None)
+    if gateway is not None:
+        await gateway.aclose()
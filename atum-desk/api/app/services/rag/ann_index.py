@@ -0,0 +1,233 @@
+"""
+RAG ANN Index Management - per-tenant strategy for pgvector search
+
+The global HNSW index on rag_chunks is shared by every tenant, so a filtered
+query (organization_id = X) walks ef_search neighbours from *all* tenants and
+throws most away: small tenants lose recall, large ones pay for over-fetch.
+Each organization therefore gets one of three strategies:
+
+- partial: a dedicated partial HNSW index (WHERE organization_id = '<uuid>'),
+           built on demand for large tenants via the admin API
+- exact:   small tenants (<= RAG_EXACT_SEARCH_MAX_CHUNKS) are scanned exactly
+           through the organization_id btree index; perfect recall, cheap
+- global:  the shared HNSW index with iterative over-fetch
+
+Plans are cached per process for RAG_ANN_PLAN_TTL_SECONDS.
+"""
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+_settings = get_settings()
+
+PARTIAL_INDEX_PREFIX = "ix_rag_chunks_hnsw_org_"
+GLOBAL_INDEX = "ix_rag_chunks_hnsw"
+GLOBAL_HALFVEC_INDEX = "ix_rag_chunks_hnsw_half"
+HNSW_EF_SEARCH_MAX = 1000  # pgvector upper bound
+
+
+def _halfvec() -> str:
+    return f"halfvec({_settings.RAG_EMBED_DIM})"
+
+
+def index_expression() -> str:
+    """
+    What the HNSW indexes are built on. With RAG_HALFVEC_INDEX the index
+    stores 2-byte floats (half the memory); rag_chunks keeps full vectors.
+    """
+    if _settings.RAG_HALFVEC_INDEX:
+        return f"(embedding::{_halfvec()}) halfvec_cosine_ops"
+    return "embedding vector_cosine_ops"
+
+
+def distance_sql(column: str, param: str) -> str:
+    """Cosine distance expression matching index_expression() so the index is usable"""
+    if _settings.RAG_HALFVEC_INDEX:
+        return f"({column}::{_halfvec()}) <=> CAST({param} AS {_halfvec()})"
+    return f"{column} <=> CAST({param} AS vector)"
+
+
+def partial_index_name(organization_id: UUID) -> str:
+    return PARTIAL_INDEX_PREFIX + UUID(str(organization_id)).hex
+
+
+def org_literal(organization_id: UUID) -> str:
+    """
+    Inline UUID literal. The planner only matches a partial index against a
+    constant, never a bind parameter; UUID() parsing makes this injection-safe.
+    """
+    return f"'{UUID(str(organization_id))}'::uuid"
+
+
+@dataclass
+class AnnPlan:
+    strategy: str  # partial | exact | global
+    ef_search: int
+    chunk_count: int  # capped at RAG_EXACT_SEARCH_MAX_CHUNKS + 1
+
+
+class AnnPlanner:
+    """Per-organization search strategy, cached with a TTL"""
+
+    def __init__(self, ttl_seconds: Optional[int] = None):
+        self.ttl = ttl_seconds if ttl_seconds is not None else _settings.RAG_ANN_PLAN_TTL_SECONDS
+        self._plans: Dict[UUID, Tuple[float, AnnPlan]] = {}
+
+    async def plan(self, session: AsyncSession, organization_id: UUID, default_ef: int) -> AnnPlan:
+        cached = self._plans.get(organization_id)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        exact_max = _settings.RAG_EXACT_SEARCH_MAX_CHUNKS
+        result = await session.execute(text("""
+            SELECT
+                EXISTS (
+                    SELECT 1 FROM pg_indexes
+                    WHERE tablename = 'rag_chunks' AND indexname = :index_name
+                ),
+                (SELECT hnsw_ef_search FROM rag_config WHERE organization_id = :org_id),
+                (SELECT count(*) FROM (
+                    SELECT 1 FROM rag_chunks WHERE organization_id = :org_id LIMIT :cap
+                ) capped)
+        """), {
+            "index_name": partial_index_name(organization_id),
+            "org_id": organization_id,
+            "cap": exact_max + 1,
+        })
+        has_partial, ef_search, chunk_count = result.fetchone()
+
+        if has_partial:
+            strategy = "partial"
+        elif chunk_count <= exact_max:
+            strategy = "exact"
+        else:
+            strategy = "global"
+
+        plan = AnnPlan(
+            strategy=strategy,
+            ef_search=min(ef_search or default_ef, HNSW_EF_SEARCH_MAX),
+            chunk_count=chunk_count,
+        )
+        self._plans[organization_id] = (time.monotonic() + self.ttl, plan)
+        return plan
+
+    def invalidate(self, organization_id: Optional[UUID] = None) -> None:
+        if organization_id is None:
+            self._plans.clear()
+        else:
+            self._plans.pop(organization_id, None)
+
+
+_planner: Optional[AnnPlanner] = None
+
+
+def get_ann_planner() -> AnnPlanner:
+    global _planner
+    if _planner is None:
+        _planner = AnnPlanner()
+    return _planner
+
+
+# === Admin operations ===
+
+async def index_status(session: AsyncSession, organization_id: UUID) -> Dict[str, Any]:
+    """Strategy, chunk count and tuning for one organization (uncached)"""
+    get_ann_planner().invalidate(organization_id)
+    plan = await get_ann_planner().plan(session, organization_id, _settings.RAG_HNSW_EF_SEARCH)
+
+    result = await session.execute(text("""
+        SELECT pg_relation_size(c.oid)
+        FROM pg_class c
+        WHERE c.relname = :index_name
+    """), {"index_name": partial_index_name(organization_id)})
+    row = result.fetchone()
+
+    return {
+        "organization_id": str(organization_id),
+        "strategy": plan.strategy,
+        "hnsw_ef_search": plan.ef_search,
+        "chunk_count_at_least": plan.chunk_count,
+        "exact_search_max_chunks": _settings.RAG_EXACT_SEARCH_MAX_CHUNKS,
+        "partial_index": partial_index_name(organization_id) if row else None,
+        "partial_index_bytes": row[0] if row else None,
+    }
+
+
+async def set_ef_search(session: AsyncSession, organization_id: UUID, ef_search: int) -> None:
+    """Persist the tenant's hnsw.ef_search in rag_config"""
+    await session.execute(text("""
+        INSERT INTO rag_config (id, organization_id, embed_dim, embed_model, hnsw_ef_search, created_at, updated_at)
+        VALUES (gen_random_uuid(), :org_id, :embed_dim, :embed_model, :ef_search, now(), now())
+        ON CONFLICT (organization_id)
+        DO UPDATE SET hnsw_ef_search = EXCLUDED.hnsw_ef_search, updated_at = now()
+    """), {
+        "org_id": organization_id,
+        "embed_dim": _settings.RAG_EMBED_DIM,
+        "embed_model": _settings.OLLAMA_EMBEDDING_MODEL,
+        "ef_search": ef_search,
+    })
+    await session.commit()
+    get_ann_planner().invalidate(organization_id)
+
+
+async def create_partial_index(engine: AsyncEngine, organization_id: UUID) -> str:
+    """
+    Build the tenant's partial HNSW index without blocking writes.
+    CREATE INDEX CONCURRENTLY cannot run in a transaction, hence AUTOCOMMIT.
+    """
+    name = partial_index_name(organization_id)
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text(f"""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS {name}
+            ON rag_chunks
+            USING hnsw ({index_expression()})
+            WITH (m=16, ef_construction=64)
+            WHERE organization_id = {org_literal(organization_id)}
+        """))
+    get_ann_planner().invalidate(organization_id)
+    logger.info(f"Built partial HNSW index {name}")
+    return name
+
+
+async def drop_partial_index(engine: AsyncEngine, organization_id: UUID) -> None:
+    name = partial_index_name(organization_id)
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+    get_ann_planner().invalidate(organization_id)
+    logger.info(f"Dropped partial HNSW index {name}")
+
+
+async def rebuild_global_index(engine: AsyncEngine, halfvec: bool) -> str:
+    """
+    Build the shared HNSW index for the requested storage (full vector or
+    halfvec) concurrently, then drop the other one. Set RAG_HALFVEC_INDEX to
+    match afterwards; partial indexes must be rebuilt as well.
+    """
+    if halfvec:
+        name, other = GLOBAL_HALFVEC_INDEX, GLOBAL_INDEX
+        expression = f"(embedding::{_halfvec()}) halfvec_cosine_ops"
+    else:
+        name, other = GLOBAL_INDEX, GLOBAL_HALFVEC_INDEX
+        expression = "embedding vector_cosine_ops"
+
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text(f"""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS {name}
+            ON rag_chunks
+            USING hnsw ({expression})
+            WITH (m=16, ef_construction=64)
+        """))
+        await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {other}"))
+    logger.info(f"Global HNSW index is now {name}")
+    return name
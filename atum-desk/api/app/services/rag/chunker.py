@@ -0,0 +1,264 @@
+"""
+RAG Chunker - streaming, token-aware, structure-preserving
+
+Splits text into chunks sized by an approximate BPE token count while keeping
+markdown structure intact: headings start a new chunk (and are repeated as
+context on the chunks below them), paragraphs are kept whole where possible
+and fenced code blocks are never broken mid-line.
+
+Input may be a str or any iterable of lines (e.g. an open file); chunks are
+yielded lazily, so working memory is bounded by max_tokens, not document size.
+"""
+import math
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+# Word-ish pieces the way BPE tokenizers see them: letter runs, digit runs,
+# single punctuation marks. Letter runs are cheap; long ones split into
+# several tokens, digits go in groups of three.
+_TOKEN_RE = re.compile(r"[^\W\d_]+|\d+|[^\w\s]|_")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+_HEADING_RE = re.compile(r"^#{1,6}\s")
+_FENCE_RE = re.compile(r"^(```|~~~)")
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate cl100k-style token count (within ~10% on English prose)"""
+    tokens = 0
+    for match in _TOKEN_RE.finditer(text):
+        piece = match.group()
+        if piece.isdigit():
+            tokens += math.ceil(len(piece) / 3)
+        elif piece.isascii():
+            tokens += 1 + len(piece) // 8
+        elif piece[0].isalpha():
+            # Non-Latin scripts tokenize close to one token per character
+            tokens += len(piece)
+        else:
+            tokens += 1
+    return tokens
+
+
+@dataclass(frozen=True)
+class ChunkSpec:
+    """Chunk size limits for one source type"""
+    max_tokens: int = 512
+    overlap_tokens: int = 64
+    max_chunks: Optional[int] = None  # None = index the whole document
+    markdown: bool = True
+
+
+CHUNK_SPECS: Dict[str, ChunkSpec] = {
+    "kb": ChunkSpec(max_tokens=512, overlap_tokens=64),
+    "ticket": ChunkSpec(max_tokens=384, overlap_tokens=48, markdown=False),
+    "asset": ChunkSpec(max_tokens=256, overlap_tokens=0, max_chunks=4, markdown=False),
+}
+DEFAULT_SPEC = ChunkSpec()
+
+
+def get_chunk_spec(source_type: str) -> ChunkSpec:
+    return CHUNK_SPECS.get(source_type, DEFAULT_SPEC)
+
+
+# === Lines and blocks ===
+
+def _iter_lines(source: Union[str, Iterable[str]]) -> Iterator[str]:
+    """Lines without trailing newline; a str is scanned in place, not split"""
+    if isinstance(source, str):
+        pos = 0
+        end = len(source)
+        while pos < end:
+            nl = source.find("\n", pos)
+            if nl == -1:
+                yield source[pos:].rstrip("\r")
+                return
+            yield source[pos:nl].rstrip("\r")
+            pos = nl + 1
+    else:
+        for line in source:
+            yield line.rstrip("\r\n")
+
+
+def _iter_blocks(lines: Iterable[str], markdown: bool, max_tokens: int) -> Iterator[Tuple[str, str, int, bool]]:
+    """
+    Yield (kind, text, tokens, continued) blocks: 'heading', 'code' or 'para'.
+    A paragraph or fence is yielded as it is read, in parts of at most
+    max_tokens (or one longer line); continued=True marks every part after
+    the first, which joins the previous one with a newline. Memory stays
+    bounded by max_tokens, not by the largest block.
+    """
+    kind = "para"
+    buf: List[str] = []
+    buf_tokens = 0
+    continued = False
+    fence: Optional[str] = None
+
+    def take() -> Tuple[str, str, int, bool]:
+        nonlocal buf, buf_tokens
+        block = (kind, "\n".join(buf), buf_tokens, continued)
+        buf, buf_tokens = [], 0
+        return block
+
+    for line in lines:
+        if fence is not None:
+            line_tokens = estimate_tokens(line)
+            if buf and buf_tokens + line_tokens > max_tokens:
+                yield take()
+                continued = True
+            buf.append(line)
+            buf_tokens += line_tokens
+            if line.strip().startswith(fence):
+                yield take()
+                fence, continued = None, False
+            continue
+
+        stripped = line.strip()
+        if markdown and _FENCE_RE.match(stripped):
+            if buf:
+                yield take()
+            kind, fence, continued = "code", stripped[:3], False
+            buf, buf_tokens = [line], estimate_tokens(line)
+        elif markdown and _HEADING_RE.match(stripped):
+            if buf:
+                yield take()
+            continued = False
+            yield "heading", stripped, estimate_tokens(stripped), False
+        elif not stripped:
+            if buf:
+                yield take()
+            continued = False
+        else:
+            kind = "para"
+            line_tokens = estimate_tokens(line)
+            if buf and buf_tokens + line_tokens > max_tokens:
+                yield take()
+                continued = True
+            buf.append(line.rstrip())
+            buf_tokens += line_tokens
+
+    if buf:
+        # Includes an unterminated fence: still index it
+        yield take()
+
+
+def _split_oversized(kind: str, text: str, max_tokens: int) -> Iterator[Tuple[str, str]]:
+    """
+    Split one block larger than max_tokens into (piece, joiner) pairs:
+    code by line, prose by sentence, and sentences longer than max_tokens
+    by word. joiner is the separator that restores the original text.
+    """
+    if kind == "code":
+        for line in text.split("\n"):
+            yield line, "\n"
+        return
+
+    for line in text.split("\n"):
+        joiner = "\n"
+        for sentence in _SENTENCE_RE.split(line):
+            if not sentence:
+                continue
+            if estimate_tokens(sentence) <= max_tokens:
+                yield sentence, joiner
+                joiner = " "
+                continue
+            words: List[str] = []
+            words_tokens = 0
+            for word in sentence.split(" "):
+                word_tokens = estimate_tokens(word)
+                if words and words_tokens + word_tokens > max_tokens:
+                    yield " ".join(words), joiner
+                    joiner = " "
+                    words, words_tokens = [], 0
+                words.append(word)
+                words_tokens += word_tokens
+            if words:
+                yield " ".join(words), joiner
+                joiner = " "
+
+
+# === Chunking ===
+
+def iter_chunks(
+    source: Union[str, Iterable[str]],
+    spec: ChunkSpec = DEFAULT_SPEC,
+) -> Iterator[Dict[str, object]]:
+    """
+    Lazily yield {"content", "token_count"} chunks of at most ~max_tokens.
+    The last units of a chunk (up to overlap_tokens) are repeated at the
+    start of the next one; chunks under a heading are prefixed with it. A
+    heading with nothing under it is a chunk of its own.
+    """
+    max_tokens = max(spec.max_tokens, 16)
+    heading: Optional[str] = None
+    heading_tokens = 0
+    # (text, tokens, joiner placed before it when it is not first in the chunk)
+    units: List[Tuple[str, int, str]] = []
+    unit_tokens = 0
+    emitted = 0
+    fresh = False  # current chunk has content not yet emitted
+
+    def build() -> Dict[str, object]:
+        body = units[0][0] + "".join(joiner + text for text, _, joiner in units[1:])
+        if heading and units[0][0] != heading:
+            return {"content": f"{heading}\n\n{body}", "token_count": heading_tokens + unit_tokens}
+        return {"content": body, "token_count": unit_tokens}
+
+    def carry_over() -> Tuple[List[Tuple[str, int, str]], int]:
+        kept: List[Tuple[str, int, str]] = []
+        kept_tokens = 0
+        for unit in reversed(units):
+            if kept_tokens + unit[1] > spec.overlap_tokens:
+                break
+            kept.insert(0, unit)
+            kept_tokens += unit[1]
+        return kept, kept_tokens
+
+    for kind, block, block_tokens, continued in _iter_blocks(_iter_lines(source), spec.markdown, max_tokens):
+        if kind == "heading":
+            # units without fresh content: the previous heading had no body
+            if fresh or units:
+                yield build()
+                emitted += 1
+                if spec.max_chunks and emitted >= spec.max_chunks:
+                    return
+            heading = block
+            heading_tokens = block_tokens
+            units, unit_tokens, fresh = [(block, heading_tokens, "")], heading_tokens, False
+            continue
+
+        room = max_tokens - (heading_tokens if heading else 0)
+        if block_tokens <= room:
+            pieces: Iterable[Tuple[str, int, str]] = [(block, block_tokens, "")]
+        else:
+            pieces = (
+                (piece, estimate_tokens(piece), joiner)
+                for piece, joiner in _split_oversized(kind, block, max(room, 16))
+            )
+
+        first = True
+        for piece, piece_tokens, joiner in pieces:
+            if first:
+                # A new block is separated by a blank line, a continued one by a newline
+                joiner, first = ("\n" if continued else "\n\n"), False
+            prefix = heading_tokens if heading and (not units or units[0][0] != heading) else 0
+            if fresh and prefix + unit_tokens + piece_tokens > max_tokens:
+                yield build()
+                emitted += 1
+                if spec.max_chunks and emitted >= spec.max_chunks:
+                    return
+                units, unit_tokens = carry_over()
+                # Overlap that no longer fits with the new piece is dropped
+                while units and unit_tokens + piece_tokens + heading_tokens > max_tokens:
+                    unit_tokens -= units.pop(0)[1]
+            units.append((piece, piece_tokens, joiner))
+            unit_tokens += piece_tokens
+            fresh = True
+
+    if fresh or units:
+        yield build()
+
+
+def chunk_text(text: Union[str, Iterable[str]], source_type: str = "kb") -> List[Dict[str, object]]:
+    """All chunks for a document using its source type's ChunkSpec"""
+    return list(iter_chunks(text, get_chunk_spec(source_type)))
@@ -0,0 +1,172 @@
+"""
+RAG Embedding Cache - content-hash keyed, two tiers
+
+Tier 1: bounded in-process LRU (per worker / API process)
+Tier 2: rag_embedding_cache table in Postgres, shared by all processes and
+        surviving restarts (NO REDIS - architecture constraint)
+
+Keys are (model, sha256(text)) so a model change never serves stale vectors.
+Only successful backend responses are cached; zero-vector fallbacks never are.
+"""
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_settings = get_settings()
+
+CacheKey = Tuple[str, str]
+
+
+def content_hash(value: str) -> str:
+    """sha256 hex digest of the text as sent to the embedding model"""
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+def _count(tier: str, result: str, amount: int = 1) -> None:
+    if not amount:
+        return
+    try:
+        from app.routers.metrics import rag_embedding_cache_total
+        rag_embedding_cache_total.labels(tier=tier, result=result).inc(amount)
+    except Exception:
+        pass
+
+
+class EmbeddingCache:
+    """LRU + Postgres embedding cache"""
+
+    def __init__(self, max_size: Optional[int] = None, persist: Optional[bool] = None):
+        self.max_size = max_size or _settings.RAG_EMBED_CACHE_SIZE
+        self.persist = _settings.RAG_EMBED_CACHE_PERSIST if persist is None else persist
+        self._entries: "OrderedDict[CacheKey, List[float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # === Memory tier ===
+
+    def get_local(self, model: str, digest: str) -> Optional[List[float]]:
+        key = (model, digest)
+        vector = self._entries.get(key)
+        if vector is not None:
+            self._entries.move_to_end(key)
+        return vector
+
+    def put_local(self, model: str, digest: str, vector: List[float]) -> None:
+        key = (model, digest)
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    # === Both tiers ===
+
+    async def get_many(self, model: str, texts: List[str]) -> Dict[int, List[float]]:
+        """
+        Look up texts. Returns {position: vector} for every hit; positions
+        missing from the result need embedding.
+        """
+        found: Dict[int, List[float]] = {}
+        missing: Dict[str, List[int]] = {}
+
+        for i, value in enumerate(texts):
+            digest = content_hash(value)
+            vector = self.get_local(model, digest)
+            if vector is not None:
+                found[i] = vector
+            else:
+                missing.setdefault(digest, []).append(i)
+
+        _count("memory", "hit", len(found))
+        _count("memory", "miss", len(texts) - len(found))
+
+        if missing and self.persist:
+            stored = await self._load(model, list(missing))
+            for digest, vector in stored.items():
+                self.put_local(model, digest, vector)
+                for i in missing[digest]:
+                    found[i] = vector
+            _count("postgres", "hit", len(stored))
+            _count("postgres", "miss", len(missing) - len(stored))
+
+        self.hits += len(found)
+        self.misses += len(texts) - len(found)
+        return found
+
+    async def put_many(self, model: str, texts: List[str], vectors: List[List[float]]) -> None:
+        """Store freshly computed vectors in both tiers"""
+        rows = {}
+        for value, vector in zip(texts, vectors):
+            if not vector:
+                continue
+            digest = content_hash(value)
+            self.put_local(model, digest, vector)
+            rows[digest] = vector
+
+        if rows and self.persist:
+            await self._store(model, rows)
+
+    # === Postgres tier ===
+
+    async def _load(self, model: str, digests: List[str]) -> Dict[str, List[float]]:
+        try:
+            from app.db.base import engine
+            async with engine.connect() as conn:
+                result = await conn.execute(
+                    text("""
+                        SELECT content_hash, embedding
+                        FROM rag_embedding_cache
+                        WHERE model = :model AND content_hash = ANY(:digests)
+                    """),
+                    {"model": model, "digests": digests},
+                )
+                return {row[0]: list(row[1]) for row in result}
+        except Exception as e:
+            logger.warning(f"Embedding cache lookup failed: {e}")
+            return {}
+
+    async def _store(self, model: str, rows: Dict[str, List[float]]) -> None:
+        try:
+            from app.db.base import engine
+            async with engine.begin() as conn:
+                await conn.execute(
+                    text("""
+                        INSERT INTO rag_embedding_cache (model, content_hash, embedding)
+                        VALUES (:model, :content_hash, CAST(:embedding AS real[]))
+                        ON CONFLICT (model, content_hash) DO NOTHING
+                    """),
+                    [
+                        {"model": model, "content_hash": digest, "embedding": vector}
+                        for digest, vector in rows.items()
+                    ],
+                )
+        except Exception as e:
+            logger.warning(f"Embedding cache write failed: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# Process-wide cache shared by every embedding client
+_cache: Optional[EmbeddingCache] = None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    global _cache
+    if _cache is None:
+        _cache = EmbeddingCache()
+    return _cache
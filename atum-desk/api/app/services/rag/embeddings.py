@@ -1,10 +1,21 @@
 """
 RAG Embeddings - Pure Ollama (No LangChain)
+
+OllamaEmbeddingClient is the async path used by the API and the RAG worker:
+one keep-alive connection pool per process, bounded upstream concurrency and
+micro-batching of concurrent callers into a single /api/embed request.
+The blocking get_embedding() helpers remain for scripts without an event loop.
 """
+import asyncio
 import logging
-import requests
-from typing import List, Optional
+import time
+import weakref
+from typing import List, Optional, Tuple, Dict, Any
+
+import httpx
+
 from app.config import get_settings
+from app.services.rag.embedding_cache import EmbeddingCache, get_embedding_cache
 
 logger = logging.getLogger(__name__)
 
@@ -14,16 +25,286 @@ _settings = get_settings()
 _cached_embed_dim: Optional[int] = None
 
 
+class EmbeddingError(Exception):
+    """Embedding backend failed or returned an unusable response"""
+
+
+class _BatchUnsupported(Exception):
+    """Backend has no batch endpoint (Ollama < 0.3.4)"""
+
+
+def _remember_dim(embedding: List[float]) -> None:
+    global _cached_embed_dim
+    if embedding and _cached_embed_dim is None:
+        _cached_embed_dim = len(embedding)
+        logger.info(f"Autodetected embedding dimension: {_cached_embed_dim}")
+
+
+def _observe(path: str, size: int, elapsed: float) -> None:
+    try:
+        from app.routers.metrics import rag_embedding_duration, rag_embedding_batch_size
+        rag_embedding_duration.labels(endpoint=path).observe(elapsed)
+        rag_embedding_batch_size.observe(size)
+    except Exception:
+        pass
+
+
+class OllamaEmbeddingClient:
+    """
+    Async embedding client for Ollama.
+
+    Concurrent embed()/embed_many() calls are queued and flushed either when
+    max_batch_size texts are pending or after batch_window_ms, whichever comes
+    first. Each flush is one POST /api/embed with a list input; if the server
+    does not expose /api/embed the client falls back to one /api/embeddings
+    request per text. At most max_concurrency upstream requests are in flight.
+    With a cache attached, only texts missing from it are sent upstream.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        model: Optional[str] = None,
+        timeout: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        max_batch_size: Optional[int] = None,
+        batch_window_ms: Optional[int] = None,
+        cache: Optional[EmbeddingCache] = None,
+    ):
+        self.base_url = (base_url or _settings.OLLAMA_URL).rstrip("/")
+        self.model = model or _settings.OLLAMA_EMBEDDING_MODEL
+        self.timeout = timeout or _settings.OLLAMA_TIMEOUT
+        self.max_concurrency = max_concurrency or _settings.RAG_EMBED_MAX_CONCURRENCY
+        self.max_batch_size = max_batch_size or _settings.RAG_EMBED_BATCH_SIZE
+        window_ms = _settings.RAG_EMBED_BATCH_WINDOW_MS if batch_window_ms is None else batch_window_ms
+        self.batch_window = window_ms / 1000.0
+        self.cache = cache
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._inflight: set = set()
+        # None until the first batch request tells us whether /api/embed exists
+        self._batch_supported: Optional[bool] = None
+
+        # Per-client counters (Prometheus histograms are process-wide)
+        self.request_count = 0
+        self.text_count = 0
+        self.error_count = 0
+        self.total_seconds = 0.0
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                    keepalive_expiry=30.0,
+                ),
+            )
+        return self._client
+
+    # === Public API ===
+
+    async def embed(self, text: str) -> List[float]:
+        """Embed one text. Raises EmbeddingError on backend failure."""
+        return (await self.embed_many([text]))[0]
+
+    async def embed_many(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts, sharing upstream requests with concurrent callers."""
+        if not texts:
+            return []
+
+        cached: Dict[int, List[float]] = {}
+        if self.cache is not None:
+            cached = await self.cache.get_many(self.model, texts)
+            if len(cached) == len(texts):
+                return [cached[i] for i in range(len(texts))]
+
+        misses = [text for i, text in enumerate(texts) if i not in cached]
+
+        loop = asyncio.get_running_loop()
+        futures = []
+        for text in misses:
+            future = loop.create_future()
+            self._pending.append((text, future))
+            futures.append(future)
+
+        self._schedule_flush(loop)
+        vectors = list(await asyncio.gather(*futures))
+
+        if self.cache is None:
+            return vectors
+
+        await self.cache.put_many(self.model, misses, vectors)
+        fresh = iter(vectors)
+        return [cached[i] if i in cached else next(fresh) for i in range(len(texts))]
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for worker timing reports"""
+        return {
+            "requests": self.request_count,
+            "texts": self.text_count,
+            "errors": self.error_count,
+            "avg_request_ms": round(self.total_seconds / self.request_count * 1000, 2) if self.request_count else 0.0,
+            "batch_supported": self._batch_supported,
+            "cache": self.cache.stats() if self.cache is not None else None,
+        }
+
+    async def aclose(self) -> None:
+        """Flush pending texts and close the connection pool"""
+        self._flush_all()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    # === Batching ===
+
+    def _schedule_flush(self, loop: asyncio.AbstractEventLoop) -> None:
+        while len(self._pending) >= self.max_batch_size:
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+            self._spawn(batch)
+
+        if self._pending and self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush_all)
+
+    def _flush_all(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        while self._pending:
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+            self._spawn(batch)
+
+    def _spawn(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        task = asyncio.ensure_future(self._send(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _send(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        texts = [text for text, _ in batch]
+        try:
+            vectors = await self._request(texts)
+        except Exception as e:
+            error = e if isinstance(e, EmbeddingError) else EmbeddingError(str(e))
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        for (_, future), vector in zip(batch, vectors):
+            if not future.done():
+                future.set_result(vector)
+
+    # === Upstream requests ===
+
+    async def _request(self, texts: List[str]) -> List[List[float]]:
+        if self._batch_supported is not False:
+            try:
+                async with self._semaphore:
+                    vectors = await self._post_batch(texts)
+                self._batch_supported = True
+                return vectors
+            except _BatchUnsupported:
+                self._batch_supported = False
+                logger.info("Embedding backend has no /api/embed, using per-text requests")
+
+        return list(await asyncio.gather(*(self._post_single(text) for text in texts)))
+
+    async def _post_batch(self, texts: List[str]) -> List[List[float]]:
+        data = await self._post("/api/embed", {"model": self.model, "input": texts}, len(texts))
+        vectors = data.get("embeddings") or []
+        if len(vectors) != len(texts):
+            raise EmbeddingError(f"Expected {len(texts)} embeddings, got {len(vectors)}")
+        _remember_dim(vectors[0])
+        return vectors
+
+    async def _post_single(self, text: str) -> List[float]:
+        async with self._semaphore:
+            data = await self._post("/api/embeddings", {"model": self.model, "prompt": text}, 1)
+        vector = data.get("embedding") or []
+        if not vector:
+            raise EmbeddingError("Empty embedding returned")
+        _remember_dim(vector)
+        return vector
+
+    async def _post(self, path: str, payload: Dict[str, Any], size: int) -> Dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            response = await self._get_client().post(path, json=payload)
+            if response.status_code == 404 and path == "/api/embed":
+                raise _BatchUnsupported()
+            response.raise_for_status()
+            return response.json()
+        except _BatchUnsupported:
+            raise
+        except Exception as e:
+            self.error_count += 1
+            logger.error(f"Embedding request to {path} failed: {e}")
+            raise EmbeddingError(str(e)) from e
+        finally:
+            elapsed = time.perf_counter() - start
+            self.request_count += 1
+            self.text_count += size
+            self.total_seconds += elapsed
+            _observe(path, size, elapsed)
+
+
+# Shared clients, one per event loop: a client's pool, flush timers and
+# in-flight batches belong to the loop that created them
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, OllamaEmbeddingClient]" = weakref.WeakKeyDictionary()
+
+
+def get_embedding_client() -> OllamaEmbeddingClient:
+    """Get the shared async embedding client for the running event loop"""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = _clients[loop] = OllamaEmbeddingClient(cache=get_embedding_cache())
+    return client
+
+
+async def close_embedding_client() -> None:
+    """Close the running loop's shared client (application / worker shutdown)"""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+async def aget_embedding(text: str) -> List[float]:
+    """Async get_embedding(); returns a zero vector if the backend fails"""
+    try:
+        return await get_embedding_client().embed(text)
+    except EmbeddingError as e:
+        logger.error(f"Failed to get embedding: {e}")
+        return [0.0] * get_embed_dimension()
+
+
+async def aget_embeddings_batch(texts: List[str]) -> List[List[float]]:
+    """Async get_embeddings_batch(); zero vectors for a failed batch"""
+    try:
+        return await get_embedding_client().embed_many(texts)
+    except EmbeddingError as e:
+        logger.error(f"Failed to get embeddings: {e}")
+        return [[0.0] * get_embed_dimension() for _ in texts]
+
+
 def get_embedding(text: str) -> List[float]:
     """
-    Get embedding for text using Ollama.
+    Get embedding for text using Ollama (blocking).
     Uses ATUM-DESK-AI model.
     Returns list of floats (1536 dimensions for ATUM-DESK-AI).
     """
-    global _cached_embed_dim
-    
     try:
-        response = requests.post(
+        response = httpx.post(
             f"{_settings.OLLAMA_URL}/api/embeddings",
             json={
                 "model": _settings.OLLAMA_EMBEDDING_MODEL,
@@ -32,32 +313,28 @@ def get_embedding(text: str) -> List[float]:
             timeout=_settings.OLLAMA_TIMEOUT,
         )
         response.raise_for_status()
-        
+
         result = response.json()
         embedding = result.get("embedding", [])
-        
-        if embedding and _cached_embed_dim is None:
-            _cached_embed_dim = len(embedding)
-            logger.info(f"Autodetected embedding dimension: {_cached_embed_dim}")
-        
+        _remember_dim(embedding)
+
         return embedding
-        
+
     except Exception as e:
         logger.error(f"Failed to get embedding: {e}")
-        return [0.0] * (_cached_embed_dim or _settings.RAG_EMBED_DIM)
+        return [0.0] * get_embed_dimension()
 
 
 def get_embeddings_batch(texts: List[str]) -> List[List[float]]:
     """
-    Get embeddings for multiple texts.
-    Note: Ollama doesn't have batch API, so we call sequentially.
+    Get embeddings for multiple texts (blocking, sequential).
+    Prefer aget_embeddings_batch() from async code.
     """
     return [get_embedding(text) for text in texts]
 
 
 def get_embed_dimension() -> int:
     """Get current embedding dimension"""
-    global _cached_embed_dim
     if _cached_embed_dim:
         return _cached_embed_dim
     return _settings.RAG_EMBED_DIM
@@ -6,17 +6,15 @@ from typing import List, Dict, Any, Optional
 from uuid import UUID
 import json
 
-from sqlalchemy import select, text
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.services.rag.store import RAGStore
-from app.services.rag.embeddings import get_embedding, get_embeddings_batch
+from app.services.rag.store import RAGStore, ChunkSyncPlan
+from app.services.rag.embeddings import get_embedding_client
+from app.services.rag.chunker import chunk_text
 
 logger = logging.getLogger(__name__)
 
-CHUNK_MAX_TOKENS = 512
-CHUNK_OVERLAP = 50
-
 
 class RAGIndexer:
     """Index content into RAG store"""
@@ -24,6 +22,108 @@ class RAGIndexer:
     def __init__(self, store: RAGStore):
         self.store = store
     
+    # === Source documents (pure: no I/O) ===
+    
+    def ticket_document(
+        self,
+        subject: str,
+        description: str,
+        resolution: Optional[str] = None,
+        status: str = "new",
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Document + chunks for a ticket.
+        Only RESOLVED tickets are indexed (per spec); returns None otherwise.
+        """
+        if status not in ("resolved", "closed"):
+            return None
+        
+        # Problem (subject + description), then resolution (if available);
+        # long descriptions are split instead of truncated
+        problem_text = f"Subject: {subject}\n\nDescription: {description}"
+        chunks = chunk_text(problem_text, "ticket")
+        if resolution:
+            chunks.extend(chunk_text(f"Resolution: {resolution}", "ticket"))
+        
+        return {
+            "title": subject,
+            "visibility": "internal",
+            "metadata": {"status": status},
+            "chunks": chunks,
+        }
+    
+    def kb_document(self, title: str, content: str, visibility: str = "public") -> Dict[str, Any]:
+        """Document + chunks for a KB article"""
+        return {
+            "title": title,
+            "visibility": visibility,
+            "metadata": None,
+            "chunks": chunk_text(content or "", "kb"),
+        }
+    
+    def asset_document(self, name: str, asset_type: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """Document + summary chunk for an asset"""
+        summary = f"Asset: {name} ({asset_type})\n"
+        if metadata:
+            summary += json.dumps(metadata, default=str)
+        
+        return {
+            "title": name,
+            "visibility": "internal",
+            "metadata": metadata,
+            "chunks": chunk_text(summary, "asset"),
+        }
+    
+    # === Indexing ===
+    
+    async def prepare_document(
+        self,
+        organization_id: UUID,
+        source_type: str,
+        source_id: UUID,
+        document: Dict[str, Any],
+    ) -> ChunkSyncPlan:
+        """Upsert the document row and diff its chunks; nothing is embedded yet"""
+        doc_id = await self.store.upsert_document(
+            organization_id=organization_id,
+            source_type=source_type,
+            source_id=source_id,
+            title=document["title"],
+            visibility=document["visibility"],
+            metadata=document["metadata"],
+        )
+        return await self.store.plan_chunk_sync(doc_id, organization_id, document["chunks"])
+    
+    async def index_graph(
+        self,
+        organization_id: UUID,
+        source_type: str,
+        source_id: UUID,
+        document: Dict[str, Any],
+    ) -> None:
+        """Build graph node for an indexed source"""
+        await self.store.upsert_node(
+            organization_id=organization_id,
+            node_type=source_type,
+            node_id=source_id,
+            label=document["title"],
+        )
+    
+    async def index_document(
+        self,
+        organization_id: UUID,
+        source_type: str,
+        source_id: UUID,
+        document: Dict[str, Any],
+    ) -> Dict[str, int]:
+        """Upsert, embed only changed chunks, write, and build graph"""
+        plan = await self.prepare_document(organization_id, source_type, source_id, document)
+        if plan.pending:
+            plan.set_embeddings(await self.embed_many(plan.pending_texts()))
+        stats = await self.store.apply_chunk_sync([plan])
+        await self.index_graph(organization_id, source_type, source_id, document)
+        return stats
+    
     async def index_ticket(
         self,
         organization_id: UUID,
@@ -37,49 +137,13 @@ class RAGIndexer:
         Index a ticket into RAG.
         Only indexes RESOLVED tickets (per spec).
         """
-        if status not in ("resolved", "closed"):
+        document = self.ticket_document(subject, description, resolution, status)
+        if document is None:
             logger.debug(f"Skipping indexing for non-resolved ticket {ticket_id}")
             return False
         
         try:
-            # Create document
-            doc_id = await self.store.upsert_document(
-                organization_id=organization_id,
-                source_type="ticket",
-                source_id=ticket_id,
-                title=subject,
-                visibility="internal",
-                metadata={"status": status},
-            )
-            
-            # Create chunks
-            chunks = []
-            
-            # Chunk 1: Problem (subject + description)
-            problem_text = f"Subject: {subject}\n\nDescription: {description}"
-            chunks.append({
-                "content": problem_text,
-                "token_count": len(problem_text.split()),
-            })
-            
-            # Chunk 2: Resolution (if available)
-            if resolution:
-                resolution_text = f"Resolution: {resolution}"
-                chunks.append({
-                    "content": resolution_text,
-                    "token_count": len(resolution_text.split()),
-                })
-            
-            # Generate embeddings
-            for chunk in chunks:
-                chunk["embedding"] = get_embedding(chunk["content"])
-            
-            # Store chunks
-            await self.store.insert_chunks(doc_id, organization_id, chunks)
-            
-            # Build graph nodes
-            await self._index_ticket_graph(organization_id, ticket_id, subject)
-            
+            await self.index_document(organization_id, "ticket", ticket_id, document)
             logger.info(f"Indexed ticket {ticket_id} for org {organization_id}")
             return True
             
@@ -97,26 +161,8 @@ class RAGIndexer:
     ) -> bool:
         """Index a KB article"""
         try:
-            doc_id = await self.store.upsert_document(
-                organization_id=organization_id,
-                source_type="kb",
-                source_id=article_id,
-                title=title,
-                visibility=visibility,
-            )
-            
-            # Chunk the content
-            chunks = self._chunk_text(content)
-            
-            # Generate embeddings
-            for chunk in chunks:
-                chunk["embedding"] = get_embedding(chunk["content"])
-            
-            await self.store.insert_chunks(doc_id, organization_id, chunks)
-            
-            # Build graph nodes
-            await self._index_kb_graph(organization_id, article_id, title)
-            
+            document = self.kb_document(title, content, visibility)
+            await self.index_document(organization_id, "kb", article_id, document)
             logger.info(f"Indexed KB article {article_id} for org {organization_id}")
             return True
             
@@ -134,35 +180,8 @@ class RAGIndexer:
     ) -> bool:
         """Index an asset"""
         try:
-            doc_id = await self.store.upsert_document(
-                organization_id=organization_id,
-                source_type="asset",
-                source_id=asset_id,
-                title=name,
-                visibility="internal",
-                metadata=metadata,
-            )
-            
-            # Create summary chunk
-            summary = f"Asset: {name} ({asset_type})\n"
-            if metadata:
-                summary += json.dumps(metadata, default=str)
-            
-            chunks = [{"content": summary, "token_count": len(summary.split())}]
-            
-            for chunk in chunks:
-                chunk["embedding"] = get_embedding(chunk["content"])
-            
-            await self.store.insert_chunks(doc_id, organization_id, chunks)
-            
-            # Build graph
-            await self.store.upsert_node(
-                organization_id=organization_id,
-                node_type="asset",
-                node_id=asset_id,
-                label=name,
-            )
-            
+            document = self.asset_document(name, asset_type, metadata)
+            await self.index_document(organization_id, "asset", asset_id, document)
             logger.info(f"Indexed asset {asset_id} for org {organization_id}")
             return True
             
@@ -191,53 +210,11 @@ class RAGIndexer:
             logger.error(f"Failed to delete index for {source_type}/{source_id}: {e}")
             raise
     
-    def _chunk_text(self, text: str, max_tokens: int = CHUNK_MAX_TOKENS) -> List[Dict]:
-        """Split text into chunks"""
-        words = text.split()
-        chunks = []
-        
-        for i in range(0, len(words), max_tokens - CHUNK_OVERLAP):
-            chunk_words = words[i:i + max_tokens]
-            chunk_text = " ".join(chunk_words)
-            
-            chunks.append({
-                "content": chunk_text,
-                "token_count": len(chunk_words),
-            })
-            
-            if len(chunks) >= 10:  # Limit chunks per document
-                break
-        
-        return chunks
-    
-    async def _index_ticket_graph(
-        self,
-        organization_id: UUID,
-        ticket_id: UUID,
-        subject: str,
-    ) -> None:
-        """Build graph nodes for ticket"""
-        # Create node for ticket
-        await self.store.upsert_node(
-            organization_id=organization_id,
-            node_type="ticket",
-            node_id=ticket_id,
-            label=subject,
-        )
-    
-    async def _index_kb_graph(
-        self,
-        organization_id: UUID,
-        article_id: UUID,
-        title: str,
-    ) -> None:
-        """Build graph nodes for KB article"""
-        await self.store.upsert_node(
-            organization_id=organization_id,
-            node_type="kb",
-            node_id=article_id,
-            label=title,
-        )
+    async def embed_many(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts via the shared client (batched, cached)"""
+        # Raises EmbeddingError so the queue job is retried instead of
+        # storing zero vectors under a content hash that would never change
+        return await get_embedding_client().embed_many(texts)
 
 
 async def enqueue_index(
@@ -1,6 +1,7 @@
 """
 RAG Retriever - Hybrid Vector + Keyword + Graph Expansion
 """
+import asyncio
 import logging
 from typing import List, Dict, Any, Optional
 from uuid import UUID
@@ -9,7 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, text
 
 from app.services.rag.store import RAGStore
-from app.services.rag.embeddings import get_embedding
+from app.services.rag.embeddings import aget_embedding
 from app.config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -33,33 +34,34 @@ class RAGRetriever:
     ) -> Dict[str, Any]:
         """
         Full hybrid search:
-        1. Vector similarity search
-        2. Keyword search (Postgres full-text)
-        3. Graph expansion
-        4. Merge and rerank
+        1. Keyword search (Postgres full-text), concurrent with query embedding
+        2. Vector similarity search
+        3. Reciprocal-rank fusion
+        4. Graph expansion
         """
-        # 1. Vector search
-        query_embedding = get_embedding(query)
-        
         # Determine what source types this role can see
         source_types = self._get_visible_source_types(user_role)
         
+        # 1. Keyword search runs on the session while Ollama embeds the query
+        query_embedding, keyword_results = await asyncio.gather(
+            aget_embedding(query),
+            self._keyword_search(
+                organization_id=organization_id,
+                query=query,
+                source_types=source_types,
+                top_k=top_k * 2,  # Get more for merging
+            ),
+        )
+        
+        # 2. Vector search
         vector_results = await self.store.search_similar(
             organization_id=organization_id,
             query_embedding=query_embedding,
-            top_k=top_k * 2,  # Get more for merging
+            top_k=top_k * 2,
             source_types=source_types,
             ef_search=_settings.RAG_HNSW_EF_SEARCH,
         )
         
-        # 2. Keyword search
-        keyword_results = await self._keyword_search(
-            organization_id=organization_id,
-            query=query,
-            source_types=source_types,
-            top_k=top_k * 2,
-        )
-        
         # 3. Merge results
         merged = self._merge_results(vector_results, keyword_results)
         
@@ -93,7 +95,7 @@ class RAGRetriever:
     ) -> List[Dict[str, Any]]:
         """Find tickets similar to a given ticket"""
         # Get ticket info
-        query_embedding = get_embedding(f"ticket:{ticket_id}")
+        query_embedding = await aget_embedding(f"ticket:{ticket_id}")
         
         results = await self.store.search_similar(
             organization_id=organization_id,
@@ -161,60 +163,16 @@ class RAGRetriever:
         source_types: Optional[List[str]],
         top_k: int,
     ) -> List[Dict[str, Any]]:
-        """Simple keyword search using ILIKE (fallback)"""
-        # Build query
-        search_term = f"%{query}%"
-        
-        source_filter = ""
-        params = {"org_id": organization_id, "query": search_term, "limit": top_k}
-        
-        if source_types:
-            placeholders = ", ".join([f":type_{i}" for i in range(len(source_types))])
-            source_filter = f"AND d.source_type IN ({placeholders})"
-            for i, stype in enumerate(source_types):
-                params[f"type_{i}"] = stype
-        
-        stmt = text(f"""
-            SELECT 
-                c.id as chunk_id,
-                c.content,
-                c.chunk_index,
-                d.id as doc_id,
-                d.source_type,
-                d.source_id,
-                d.title,
-                d.visibility,
-                1.0 as similarity
-            FROM rag_chunks c
-            JOIN rag_documents d ON c.document_id = d.id
-            WHERE c.organization_id = :org_id 
-                AND d.organization_id = :org_id
-                AND c.content ILIKE :query
-                {source_filter}
-            ORDER BY d.updated_at DESC
-            LIMIT :limit
-        """)
-        
+        """Ranked full-text search; an FTS failure must not break vector search"""
         try:
-            from app.db.session import AsyncSessionLocal
-            async with AsyncSessionLocal() as session:
-                result = await session.execute(stmt, params)
-                rows = result.fetchall()
-                
-                return [
-                    {
-                        "chunk_id": row[0],
-                        "content": row[1],
-                        "chunk_index": row[2],
-                        "document_id": row[3],
-                        "source_type": row[4],
-                        "source_id": row[5],
-                        "title": row[6],
-                        "visibility": row[7],
-                        "score": row[8],
-                    }
-                    for row in rows
-                ]
+            # Savepoint so a failed FTS query does not abort the shared transaction
+            async with self.store.session.begin_nested():
+                return await self.store.search_keyword(
+                    organization_id=organization_id,
+                    query=query,
+                    top_k=top_k,
+                    source_types=source_types,
+                )
         except Exception as e:
             logger.warning(f"Keyword search failed: {e}")
             return []
@@ -223,19 +181,28 @@ class RAGRetriever:
         self,
         vector_results: List[Dict],
         keyword_results: List[Dict],
+        k: Optional[int] = None,
     ) -> List[Dict]:
-        """Merge and dedupe results from vector and keyword search"""
+        """
+        Reciprocal-rank fusion: score = sum(1 / (k + rank)) over both lists.
+        Raw cosine similarity and ts_rank_cd are not comparable, ranks are.
+        Deduped per source, keeping its best chunk.
+        """
+        k = k or _settings.RAG_RRF_K
+        fused: Dict[Any, Dict] = {}
+        
+        for field, results in (("vector_score", vector_results), ("keyword_score", keyword_results)):
+            for rank, r in enumerate(results, start=1):
+                entry = fused.get(r["chunk_id"])
+                if entry is None:
+                    entry = {**r, "score": 0.0, "vector_score": None, "keyword_score": None}
+                    fused[r["chunk_id"]] = entry
+                entry["score"] += 1.0 / (k + rank)
+                entry[field] = r.get("score")
+        
         seen = set()
         merged = []
-        
-        # Interleave results by score
-        all_results = sorted(
-            vector_results + keyword_results,
-            key=lambda x: x.get("score", 0),
-            reverse=True,
-        )
-        
-        for r in all_results:
+        for r in sorted(fused.values(), key=lambda x: x["score"], reverse=True):
             key = (r["source_type"], r["source_id"])
             if key not in seen:
                 seen.add(key)
@@ -3,20 +3,49 @@ RAG Store - Pure SQLAlchemy + pgvector (No LangChain)
 """
 import uuid
 import logging
-from datetime import datetime
-from typing import List, Optional, Dict, Any, Tuple
+from dataclasses import dataclass, field
+from typing import List, Optional, Dict, Any, Tuple, Callable, Awaitable
 from uuid import UUID
 
-from sqlalchemy import select, insert, update, delete, text, and_, or_
+from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.dialects.postgresql import UUID, JSONB
+import numpy as np
 import pgvector.sqlalchemy.vector
 
 from app.config import get_settings
+from app.services.rag.embedding_cache import content_hash
+from app.services.rag.ann_index import get_ann_planner, org_literal, distance_sql, HNSW_EF_SEARCH_MAX
+from app.db.vector import to_vector
 
 logger = logging.getLogger(__name__)
+_settings = get_settings()
 
 RAG_EMBED_DIM = 1536  # ATUM-DESK-AI dimension
+RAG_FTS_CONFIG = "english"  # must match the rag_chunks.content_tsv generated column
+
+
+@dataclass
+class ChunkSyncPlan:
+    """Result of diffing a document's new chunks against stored rag_chunks"""
+    document_id: UUID
+    organization_id: UUID
+    chunks: List[Dict[str, Any]]
+    to_insert: List[int] = field(default_factory=list)
+    to_update: List[int] = field(default_factory=list)
+    chunk_ids: Dict[int, UUID] = field(default_factory=dict)  # chunk_index -> id for updates
+    stale: int = 0  # stored chunks past the new end
+
+    @property
+    def pending(self) -> List[int]:
+        """Chunk indexes that need a (re-)embedding"""
+        return self.to_insert + self.to_update
+
+    def pending_texts(self) -> List[str]:
+        return [self.chunks[idx]["content"] for idx in self.pending]
+
+    def set_embeddings(self, vectors: List[List[float]]) -> None:
+        for idx, vector in zip(self.pending, vectors):
+            self.chunks[idx]["embedding"] = vector
 
 
 class RAGStore:
@@ -39,7 +68,7 @@ class RAGStore:
         """Create or update a RAG document"""
         doc_id = uuid.uuid4()
         
-        stmt = insert(text("""
+        result = await self.session.execute(text("""
             INSERT INTO rag_documents (id, organization_id, source_type, source_id, title, visibility, metadata_json, created_at, updated_at)
             VALUES (:id, :org_id, :source_type, :source_id, :title, :visibility, :metadata, now(), now())
             ON CONFLICT (organization_id, source_type, source_id) 
@@ -49,23 +78,21 @@ class RAGStore:
                 metadata_json = EXCLUDED.metadata_json,
                 updated_at = now()
             RETURNING id
-        """)).bindparams(
-            id=doc_id,
-            org_id=organization_id,
-            source_type=source_type,
-            source_id=source_id,
-            title=title,
-            visibility=visibility,
-            metadata=metadata or {},
-        )
-        
-        result = await self.session.execute(stmt)
+        """), {
+            "id": doc_id,
+            "org_id": organization_id,
+            "source_type": source_type,
+            "source_id": source_id,
+            "title": title,
+            "visibility": visibility,
+            "metadata": metadata or {},
+        })
         await self.session.commit()
         
         # Get existing or new ID
-        if result.returns_rows:
-            row = result.fetchone()
-            return row[0] if row else doc_id
+        row = result.fetchone()
+        if row:
+            return row[0]
         return doc_id
     
     async def get_document(
@@ -137,35 +164,143 @@ class RAGStore:
         document_id: UUID,
         organization_id: UUID,
         chunks: List[Dict[str, Any]],
+        start_index: int = 0,
+        commit: bool = True,
     ) -> List[UUID]:
-        """Insert chunks with embeddings"""
-        chunk_ids = []
+        """Insert chunks with embeddings (single multi-row executemany)"""
+        if not chunks:
+            return []
+        
+        rows = [
+            self._chunk_row(uuid.uuid4(), document_id, organization_id, start_index + offset, chunk)
+            for offset, chunk in enumerate(chunks)
+        ]
+        
+        await self.session.execute(text("""
+            INSERT INTO rag_chunks (id, organization_id, document_id, chunk_index, content, content_hash, embedding, token_count, created_at)
+            VALUES (:id, :org_id, :doc_id, :idx, :content, :content_hash, :embedding, :tokens, now())
+        """), rows)
+        
+        if commit:
+            await self.session.commit()
+        return [row["id"] for row in rows]
+    
+    async def get_chunk_hashes(
+        self,
+        document_id: UUID,
+        organization_id: UUID,
+    ) -> Dict[int, Tuple[UUID, Optional[str]]]:
+        """Stored chunks of a document as {chunk_index: (chunk_id, content_hash)}"""
+        result = await self.session.execute(
+            text("""
+                SELECT chunk_index, id, content_hash FROM rag_chunks
+                WHERE organization_id = :org_id AND document_id = :doc_id
+            """),
+            {"org_id": organization_id, "doc_id": document_id}
+        )
+        return {row[0]: (row[1], row[2]) for row in result}
+    
+    async def plan_chunk_sync(
+        self,
+        document_id: UUID,
+        organization_id: UUID,
+        chunks: List[Dict[str, Any]],
+    ) -> "ChunkSyncPlan":
+        """Diff chunk content hashes against rag_chunks (read only)"""
+        existing = await self.get_chunk_hashes(document_id, organization_id)
+        plan = ChunkSyncPlan(document_id=document_id, organization_id=organization_id, chunks=chunks)
         
         for idx, chunk in enumerate(chunks):
-            chunk_id = uuid.uuid4()
-            
-            stmt = text("""
-                INSERT INTO rag_chunks (id, organization_id, document_id, chunk_index, content, embedding, token_count, created_at)
-                VALUES (:id, :org_id, :doc_id, :idx, :content, :embedding, :tokens, now())
-            """)
-            
-            embedding_arr = chunk.get("embedding")
-            if embedding_arr is None:
-                embedding_arr = [0.0] * RAG_EMBED_DIM
-            
-            await self.session.execute(stmt, {
-                "id": chunk_id,
-                "org_id": organization_id,
-                "doc_id": document_id,
-                "idx": idx,
-                "content": chunk["content"],
-                "embedding": embedding_arr,
-                "tokens": chunk.get("token_count"),
-            })
-            chunk_ids.append(chunk_id)
+            chunk["content_hash"] = content_hash(chunk["content"])
+            stored = existing.get(idx)
+            if stored is None:
+                plan.to_insert.append(idx)
+            elif stored[1] != chunk["content_hash"]:
+                plan.to_update.append(idx)
+                plan.chunk_ids[idx] = stored[0]
+        
+        plan.stale = sum(1 for idx in existing if idx >= len(chunks))
+        return plan
+    
+    async def apply_chunk_sync(self, plans: List["ChunkSyncPlan"]) -> Dict[str, int]:
+        """
+        Write one or more diff plans (embeddings already set) with a single
+        executemany per statement, then commit once.
+        """
+        inserts, updates, deletes = [], [], []
+        for plan in plans:
+            for idx in plan.to_insert:
+                inserts.append(self._chunk_row(uuid.uuid4(), plan.document_id, plan.organization_id, idx, plan.chunks[idx]))
+            for idx in plan.to_update:
+                updates.append(self._chunk_row(plan.chunk_ids[idx], plan.document_id, plan.organization_id, idx, plan.chunks[idx]))
+            if plan.stale:
+                deletes.append({"org_id": plan.organization_id, "doc_id": plan.document_id, "n": len(plan.chunks)})
+        
+        if inserts:
+            await self.session.execute(text("""
+                INSERT INTO rag_chunks (id, organization_id, document_id, chunk_index, content, content_hash, embedding, token_count, created_at)
+                VALUES (:id, :org_id, :doc_id, :idx, :content, :content_hash, :embedding, :tokens, now())
+            """), inserts)
+        
+        if updates:
+            await self.session.execute(text("""
+                UPDATE rag_chunks
+                SET content = :content, content_hash = :content_hash, embedding = :embedding, token_count = :tokens
+                WHERE id = :id AND organization_id = :org_id AND document_id = :doc_id AND chunk_index = :idx
+            """), updates)
+        
+        if deletes:
+            await self.session.execute(text("""
+                DELETE FROM rag_chunks
+                WHERE organization_id = :org_id AND document_id = :doc_id AND chunk_index >= :n
+            """), deletes)
         
         await self.session.commit()
-        return chunk_ids
+        return {
+            "inserted": len(inserts),
+            "updated": len(updates),
+            "deleted": sum(plan.stale for plan in plans),
+            "unchanged": sum(len(plan.chunks) - len(plan.pending) for plan in plans),
+        }
+    
+    async def sync_chunks(
+        self,
+        document_id: UUID,
+        organization_id: UUID,
+        chunks: List[Dict[str, Any]],
+        embed_many: Callable[[List[str]], Awaitable[List[List[float]]]],
+    ) -> Dict[str, int]:
+        """
+        Incremental re-index: diff chunk content hashes against rag_chunks and
+        only embed/write what changed. Chunks are matched by chunk_index.
+        Returns counts of inserted, updated, deleted and unchanged chunks.
+        """
+        plan = await self.plan_chunk_sync(document_id, organization_id, chunks)
+        if plan.pending:
+            plan.set_embeddings(await embed_many(plan.pending_texts()))
+        return await self.apply_chunk_sync([plan])
+    
+    @staticmethod
+    def _chunk_row(
+        chunk_id: UUID,
+        document_id: UUID,
+        organization_id: UUID,
+        idx: int,
+        chunk: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        embedding_arr = chunk.get("embedding")
+        if embedding_arr is None:
+            embedding_arr = np.zeros(RAG_EMBED_DIM, dtype=np.float32)
+        return {
+            "id": chunk_id,
+            "org_id": organization_id,
+            "doc_id": document_id,
+            "idx": idx,
+            "content": chunk["content"],
+            "content_hash": chunk.get("content_hash") or content_hash(chunk["content"]),
+            "embedding": to_vector(embedding_arr),
+            "tokens": chunk.get("token_count"),
+        }
     
     async def search_similar(
         self,
@@ -175,15 +310,146 @@ class RAGStore:
         source_types: Optional[List[str]] = None,
         ef_search: int = 100,
     ) -> List[Dict[str, Any]]:
-        """Vector similarity search with tenant filtering"""
+        """
+        Vector similarity search with tenant filtering.
+        Strategy (partial index / exact / shared index) comes from the ANN
+        planner; ANN candidates are over-fetched and the fetch widened until
+        top_k survive the source-type filter, with exact search as last resort.
+        """
+        plan = await get_ann_planner().plan(self.session, organization_id, ef_search)
+        
+        # float32 buffer, sent as a binary vector parameter
+        query_vector = to_vector(query_embedding)
+        distance = distance_sql("embedding", ":query")
+        
+        if plan.strategy == "exact":
+            return await self._search_exact(organization_id, query_vector, top_k, source_types)
+        
+        allowed = set(source_types) if source_types else None
+        candidates = top_k * _settings.RAG_ANN_OVERFETCH
+        ef = plan.ef_search
+        
+        while True:
+            ef = min(max(ef, candidates), HNSW_EF_SEARCH_MAX)
+            await self.session.execute(
+                text("SELECT set_config('hnsw.ef_search', :ef, true)"),
+                {"ef": str(ef)}
+            )
+            
+            # Inner ORDER BY ... LIMIT is what the HNSW index serves; the org
+            # literal lets the planner pick the tenant's partial index
+            result = await self.session.execute(text(f"""
+                SELECT 
+                    c.id as chunk_id,
+                    c.content,
+                    c.chunk_index,
+                    d.id as doc_id,
+                    d.source_type,
+                    d.source_id,
+                    d.title,
+                    d.visibility,
+                    1 - c.distance as similarity
+                FROM (
+                    SELECT id, content, chunk_index, document_id,
+                           {distance} as distance
+                    FROM rag_chunks
+                    WHERE organization_id = {org_literal(organization_id)}
+                    ORDER BY {distance}
+                    LIMIT :candidates
+                ) c
+                JOIN rag_documents d ON c.document_id = d.id AND d.organization_id = :org_id
+                ORDER BY c.distance
+            """), {"query": query_vector, "org_id": organization_id, "candidates": candidates})
+            rows = result.fetchall()
+            
+            matches = [r for r in rows if allowed is None or r[4] in allowed]
+            if len(matches) >= top_k:
+                return [self._similarity_row(r) for r in matches[:top_k]]
+            
+            # A partial index holds only this tenant: fewer rows means exhausted
+            if plan.strategy == "partial" and len(rows) < candidates:
+                return [self._similarity_row(r) for r in matches]
+            
+            if candidates >= _settings.RAG_ANN_MAX_CANDIDATES:
+                break
+            candidates = min(candidates * 4, _settings.RAG_ANN_MAX_CANDIDATES)
+        
+        logger.info(f"ANN over-fetch exhausted for org {organization_id}, falling back to exact search")
+        return await self._search_exact(organization_id, query_vector, top_k, source_types)
+    
+    async def _search_exact(
+        self,
+        organization_id: UUID,
+        query_vector: np.ndarray,
+        top_k: int,
+        source_types: Optional[List[str]],
+    ) -> List[Dict[str, Any]]:
+        """Exact k-NN over the tenant's rows (MATERIALIZED keeps HNSW out of the plan)"""
+        source_filter = ""
+        params = {
+            "query": query_vector,
+            "org_id": organization_id,
+            "top_k": top_k,
+        }
+        
+        if source_types:
+            placeholders = ", ".join([f":type_{i}" for i in range(len(source_types))])
+            source_filter = f"AND d.source_type IN ({placeholders})"
+            for i, stype in enumerate(source_types):
+                params[f"type_{i}"] = stype
         
-        # Convert embedding to string format for pgvector
-        embedding_str = "[" + ",".join(str(x) for x in query_embedding) + "]"
+        result = await self.session.execute(text(f"""
+            WITH tenant_chunks AS MATERIALIZED (
+                SELECT 
+                    c.id as chunk_id,
+                    c.content,
+                    c.chunk_index,
+                    d.id as doc_id,
+                    d.source_type,
+                    d.source_id,
+                    d.title,
+                    d.visibility,
+                    c.embedding <=> :query as distance
+                FROM rag_chunks c
+                JOIN rag_documents d ON c.document_id = d.id
+                WHERE c.organization_id = :org_id 
+                    AND d.organization_id = :org_id
+                    {source_filter}
+            )
+            SELECT chunk_id, content, chunk_index, doc_id, source_type, source_id, title, visibility,
+                   1 - distance as similarity
+            FROM tenant_chunks
+            ORDER BY distance
+            LIMIT :top_k
+        """), params)
         
-        # Build source filter if provided
+        return [self._similarity_row(r) for r in result.fetchall()]
+    
+    @staticmethod
+    def _similarity_row(row) -> Dict[str, Any]:
+        return {
+            "chunk_id": row[0],
+            "content": row[1],
+            "chunk_index": row[2],
+            "document_id": row[3],
+            "source_type": row[4],
+            "source_id": row[5],
+            "title": row[6],
+            "visibility": row[7],
+            "score": row[8],
+        }
+    
+    async def search_keyword(
+        self,
+        organization_id: UUID,
+        query: str,
+        top_k: int = 5,
+        source_types: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Ranked full-text search over rag_chunks.content_tsv (GIN indexed)"""
         source_filter = ""
         params = {
-            "query": embedding_str,
+            "query": query,
             "org_id": organization_id,
             "top_k": top_k,
         }
@@ -194,7 +460,6 @@ class RAGStore:
             for i, stype in enumerate(source_types):
                 params[f"type_{i}"] = stype
         
-        # Use HNSW with cosine distance
         stmt = text(f"""
             SELECT 
                 c.id as chunk_id,
@@ -205,13 +470,15 @@ class RAGStore:
                 d.source_id,
                 d.title,
                 d.visibility,
-                1 - (c.embedding <=> :query) as similarity
+                ts_rank_cd(c.content_tsv, q) as rank
             FROM rag_chunks c
-            JOIN rag_documents d ON c.document_id = d.id
+            JOIN rag_documents d ON c.document_id = d.id,
+                websearch_to_tsquery('{RAG_FTS_CONFIG}', :query) q
             WHERE c.organization_id = :org_id 
                 AND d.organization_id = :org_id
+                AND c.content_tsv @@ q
                 {source_filter}
-            ORDER BY c.embedding <=> :query
+            ORDER BY rank DESC
             LIMIT :top_k
         """)
         
@@ -0,0 +1,263 @@
+"""
+ATUM DESK - Compiled Rule Engine
+
+Rules (`rules.conditions`) are compiled once into predicate closures and
+grouped per event type into a RuleSet that indexes them by one equality /
+membership condition each, so a ticket is only tested against rules that can
+possibly match it (plus the rules with no indexable condition).
+
+Condition syntax - every field must match:
+
+    {"priority": "high"}                       equality (case-insensitive, as before)
+    {"priority": {"in": ["high", "urgent"]}}   operator form, several ops are ANDed
+    {"subject": {"regex": "vpn|outage"}}
+
+Operators: eq, ne, gt, gte, lt, lte, in, not_in, contains, regex, exists.
+Tickets may be ORM objects or plain mappings (backfills); enum values are
+compared by their .value.
+"""
+import logging
+import operator
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+Predicate = Callable[[Any], bool]
+
+
+class RuleCompileError(ValueError):
+    """A rule's conditions use an unknown operator or an invalid value"""
+
+
+def ticket_value(ticket: Any, name: str) -> Any:
+    """Field of an ORM ticket or a mapping, enums unwrapped"""
+    if isinstance(ticket, dict):
+        value = ticket.get(name, _MISSING)
+    else:
+        value = getattr(ticket, name, _MISSING)
+    if value is _MISSING:
+        return None
+    return getattr(value, "value", value)
+
+
+def _norm(value: Any) -> str:
+    """Legacy comparison key: str().lower() of the (enum-unwrapped) value"""
+    return str(getattr(value, "value", value)).lower()
+
+
+def _ordered(op: Callable[[Any, Any], bool], expected: Any) -> Callable[[Any], bool]:
+    """Numeric comparison when both sides are numbers, else on comparable values"""
+    try:
+        number = float(expected)
+    except (TypeError, ValueError):
+        number = None
+
+    def test(actual: Any) -> bool:
+        if actual is None:
+            return False
+        if number is not None:
+            try:
+                return op(float(actual), number)
+            except (TypeError, ValueError):
+                return False
+        try:
+            return op(actual, expected)
+        except TypeError:
+            return False
+    return test
+
+
+def _contains(expected: Any) -> Callable[[Any], bool]:
+    needle = _norm(expected)
+
+    def test(actual: Any) -> bool:
+        if actual is None:
+            return False
+        if isinstance(actual, (list, tuple, set, frozenset)):
+            return any(_norm(item) == needle for item in actual)
+        return needle in _norm(actual)
+    return test
+
+
+def _operator(op: str, expected: Any) -> Callable[[Any], bool]:
+    if op == "eq":
+        key = _norm(expected)
+        return lambda actual: _norm(actual) == key
+    if op == "ne":
+        key = _norm(expected)
+        return lambda actual: _norm(actual) != key
+    if op in ("in", "not_in"):
+        if not isinstance(expected, (list, tuple, set)):
+            raise RuleCompileError(f"'{op}' needs a list, got {expected!r}")
+        keys = frozenset(_norm(v) for v in expected)
+        if op == "in":
+            return lambda actual: _norm(actual) in keys
+        return lambda actual: _norm(actual) not in keys
+    if op in ("gt", "gte", "lt", "lte"):
+        return _ordered(getattr(operator, {"gte": "ge", "lte": "le"}.get(op, op)), expected)
+    if op == "contains":
+        return _contains(expected)
+    if op == "regex":
+        try:
+            pattern = re.compile(str(expected), re.IGNORECASE)
+        except re.error as e:
+            raise RuleCompileError(f"Invalid regex {expected!r}: {e}")
+        return lambda actual: actual is not None and pattern.search(str(actual)) is not None
+    if op == "exists":
+        wanted = bool(expected)
+        return lambda actual: (actual is not None) == wanted
+    raise RuleCompileError(f"Unknown operator '{op}'")
+
+
+@dataclass
+class RuleActionSpec:
+    """Detached copy of a RuleAction (safe to cache across sessions)"""
+    action_type: str
+    action_data: Dict[str, Any]
+
+
+@dataclass
+class CompiledRule:
+    id: str
+    name: str
+    execution_order: int
+    predicate: Predicate
+    actions: List[RuleActionSpec] = field(default_factory=list)
+    # (field, normalised values) of every equality / `in` condition; the
+    # RuleSet indexes each rule on the most selective one
+    index_keys: List[Tuple[str, frozenset]] = field(default_factory=list)
+
+
+def compile_conditions(conditions: Optional[Dict[str, Any]]) -> Tuple[Predicate, List[Tuple[str, frozenset]]]:
+    """
+    Predicate for a conditions dict, plus its equality / `in` conditions
+    as possible index keys (empty when there is nothing to index on).
+    """
+    if not conditions:
+        return (lambda ticket: True), []
+
+    tests: List[Tuple[str, Callable[[Any], bool]]] = []
+    index_keys = []
+    for raw_field, spec in conditions.items():
+        name = raw_field.lower()
+        ops = spec if isinstance(spec, dict) else {"eq": spec}
+        if not ops:
+            raise RuleCompileError(f"No operator for field '{raw_field}'")
+        for op, expected in ops.items():
+            tests.append((name, _operator(op, expected)))
+            if op == "eq":
+                index_keys.append((name, frozenset([_norm(expected)])))
+            elif op == "in":
+                index_keys.append((name, frozenset(_norm(v) for v in expected)))
+
+    if len(tests) == 1:
+        (name, test), = tests
+        return (lambda ticket: test(ticket_value(ticket, name))), index_keys
+
+    def predicate(ticket: Any) -> bool:
+        for name, test in tests:
+            if not test(ticket_value(ticket, name)):
+                return False
+        return True
+    return predicate, index_keys
+
+
+def compile_rule(rule_id: Any, name: str, conditions: Optional[Dict[str, Any]], execution_order: int,
+                 actions: Iterable[Tuple[str, Dict[str, Any]]] = ()) -> CompiledRule:
+    predicate, index_keys = compile_conditions(conditions)
+    return CompiledRule(
+        id=str(rule_id),
+        name=name,
+        execution_order=execution_order,
+        predicate=predicate,
+        actions=[RuleActionSpec(t, dict(d or {})) for t, d in actions],
+        index_keys=index_keys,
+    )
+
+
+class RuleSet:
+    """Compiled rules of one event type, in execution order, indexed by field value"""
+
+    def __init__(self, rules: Iterable[CompiledRule]):
+        self.rules = sorted(rules, key=lambda r: r.execution_order)
+        # field -> normalised value -> rule positions (ascending)
+        self._index: Dict[str, Dict[str, List[int]]] = {}
+        self._unindexed: List[int] = []
+        # Selectivity of a field ~ distinct values rules test it against
+        distinct: Dict[str, set] = {}
+        for rule in self.rules:
+            for name, values in rule.index_keys:
+                distinct.setdefault(name, set()).update(values)
+        for pos, rule in enumerate(self.rules):
+            if not rule.index_keys:
+                self._unindexed.append(pos)
+                continue
+            name, values = max(rule.index_keys, key=lambda k: (len(distinct[k[0]]), -len(k[1])))
+            by_value = self._index.setdefault(name, {})
+            for value in values:
+                by_value.setdefault(value, []).append(pos)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def candidates(self, ticket: Any, after: int = -1) -> List[int]:
+        """Positions of rules that may match, ascending, greater than `after`"""
+        found = set(self._unindexed)
+        for name, by_value in self._index.items():
+            hits = by_value.get(_norm(ticket_value(ticket, name)))
+            if hits:
+                found.update(hits)
+        return sorted(pos for pos in found if pos > after)
+
+    def match(self, ticket: Any) -> List[CompiledRule]:
+        """Matching rules for a ticket that is not changed between rules"""
+        return [self.rules[pos] for pos in self.candidates(ticket) if self.rules[pos].predicate(ticket)]
+
+    def iter_matches(self, ticket: Any) -> Iterator[CompiledRule]:
+        """
+        Matching rules in execution order when the caller applies each rule's
+        actions before asking for the next: later rules see the changes, as
+        with the old one-rule-at-a-time loop (candidates are re-derived
+        after every match).
+        """
+        candidates = self.candidates(ticket)
+        i = 0
+        while i < len(candidates):
+            pos = candidates[i]
+            i += 1
+            rule = self.rules[pos]
+            if rule.predicate(ticket):
+                yield rule
+                if rule.actions:
+                    candidates, i = self.candidates(ticket, after=pos), 0
+
+    def match_many(self, tickets: Iterable[Any]) -> List[List[CompiledRule]]:
+        """Bulk evaluation (backfills, previews): matches per ticket"""
+        return [self.match(ticket) for ticket in tickets]
+
+
+# Compiled rule sets: event type -> (version stamp, RuleSet)
+_rule_sets: Dict[str, Tuple[Any, RuleSet]] = {}
+
+
+def cached_rule_set(event_type: str, version: Any) -> Optional[RuleSet]:
+    entry = _rule_sets.get(event_type)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+    return None
+
+
+def store_rule_set(event_type: str, version: Any, rule_set: RuleSet) -> None:
+    _rule_sets[event_type] = (version, rule_set)
+
+
+def invalidate_rules(event_type: Optional[str] = None) -> None:
+    """Drop compiled rules (all event types when None) in this process"""
+    if event_type is None:
+        _rule_sets.clear()
+    else:
+        _rule_sets.pop(event_type, None)
@@ -1,10 +1,15 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Iterable
 import logging
-from sqlalchemy import select
+from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.models.rules import Rule, RuleAction
+from sqlalchemy.orm import selectinload
+from app.models.rules import Rule
 from app.models.ticket import Ticket
 from app.models.audit_log import AuditLog
+from app.services.agent_load import invalidate_agent_load
+from app.services.rule_engine import (
+    RuleActionSpec, RuleCompileError, RuleSet, cached_rule_set, compile_rule, store_rule_set,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -12,44 +17,75 @@ class RulesService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def evaluate_ticket(self, ticket: Ticket, event_type: str):
+    async def _version(self, event_type: str):
         """
-        Evaluate a ticket against active rules for a given event type.
+        Changes whenever a rule or action of the event type is added, edited,
+        toggled or removed (rule_actions has no updated_at, so actions are
+        stamped by a digest of their content)
         """
+        result = await self.db.execute(
+            text("""
+                SELECT count(DISTINCT r.id), max(r.updated_at),
+                       md5(string_agg(a.id::text || a.action_type || a.action_data::text, '|' ORDER BY a.id))
+                FROM rules r
+                LEFT JOIN rule_actions a ON a.rule_id = r.id
+                WHERE r.event_type = :event_type AND r.is_active
+            """),
+            {"event_type": event_type},
+        )
+        return tuple(result.one())
+
+    async def get_rule_set(self, event_type: str) -> RuleSet:
+        """Compiled rules for an event type, recompiled only when they changed"""
+        version = await self._version(event_type)
+        rule_set = cached_rule_set(event_type, version)
+        if rule_set is not None:
+            return rule_set
+
         query = select(Rule).where(
             Rule.event_type == event_type,
             Rule.is_active == True
-        ).order_by(Rule.execution_order)
-        
+        ).options(selectinload(Rule.actions)).order_by(Rule.execution_order)
         result = await self.db.execute(query)
-        rules = result.scalars().all()
 
-        match_count = 0
-        for rule in rules:
-            if self._matches_condition(ticket, rule.conditions):
-                logger.info(f"Rule '{rule.name}' matched for Ticket {ticket.id}")
-                await self._execute_actions(ticket, rule.actions)
-                match_count += 1
-        
-        return match_count
+        compiled = []
+        for rule in result.scalars().all():
+            try:
+                compiled.append(compile_rule(
+                    rule.id, rule.name, rule.conditions, rule.execution_order,
+                    [(a.action_type, a.action_data) for a in rule.actions],
+                ))
+            except RuleCompileError as e:
+                logger.error(f"Rule '{rule.name}' skipped: {e}")
+        rule_set = RuleSet(compiled)
+        store_rule_set(event_type, version, rule_set)
+        logger.info(f"Compiled {len(rule_set)} rules for '{event_type}'")
+        return rule_set
 
-    def _matches_condition(self, ticket: Ticket, conditions: Dict[str, Any]) -> bool:
-        if not conditions:
-            return True
+    async def evaluate_ticket(self, ticket: Ticket, event_type: str):
+        """
+        Evaluate a ticket against active rules for a given event type.
+        """
+        rule_set = await self.get_rule_set(event_type)
+        return await self._apply(rule_set, ticket)
 
-        for field, expected_value in conditions.items():
-            actual_value = getattr(ticket, field.lower(), None)
-            
-            # Handle Enums (e.g. TicketPriority)
-            if hasattr(actual_value, "value"):
-                actual_value = actual_value.value
-                
-            if str(expected_value).lower() != str(actual_value).lower():
-                return False
-        
-        return True
+    async def evaluate_many(self, tickets: Iterable[Ticket], event_type: str) -> Dict[str, int]:
+        """
+        Backfill: evaluate many tickets against one compiled rule set.
+        Returns matched-rule counts per ticket id. Caller commits.
+        """
+        rule_set = await self.get_rule_set(event_type)
+        return {str(ticket.id): await self._apply(rule_set, ticket) for ticket in tickets}
+
+    async def _apply(self, rule_set: RuleSet, ticket: Ticket) -> int:
+        match_count = 0
+        for rule in rule_set.iter_matches(ticket):
+            logger.info(f"Rule '{rule.name}' matched for Ticket {ticket.id}")
+            await self._execute_actions(ticket, rule.actions)
+            match_count += 1
+        return match_count
 
-    async def _execute_actions(self, ticket: Ticket, actions: List[RuleAction]):
+    async def _execute_actions(self, ticket: Ticket, actions: List[RuleActionSpec]):
         for action in actions:
             try:
                 if action.action_type == "set_priority":
@@ -61,6 +97,7 @@ class RulesService:
                     user_id = action.action_data.get("user_id")
                     if user_id:
                         ticket.assigned_to = user_id
+                        invalidate_agent_load(ticket.organization_id)
 
                 elif action.action_type == "add_tag":
                     tag = action.action_data.get("tag")
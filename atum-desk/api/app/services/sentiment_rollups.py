@@ -0,0 +1,245 @@
+"""
+ATUM DESK - Incremental Sentiment Rollups
+
+The SENTIMENT_ANALYSIS job keeps each ticket's latest sentiment in
+ticket_sentiment and, in the same statement, applies the change to two
+daily rollups (day = ticket creation day, UTC):
+
+    customer_sentiment_daily  (requester_id, day)     per-customer history
+    org_sentiment_daily       (organization_id, day)  org summary and trend
+
+Each rollup row holds positive / neutral / negative counts, the sum of the
+signed scores (-1..1) and the ticket count. Re-analysing a ticket subtracts
+its previous contribution, so rollups always equal an aggregate over
+ticket_sentiment, and profiles / trends read O(days) rows instead of every
+ticket. scripts/backfill_sentiment_rollups.py rebuilds everything from the
+stored SENTIMENT_ANALYSIS results.
+
+Statements here use psycopg parameters (job worker, backfill script).
+"""
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+BUCKETS = ("positive", "neutral", "negative")
+# Trend: newer half vs older half mean score
+TREND_DELTA = 0.2
+
+# Serialises analyses of the same ticket so the previous contribution read
+# below is the committed one
+LOCK_TICKET_SQL = "SELECT pg_advisory_xact_lock(hashtext(%(ticket_id)s))"
+
+APPLY_SQL = """
+    WITH t AS (
+        SELECT id, organization_id, requester_id, (created_at AT TIME ZONE 'UTC')::date AS day
+        FROM tickets
+        WHERE id = %(ticket_id)s::uuid
+    ),
+    old AS (
+        SELECT organization_id, requester_id, day, bucket, score
+        FROM ticket_sentiment
+        WHERE ticket_id = %(ticket_id)s::uuid
+    ),
+    new AS (
+        INSERT INTO ticket_sentiment AS s (ticket_id, organization_id, requester_id, day, bucket, score, analyzed_at)
+        SELECT id, organization_id, requester_id, day, %(bucket)s, %(score)s, now() FROM t
+        ON CONFLICT (ticket_id) DO UPDATE
+        SET bucket = EXCLUDED.bucket, score = EXCLUDED.score, analyzed_at = EXCLUDED.analyzed_at
+        RETURNING s.organization_id, s.requester_id, s.day, s.bucket, s.score
+    ),
+    delta AS (
+        SELECT organization_id, requester_id, day, bucket, score, 1 AS sign FROM new
+        UNION ALL
+        SELECT organization_id, requester_id, day, bucket, score, -1 FROM old
+    ),
+    customer AS (
+        INSERT INTO customer_sentiment_daily AS r
+               (requester_id, day, organization_id, positive, neutral, negative, score_sum, tickets)
+        SELECT requester_id, day, organization_id,
+               coalesce(sum(sign) FILTER (WHERE bucket = 'positive'), 0),
+               coalesce(sum(sign) FILTER (WHERE bucket = 'neutral'), 0),
+               coalesce(sum(sign) FILTER (WHERE bucket = 'negative'), 0),
+               sum(sign * score), sum(sign)
+        FROM delta
+        WHERE requester_id IS NOT NULL
+        GROUP BY requester_id, day, organization_id
+        ON CONFLICT (requester_id, day) DO UPDATE
+        SET positive = r.positive + EXCLUDED.positive,
+            neutral = r.neutral + EXCLUDED.neutral,
+            negative = r.negative + EXCLUDED.negative,
+            score_sum = r.score_sum + EXCLUDED.score_sum,
+            tickets = r.tickets + EXCLUDED.tickets
+        RETURNING 1
+    ),
+    org AS (
+        INSERT INTO org_sentiment_daily AS r
+               (organization_id, day, positive, neutral, negative, score_sum, tickets)
+        SELECT organization_id, day,
+               coalesce(sum(sign) FILTER (WHERE bucket = 'positive'), 0),
+               coalesce(sum(sign) FILTER (WHERE bucket = 'neutral'), 0),
+               coalesce(sum(sign) FILTER (WHERE bucket = 'negative'), 0),
+               sum(sign * score), sum(sign)
+        FROM delta
+        GROUP BY organization_id, day
+        ON CONFLICT (organization_id, day) DO UPDATE
+        SET positive = r.positive + EXCLUDED.positive,
+            neutral = r.neutral + EXCLUDED.neutral,
+            negative = r.negative + EXCLUDED.negative,
+            score_sum = r.score_sum + EXCLUDED.score_sum,
+            tickets = r.tickets + EXCLUDED.tickets
+        RETURNING 1
+    )
+    SELECT (SELECT count(*) FROM new), (SELECT count(*) FROM customer), (SELECT count(*) FROM org)
+"""
+
+# Backfill: latest SENTIMENT_ANALYSIS result of each of an organization's
+# tickets after %(after)s, by ticket id (keyset batches)
+BACKFILL_BATCH_SQL = """
+    SELECT DISTINCT ON (s.ticket_id) s.ticket_id, t.organization_id, t.requester_id,
+           (t.created_at AT TIME ZONE 'UTC')::date, s.content, s.created_at
+    FROM ai_suggestions s
+    JOIN tickets t ON t.id = s.ticket_id
+    WHERE s.suggestion_type = 'SENTIMENT_ANALYSIS'
+    AND t.organization_id = %(org_id)s::uuid
+    AND s.ticket_id > %(after)s::uuid
+    ORDER BY s.ticket_id, s.created_at DESC
+    LIMIT %(batch_size)s
+"""
+
+BACKFILL_UPSERT_SQL = """
+    INSERT INTO ticket_sentiment (ticket_id, organization_id, requester_id, day, bucket, score, analyzed_at)
+    SELECT * FROM unnest(%(ticket_ids)s::uuid[], %(organization_ids)s::uuid[], %(requester_ids)s::uuid[],
+                         %(days)s::date[], %(buckets)s::text[], %(scores)s::float8[], %(analyzed_at)s::timestamptz[])
+    ON CONFLICT (ticket_id) DO UPDATE
+    SET organization_id = EXCLUDED.organization_id, requester_id = EXCLUDED.requester_id, day = EXCLUDED.day,
+        bucket = EXCLUDED.bucket, score = EXCLUDED.score, analyzed_at = EXCLUDED.analyzed_at
+"""
+
+# Rollups of one organization recomputed from ticket_sentiment
+REBUILD_ORG_SQL = (
+    "DELETE FROM customer_sentiment_daily WHERE organization_id = %(org_id)s::uuid",
+    "DELETE FROM org_sentiment_daily WHERE organization_id = %(org_id)s::uuid",
+    """
+    INSERT INTO customer_sentiment_daily
+           (requester_id, day, organization_id, positive, neutral, negative, score_sum, tickets)
+    SELECT requester_id, day, %(org_id)s::uuid,
+           count(*) FILTER (WHERE bucket = 'positive'),
+           count(*) FILTER (WHERE bucket = 'neutral'),
+           count(*) FILTER (WHERE bucket = 'negative'),
+           sum(score), count(*)
+    FROM ticket_sentiment
+    WHERE organization_id = %(org_id)s::uuid AND requester_id IS NOT NULL
+    GROUP BY requester_id, day
+    """,
+    """
+    INSERT INTO org_sentiment_daily
+           (organization_id, day, positive, neutral, negative, score_sum, tickets)
+    SELECT %(org_id)s::uuid, day,
+           count(*) FILTER (WHERE bucket = 'positive'),
+           count(*) FILTER (WHERE bucket = 'neutral'),
+           count(*) FILTER (WHERE bucket = 'negative'),
+           sum(score), count(*)
+    FROM ticket_sentiment
+    WHERE organization_id = %(org_id)s::uuid
+    GROUP BY day
+    """,
+)
+
+# (day, positive, neutral, negative, score_sum, tickets)
+DailyRow = Tuple[date, int, int, int, float, int]
+
+
+def bucket(label: Optional[str]) -> str:
+    """SENTIMENT_ANALYSIS label -> rollup bucket"""
+    label = (label or "").lower()
+    if label == "positive":
+        return "positive"
+    if label in ("negative", "angry"):
+        return "negative"
+    return "neutral"
+
+
+def signed_score(label: Optional[str], score: Any) -> float:
+    """
+    Job output (label + 0..1 intensity) -> -1..1 score: positive labels
+    count up, negative / angry down, neutral is 0.
+    """
+    try:
+        intensity = min(1.0, max(0.0, float(score)))
+    except (TypeError, ValueError):
+        intensity = 0.5
+    sign = {"positive": 1.0, "negative": -1.0, "neutral": 0.0}[bucket(label)]
+    return sign * intensity
+
+
+def _mean(score_sum: float, tickets: float) -> Optional[float]:
+    return score_sum / tickets if tickets else None
+
+
+def split_trend(rows: Sequence[DailyRow]) -> str:
+    """
+    Mean score of the newer half of the tickets vs the older half (rows in
+    day order; the day straddling the middle is split pro rata).
+    """
+    total = sum(r[5] for r in rows)
+    if total < 5:
+        return "stable"
+    older_n = total // 2
+    older_sum = newer_sum = 0.0
+    seen = 0
+    for r in rows:
+        tickets, score_sum = r[5], r[4]
+        if tickets <= 0:
+            continue
+        older_part = min(tickets, max(0, older_n - seen))
+        older_sum += score_sum * older_part / tickets
+        newer_sum += score_sum * (tickets - older_part) / tickets
+        seen += tickets
+    older, newer = older_sum / older_n, newer_sum / (total - older_n)
+    if newer > older + TREND_DELTA:
+        return "improving"
+    elif newer < older - TREND_DELTA:
+        return "declining"
+    return "stable"
+
+
+def totals(rows: Iterable[DailyRow]) -> Dict[str, Any]:
+    positive = neutral = negative = tickets = 0
+    score_sum = 0.0
+    for _, p, n, ng, s, t in rows:
+        positive += p
+        neutral += n
+        negative += ng
+        score_sum += s
+        tickets += t
+    return {
+        "tickets": tickets,
+        "distribution": {"positive": positive, "neutral": neutral, "negative": negative},
+        "mean_score": _mean(score_sum, tickets),
+    }
+
+
+def profile_label(distribution: Dict[str, int], total: int) -> str:
+    if not total:
+        return "neutral"
+    if distribution["negative"] / total * 100 > 40:
+        return "frustrated"
+    elif distribution["positive"] / total * 100 > 60:
+        return "satisfied"
+    return "neutral"
+
+
+def daily_series(rows: Sequence[DailyRow], start: date, days: int) -> List[Dict[str, Any]]:
+    """One entry per day from `start`, days without tickets included"""
+    by_day = {r[0]: r for r in rows}
+    series = []
+    for offset in range(days):
+        day = date.fromordinal(start.toordinal() + offset)
+        row = by_day.get(day)
+        tickets = row[5] if row else 0
+        mean = _mean(row[4], tickets) if row else None
+        series.append({
+            "date": day.isoformat(),
+            "sentiment_score": round(mean, 2) if mean is not None else None,
+            "ticket_count": tickets,
+        })
+    return series
@@ -0,0 +1,125 @@
+"""
+ATUM DESK - Set-based SLA breach detection
+
+One statement per organization (and batch) flags every response and
+resolution breach whose deadline has passed and writes the matching
+audit_log rows in the same statement:
+
+    due      - sla_calculations rows with next_sla_deadline <= now()
+               (ix_sla_calculations_next_deadline range scan), for open,
+               not-paused tickets of the organization
+    flagged  - UPDATE ... RETURNING the breaches just set
+    audit    - INSERT ... SELECT one audit row per breach type
+
+Flagging a breach clears that target out of next_sla_deadline (a generated
+column), so each pass only touches tickets that breached since the last one.
+"""
+import asyncio
+import logging
+from typing import Any, Dict, List
+
+from sqlalchemy import bindparam, text
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 5000
+
+# Ticket statuses whose SLA clock is not running (compared case-insensitively
+# so the check does not depend on how the enum is stored)
+SLA_STOPPED_STATUSES = ("resolved", "closed", "waiting_customer")
+
+BREACH_SQL = text("""
+    WITH due AS (
+        SELECT c.ticket_id,
+               t.organization_id,
+               (c.first_response_target <= now()
+                AND c.first_response_actual IS NULL
+                AND NOT coalesce(c.first_response_breached, false)) AS response,
+               (c.resolution_target <= now()
+                AND c.resolution_actual IS NULL
+                AND NOT coalesce(c.resolution_breached, false)) AS resolution
+        FROM sla_calculations c
+        JOIN tickets t ON t.id = c.ticket_id
+        WHERE c.next_sla_deadline <= now()
+        AND t.organization_id = :org_id
+        AND t.sla_started_at IS NOT NULL
+        AND lower(t.status::text) NOT IN :stopped
+        ORDER BY c.next_sla_deadline
+        LIMIT :batch_size
+        FOR UPDATE OF c SKIP LOCKED
+    ),
+    flagged AS (
+        UPDATE sla_calculations c
+        SET first_response_breached = coalesce(c.first_response_breached, false) OR due.response,
+            resolution_breached = coalesce(c.resolution_breached, false) OR due.resolution,
+            breach_reason = CASE WHEN due.resolution THEN 'Resolution time exceeded'
+                                 ELSE 'Response time exceeded' END
+        FROM due
+        WHERE c.ticket_id = due.ticket_id
+        RETURNING c.ticket_id, due.organization_id, due.response, due.resolution
+    ),
+    audit AS (
+        INSERT INTO audit_log (id, organization_id, entity_type, entity_id, action, new_values, created_at)
+        SELECT gen_random_uuid(), f.organization_id, 'ticket', f.ticket_id, 'sla_breach',
+               jsonb_build_object('breach_type', b.breach_type), now()
+        FROM flagged f
+        CROSS JOIN LATERAL (VALUES ('response', f.response), ('resolution', f.resolution)) AS b(breach_type, hit)
+        WHERE b.hit
+        RETURNING 1
+    )
+    SELECT ticket_id, response, resolution FROM flagged
+""").bindparams(bindparam("stopped", expanding=True))
+
+
+async def flag_org_breaches(conn, org_id, batch_size: int = DEFAULT_BATCH_SIZE) -> List[Dict[str, Any]]:
+    """
+    Flag one batch of breaches for an organization on `conn` (caller owns
+    the transaction and has set app.current_org). Returns the breached
+    tickets: every due row has at least one passed, unflagged target, so
+    fewer than batch_size rows means the org is done.
+    """
+    result = await conn.execute(
+        BREACH_SQL,
+        {"org_id": org_id, "stopped": SLA_STOPPED_STATUSES, "batch_size": batch_size},
+    )
+    rows = result.fetchall()
+    return [
+        {"ticket_id": str(r[0]), "response": bool(r[1]), "resolution": bool(r[2])}
+        for r in rows
+    ]
+
+
+async def run_org(engine, org_id, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """All due breaches of one organization, one transaction per batch"""
+    breached = 0
+    while True:
+        async with engine.begin() as conn:
+            await conn.execute(text("SELECT set_config('app.current_org', :org_id, true)"), {"org_id": str(org_id)})
+            rows = await flag_org_breaches(conn, org_id, batch_size)
+        for row in rows:
+            kinds = [k for k in ("response", "resolution") if row[k]]
+            logger.warning(f"SLA BREACH ({', '.join(kinds)}) for Ticket {row['ticket_id']}")
+        breached += len(rows)
+        # A full batch may have left more due rows behind it
+        if len(rows) < batch_size:
+            return breached
+
+
+async def run_pass(engine, org_ids: List[Any], concurrency: int = 4,
+                   batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, int]:
+    """One breach pass over the given organizations, `concurrency` orgs at a time"""
+    semaphore = asyncio.Semaphore(concurrency)
+    failed = 0
+
+    async def one(org_id) -> int:
+        nonlocal failed
+        async with semaphore:
+            try:
+                return await run_org(engine, org_id, batch_size)
+            except Exception as e:
+                failed += 1
+                logger.error(f"SLA breach pass failed for org {org_id}: {e}")
+                return 0
+
+    counts = await asyncio.gather(*(one(org_id) for org_id in org_ids))
+    return {"organizations": len(org_ids), "breached": sum(counts), "failed_orgs": failed}
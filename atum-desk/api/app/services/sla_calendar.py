@@ -0,0 +1,261 @@
+"""
+ATUM DESK - SLA Business-Hours Calendars
+
+A calendar (weekly working hours + holidays, in its own timezone) is
+expanded once into sorted arrays of working intervals in UTC epoch seconds,
+with a prefix sum of working seconds before each interval:
+
+    starts[i], ends[i]   working interval i
+    cum[i]               working seconds in intervals 0..i-1
+
+"Working-time offset" of an instant is then a binary search plus one
+subtraction, and so is its inverse. Adding N business seconds to a start
+time is offset -> +N -> inverse: O(log intervals) instead of stepping
+minute by minute, and vectorised over numpy arrays for bulk recomputation.
+
+Weekly hours are given per weekday key ("mon".."sun") as ["HH:MM", "HH:MM"]
+pairs, local to the calendar timezone (DST handled by zoneinfo); "24:00"
+ends a span at midnight. A calendar without weekly hours is 24/7.
+"""
+import bisect
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+DEFAULT_HORIZON_DAYS = 730  # expanded ahead of today; extended on demand
+HISTORY_DAYS = 400  # origin is this far before "now", for older tickets
+
+Spans = Dict[int, List[Tuple[int, int]]]  # weekday -> [(start minute, end minute)]
+
+
+def _minutes(value: str) -> int:
+    hours, minutes = value.split(":")
+    total = int(hours) * 60 + int(minutes)
+    if not 0 <= total <= 1440:
+        raise ValueError(f"Invalid time of day: {value}")
+    return total
+
+
+def parse_weekly_hours(spec: Optional[Dict[str, Any]]) -> Optional[Spans]:
+    """{"mon": [["09:00", "17:00"]], ...} -> {0: [(540, 1020)], ...}"""
+    if not spec:
+        return None
+    weekly: Spans = {}
+    for key, spans in spec.items():
+        day = WEEKDAYS.index(key.lower()[:3])
+        parsed = sorted((_minutes(start), _minutes(end)) for start, end in spans)
+        for start, end in parsed:
+            if end <= start:
+                raise ValueError(f"Empty working span {key} {start}-{end}")
+        weekly[day] = parsed
+    return weekly
+
+
+def _epoch(value: datetime) -> float:
+    """Naive datetimes are UTC (the rest of the SLA code uses utcnow())"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=dt_timezone.utc)
+    return value.timestamp()
+
+
+def _like(epoch: float, template: datetime) -> datetime:
+    """Epoch -> datetime with the same naive/aware convention as template"""
+    result = datetime.fromtimestamp(epoch, tz=dt_timezone.utc)
+    return result.replace(tzinfo=None) if template.tzinfo is None else result
+
+
+class BusinessCalendar:
+    """Working-interval arrays for one calendar, with O(log n) deadline math"""
+
+    def __init__(
+        self,
+        weekly_hours: Optional[Spans] = None,
+        holidays: Iterable[date] = (),
+        timezone: str = "UTC",
+        origin: Optional[date] = None,
+        horizon_days: int = DEFAULT_HORIZON_DAYS,
+    ):
+        self.weekly_hours = weekly_hours
+        self.holidays = frozenset(holidays)
+        self.timezone = timezone
+        self.tz = ZoneInfo(timezone)
+        self._lock = threading.Lock()
+        today = datetime.now(dt_timezone.utc).date()
+        first = origin or (today - timedelta(days=HISTORY_DAYS))
+        self._build(first, max(first, today) + timedelta(days=horizon_days))
+
+    @classmethod
+    def from_spec(cls, spec: Dict[str, Any], **kwargs) -> "BusinessCalendar":
+        """Calendar from a sla_calendars row (timezone, weekly_hours, holidays)"""
+        return cls(
+            weekly_hours=parse_weekly_hours(spec.get("weekly_hours")),
+            holidays=[date.fromisoformat(str(h)) for h in spec.get("holidays") or []],
+            timezone=spec.get("timezone") or "UTC",
+            **kwargs,
+        )
+
+    @property
+    def is_continuous(self) -> bool:
+        return self.weekly_hours is None and not self.holidays
+
+    # === Expansion ===
+
+    def _day_spans(self, day: date) -> List[Tuple[float, float]]:
+        if day in self.holidays:
+            return []
+        if self.weekly_hours is None:
+            spans = [(0, 1440)]
+        else:
+            spans = self.weekly_hours.get(day.weekday(), [])
+        result = []
+        for start, end in spans:
+            local_start = datetime.combine(day, time()) + timedelta(minutes=start)
+            local_end = datetime.combine(day, time()) + timedelta(minutes=end)
+            result.append((local_start.replace(tzinfo=self.tz).timestamp(),
+                           local_end.replace(tzinfo=self.tz).timestamp()))
+        return result
+
+    def _build(self, first: date, last: date) -> None:
+        starts: List[float] = []
+        ends: List[float] = []
+        day = first
+        while day < last:
+            for start, end in self._day_spans(day):
+                if ends and start <= ends[-1]:
+                    # Contiguous with the previous span (e.g. 24/7, or 00:00 after 24:00)
+                    ends[-1] = max(ends[-1], end)
+                else:
+                    starts.append(start)
+                    ends.append(end)
+            day += timedelta(days=1)
+        if not starts:
+            raise ValueError("Calendar has no working time")
+
+        lengths = np.asarray(ends) - np.asarray(starts)
+        cum = np.concatenate(([0.0], np.cumsum(lengths)[:-1]))
+        self.first_day, self.last_day = first, last
+        self._origin = datetime.combine(first, time(), tzinfo=self.tz).timestamp()
+        self.starts = np.asarray(starts)
+        self.ends = np.asarray(ends)
+        self.cum = cum
+        self.cum_end = cum + lengths
+        # Plain lists: bisect on them beats numpy for single lookups
+        self._starts, self._ends = starts, ends
+        self._cum, self._cum_end = cum.tolist(), self.cum_end.tolist()
+
+    def _ensure(self, earliest: float, latest: Optional[float] = None,
+                latest_offset: Optional[float] = None) -> None:
+        """
+        Re-expand so `earliest` is covered and the horizon reaches past
+        `latest` (instant) / `latest_offset` (working seconds). Offsets are
+        only comparable between two re-expansions of the origin, so callers
+        pass their earliest instant before computing any offset.
+        """
+        if (earliest >= self._origin
+                and (latest is None or latest < self._ends[-1])
+                and (latest_offset is None or latest_offset <= self._cum_end[-1])):
+            return
+        with self._lock:
+            first, last = self.first_day, self.last_day
+            while earliest < datetime.combine(first, time(), tzinfo=self.tz).timestamp():
+                first -= timedelta(days=HISTORY_DAYS)
+            if first != self.first_day:
+                self._build(first, last)
+            while ((latest is not None and latest >= self._ends[-1])
+                   or (latest_offset is not None and latest_offset > self._cum_end[-1])):
+                last = first + 2 * (last - first)
+                self._build(first, last)
+
+    # === Scalar (bisect) ===
+
+    def _offset(self, t: float) -> float:
+        i = bisect.bisect_right(self._starts, t) - 1
+        if i < 0:
+            return 0.0
+        return self._cum[i] + min(t, self._ends[i]) - self._starts[i]
+
+    def _at_offset(self, w: float) -> float:
+        i = bisect.bisect_left(self._cum_end, w)
+        return self._starts[i] + (w - self._cum[i])
+
+    def add_business_seconds(self, start: datetime, seconds: float) -> datetime:
+        """Instant at which `seconds` of working time after `start` have elapsed"""
+        if seconds <= 0:
+            return start
+        t = _epoch(start)
+        self._ensure(t, latest=t)
+        w = self._offset(t) + seconds
+        self._ensure(t, latest_offset=w)
+        return _like(self._at_offset(w), start)
+
+    def business_seconds_between(self, start: datetime, end: datetime) -> float:
+        a, b = _epoch(start), _epoch(end)
+        self._ensure(min(a, b), latest=max(a, b))
+        return self._offset(b) - self._offset(a)
+
+    def shift_for_pause(self, target: datetime, paused_at: datetime, resumed_at: datetime) -> datetime:
+        """
+        Deadline after a pause: the working time that was left at pause time
+        is granted again from the resume instant. Targets already passed when
+        the pause began are left alone.
+        """
+        p, r, d = _epoch(paused_at), _epoch(resumed_at), _epoch(target)
+        self._ensure(min(p, r, d), latest=max(p, r, d))
+        remaining = self._offset(d) - self._offset(p)
+        if remaining <= 0:
+            return target
+        w = self._offset(r) + remaining
+        self._ensure(p, latest_offset=w)
+        return _like(self._at_offset(w), target)
+
+    # === Vectorised (numpy searchsorted) ===
+
+    def _offsets(self, t: np.ndarray) -> np.ndarray:
+        i = np.searchsorted(self.starts, t, side="right") - 1
+        j = np.maximum(i, 0)
+        inside = np.minimum(t, self.ends[j]) - self.starts[j]
+        return np.where(i < 0, 0.0, self.cum[j] + inside)
+
+    def add_business_seconds_many(self, starts: np.ndarray, seconds: np.ndarray) -> np.ndarray:
+        """add_business_seconds over arrays of epoch seconds (UTC)"""
+        starts = np.asarray(starts, dtype=np.float64)
+        if starts.size == 0:
+            return starts
+        self._ensure(float(starts.min()), latest=float(starts.max()))
+        w = self._offsets(starts) + np.asarray(seconds, dtype=np.float64)
+        self._ensure(float(starts.min()), latest_offset=float(w.max()))
+        i = np.searchsorted(self.cum_end, w, side="left")
+        return self.starts[i] + (w - self.cum[i])
+
+
+# 24/7: deadlines are plain time arithmetic
+CONTINUOUS = BusinessCalendar(horizon_days=30)
+
+# Expanded calendars by (calendar id, updated_at)
+_MAX_CALENDARS = 256
+_calendars: "OrderedDict[Tuple[str, Any], BusinessCalendar]" = OrderedDict()
+
+
+def get_calendar(calendar_id: Optional[str], spec: Optional[Dict[str, Any]] = None,
+                 version: Any = None) -> BusinessCalendar:
+    """
+    Cached calendar for a sla_calendars row. `version` (updated_at) is part
+    of the key, so an edited calendar is re-expanded on next use.
+    """
+    if calendar_id is None or spec is None:
+        return CONTINUOUS
+    key = (str(calendar_id), version)
+    calendar = _calendars.get(key)
+    if calendar is None:
+        calendar = BusinessCalendar.from_spec(spec)
+        _calendars[key] = calendar
+        while len(_calendars) > _MAX_CALENDARS:
+            _calendars.popitem(last=False)
+    else:
+        _calendars.move_to_end(key)
+    return calendar
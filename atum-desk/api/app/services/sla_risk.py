@@ -0,0 +1,229 @@
+"""
+ATUM DESK - Batch SLA Breach-Risk Scoring
+
+SLABreachPredictor's breach probability for every open SLA ticket at once,
+persisted in tickets.sla_risk_score so the risk dashboard reads scores
+instead of computing them per request:
+
+    stats   - sla_resolution_stats: average resolution hours per
+              (organization, priority) over the last 30 days, refreshed by
+              one grouped upsert per organization every
+              SLA_RISK_STATS_REFRESH_MINUTES
+    score   - the organization's open tickets with a future sla_due_at are
+              read as columns and scored in one numpy pass
+    persist - UPDATE ... FROM unnest(ids, scores) per batch, skipping
+              tickets whose (rounded) score did not change
+
+scripts/run_sla_worker.py runs a pass after each breach pass.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+from sqlalchemy import bindparam, text
+
+logger = logging.getLogger(__name__)
+
+# Fallback average resolution hours when a priority has no recent history
+PRIORITY_HOURS = {
+    "urgent": 1,
+    "high": 4,
+    "medium": 24,
+    "low": 72
+}
+STATS_WINDOW_DAYS = 30
+# Tickets above this probability are "at risk" (ix_tickets_sla_risk predicate)
+RISK_THRESHOLD = 0.3
+# Factor-based risk above 0.7 predicts a breach; probability is risk * 0.5
+WILL_BREACH_PROBABILITY = 0.35
+SCORE_DECIMALS = 3
+DEFAULT_BATCH_SIZE = 5000
+
+# Statuses whose tickets are scored (compared case-insensitively)
+SCORED_STATUSES = ("new", "in_progress", "assigned")
+
+REFRESH_STATS_SQL = text("""
+    WITH fresh AS (
+        INSERT INTO sla_resolution_stats (organization_id, priority, avg_hours, samples, refreshed_at)
+        SELECT organization_id, lower(priority::text),
+               avg(extract(epoch FROM resolved_at - created_at) / 3600), count(*), now()
+        FROM tickets
+        WHERE organization_id = :org_id
+        AND lower(status::text) = 'resolved'
+        AND resolved_at IS NOT NULL
+        AND resolved_at >= now() - make_interval(days => :window_days)
+        GROUP BY organization_id, lower(priority::text)
+        ON CONFLICT (organization_id, priority) DO UPDATE
+        SET avg_hours = EXCLUDED.avg_hours, samples = EXCLUDED.samples, refreshed_at = EXCLUDED.refreshed_at
+        RETURNING priority
+    )
+    DELETE FROM sla_resolution_stats
+    WHERE organization_id = :org_id
+    AND priority NOT IN (SELECT priority FROM fresh)
+""")
+
+STATS_SQL = text("SELECT priority, avg_hours FROM sla_resolution_stats WHERE organization_id = :org_id")
+
+OPEN_TICKETS_SQL = text("""
+    SELECT id,
+           extract(epoch FROM sla_due_at),
+           extract(epoch FROM created_at),
+           lower(priority::text),
+           assigned_to IS NOT NULL,
+           coalesce(escalation_level, 0),
+           lower(status::text) = 'waiting_customer',
+           sla_risk_score
+    FROM tickets
+    WHERE organization_id = :org_id
+    AND lower(status::text) IN :statuses
+    AND sla_due_at > now()
+""").bindparams(bindparam("statuses", expanding=True))
+
+SAVE_SCORES_SQL = text("""
+    UPDATE tickets t
+    SET sla_risk_score = s.score
+    FROM unnest(CAST(:ids AS uuid[]), CAST(:scores AS float8[])) AS s(id, score)
+    WHERE t.id = s.id
+""")
+
+
+def average_hours(stats: Dict[str, float], priority: Optional[str]) -> float:
+    """Recent average resolution hours for a priority, else its default"""
+    priority = (priority or "").lower()
+    hours = stats.get(priority)
+    if hours is None:
+        return float(PRIORITY_HOURS.get(priority, 24))
+    return float(hours)
+
+
+def factor_risk(age_hours: np.ndarray, unassigned: np.ndarray, high_priority: np.ndarray,
+                escalation: np.ndarray, waiting: np.ndarray) -> np.ndarray:
+    """Risk factors (0-1): unassigned, high/urgent, older than a day, escalations, waiting on customer"""
+    risk = (
+        0.3 * unassigned
+        + 0.2 * high_priority
+        + 0.2 * (age_hours > 24)
+        + 0.1 * np.maximum(escalation, 0)
+        + 0.15 * waiting
+    )
+    # Round off float noise so risk 0.7 stays exactly at the threshold
+    return np.minimum(1.0, np.round(risk, 6))
+
+
+def breach_probability(hours_left: np.ndarray, avg_hours: np.ndarray, risk: np.ndarray) -> np.ndarray:
+    """
+    Breach probability per ticket. Needing more than the time left
+    scores by the shortfall, otherwise half the factor risk; 0 once due.
+    """
+    shortfall = (hours_left > 0) & (avg_hours > hours_left)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        by_time = np.minimum(0.95, (avg_hours - hours_left) / avg_hours + 0.3)
+    return np.where(shortfall, by_time, np.where(hours_left > 0, risk * 0.5, 0.0))
+
+
+def will_breach(probability: float, hours_left: float, avg_hours: float) -> bool:
+    return hours_left > 0 and (avg_hours > hours_left or probability > WILL_BREACH_PROBABILITY)
+
+
+def recommendations(assigned: bool, priority: Optional[str], hours_left: float, est_resolution: float) -> List[str]:
+    """Actionable recommendations for an at-risk ticket"""
+    recs = []
+
+    if not assigned:
+        recs.append("Assign ticket to an agent immediately")
+
+    if hours_left < est_resolution:
+        recs.append(f"Priority override needed - only {hours_left:.1f}h remaining but ~{est_resolution:.1f}h needed")
+
+    if (priority or "").lower() == "low" and hours_left < 4:
+        recs.append("Consider upgrading priority to high/urgent")
+
+    recs.append("Notify team lead for potential escalation")
+
+    return recs
+
+
+def score_rows(rows: Iterable[tuple], stats: Dict[str, float], now: Optional[float] = None) -> np.ndarray:
+    """
+    Breach probabilities for OPEN_TICKETS_SQL rows (id, due epoch, created
+    epoch, priority, assigned, escalation level, waiting, ...).
+    """
+    now = time.time() if now is None else now
+    rows = list(rows)
+    if not rows:
+        return np.zeros(0)
+    _, due, created, priority, assigned, escalation, waiting = (list(c) for c in zip(*(r[:7] for r in rows)))
+    avg = np.array([average_hours(stats, p) for p in priority], dtype=float)
+    high = np.array([p in ("high", "urgent") for p in priority], dtype=float)
+    risk = factor_risk(
+        (now - np.array(created, dtype=float)) / 3600,
+        1.0 - np.array(assigned, dtype=float),
+        high,
+        np.array(escalation, dtype=float),
+        np.array(waiting, dtype=float),
+    )
+    return breach_probability((np.array(due, dtype=float) - now) / 3600, avg, risk)
+
+
+async def refresh_org_stats(conn, org_id) -> None:
+    await conn.execute(REFRESH_STATS_SQL, {"org_id": org_id, "window_days": STATS_WINDOW_DAYS})
+
+
+async def load_org_stats(conn, org_id) -> Dict[str, float]:
+    result = await conn.execute(STATS_SQL, {"org_id": org_id})
+    return {priority: float(hours) for priority, hours in result.fetchall() if hours is not None}
+
+
+async def score_org(conn, org_id, batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, int]:
+    """
+    Score and persist every open SLA ticket of an organization on `conn`
+    (caller owns the transaction and has set app.current_org).
+    """
+    stats = await load_org_stats(conn, org_id)
+    result = await conn.execute(OPEN_TICKETS_SQL, {"org_id": org_id, "statuses": SCORED_STATUSES})
+    rows = result.fetchall()
+    scores = np.round(score_rows(rows, stats), SCORE_DECIMALS)
+
+    previous = np.array([np.nan if r[7] is None else r[7] for r in rows], dtype=float)
+    changed = np.flatnonzero(~np.isclose(scores, previous, rtol=0, atol=10 ** -(SCORE_DECIMALS + 1)))
+    ids = [str(rows[i][0]) for i in changed]
+    values = scores[changed].tolist()
+    for start in range(0, len(ids), batch_size):
+        await conn.execute(SAVE_SCORES_SQL, {
+            "ids": ids[start:start + batch_size],
+            "scores": values[start:start + batch_size],
+        })
+    return {"scored": len(rows), "updated": len(ids), "at_risk": int((scores > RISK_THRESHOLD).sum())}
+
+
+async def run_org(engine, org_id, refresh_stats: bool, batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, int]:
+    async with engine.begin() as conn:
+        await conn.execute(text("SELECT set_config('app.current_org', :org_id, true)"), {"org_id": str(org_id)})
+        if refresh_stats:
+            await refresh_org_stats(conn, org_id)
+        return await score_org(conn, org_id, batch_size)
+
+
+async def run_pass(engine, org_ids: List[Any], refresh_stats: bool = False, concurrency: int = 4,
+                   batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, int]:
+    """One scoring pass over the given organizations, `concurrency` orgs at a time"""
+    semaphore = asyncio.Semaphore(concurrency)
+    failed = 0
+
+    async def one(org_id) -> Dict[str, int]:
+        nonlocal failed
+        async with semaphore:
+            try:
+                return await run_org(engine, org_id, refresh_stats, batch_size)
+            except Exception as e:
+                failed += 1
+                logger.error(f"SLA risk scoring failed for org {org_id}: {e}")
+                return {}
+
+    results = await asyncio.gather(*(one(org_id) for org_id in org_ids))
+    summary = {"organizations": len(org_ids), "failed_orgs": failed}
+    for key in ("scored", "updated", "at_risk"):
+        summary[key] = sum(r.get(key, 0) for r in results)
+    return summary
@@ -1,12 +1,13 @@
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Optional
 import logging
-from sqlalchemy import select
+from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.ticket import Ticket
 from app.models.sla_policy import SLAPolicy
 from app.models.sla_calculation import SLACalculation
 from app.models.audit_log import AuditLog
+from app.services.sla_calendar import BusinessCalendar, get_calendar
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +15,23 @@ class SLAService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
+    async def get_policy_calendar(self, policy_id) -> BusinessCalendar:
+        """Business-hours calendar of a policy (24/7 when it has none)"""
+        result = await self.db.execute(
+            text("""
+                SELECT c.id, c.timezone, c.weekly_hours, c.holidays, c.updated_at
+                FROM sla_policies p
+                JOIN sla_calendars c ON c.id = p.calendar_id
+                WHERE p.id = :policy_id
+            """),
+            {"policy_id": policy_id},
+        )
+        row = result.fetchone()
+        if not row:
+            return get_calendar(None)
+        spec = {"timezone": row[1], "weekly_hours": row[2], "holidays": row[3]}
+        return get_calendar(row[0], spec, version=row[4])
+
     async def calculate_targets(self, ticket: Ticket):
         """
         Calculate and set SLA targets for a ticket based on its policy.
@@ -33,8 +51,9 @@ class SLAService:
         if not policy:
             return
 
-        # Simple 24/7 calculation for Phase 1
-        now = datetime.utcnow()
+        # Targets count only working time of the policy's calendar
+        calendar = await self.get_policy_calendar(policy.id)
+        now = ticket.sla_started_at or datetime.utcnow()
         
         response_minutes = policy.get_response_time(ticket.priority)
         resolution_minutes = policy.get_resolution_time(ticket.priority)
@@ -49,15 +68,35 @@ class SLAService:
             self.db.add(calc)
         
         if response_minutes:
-            calc.first_response_target = now + timedelta(minutes=response_minutes)
+            calc.first_response_target = calendar.add_business_seconds(now, response_minutes * 60)
         
         if resolution_minutes:
-            calc.resolution_target = now + timedelta(minutes=resolution_minutes)
+            calc.resolution_target = calendar.add_business_seconds(now, resolution_minutes * 60)
+            ticket.sla_due_at = calc.resolution_target
             
         # Update ticket/calc
         await self.db.commit()
         logger.info(f"SLA Targets set for Ticket {ticket.id}")
 
+    async def resume(self, ticket: Ticket, paused_at: datetime, resumed_at: datetime):
+        """
+        Shift the ticket's open targets after a pause (WAITING_CUSTOMER):
+        the working time left when it was paused is granted again from
+        resumed_at. Caller commits.
+        """
+        query = select(SLACalculation).where(SLACalculation.ticket_id == ticket.id)
+        result = await self.db.execute(query)
+        calc = result.scalar_one_or_none()
+        if not calc:
+            return
+
+        calendar = await self.get_policy_calendar(ticket.sla_policy_id) if ticket.sla_policy_id else get_calendar(None)
+        if calc.first_response_target and not calc.first_response_actual:
+            calc.first_response_target = calendar.shift_for_pause(calc.first_response_target, paused_at, resumed_at)
+        if calc.resolution_target and not calc.resolution_actual:
+            calc.resolution_target = calendar.shift_for_pause(calc.resolution_target, paused_at, resumed_at)
+            ticket.sla_due_at = calc.resolution_target
+
     async def check_breaches(self, ticket_id: str):
         """
         Check if a ticket has breached its SLA targets.
@@ -0,0 +1,314 @@
+"""
+ATUM DESK - Ticket Metric Rollups
+
+Time-bucketed ticket statistics for the /api/v1/ai/insights endpoints:
+
+    ticket_metrics_hourly  (organization_id, bucket)      hour, UTC
+    ticket_metrics_daily   (organization_id, day)         day, UTC
+    agent_metrics_daily    (organization_id, agent_id, day)
+
+Rows hold tickets created (total and per priority) in the bucket and
+tickets resolved in it, with their summed resolution time and SLA outcome
+(resolved before / after sla_due_at). A trigger on tickets appends the
+signed change of every relevant insert / update / delete to
+ticket_metric_deltas (-old contribution, +new), so ticket writes never
+contend on a rollup row. scripts/metrics_snapshot_worker.py folds the
+deltas into the rollups every cycle and refits the per-org volume
+forecasts (ticket_forecasts); reading 90 days is then 90 rows.
+
+scripts/backfill_ticket_metrics.py rebuilds an organization's rollups from
+tickets. Statements here use psycopg parameters.
+"""
+import json
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.services.forecasting import holt_winters
+
+PRIORITIES = ("low", "medium", "high", "urgent")
+FIT_DAYS = 365
+FORECAST_HORIZON = 30
+DEFAULT_FOLD_BATCH = 50_000
+# Trend summary: newer half vs older half beyond +-5%
+TREND_CHANGE = 5.0
+
+_COUNTS = (
+    "created, created_low, created_medium, created_high, created_urgent, "
+    "resolved, resolution_seconds, sla_met, sla_breached"
+)
+
+_ADD_COUNTS = """
+            created = r.created + EXCLUDED.created,
+            created_low = r.created_low + EXCLUDED.created_low,
+            created_medium = r.created_medium + EXCLUDED.created_medium,
+            created_high = r.created_high + EXCLUDED.created_high,
+            created_urgent = r.created_urgent + EXCLUDED.created_urgent,
+            resolved = r.resolved + EXCLUDED.resolved,
+            resolution_seconds = r.resolution_seconds + EXCLUDED.resolution_seconds,
+            sla_met = r.sla_met + EXCLUDED.sla_met,
+            sla_breached = r.sla_breached + EXCLUDED.sla_breached"""
+
+_SUMS = """
+           coalesce(sum(created), 0),
+           coalesce(sum(created) FILTER (WHERE priority = 'low'), 0),
+           coalesce(sum(created) FILTER (WHERE priority = 'medium'), 0),
+           coalesce(sum(created) FILTER (WHERE priority = 'high'), 0),
+           coalesce(sum(created) FILTER (WHERE priority = 'urgent'), 0),
+           coalesce(sum(resolved), 0), coalesce(sum(resolution_seconds), 0),
+           coalesce(sum(sla_met), 0), coalesce(sum(sla_breached), 0)"""
+
+
+# Drain up to %(batch_size)s deltas (oldest first) into the three rollups.
+# SKIP LOCKED lets a second worker take the next batch instead of waiting.
+# Returns the new totals of every hour touched (organization, bucket,
+# created, urgent, resolved, SLA breached) with the number of deltas
+# folded; no rows once the table is empty.
+FOLD_SQL = f"""
+    WITH batch AS (
+        DELETE FROM ticket_metric_deltas
+        WHERE id IN (
+            SELECT id FROM ticket_metric_deltas ORDER BY id
+            LIMIT %(batch_size)s FOR UPDATE SKIP LOCKED
+        )
+        RETURNING organization_id, agent_id, bucket, priority,
+                  created, resolved, resolution_seconds, sla_met, sla_breached
+    ),
+    hourly AS (
+        INSERT INTO ticket_metrics_hourly AS r (organization_id, bucket, {_COUNTS})
+        SELECT organization_id, bucket, {_SUMS}
+        FROM batch
+        GROUP BY organization_id, bucket
+        ON CONFLICT (organization_id, bucket) DO UPDATE SET {_ADD_COUNTS}
+        RETURNING r.organization_id, r.bucket, r.created, r.created_urgent, r.resolved, r.sla_breached
+    ),
+    daily AS (
+        INSERT INTO ticket_metrics_daily AS r (organization_id, day, {_COUNTS})
+        SELECT organization_id, (bucket AT TIME ZONE 'UTC')::date, {_SUMS}
+        FROM batch
+        GROUP BY organization_id, (bucket AT TIME ZONE 'UTC')::date
+        ON CONFLICT (organization_id, day) DO UPDATE SET {_ADD_COUNTS}
+        RETURNING 1
+    ),
+    agents AS (
+        INSERT INTO agent_metrics_daily AS r
+               (organization_id, agent_id, day, resolved, resolution_seconds, sla_met, sla_breached)
+        SELECT organization_id, agent_id, (bucket AT TIME ZONE 'UTC')::date,
+               sum(resolved), sum(resolution_seconds), sum(sla_met), sum(sla_breached)
+        FROM batch
+        WHERE agent_id IS NOT NULL AND resolved <> 0
+        GROUP BY organization_id, agent_id, (bucket AT TIME ZONE 'UTC')::date
+        ON CONFLICT (organization_id, agent_id, day) DO UPDATE
+        SET resolved = r.resolved + EXCLUDED.resolved,
+            resolution_seconds = r.resolution_seconds + EXCLUDED.resolution_seconds,
+            sla_met = r.sla_met + EXCLUDED.sla_met,
+            sla_breached = r.sla_breached + EXCLUDED.sla_breached
+        RETURNING 1
+    )
+    SELECT h.*, (SELECT count(*) FROM batch)
+    FROM hourly h
+"""
+
+# One organization recomputed from tickets. Run in a REPEATABLE READ
+# transaction: the deltas deleted are exactly those already reflected in
+# the snapshot the rollups are rebuilt from; later ones are folded normally.
+_TICKET_CONTRIBUTIONS = """
+    SELECT date_trunc('hour', created_at, 'UTC') AS bucket, NULL::uuid AS agent_id,
+           lower(priority::text) AS priority, 1 AS created, 0 AS resolved,
+           0::float8 AS resolution_seconds, 0 AS sla_met, 0 AS sla_breached
+    FROM tickets
+    WHERE organization_id = %(org_id)s::uuid
+    UNION ALL
+    SELECT date_trunc('hour', resolved_at, 'UTC'), assigned_to, NULL, 0, 1,
+           extract(epoch FROM resolved_at - created_at),
+           (sla_due_at IS NOT NULL AND resolved_at <= sla_due_at)::int,
+           (sla_due_at IS NOT NULL AND resolved_at > sla_due_at)::int
+    FROM tickets
+    WHERE organization_id = %(org_id)s::uuid AND resolved_at IS NOT NULL
+"""
+
+REBUILD_ORG_SQL = (
+    "DELETE FROM ticket_metric_deltas WHERE organization_id = %(org_id)s::uuid",
+    "DELETE FROM ticket_metrics_hourly WHERE organization_id = %(org_id)s::uuid",
+    "DELETE FROM ticket_metrics_daily WHERE organization_id = %(org_id)s::uuid",
+    "DELETE FROM agent_metrics_daily WHERE organization_id = %(org_id)s::uuid",
+    f"""
+    INSERT INTO ticket_metrics_hourly (organization_id, bucket, {_COUNTS})
+    SELECT %(org_id)s::uuid, bucket, {_SUMS}
+    FROM ({_TICKET_CONTRIBUTIONS}) c
+    GROUP BY bucket
+    """,
+    f"""
+    INSERT INTO ticket_metrics_daily (organization_id, day, {_COUNTS})
+    SELECT organization_id, (bucket AT TIME ZONE 'UTC')::date,
+           sum(created), sum(created_low), sum(created_medium), sum(created_high), sum(created_urgent),
+           sum(resolved), sum(resolution_seconds), sum(sla_met), sum(sla_breached)
+    FROM ticket_metrics_hourly
+    WHERE organization_id = %(org_id)s::uuid
+    GROUP BY organization_id, (bucket AT TIME ZONE 'UTC')::date
+    """,
+    f"""
+    INSERT INTO agent_metrics_daily
+           (organization_id, agent_id, day, resolved, resolution_seconds, sla_met, sla_breached)
+    SELECT %(org_id)s::uuid, agent_id, (bucket AT TIME ZONE 'UTC')::date,
+           sum(resolved), sum(resolution_seconds), sum(sla_met), sum(sla_breached)
+    FROM ({_TICKET_CONTRIBUTIONS}) c
+    WHERE agent_id IS NOT NULL AND resolved = 1
+    GROUP BY agent_id, (bucket AT TIME ZONE 'UTC')::date
+    """,
+)
+
+# Daily created counts since %(since)s, for the forecast fit
+CREATED_SERIES_SQL = """
+    SELECT day, created
+    FROM ticket_metrics_daily
+    WHERE organization_id = %(org_id)s::uuid AND day >= %(since)s
+    ORDER BY day
+"""
+
+SAVE_FORECAST_SQL = """
+    INSERT INTO ticket_forecasts (organization_id, fitted_at, last_day, method, params, history, forecast, mae)
+    VALUES (%(org_id)s::uuid, now(), %(last_day)s, %(method)s, %(params)s, %(history)s, %(forecast)s, %(mae)s)
+    ON CONFLICT (organization_id) DO UPDATE
+    SET fitted_at = EXCLUDED.fitted_at, last_day = EXCLUDED.last_day, method = EXCLUDED.method,
+        params = EXCLUDED.params, history = EXCLUDED.history, forecast = EXCLUDED.forecast, mae = EXCLUDED.mae
+"""
+
+# ticket_metrics_daily columns after day, in DailyRow order
+DAILY_COLUMNS = _COUNTS
+
+# (day, created, low, medium, high, urgent, resolved, resolution seconds, sla met, sla breached)
+DailyRow = Tuple[date, int, int, int, int, int, int, float, int, int]
+
+
+def dense(rows: Iterable[Sequence[Any]], start: date, days: int) -> List[Optional[Sequence[Any]]]:
+    """Rows keyed by their first column (a day) -> one slot per day from `start`, None when missing"""
+    by_day = {r[0]: r for r in rows}
+    return [by_day.get(date.fromordinal(start.toordinal() + offset)) for offset in range(days)]
+
+
+def day_labels(start: date, days: int) -> List[str]:
+    return [date.fromordinal(start.toordinal() + offset).isoformat() for offset in range(days)]
+
+
+def sla_compliance(met: float, breached: float) -> Optional[float]:
+    """Percent of SLA-bound resolutions inside their deadline, None without any"""
+    total = met + breached
+    return round(met / total * 100, 1) if total else None
+
+
+def dominant_priority(row: Optional[Sequence[Any]]) -> Optional[str]:
+    """The day's most frequent priority among created tickets (ties to the higher one)"""
+    if row is None or not row[1]:
+        return None
+    counts = dict(zip(PRIORITIES, row[2:6]))
+    return max(reversed(PRIORITIES), key=lambda p: counts[p])
+
+
+def change_summary(older: float, newer: float) -> Dict[str, Any]:
+    """Trend of newer vs older (totals or rates over equal halves)"""
+    if older:
+        change = (newer - older) / older * 100
+    else:
+        change = 100.0 if newer else 0.0
+    if change > TREND_CHANGE:
+        trend = "increasing"
+    elif change < -TREND_CHANGE:
+        trend = "decreasing"
+    else:
+        trend = "stable"
+    return {"trend": trend, "change_percent": round(change, 1)}
+
+
+def trend_series(metric: str, rows: Sequence[DailyRow], start: date, days: int) -> Dict[str, Any]:
+    """
+    /insights/trends payload from daily rows: tickets created per day,
+    the dominant priority per day (with counts), or SLA compliance per day.
+    The summary compares the newer half of the window with the older half.
+    """
+    slots = dense(rows, start, days)
+    half = days // 2
+    older, newer = slots[:days - half], slots[days - half:]
+    trends = []
+    for label, row in zip(day_labels(start, days), slots):
+        if metric == "tickets":
+            trends.append({"date": label, "value": row[1] if row else 0})
+        elif metric == "priority":
+            counts = dict(zip(PRIORITIES, row[2:6])) if row else dict.fromkeys(PRIORITIES, 0)
+            trends.append({"date": label, "value": dominant_priority(row), "counts": counts})
+        else:
+            trends.append({"date": label, "value": sla_compliance(row[8], row[9]) if row else None})
+
+    def total(part, index):
+        return sum(r[index] for r in part if r)
+
+    if metric == "tickets":
+        summary = change_summary(total(older, 1), total(newer, 1))
+    elif metric == "priority":
+        # Share of high + urgent among created tickets
+        def share(part):
+            created = total(part, 1)
+            return (total(part, 4) + total(part, 5)) / created * 100 if created else 0.0
+        summary = change_summary(share(older), share(newer))
+    else:
+        summary = change_summary(
+            sla_compliance(total(older, 8), total(older, 9)) or 0.0,
+            sla_compliance(total(newer, 8), total(newer, 9)) or 0.0,
+        )
+    return {"metric": metric, "period_days": days, "trends": trends, "summary": summary}
+
+
+def forecast_record(org_id: str, rows: Iterable[Tuple[date, int]], today: date) -> Dict[str, Any]:
+    """
+    Fit CREATED_SERIES_SQL rows over the FIT_DAYS complete days before
+    `today` -> SAVE_FORECAST_SQL parameters. Leading days before the
+    organization's first ticket are left out of the fit.
+    """
+    start = date.fromordinal(today.toordinal() - FIT_DAYS)
+    series = [r[1] if r else 0 for r in dense(rows, start, FIT_DAYS)]
+    first = next((i for i, v in enumerate(series) if v), len(series))
+    fit = holt_winters(series[first:], FORECAST_HORIZON)
+    return {
+        "org_id": org_id,
+        "last_day": date.fromordinal(today.toordinal() - 1),
+        "method": fit["method"],
+        "params": json.dumps(fit["params"]),
+        "history": series[-FORECAST_HORIZON:],
+        "forecast": [round(v, 2) for v in fit["forecast"]],
+        "mae": round(fit["mae"], 3),
+    }
+
+
+def priority_distribution(rows: Iterable[DailyRow]) -> Dict[str, float]:
+    """Percent of created tickets per priority over the rows"""
+    counts = dict.fromkeys(PRIORITIES, 0)
+    for row in rows:
+        for priority, count in zip(PRIORITIES, row[2:6]):
+            counts[priority] += count
+    total = sum(counts.values())
+    return {p: round(c / total * 100, 1) if total else 0.0 for p, c in counts.items()}
+
+
+def agent_summary(rows: Iterable[Tuple[Any, Optional[str], int, float, int, int]]) -> Dict[str, Any]:
+    """
+    Per-agent totals (agent id, name, resolved, resolution seconds, SLA met,
+    SLA breached) -> /insights/agent-performance agents and summary.
+    """
+    agents = []
+    for agent_id, name, resolved, seconds, met, breached in rows:
+        if resolved <= 0:
+            continue
+        agents.append({
+            "agent_id": str(agent_id),
+            "name": name,
+            "tickets_resolved": int(resolved),
+            "avg_resolution_hours": round(seconds / resolved / 3600, 1),
+            "sla_compliance": sla_compliance(met, breached),
+        })
+    agents.sort(key=lambda a: (-a["tickets_resolved"], a["avg_resolution_hours"]))
+    return {
+        "agents": agents,
+        "summary": {
+            "top_performer": agents[0]["name"] if agents else None,
+            "most_efficient": min(agents, key=lambda a: a["avg_resolution_hours"])["name"] if agents else None,
+        },
+    }
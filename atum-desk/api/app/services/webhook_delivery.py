@@ -0,0 +1,296 @@
+"""
+ATUM DESK - Webhook Delivery
+Concurrent fan-out of webhook_outbox rows (used by scripts/webhook_worker.py)
+
+- one shared keep-alive httpx client for every endpoint
+- per-endpoint (host:port) concurrency caps, so one slow receiver cannot
+  hold every connection while the others wait
+- exponential retry delays with jitter, so failed deliveries of a burst do
+  not all come back at the same instant
+- a circuit breaker per URL: after repeated failures the URL is skipped for
+  a cool-down, then a single trial request decides whether it closes
+- webhook stats (last_triggered_at / failure_count) accumulated in memory and
+  written in one statement per flush instead of one commit per delivery
+"""
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import random
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 10.0  # seconds per delivery attempt
+DEFAULT_ENDPOINT_LIMIT = 4  # concurrent requests per receiver host
+DEFAULT_MAX_CONNECTIONS = 100
+
+# 408 / 429 are the receiver asking us to come back later; any other 4xx
+# will not change on retry
+RETRYABLE_STATUS = {408, 425, 429}
+
+
+def _count(result: str) -> None:
+    try:
+        from app.routers.metrics import webhook_deliveries_total
+        webhook_deliveries_total.labels(result=result).inc()
+    except Exception:
+        pass
+
+
+def _observe(elapsed: float) -> None:
+    try:
+        from app.routers.metrics import webhook_delivery_duration
+        webhook_delivery_duration.observe(elapsed)
+    except Exception:
+        pass
+
+
+def sign(secret: str, body: bytes) -> str:
+    """X-Atum-Signature value for a request body"""
+    digest = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return f"sha256={digest}"
+
+
+def build_body(event_type: str, occurred_at: datetime, payload: Dict[str, Any]) -> bytes:
+    """
+    Request body of an event. The timestamp is when the event happened, so
+    every retry of a delivery sends identical bytes (and signature).
+    """
+    return json.dumps({
+        "event": event_type,
+        "timestamp": occurred_at.isoformat(),
+        "payload": payload,
+    }).encode("utf-8")
+
+
+def retry_delay(attempt: int, base: float, cap: float, rand: Callable[[], float] = random.random) -> float:
+    """
+    Seconds before retry number `attempt` (1-based): exponential growth capped
+    at `cap`, with "equal jitter" - half fixed, half random - so the delay
+    never collapses to zero but concurrent failures still spread out.
+    """
+    ceiling = min(cap, base * (2 ** max(attempt - 1, 0)))
+    return ceiling / 2 + rand() * ceiling / 2
+
+
+def endpoint_key(url: str) -> str:
+    """Concurrency-cap key: receivers are limited per host:port"""
+    parts = urlsplit(url)
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    return f"{parts.hostname}:{port}"
+
+
+class CircuitBreaker:
+    """
+    Per-URL breaker: closed -> open after `threshold` consecutive failures;
+    after `reset_seconds` one trial request is let through (half-open) and
+    its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, threshold: int = 5, reset_seconds: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._failures: Dict[str, int] = defaultdict(int)
+        self._opened_at: Dict[str, float] = {}
+        self._trial: set = set()
+
+    def is_open(self, url: str) -> bool:
+        return url in self._opened_at
+
+    def allow(self, url: str) -> bool:
+        opened_at = self._opened_at.get(url)
+        if opened_at is None:
+            return True
+        if url in self._trial or self._clock() - opened_at < self.reset_seconds:
+            return False
+        self._trial.add(url)
+        return True
+
+    def retry_after(self, url: str) -> float:
+        """Seconds until an open circuit lets a trial request through"""
+        opened_at = self._opened_at.get(url)
+        if opened_at is None:
+            return 0.0
+        return max(self.reset_seconds - (self._clock() - opened_at), 0.0)
+
+    def record(self, url: str, ok: bool) -> None:
+        self._trial.discard(url)
+        if ok:
+            self._failures.pop(url, None)
+            if self._opened_at.pop(url, None) is not None:
+                logger.info(f"Webhook circuit closed for {url}")
+            return
+        self._failures[url] += 1
+        if url in self._opened_at or self._failures[url] >= self.threshold:
+            if url not in self._opened_at:
+                logger.warning(f"Webhook circuit opened for {url} after {self._failures[url]} failures")
+            self._opened_at[url] = self._clock()
+
+
+@dataclass
+class Delivery:
+    """One webhook_outbox row joined with its webhook"""
+    id: str
+    webhook_id: str
+    url: str
+    secret: str
+    event_type: str
+    payload: Dict[str, Any]
+    created_at: datetime
+    attempts: int = 0
+
+
+@dataclass
+class DeliveryResult:
+    delivery: Delivery
+    ok: bool
+    status_code: Optional[int] = None
+    error: Optional[str] = None
+    retryable: bool = True
+    # Not sent because the URL's circuit is open; not counted as an attempt
+    skipped: bool = False
+    retry_after: float = 0.0
+
+
+class WebhookDispatcher:
+    """Sends deliveries concurrently over one pooled client"""
+
+    def __init__(
+        self,
+        timeout: float = DEFAULT_TIMEOUT,
+        endpoint_limit: int = DEFAULT_ENDPOINT_LIMIT,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        breaker: Optional[CircuitBreaker] = None,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
+        self.endpoint_limit = endpoint_limit
+        self.breaker = breaker or CircuitBreaker()
+        self._client = client or httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+        self._endpoints: Dict[str, asyncio.Semaphore] = {}
+
+    def _semaphore(self, url: str) -> asyncio.Semaphore:
+        key = endpoint_key(url)
+        semaphore = self._endpoints.get(key)
+        if semaphore is None:
+            semaphore = self._endpoints[key] = asyncio.Semaphore(self.endpoint_limit)
+        return semaphore
+
+    async def deliver(self, delivery: Delivery) -> DeliveryResult:
+        async with self._semaphore(delivery.url):
+            # Checked after queueing for the endpoint: failures of the
+            # requests ahead of us may just have opened the circuit
+            if not self.breaker.allow(delivery.url):
+                _count("circuit_open")
+                return DeliveryResult(delivery, ok=False, error="circuit open", skipped=True,
+                                      retry_after=self.breaker.retry_after(delivery.url))
+            result = await self._send(delivery)
+        self.breaker.record(delivery.url, result.ok)
+        _count("ok" if result.ok else "retry" if result.retryable else "rejected")
+        return result
+
+    async def _send(self, delivery: Delivery) -> DeliveryResult:
+        body = build_body(delivery.event_type, delivery.created_at, delivery.payload)
+        headers = {
+            "Content-Type": "application/json",
+            "X-Atum-Signature": sign(delivery.secret, body),
+            "X-Atum-Event": delivery.event_type,
+            # Stable across retries, so receivers can drop duplicates
+            "X-Atum-Delivery": delivery.id,
+        }
+        start = time.perf_counter()
+        try:
+            response = await self._client.post(delivery.url, content=body, headers=headers)
+        except httpx.HTTPError as e:
+            return DeliveryResult(delivery, ok=False, error=f"{type(e).__name__}: {e}"[:1000])
+        finally:
+            _observe(time.perf_counter() - start)
+
+        if response.is_success:
+            return DeliveryResult(delivery, ok=True, status_code=response.status_code)
+        retryable = response.status_code >= 500 or response.status_code in RETRYABLE_STATUS
+        return DeliveryResult(
+            delivery,
+            ok=False,
+            status_code=response.status_code,
+            error=f"HTTP {response.status_code}: {response.text[:500]}",
+            retryable=retryable,
+        )
+
+    async def deliver_many(self, deliveries: List[Delivery]) -> List[DeliveryResult]:
+        return list(await asyncio.gather(*(self.deliver(d) for d in deliveries)))
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+@dataclass
+class _WebhookTally:
+    last_success: Optional[datetime] = None
+    reset: bool = False
+    failures: int = 0
+    last_error: Optional[str] = None
+
+
+class WebhookStats:
+    """
+    Pending webhooks-table stat changes. Mirrors the old per-delivery
+    updates: a success sets last_triggered_at and resets failure_count,
+    each failure after it increments the count.
+    """
+
+    def __init__(self):
+        self._tally: Dict[str, _WebhookTally] = {}
+
+    def __len__(self) -> int:
+        return len(self._tally)
+
+    def record(self, result: DeliveryResult, at: Optional[datetime] = None) -> None:
+        if result.skipped:
+            return
+        tally = self._tally.setdefault(result.delivery.webhook_id, _WebhookTally())
+        if result.ok:
+            tally.last_success = at or datetime.now(timezone.utc)
+            tally.reset = True
+            tally.failures = 0
+        else:
+            tally.failures += 1
+            tally.last_error = result.error
+
+    def drain(self) -> Dict[str, list]:
+        """Column arrays for one UPDATE ... FROM unnest(...) statement"""
+        columns = {"ids": [], "last_success": [], "reset": [], "failures": [], "last_error": []}
+        for webhook_id, tally in self._tally.items():
+            columns["ids"].append(webhook_id)
+            columns["last_success"].append(tally.last_success)
+            columns["reset"].append(tally.reset)
+            columns["failures"].append(tally.failures)
+            columns["last_error"].append(tally.last_error)
+        self._tally.clear()
+        return columns
+
+    def restore(self, columns: Dict[str, list]) -> None:
+        """Put back drained stats whose write failed (newer tallies win)"""
+        for i, webhook_id in enumerate(columns["ids"]):
+            newer = self._tally.get(webhook_id)
+            older = _WebhookTally(columns["last_success"][i], columns["reset"][i],
+                                  columns["failures"][i], columns["last_error"][i])
+            if newer is None:
+                self._tally[webhook_id] = older
+            elif not newer.reset:
+                newer.failures += older.failures
+                newer.reset = older.reset
+                newer.last_success = older.last_success
+                newer.last_error = newer.last_error or older.last_error
@@ -0,0 +1,469 @@
+"""
+ATUM DESK - Workflow Runtime
+
+Async executor for domain workflows (src/domain/entities/workflow.py):
+
+- runs the compiled step graph (Workflow.compile): steps sorted once,
+  jumps resolved to positions, condition paths pre-parsed
+- WEBHOOK_CALL and SEND_EMAIL do real I/O (one pooled HTTP client with a
+  per-host cap; SMTP); other actions produce their result dict as before
+- WAIT suspends the run: the caller persists it with save_waits and
+  scripts/workflow_scheduler.py resumes it when due, from a snapshot of the
+  workflow definition it started on
+- execution counters are tallied in memory (WorkflowStats) and written in
+  one upsert per flush
+"""
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID, uuid4
+
+import httpx
+from sqlalchemy import text
+
+from app.services.webhook_delivery import endpoint_key
+from src.domain.entities import OrganizationId
+from src.domain.entities.workflow import (
+    ActionType, Operator, TriggerType, Workflow, WorkflowAction, WorkflowCondition, WorkflowStep,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 10.0  # seconds per webhook call
+DEFAULT_ENDPOINT_LIMIT = 8  # concurrent webhook calls per host
+DEFAULT_MAX_CONNECTIONS = 100
+
+COMPLETED = "completed"
+FAILED = "failed"
+WAITING = "waiting"
+
+ActionHandler = Callable[[WorkflowAction, Dict[str, Any]], Awaitable[Dict[str, Any]]]
+EmailSender = Callable[[str, str, str], Awaitable[Any]]
+
+
+@dataclass
+class WorkflowRun:
+    """Outcome of running (or resuming) a workflow up to its end or a WAIT"""
+    workflow: Workflow
+    status: str
+    context: Dict[str, Any]
+    results: List[Dict[str, Any]] = field(default_factory=list)
+    error: Optional[str] = None
+    ticket_id: Optional[str] = None
+    # Set while waiting: where and when to continue
+    resume_step_id: Optional[UUID] = None
+    resume_at: Optional[datetime] = None
+    # workflow_waits row; kept across waits of the same run
+    wait_id: Optional[str] = None
+    # Continuation of a run that was already counted as an execution
+    resumed: bool = False
+
+
+def _step_result(step: WorkflowStep, success: bool, **fields) -> Dict[str, Any]:
+    return {"step_id": step.id, "step_name": step.name, "success": success, **fields}
+
+
+class WorkflowRuntime:
+    """Runs compiled workflows with async action handlers"""
+
+    def __init__(
+        self,
+        timeout: float = DEFAULT_TIMEOUT,
+        endpoint_limit: int = DEFAULT_ENDPOINT_LIMIT,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        client: Optional[httpx.AsyncClient] = None,
+        send_email: Optional[EmailSender] = None,
+        handlers: Optional[Dict[ActionType, ActionHandler]] = None,
+        clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc),
+    ):
+        self.endpoint_limit = endpoint_limit
+        self._client = client or httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+        self._endpoints: Dict[str, asyncio.Semaphore] = {}
+        self._send_email = send_email
+        self.clock = clock
+        self.handlers: Dict[ActionType, ActionHandler] = {
+            ActionType.WEBHOOK_CALL: self._webhook_call,
+            ActionType.SEND_EMAIL: self._email,
+        }
+        self.handlers.update(handlers or {})
+        self.stats = WorkflowStats()
+
+    # === Actions ===
+
+    async def _webhook_call(self, action: WorkflowAction, context: Dict[str, Any]) -> Dict[str, Any]:
+        result = action.execute(context)
+        webhook = result["webhook"]
+        if not webhook["url"]:
+            raise ValueError("webhook_call without url")
+        key = endpoint_key(webhook["url"])
+        semaphore = self._endpoints.get(key)
+        if semaphore is None:
+            semaphore = self._endpoints[key] = asyncio.Semaphore(self.endpoint_limit)
+        async with semaphore:
+            response = await self._client.request(webhook["method"], webhook["url"], json=webhook["payload"])
+        # Non-2xx fails the step (and takes its on_failure branch)
+        response.raise_for_status()
+        result["status_code"] = response.status_code
+        return result
+
+    async def _email(self, action: WorkflowAction, context: Dict[str, Any]) -> Dict[str, Any]:
+        result = action.execute(context)
+        email = result["email"]
+        if not email["to"]:
+            raise ValueError("send_email without recipient")
+        send = self._send_email
+        if send is None:
+            from app.services.email_notification import email_notification_service
+            send = email_notification_service.send_email
+        await send(email["to"], email["subject"] or "", email["body"] or "")
+        return result
+
+    # === Execution ===
+
+    async def run(
+        self,
+        workflow: Workflow,
+        context: Dict[str, Any],
+        ticket_id: Optional[str] = None,
+        resume_step_id: Optional[UUID] = None,
+        results: Optional[List[Dict[str, Any]]] = None,
+        wait_id: Optional[str] = None,
+    ) -> WorkflowRun:
+        """
+        Run from the first step, or continue a waiting run at resume_step_id.
+        Step failures follow on_failure_step_id or end the run, as in
+        Workflow.execute; only errors outside an action fail the run.
+        """
+        plan = workflow.compile()
+        steps = plan.steps
+        position = 0 if resume_step_id is None else plan.position(resume_step_id)
+        results = list(results or [])
+        run = WorkflowRun(workflow, COMPLETED, context, results, ticket_id=ticket_id, wait_id=wait_id,
+                          resumed=resume_step_id is not None)
+        try:
+            while position < len(steps):
+                compiled = steps[position]
+                step = compiled.step
+                if not step.is_enabled or not compiled.condition(context):
+                    position += 1
+                    continue
+
+                action = step.action
+                if action.action_type == ActionType.WAIT:
+                    delay = float(action.config.get("delay", 0) or 0)
+                    results.append(_step_result(step, True, result={
+                        "success": True, "action": ActionType.WAIT.value, "delay_seconds": delay,
+                    }))
+                    position = compiled.next_position
+                    if delay > 0 and position < len(steps):
+                        run.status = WAITING
+                        run.resume_step_id = steps[position].step.id
+                        run.resume_at = self.clock() + timedelta(seconds=delay)
+                        run.wait_id = run.wait_id or str(uuid4())
+                        break
+                    continue
+
+                try:
+                    handler = self.handlers.get(action.action_type)
+                    result = await handler(action, context) if handler else action.execute(context)
+                    results.append(_step_result(step, True, result=result))
+                    context["last_action_result"] = result
+                    position = compiled.next_position
+                except Exception as e:
+                    results.append(_step_result(step, False, error=str(e)))
+                    if compiled.failure_position is None:
+                        break
+                    position = compiled.failure_position
+        except Exception as e:
+            run.status = FAILED
+            run.error = str(e)
+        self.stats.record(run)
+        return run
+
+    async def run_many(self, items: Iterable[Tuple[Workflow, Dict[str, Any]]], concurrency: int = 100) -> List[WorkflowRun]:
+        """
+        Run (workflow, context) pairs concurrently, `concurrency` at a time:
+        a fixed set of worker coroutines drains one shared iterator, so a
+        large batch does not become one task per run.
+        """
+        items = list(items)
+        runs: List[Optional[WorkflowRun]] = [None] * len(items)
+        pending = iter(enumerate(items))
+
+        async def worker() -> None:
+            for i, (workflow, context) in pending:
+                runs[i] = await self.run(workflow, context)
+
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, len(items)))))
+        return runs
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+# === Counters ===
+
+class WorkflowStats:
+    """
+    Execution counters per workflow since the last flush. A run that waits
+    counts as an execution when it starts and as a success / failure when
+    it finishes.
+    """
+
+    def __init__(self):
+        self._tally: Dict[str, List[Any]] = {}  # workflow id -> [org, executions, successes, failures, last run]
+
+    def __len__(self) -> int:
+        return len(self._tally)
+
+    def record(self, run: WorkflowRun, at: Optional[datetime] = None) -> None:
+        workflow = run.workflow
+        key = str(workflow.id)
+        tally = self._tally.get(key)
+        if tally is None:
+            org = workflow.organization_id
+            tally = self._tally[key] = [str(org) if org else None, 0, 0, 0, None]
+        if not run.resumed:
+            tally[1] += 1
+        if run.status == COMPLETED:
+            tally[2] += 1
+        elif run.status == FAILED:
+            tally[3] += 1
+        tally[4] = at or datetime.now(timezone.utc)
+
+    def drain(self) -> Dict[str, list]:
+        """Pending counters as unnest() columns; the tally starts over"""
+        tally, self._tally = self._tally, {}
+        columns = {"ids": [], "organization_ids": [], "executions": [], "successes": [], "failures": [], "last_run_at": []}
+        for key, (org, executions, successes, failures, last_run) in tally.items():
+            columns["ids"].append(key)
+            columns["organization_ids"].append(org)
+            columns["executions"].append(executions)
+            columns["successes"].append(successes)
+            columns["failures"].append(failures)
+            columns["last_run_at"].append(last_run)
+        return columns
+
+    def restore(self, columns: Dict[str, list]) -> None:
+        """Put drained counters back after a failed write"""
+        for key, org, executions, successes, failures, last_run in zip(
+            columns["ids"], columns["organization_ids"], columns["executions"],
+            columns["successes"], columns["failures"], columns["last_run_at"],
+        ):
+            tally = self._tally.setdefault(key, [org, 0, 0, 0, last_run])
+            tally[1] += executions
+            tally[2] += successes
+            tally[3] += failures
+            tally[4] = max(filter(None, (tally[4], last_run)), default=None)
+
+
+STATS_SQL = text("""
+    INSERT INTO workflow_stats AS s (workflow_id, organization_id, execution_count, success_count,
+                                     failure_count, last_run_at, updated_at)
+    SELECT u.id, u.organization_id, u.executions, u.successes, u.failures, u.last_run_at, now()
+    FROM unnest(CAST(:ids AS uuid[]), CAST(:organization_ids AS uuid[]), CAST(:executions AS int[]),
+                CAST(:successes AS int[]), CAST(:failures AS int[]), CAST(:last_run_at AS timestamptz[]))
+         AS u(id, organization_id, executions, successes, failures, last_run_at)
+    ON CONFLICT (workflow_id) DO UPDATE
+    SET execution_count = s.execution_count + EXCLUDED.execution_count,
+        success_count = s.success_count + EXCLUDED.success_count,
+        failure_count = s.failure_count + EXCLUDED.failure_count,
+        last_run_at = greatest(s.last_run_at, EXCLUDED.last_run_at),
+        updated_at = now()
+""")
+
+
+async def flush_stats(conn, stats: WorkflowStats) -> int:
+    """Write pending counters on `conn` (caller owns the transaction)"""
+    if not len(stats):
+        return 0
+    columns = stats.drain()
+    try:
+        await conn.execute(STATS_SQL, columns)
+    except BaseException:
+        stats.restore(columns)
+        raise
+    return len(columns["ids"])
+
+
+# === Durable waits ===
+
+def dump_workflow(workflow: Workflow) -> Dict[str, Any]:
+    """JSON-safe definition snapshot (stored with a waiting run)"""
+    def opt(value: Any) -> Optional[str]:
+        return str(value) if value else None
+
+    return {
+        "id": str(workflow.id),
+        "organization_id": opt(workflow.organization_id),
+        "name": workflow.name,
+        "trigger_type": workflow.trigger_type.value,
+        "trigger_config": workflow.trigger_config,
+        "steps": [
+            {
+                "id": str(step.id),
+                "name": step.name,
+                "order": step.order,
+                "is_enabled": step.is_enabled,
+                "next_step_id": opt(step.next_step_id),
+                "on_failure_step_id": opt(step.on_failure_step_id),
+                "action": {"action_type": step.action.action_type.value, "config": step.action.config},
+                "conditions": [
+                    {"field": c.field, "operator": c.operator.value, "value": c.value}
+                    for c in step.conditions
+                ],
+            }
+            for step in workflow.steps
+        ],
+    }
+
+
+def load_workflow(data: Dict[str, Any]) -> Workflow:
+    """Workflow from dump_workflow output"""
+    def opt_uuid(value: Optional[str]) -> Optional[UUID]:
+        return UUID(value) if value else None
+
+    org = opt_uuid(data.get("organization_id"))
+    return Workflow(
+        id=UUID(data["id"]),
+        organization_id=OrganizationId(org) if org else None,
+        name=data.get("name", ""),
+        trigger_type=TriggerType(data["trigger_type"]),
+        trigger_config=data.get("trigger_config") or {},
+        steps=[
+            WorkflowStep(
+                id=UUID(step["id"]),
+                name=step.get("name", ""),
+                order=step.get("order", 0),
+                is_enabled=step.get("is_enabled", True),
+                next_step_id=opt_uuid(step.get("next_step_id")),
+                on_failure_step_id=opt_uuid(step.get("on_failure_step_id")),
+                action=WorkflowAction(
+                    action_type=ActionType(step["action"]["action_type"]),
+                    config=step["action"].get("config") or {},
+                ),
+                conditions=[
+                    WorkflowCondition(field=c["field"], operator=Operator(c["operator"]), value=c.get("value"))
+                    for c in step.get("conditions", [])
+                ],
+            )
+            for step in data.get("steps", [])
+        ],
+    )
+
+
+def _json(value: Any) -> str:
+    # Context values that are not JSON (UUIDs, datetimes) come back as strings
+    return json.dumps(value, default=str)
+
+
+SAVE_WAITS_SQL = text("""
+    INSERT INTO workflow_waits AS w (id, organization_id, workflow_id, ticket_id, definition,
+                                     resume_step_id, context, results, resume_at)
+    SELECT u.id, u.organization_id, u.workflow_id, u.ticket_id, u.definition::jsonb,
+           u.resume_step_id, u.context::jsonb, u.results::jsonb, u.resume_at
+    FROM unnest(CAST(:ids AS uuid[]), CAST(:organization_ids AS uuid[]), CAST(:workflow_ids AS uuid[]),
+                CAST(:ticket_ids AS uuid[]), CAST(:definitions AS text[]), CAST(:resume_step_ids AS uuid[]),
+                CAST(:contexts AS text[]), CAST(:results AS text[]), CAST(:resume_ats AS timestamptz[]))
+         AS u(id, organization_id, workflow_id, ticket_id, definition, resume_step_id, context, results, resume_at)
+    ON CONFLICT (id) DO UPDATE
+    SET resume_step_id = EXCLUDED.resume_step_id,
+        context = EXCLUDED.context,
+        results = EXCLUDED.results,
+        resume_at = EXCLUDED.resume_at,
+        status = 'WAITING',
+        locked_by = NULL,
+        lease_expires_at = NULL
+    WHERE w.locked_by IS NOT DISTINCT FROM CAST(:worker_id AS uuid)
+""")
+
+
+async def save_waits(conn, runs: Iterable[WorkflowRun], worker_id: Optional[str] = None) -> int:
+    """
+    Persist waiting runs (new or waiting again) in one statement. An existing
+    wait is only updated while `worker_id` holds its lease (None: unleased)
+    """
+    waiting = [run for run in runs if run.status == WAITING]
+    if not waiting:
+        return 0
+    definitions: Dict[str, str] = {}
+    columns = {key: [] for key in ("ids", "organization_ids", "workflow_ids", "ticket_ids", "definitions",
+                                   "resume_step_ids", "contexts", "results", "resume_ats")}
+    for run in waiting:
+        workflow = run.workflow
+        key = str(workflow.id)
+        if key not in definitions:
+            definitions[key] = _json(dump_workflow(workflow))
+        columns["ids"].append(run.wait_id)
+        columns["organization_ids"].append(str(workflow.organization_id) if workflow.organization_id else None)
+        columns["workflow_ids"].append(key)
+        columns["ticket_ids"].append(str(run.ticket_id) if run.ticket_id else None)
+        columns["definitions"].append(definitions[key])
+        columns["resume_step_ids"].append(str(run.resume_step_id))
+        columns["contexts"].append(_json(run.context))
+        columns["results"].append(_json(run.results))
+        columns["resume_ats"].append(run.resume_at)
+    await conn.execute(SAVE_WAITS_SQL, {**columns, "worker_id": worker_id})
+    return len(waiting)
+
+
+CLAIM_WAITS_SQL = text("""
+    WITH due AS (
+        SELECT id FROM workflow_waits
+        WHERE status = 'WAITING' AND resume_at <= now()
+        ORDER BY resume_at
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE workflow_waits w
+    SET status = 'RUNNING',
+        locked_by = CAST(:worker_id AS uuid),
+        lease_expires_at = now() + make_interval(secs => :lease),
+        attempts = w.attempts + 1
+    FROM due
+    WHERE w.id = due.id
+    RETURNING w.id, w.ticket_id, w.definition, w.resume_step_id, w.context, w.results
+""")
+
+FINISH_WAITS_SQL = text("""
+    DELETE FROM workflow_waits
+    WHERE id = ANY(CAST(:ids AS uuid[])) AND locked_by = CAST(:worker_id AS uuid)
+""")
+
+RELEASE_LAPSED_SQL = text("""
+    UPDATE workflow_waits
+    SET status = 'WAITING', locked_by = NULL, lease_expires_at = NULL
+    WHERE status = 'RUNNING' AND lease_expires_at < now()
+""")
+
+
+async def claim_waits(conn, worker_id: str, limit: int, lease: float) -> List[Dict[str, Any]]:
+    """Lease up to `limit` due waits; returned as run() keyword arguments"""
+    result = await conn.execute(CLAIM_WAITS_SQL, {"limit": limit, "worker_id": worker_id, "lease": lease})
+    claimed = []
+    for row in result.fetchall():
+        claimed.append({
+            "wait_id": str(row[0]),
+            "ticket_id": str(row[1]) if row[1] else None,
+            "workflow": load_workflow(row[2]),
+            "resume_step_id": row[3],
+            "context": row[4] or {},
+            "results": row[5] or [],
+        })
+    return claimed
+
+
+async def finish_waits(conn, worker_id: str, runs: Iterable[WorkflowRun]) -> int:
+    """Persist what resumed runs came to: waiting again, or done (row removed)"""
+    runs = list(runs)
+    waiting = await save_waits(conn, runs, worker_id)
+    done = [run.wait_id for run in runs if run.status != WAITING]
+    if done:
+        await conn.execute(FINISH_WAITS_SQL, {"ids": done, "worker_id": worker_id})
+    return waiting
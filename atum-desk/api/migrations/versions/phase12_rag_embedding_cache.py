@@ -0,0 +1,33 @@
+"""Add rag_embedding_cache table (persistent embedding cache tier)
+
+Revision ID: phase12_rag_embedding_cache
+Revises: phase11_provenance_gate
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = 'phase12_rag_embedding_cache'
+down_revision = 'phase11_provenance_gate'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Keyed by content hash, not tenant: a vector is only useful to whoever
+    # already holds the exact text it was computed from.
+    # real[] rather than vector(n) so a model with another dimension can share the table.
+    op.create_table(
+        'rag_embedding_cache',
+        sa.Column('model', sa.String(100), nullable=False),
+        sa.Column('content_hash', sa.String(64), nullable=False),
+        sa.Column('embedding', postgresql.ARRAY(sa.REAL()), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('model', 'content_hash', name='pk_rag_embedding_cache'),
+    )
+    op.create_index('ix_rag_embedding_cache_created', 'rag_embedding_cache', ['created_at'])
+
+
+def downgrade() -> None:
+    op.drop_table('rag_embedding_cache')
@@ -0,0 +1,41 @@
+"""Add rag_chunks.content_hash for incremental re-indexing
+
+Revision ID: phase13_rag_chunk_hash
+Revises: phase12_rag_embedding_cache
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'phase13_rag_chunk_hash'
+down_revision = 'phase12_rag_embedding_cache'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('rag_chunks', sa.Column('content_hash', sa.String(64), nullable=True))
+    
+    # Backfill with the same digest the indexer computes (sha256 hex of UTF-8 content)
+    # so the first re-index after upgrade does not re-embed unchanged chunks
+    op.execute("""
+        UPDATE rag_chunks
+        SET content_hash = encode(sha256(convert_to(content, 'UTF8')), 'hex')
+        WHERE content_hash IS NULL
+    """)
+    
+    # Earlier re-indexing appended chunks instead of replacing them; keep the
+    # newest row per (document, chunk_index) so the diff has one row to compare
+    op.execute("""
+        DELETE FROM rag_chunks c
+        USING rag_chunks newer
+        WHERE c.document_id = newer.document_id
+            AND c.chunk_index = newer.chunk_index
+            AND (c.created_at, c.id) < (newer.created_at, newer.id)
+    """)
+    op.create_index('ix_rag_chunks_doc_idx', 'rag_chunks', ['document_id', 'chunk_index'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_rag_chunks_doc_idx', table_name='rag_chunks')
+    op.drop_column('rag_chunks', 'content_hash')
@@ -0,0 +1,28 @@
+"""Add rag_chunks.content_tsv + GIN index for ranked keyword search
+
+Revision ID: phase14_rag_chunk_fts
+Revises: phase13_rag_chunk_hash
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = 'phase14_rag_chunk_fts'
+down_revision = 'phase13_rag_chunk_hash'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Generated column: Postgres keeps it in sync on every chunk insert/update,
+    # the indexer does not have to compute it. Config must match RAG_FTS_CONFIG.
+    op.execute("""
+        ALTER TABLE rag_chunks
+        ADD COLUMN content_tsv tsvector
+        GENERATED ALWAYS AS (to_tsvector('english', coalesce(content, ''))) STORED
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_rag_chunks_tsv ON rag_chunks USING gin (content_tsv)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_rag_chunks_tsv")
+    op.drop_column('rag_chunks', 'content_tsv')
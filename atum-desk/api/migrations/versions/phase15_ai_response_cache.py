@@ -0,0 +1,32 @@
+"""Add ai_response_cache table (shared AI response cache tier)
+
+Revision ID: phase15_ai_response_cache
+Revises: phase14_rag_chunk_fts
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'phase15_ai_response_cache'
+down_revision = 'phase14_rag_chunk_fts'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # cache_key = sha256(model, full prompt, generation params); prompts embed
+    # the ticket text, so an entry is only reachable with the exact same input.
+    op.create_table(
+        'ai_response_cache',
+        sa.Column('cache_key', sa.String(64), nullable=False),
+        sa.Column('model', sa.String(100), nullable=False),
+        sa.Column('response', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('cache_key', name='pk_ai_response_cache'),
+    )
+    op.create_index('ix_ai_response_cache_expires', 'ai_response_cache', ['expires_at'])
+
+
+def downgrade() -> None:
+    op.drop_table('ai_response_cache')
@@ -0,0 +1,59 @@
+"""Add job_queue.priority_rank, lease_expires_at and the claim index
+
+Revision ID: phase16_job_queue_claim_lease
+Revises: phase15_ai_response_cache
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = 'phase16_job_queue_claim_lease'
+down_revision = 'phase15_ai_response_cache'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # priority is written by JobQueueService.enqueue but was never declared here
+    op.execute("ALTER TABLE job_queue ADD COLUMN IF NOT EXISTS priority varchar(20) NOT NULL DEFAULT 'medium'")
+
+    # Numeric rank kept in sync by Postgres, so ORDER BY can walk an index
+    op.execute("""
+        ALTER TABLE job_queue
+        ADD COLUMN priority_rank smallint
+        GENERATED ALWAYS AS (
+            CASE priority
+                WHEN 'urgent' THEN 1
+                WHEN 'high' THEN 2
+                WHEN 'medium' THEN 3
+                ELSE 4
+            END
+        ) STORED
+    """)
+
+    # Workers claim per job type in rank order: one ordered index range scan
+    # per type. Partial, so finished jobs cost nothing to index.
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_job_queue_pending_claim
+        ON job_queue (job_type, priority_rank, created_at)
+        WHERE status = 'PENDING'
+    """)
+
+    # Leases: a RUNNING job whose lease lapsed belongs to a dead worker
+    op.execute("ALTER TABLE job_queue ADD COLUMN lease_expires_at timestamptz")
+    op.execute("""
+        UPDATE job_queue
+        SET lease_expires_at = coalesce(locked_at, updated_at) + interval '10 minutes'
+        WHERE status = 'RUNNING'
+    """)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_job_queue_running_lease
+        ON job_queue (lease_expires_at)
+        WHERE status = 'RUNNING'
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_job_queue_running_lease")
+    op.execute("DROP INDEX IF EXISTS ix_job_queue_pending_claim")
+    op.drop_column('job_queue', 'lease_expires_at')
+    op.drop_column('job_queue', 'priority_rank')
@@ -0,0 +1,57 @@
+"""Add webhook_outbox (durable webhook deliveries)
+
+Revision ID: phase17_webhook_outbox
+Revises: phase16_job_queue_claim_lease
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = 'phase17_webhook_outbox'
+down_revision = 'phase16_job_queue_claim_lease'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # One row per (event, subscribed webhook), written in the transaction of
+    # the change that raised the event; scripts/webhook_worker.py delivers.
+    # status: PENDING -> SENDING (leased) -> DELIVERED | DEAD
+    op.create_table(
+        'webhook_outbox',
+        sa.Column('id', postgresql.UUID(as_uuid=True), server_default=sa.text('gen_random_uuid()'), nullable=False),
+        sa.Column('organization_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('webhook_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('event_type', sa.String(100), nullable=False),
+        sa.Column('payload', postgresql.JSONB(), nullable=False),
+        sa.Column('status', sa.String(20), server_default='PENDING', nullable=False),
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('next_attempt_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('locked_by', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_status_code', sa.Integer(), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('delivered_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id', name='pk_webhook_outbox'),
+        sa.ForeignKeyConstraint(['webhook_id'], ['webhooks.id'], ondelete='CASCADE',
+                                name='fk_webhook_outbox_webhook_id_webhooks'),
+    )
+    # Claim scan: due deliveries in order; partial so delivered rows cost nothing
+    op.execute("""
+        CREATE INDEX ix_webhook_outbox_due
+        ON webhook_outbox (next_attempt_at)
+        WHERE status = 'PENDING'
+    """)
+    # Lapsed leases of crashed workers
+    op.execute("""
+        CREATE INDEX ix_webhook_outbox_sending_lease
+        ON webhook_outbox (lease_expires_at)
+        WHERE status = 'SENDING'
+    """)
+    op.create_index('ix_webhook_outbox_webhook_created', 'webhook_outbox', ['webhook_id', 'created_at'])
+
+
+def downgrade() -> None:
+    op.drop_table('webhook_outbox')
@@ -0,0 +1,43 @@
+"""Add sla_calculations.next_sla_deadline and its breach-scan index
+
+Revision ID: phase18_sla_next_deadline
+Revises: phase17_webhook_outbox
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = 'phase18_sla_next_deadline'
+down_revision = 'phase17_webhook_outbox'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Earliest target that is neither met nor already flagged; NULL once
+    # nothing can breach any more. Maintained by Postgres on every write of
+    # targets, actuals or breach flags, so no code path can forget it.
+    op.execute("""
+        ALTER TABLE sla_calculations
+        ADD COLUMN next_sla_deadline timestamptz
+        GENERATED ALWAYS AS (
+            LEAST(
+                CASE WHEN first_response_actual IS NULL AND NOT coalesce(first_response_breached, false)
+                     THEN first_response_target END,
+                CASE WHEN resolution_actual IS NULL AND NOT coalesce(resolution_breached, false)
+                     THEN resolution_target END
+            )
+        ) STORED
+    """)
+
+    # The breach pass only visits rows whose deadline has passed; partial,
+    # so met and already-breached SLAs are not indexed at all
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_sla_calculations_next_deadline
+        ON sla_calculations (next_sla_deadline)
+        WHERE next_sla_deadline IS NOT NULL
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_sla_calculations_next_deadline")
+    op.drop_column('sla_calculations', 'next_sla_deadline')
@@ -0,0 +1,46 @@
+"""Add sla_calendars (business hours + holidays) and sla_policies.calendar_id
+
+Revision ID: phase19_sla_calendars
+Revises: phase18_sla_next_deadline
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = 'phase19_sla_calendars'
+down_revision = 'phase18_sla_next_deadline'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # weekly_hours: {"mon": [["09:00", "17:00"]], ...} local to `timezone`;
+    # holidays: ["2026-12-25", ...]. Expanded in memory by
+    # app/services/sla_calendar.py, keyed on (id, updated_at).
+    op.create_table(
+        'sla_calendars',
+        sa.Column('id', postgresql.UUID(as_uuid=True), server_default=sa.text('gen_random_uuid()'), nullable=False),
+        sa.Column('organization_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('name', sa.String(255), nullable=False),
+        sa.Column('timezone', sa.String(64), server_default='UTC', nullable=False),
+        sa.Column('weekly_hours', postgresql.JSONB(), nullable=False),
+        sa.Column('holidays', postgresql.JSONB(), server_default=sa.text("'[]'::jsonb"), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id', name='pk_sla_calendars'),
+    )
+    op.create_index('ix_sla_calendars_organization_id', 'sla_calendars', ['organization_id'])
+
+    # No calendar = 24/7, the previous behaviour
+    op.add_column('sla_policies', sa.Column('calendar_id', postgresql.UUID(as_uuid=True), nullable=True))
+    op.create_foreign_key(
+        'fk_sla_policies_calendar_id_sla_calendars', 'sla_policies', 'sla_calendars',
+        ['calendar_id'], ['id'], ondelete='SET NULL',
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('fk_sla_policies_calendar_id_sla_calendars', 'sla_policies', type_='foreignkey')
+    op.drop_column('sla_policies', 'calendar_id')
+    op.drop_table('sla_calendars')
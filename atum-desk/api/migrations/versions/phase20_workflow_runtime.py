@@ -0,0 +1,67 @@
+"""Add workflow_waits (durable WAIT steps) and workflow_stats (batched counters)
+
+Revision ID: phase20_workflow_runtime
+Revises: phase19_sla_calendars
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = 'phase20_workflow_runtime'
+down_revision = 'phase19_sla_calendars'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # A workflow run suspended at a WAIT step, with the definition snapshot
+    # it started on; scripts/workflow_scheduler.py resumes it at resume_at.
+    # status: WAITING -> RUNNING (leased) -> row deleted, or WAITING again
+    op.create_table(
+        'workflow_waits',
+        sa.Column('id', postgresql.UUID(as_uuid=True), server_default=sa.text('gen_random_uuid()'), nullable=False),
+        sa.Column('organization_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('workflow_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('ticket_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('definition', postgresql.JSONB(), nullable=False),
+        sa.Column('resume_step_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('context', postgresql.JSONB(), server_default=sa.text("'{}'::jsonb"), nullable=False),
+        sa.Column('results', postgresql.JSONB(), server_default=sa.text("'[]'::jsonb"), nullable=False),
+        sa.Column('resume_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('status', sa.String(20), server_default='WAITING', nullable=False),
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('locked_by', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id', name='pk_workflow_waits'),
+    )
+    op.execute("""
+        CREATE INDEX ix_workflow_waits_due
+        ON workflow_waits (resume_at)
+        WHERE status = 'WAITING'
+    """)
+    op.execute("""
+        CREATE INDEX ix_workflow_waits_running_lease
+        ON workflow_waits (lease_expires_at)
+        WHERE status = 'RUNNING'
+    """)
+    op.create_index('ix_workflow_waits_ticket_id', 'workflow_waits', ['ticket_id'])
+
+    # Execution counters, incremented by batched upserts
+    op.create_table(
+        'workflow_stats',
+        sa.Column('workflow_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('organization_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('execution_count', sa.BigInteger(), server_default='0', nullable=False),
+        sa.Column('success_count', sa.BigInteger(), server_default='0', nullable=False),
+        sa.Column('failure_count', sa.BigInteger(), server_default='0', nullable=False),
+        sa.Column('last_run_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('workflow_id', name='pk_workflow_stats'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('workflow_stats')
+    op.drop_table('workflow_waits')
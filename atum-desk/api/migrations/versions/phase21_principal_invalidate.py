@@ -0,0 +1,36 @@
+"""Notify principal_invalidate on users changes (authenticated-user cache)
+
+Revision ID: phase21_principal_invalidate
+Revises: phase20_workflow_runtime
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = 'phase21_principal_invalidate'
+down_revision = 'phase20_workflow_runtime'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Every API process LISTENs and drops the user from its principal cache
+    # (app/auth/principal_cache.py): deactivation, role or 2FA changes apply
+    # on the next request. Sent at commit, so rolled-back changes are silent.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_principal_invalidate() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('principal_invalidate', OLD.id::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_users_principal_invalidate
+        AFTER UPDATE OR DELETE ON users
+        FOR EACH ROW EXECUTE FUNCTION notify_principal_invalidate();
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_users_principal_invalidate ON users;")
+    op.execute("DROP FUNCTION IF EXISTS notify_principal_invalidate();")
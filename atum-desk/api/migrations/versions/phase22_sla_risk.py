@@ -0,0 +1,40 @@
+"""Add sla_resolution_stats and the at-risk ticket index for batch SLA risk scoring
+
+Revision ID: phase22_sla_risk
+Revises: phase21_principal_invalidate
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = 'phase22_sla_risk'
+down_revision = 'phase21_principal_invalidate'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Average resolution hours of the last 30 days per (org, priority),
+    # refreshed by the SLA worker (app/services/sla_risk.py)
+    op.create_table(
+        'sla_resolution_stats',
+        sa.Column('organization_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('priority', sa.String(20), nullable=False),
+        sa.Column('avg_hours', sa.Float(), nullable=True),
+        sa.Column('samples', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('refreshed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('organization_id', 'priority', name='pk_sla_resolution_stats'),
+    )
+    # Risk dashboard: at-risk tickets of an org by due time. The predicate
+    # must match RISK_THRESHOLD in app/services/sla_risk.py
+    op.execute("""
+        CREATE INDEX ix_tickets_sla_risk
+        ON tickets (organization_id, sla_due_at)
+        WHERE sla_risk_score > 0.3
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_tickets_sla_risk")
+    op.drop_table('sla_resolution_stats')
@@ -0,0 +1,65 @@
+"""Add ticket_sentiment and the daily customer / org sentiment rollups
+
+Revision ID: phase23_sentiment_rollups
+Revises: phase22_sla_risk
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = 'phase23_sentiment_rollups'
+down_revision = 'phase22_sla_risk'
+branch_labels = None
+depends_on = None
+
+
+def _counts():
+    return [
+        sa.Column('positive', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('neutral', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('negative', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('score_sum', sa.Float(), server_default='0', nullable=False),
+        sa.Column('tickets', sa.Integer(), server_default='0', nullable=False),
+    ]
+
+
+def upgrade() -> None:
+    # Latest SENTIMENT_ANALYSIS result per ticket: what the rollups were
+    # built from, so a re-analysis can replace its previous contribution
+    op.create_table(
+        'ticket_sentiment',
+        sa.Column('ticket_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('organization_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('requester_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('bucket', sa.String(10), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('analyzed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('ticket_id', name='pk_ticket_sentiment'),
+    )
+    op.create_index('ix_ticket_sentiment_org', 'ticket_sentiment', ['organization_id'])
+
+    op.create_table(
+        'customer_sentiment_daily',
+        sa.Column('requester_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('organization_id', postgresql.UUID(as_uuid=True), nullable=False),
+        *_counts(),
+        sa.PrimaryKeyConstraint('requester_id', 'day', name='pk_customer_sentiment_daily'),
+    )
+    op.create_index('ix_customer_sentiment_daily_org_day', 'customer_sentiment_daily', ['organization_id', 'day'])
+
+    op.create_table(
+        'org_sentiment_daily',
+        sa.Column('organization_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        *_counts(),
+        sa.PrimaryKeyConstraint('organization_id', 'day', name='pk_org_sentiment_daily'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('org_sentiment_daily')
+    op.drop_table('customer_sentiment_daily')
+    op.drop_table('ticket_sentiment')
@@ -0,0 +1,156 @@
+"""Add ticket metric rollups, their delta trigger and cached volume forecasts
+
+Revision ID: phase24_ticket_metrics
+Revises: phase23_sentiment_rollups
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = 'phase24_ticket_metrics'
+down_revision = 'phase23_sentiment_rollups'
+branch_labels = None
+depends_on = None
+
+
+def _counts():
+    return [
+        sa.Column('created', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('created_low', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('created_medium', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('created_high', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('created_urgent', sa.Integer(), server_default='0', nullable=False),
+        *_resolutions(),
+    ]
+
+
+def _resolutions():
+    return [
+        sa.Column('resolved', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('resolution_seconds', sa.Float(), server_default='0', nullable=False),
+        sa.Column('sla_met', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('sla_breached', sa.Integer(), server_default='0', nullable=False),
+    ]
+
+
+def upgrade() -> None:
+    # Signed ticket contributions waiting to be folded into the rollups by
+    # the metrics worker (app/services/ticket_metrics.py)
+    op.create_table(
+        'ticket_metric_deltas',
+        sa.Column('id', sa.BigInteger(), sa.Identity(), nullable=False),
+        sa.Column('organization_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('agent_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('bucket', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('priority', sa.String(20), nullable=True),
+        sa.Column('created', sa.Integer(), server_default='0', nullable=False),
+        *_resolutions(),
+        sa.PrimaryKeyConstraint('id', name='pk_ticket_metric_deltas'),
+    )
+
+    op.create_table(
+        'ticket_metrics_hourly',
+        sa.Column('organization_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('bucket', sa.DateTime(timezone=True), nullable=False),
+        *_counts(),
+        sa.PrimaryKeyConstraint('organization_id', 'bucket', name='pk_ticket_metrics_hourly'),
+    )
+    op.create_table(
+        'ticket_metrics_daily',
+        sa.Column('organization_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        *_counts(),
+        sa.PrimaryKeyConstraint('organization_id', 'day', name='pk_ticket_metrics_daily'),
+    )
+    op.create_table(
+        'agent_metrics_daily',
+        sa.Column('organization_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('agent_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        *_resolutions(),
+        sa.PrimaryKeyConstraint('organization_id', 'agent_id', 'day', name='pk_agent_metrics_daily'),
+    )
+    op.create_index('ix_agent_metrics_daily_org_day', 'agent_metrics_daily', ['organization_id', 'day'])
+
+    # Latest daily-volume forecast per org, refit by the metrics worker
+    op.create_table(
+        'ticket_forecasts',
+        sa.Column('organization_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('fitted_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('last_day', sa.Date(), nullable=False),
+        sa.Column('method', sa.String(20), nullable=False),
+        sa.Column('params', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('history', postgresql.ARRAY(sa.Float()), nullable=False),
+        sa.Column('forecast', postgresql.ARRAY(sa.Float()), nullable=False),
+        sa.Column('mae', sa.Float(), nullable=True),
+        sa.PrimaryKeyConstraint('organization_id', name='pk_ticket_forecasts'),
+    )
+
+    # A ticket contributes +1 created to the hour of created_at (by
+    # priority) and, once resolved_at is set, +1 resolved with its
+    # resolution time and SLA outcome to the hour of resolved_at (and its
+    # assignee). Updates that move either contribution log -old and +new;
+    # other updates log nothing.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION ticket_metric_deltas_log() RETURNS trigger AS $$
+        DECLARE
+            created_moved boolean := TG_OP <> 'UPDATE';
+            resolved_moved boolean := TG_OP <> 'UPDATE';
+        BEGIN
+            IF TG_OP = 'UPDATE' THEN
+                created_moved := (OLD.organization_id, OLD.created_at, OLD.priority)
+                    IS DISTINCT FROM (NEW.organization_id, NEW.created_at, NEW.priority);
+                resolved_moved := (OLD.organization_id, OLD.created_at, OLD.resolved_at, OLD.assigned_to, OLD.sla_due_at)
+                    IS DISTINCT FROM (NEW.organization_id, NEW.created_at, NEW.resolved_at, NEW.assigned_to, NEW.sla_due_at);
+            END IF;
+
+            IF TG_OP <> 'INSERT' THEN
+                IF created_moved THEN
+                    INSERT INTO ticket_metric_deltas (organization_id, bucket, priority, created)
+                    VALUES (OLD.organization_id, date_trunc('hour', OLD.created_at, 'UTC'), lower(OLD.priority::text), -1);
+                END IF;
+                IF resolved_moved AND OLD.resolved_at IS NOT NULL THEN
+                    INSERT INTO ticket_metric_deltas
+                        (organization_id, agent_id, bucket, resolved, resolution_seconds, sla_met, sla_breached)
+                    VALUES (OLD.organization_id, OLD.assigned_to, date_trunc('hour', OLD.resolved_at, 'UTC'), -1,
+                            -extract(epoch FROM OLD.resolved_at - OLD.created_at),
+                            -(OLD.sla_due_at IS NOT NULL AND OLD.resolved_at <= OLD.sla_due_at)::int,
+                            -(OLD.sla_due_at IS NOT NULL AND OLD.resolved_at > OLD.sla_due_at)::int);
+                END IF;
+            END IF;
+
+            IF TG_OP <> 'DELETE' THEN
+                IF created_moved THEN
+                    INSERT INTO ticket_metric_deltas (organization_id, bucket, priority, created)
+                    VALUES (NEW.organization_id, date_trunc('hour', NEW.created_at, 'UTC'), lower(NEW.priority::text), 1);
+                END IF;
+                IF resolved_moved AND NEW.resolved_at IS NOT NULL THEN
+                    INSERT INTO ticket_metric_deltas
+                        (organization_id, agent_id, bucket, resolved, resolution_seconds, sla_met, sla_breached)
+                    VALUES (NEW.organization_id, NEW.assigned_to, date_trunc('hour', NEW.resolved_at, 'UTC'), 1,
+                            extract(epoch FROM NEW.resolved_at - NEW.created_at),
+                            (NEW.sla_due_at IS NOT NULL AND NEW.resolved_at <= NEW.sla_due_at)::int,
+                            (NEW.sla_due_at IS NOT NULL AND NEW.resolved_at > NEW.sla_due_at)::int);
+                END IF;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_tickets_metric_deltas
+        AFTER INSERT OR UPDATE OR DELETE ON tickets
+        FOR EACH ROW EXECUTE FUNCTION ticket_metric_deltas_log();
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_tickets_metric_deltas ON tickets;")
+    op.execute("DROP FUNCTION IF EXISTS ticket_metric_deltas_log();")
+    op.drop_table('ticket_forecasts')
+    op.drop_index('ix_agent_metrics_daily_org_day', table_name='agent_metrics_daily')
+    op.drop_table('agent_metrics_daily')
+    op.drop_table('ticket_metrics_daily')
+    op.drop_table('ticket_metrics_hourly')
+    op.drop_table('ticket_metric_deltas')
@@ -0,0 +1,48 @@
+"""Add persisted anomaly baselines and detected ticket anomalies
+
+Revision ID: phase25_anomaly_baselines
+Revises: phase24_ticket_metrics
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = 'phase25_anomaly_baselines'
+down_revision = 'phase24_ticket_metrics'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Seasonal EWMA baselines of the metrics worker's online detector
+    # (app/services/anomaly_baselines.py), reloaded when it restarts
+    op.create_table(
+        'anomaly_baselines',
+        sa.Column('organization_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('state', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('organization_id', name='pk_anomaly_baselines'),
+    )
+
+    # Hours whose metric was outside its baseline; partial while the hour
+    # is still open. Read by GET /api/v1/ai/anomalies
+    op.create_table(
+        'ticket_anomalies',
+        sa.Column('organization_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('metric', sa.String(20), nullable=False),
+        sa.Column('bucket', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('value', sa.Float(), nullable=False),
+        sa.Column('expected', sa.Float(), nullable=False),
+        sa.Column('z_score', sa.Float(), nullable=False),
+        sa.Column('partial', sa.Boolean(), server_default='false', nullable=False),
+        sa.Column('detected_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('organization_id', 'metric', 'bucket', name='pk_ticket_anomalies'),
+    )
+    op.create_index('ix_ticket_anomalies_org_bucket', 'ticket_anomalies', ['organization_id', 'bucket'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ticket_anomalies_org_bucket', table_name='ticket_anomalies')
+    op.drop_table('ticket_anomalies')
+    op.drop_table('anomaly_baselines')
@@ -0,0 +1,26 @@
+"""Add the open-ticket index behind per-agent load anomalies
+
+Revision ID: phase26_agent_open_tickets
+Revises: phase25_anomaly_baselines
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = 'phase26_agent_open_tickets'
+down_revision = 'phase25_anomaly_baselines'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Open tickets per assignee (AnomalyDetector.detect_agent_anomalies).
+    # The predicate must match OPEN_TICKETS_SQL in app/services/ai/anomaly_detector.py
+    op.execute("""
+        CREATE INDEX ix_tickets_open_assignee
+        ON tickets (organization_id, assigned_to)
+        WHERE lower(status::text) IN ('new', 'in_progress')
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_tickets_open_assignee")
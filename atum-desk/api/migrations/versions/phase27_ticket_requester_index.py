@@ -0,0 +1,21 @@
+"""Add the requester index behind customer sentiment profiles
+
+Revision ID: phase27_ticket_requester_index
+Revises: phase26_agent_open_tickets
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = 'phase27_ticket_requester_index'
+down_revision = 'phase26_agent_open_tickets'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Ticket count per customer (SentimentTracker.get_customer_sentiment_profile)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_tickets_requester_id ON tickets (requester_id)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_tickets_requester_id")
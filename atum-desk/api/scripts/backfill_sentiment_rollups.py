@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+ATUM DESK - Sentiment Rollup Backfill
+Rebuilds ticket_sentiment and the daily customer / org sentiment rollups
+from the stored SENTIMENT_ANALYSIS results (ai_suggestions)
+
+Per organization (with its RLS context): the latest result of each ticket
+is streamed in keyset batches into ticket_sentiment (one transaction per
+batch), then the org's rollups are recomputed from ticket_sentiment in one
+transaction. Safe to re-run; the job worker keeps them current afterwards.
+
+Usage:
+    python scripts/backfill_sentiment_rollups.py [--org ORG_ID] [--batch-size 5000]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+
+# Add api directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from psycopg import AsyncConnection
+
+from app.config import get_settings
+from app.services.sentiment_rollups import (
+    BACKFILL_BATCH_SQL, BACKFILL_UPSERT_SQL, REBUILD_ORG_SQL, bucket, signed_score,
+)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+)
+logger = logging.getLogger("backfill_sentiment_rollups")
+
+NIL_UUID = "00000000-0000-0000-0000-000000000000"
+
+
+def _content(value):
+    if isinstance(value, (bytes, str)):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return {}
+    return value or {}
+
+
+async def set_org(conn: AsyncConnection, org_id: str) -> None:
+    await conn.execute("SELECT set_config('app.current_org', %s, true)", (org_id,))
+
+
+async def backfill_org(conn: AsyncConnection, org_id: str, batch_size: int) -> int:
+    """Stream one organization's results into ticket_sentiment, then rebuild its rollups"""
+    after, copied = NIL_UUID, 0
+    while True:
+        async with conn.transaction():
+            await set_org(conn, org_id)
+            cur = await conn.execute(BACKFILL_BATCH_SQL, {"org_id": org_id, "after": after, "batch_size": batch_size})
+            rows = await cur.fetchall()
+            if not rows:
+                break
+            columns = {k: [] for k in ("ticket_ids", "organization_ids", "requester_ids", "days",
+                                       "buckets", "scores", "analyzed_at")}
+            for ticket_id, organization_id, requester_id, day, content, created_at in rows:
+                data = _content(content)
+                label = data.get("sentiment_label")
+                columns["ticket_ids"].append(ticket_id)
+                columns["organization_ids"].append(organization_id)
+                columns["requester_ids"].append(requester_id)
+                columns["days"].append(day)
+                columns["buckets"].append(bucket(label))
+                columns["scores"].append(signed_score(label, data.get("sentiment_score", 0.5)))
+                columns["analyzed_at"].append(created_at)
+            await conn.execute(BACKFILL_UPSERT_SQL, columns)
+        copied += len(rows)
+        after = str(rows[-1][0])
+        if len(rows) < batch_size:
+            break
+
+    async with conn.transaction():
+        await set_org(conn, org_id)
+        for statement in REBUILD_ORG_SQL:
+            await conn.execute(statement, {"org_id": org_id})
+    return copied
+
+
+async def main(args):
+    dsn = str(get_settings().DATABASE_URL).replace("postgresql+asyncpg://", "postgresql://").replace(
+        "postgresql+psycopg://", "postgresql://")
+    async with await AsyncConnection.connect(dsn, autocommit=True) as conn:
+        if args.org:
+            org_ids = [args.org]
+        else:
+            cur = await conn.execute("SELECT id FROM organizations ORDER BY id")
+            org_ids = [str(r[0]) for r in await cur.fetchall()]
+
+        start = time.perf_counter()
+        total = 0
+        for org_id in org_ids:
+            copied = await backfill_org(conn, org_id, args.batch_size)
+            total += copied
+            logger.info(f"org {org_id}: {copied} tickets, rollups rebuilt")
+        logger.info(f"Backfilled {total} tickets in {len(org_ids)} organizations "
+                    f"in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the sentiment rollups")
+    parser.add_argument("--org", help="Only this organization id")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Load benchmark for per-request authentication cost (needs the database and
+an existing user).
+
+Drives the API in process (httpx ASGI transport) with one bearer token and
+counts the SQL statements each request sends (SQLAlchemy cursor events, so
+pool pre-pings are not included):
+
+  uncached  - principal cache disabled: JWT decode + SELECT users per request
+  cached    - principal cache on, with its LISTEN principal_invalidate
+              connection; only the first request of the token reads users
+
+Usage:
+    python scripts/bench_auth_roundtrips.py --email admin@example.com --password ... \\
+        --requests 5000 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Add api directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from sqlalchemy import event
+
+from app.auth.principal_cache import listen_for_invalidations, principal_cache
+from app.config import get_settings
+from app.db.base import engine
+from app.main import app
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+
+async def load(client: httpx.AsyncClient, token: str, path: str, requests: int, concurrency: int) -> float:
+    headers = {"Authorization": f"Bearer {token}"}
+    pending = iter(range(requests))
+
+    async def worker():
+        for _ in pending:
+            response = await client.get(path, headers=headers)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - start
+
+
+async def main(args):
+    counter = StatementCounter()
+    event.listen(engine.sync_engine, "before_cursor_execute", counter)
+    dsn = str(get_settings().DATABASE_URL).replace("postgresql+psycopg://", "postgresql://")
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.post("/api/v1/auth/login", data={"username": args.email, "password": args.password})
+        response.raise_for_status()
+        token = response.json()["access_token"]
+
+        rows = []
+        for label, ttl in (("uncached", 0), ("cached", get_settings().PRINCIPAL_CACHE_TTL_SECONDS or 30)):
+            principal_cache.ttl = ttl
+            listener = asyncio.create_task(listen_for_invalidations(principal_cache, dsn))
+            while ttl and not principal_cache.active:
+                await asyncio.sleep(0.05)
+            counter.count = 0
+            elapsed = await load(client, token, args.path, args.requests, args.concurrency)
+            rows.append((label, counter.count / args.requests, args.requests / elapsed))
+            listener.cancel()
+            await asyncio.gather(listener, return_exceptions=True)
+
+    print(f"GET {args.path} x {args.requests} (concurrency {args.concurrency})")
+    for label, statements, rate in rows:
+        print(f"  {label:9} {statements:6.2f} statements/request  {rate:8,.0f} req/s")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark per-request auth DB round-trips")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--path", default="/api/v1/auth/me")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
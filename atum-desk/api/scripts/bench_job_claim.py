@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark job_queue claim latency with a large PENDING backlog.
+
+Inserts --rows PENDING jobs (default 1M, mixed types and priorities) inside
+one transaction that is rolled back at the end, so running workers never see
+them. Each claim runs in a savepoint that is rolled back, keeping the backlog
+constant, and compares:
+  legacy  - single claim ordered by CASE priority (sorts the whole backlog)
+  batch   - the worker's per-type claim ordered by priority_rank
+            (ix_job_queue_pending_claim range scans)
+
+Requires migration phase16_job_queue_claim_lease.
+
+Usage:
+    python scripts/bench_job_claim.py --rows 1000000 --claims 200
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from uuid import uuid4
+
+# Add api directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from psycopg import AsyncConnection
+
+from job_worker import CLAIM_SQL, DATABASE_URL, JOB_TYPE_LIMITS, LEASE_SECONDS
+
+LEGACY_CLAIM_SQL = """
+    UPDATE job_queue
+    SET status = 'RUNNING',
+        locked_by = %s::uuid,
+        locked_at = %s,
+        updated_at = %s
+    WHERE id = (
+        SELECT id FROM job_queue
+        WHERE status = 'PENDING'
+        AND (run_after IS NULL OR run_after <= %s)
+        ORDER BY
+            CASE priority
+                WHEN 'urgent' THEN 1
+                WHEN 'high' THEN 2
+                WHEN 'medium' THEN 3
+                ELSE 4
+            END,
+            created_at
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING id, organization_id, job_type, payload
+"""
+
+
+async def load_backlog(conn, rows):
+    await conn.execute("""
+        INSERT INTO job_queue (id, job_type, payload, status, priority, created_at, updated_at)
+        SELECT gen_random_uuid(),
+               (%s::text[])[1 + (i %% cardinality(%s::text[]))],
+               '{}'::jsonb,
+               'PENDING',
+               (ARRAY['urgent','high','medium','medium','low','low'])[1 + (i %% 6)],
+               now() - make_interval(secs => i),
+               now()
+        FROM generate_series(1, %s) AS i
+    """, (list(JOB_TYPE_LIMITS), list(JOB_TYPE_LIMITS), rows))
+    await conn.execute("ANALYZE job_queue")
+
+
+async def measure(label, conn, claims, claim):
+    latencies = []
+    claimed = 0
+    for _ in range(claims):
+        async with conn.transaction(force_rollback=True):
+            start = time.perf_counter()
+            claimed += await claim()
+            latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"  {label:<8} p50={statistics.median(latencies):8.2f}ms  p95={p95:8.2f}ms  "
+          f"jobs/claim={claimed / claims:.1f}")
+
+
+async def explain(conn, sql, params):
+    async with conn.transaction(force_rollback=True):
+        cur = await conn.execute("EXPLAIN (ANALYZE, COSTS OFF, TIMING OFF) " + sql, params)
+        return "\n".join("    " + row[0] for row in await cur.fetchall())
+
+
+async def main(args):
+    worker_id = str(uuid4())
+    slots = dict(JOB_TYPE_LIMITS)
+    batch_params = {
+        "types": list(slots),
+        "free": list(slots.values()),
+        "total": sum(slots.values()),
+        "worker_id": worker_id,
+        "now": datetime.now(timezone.utc),
+        "lease": LEASE_SECONDS,
+    }
+
+    conn = await AsyncConnection.connect(DATABASE_URL, autocommit=False)
+    try:
+        print(f"Loading {args.rows} pending jobs (rolled back at exit)...")
+        start = time.perf_counter()
+        await load_backlog(conn, args.rows)
+        print(f"  loaded in {time.perf_counter() - start:.1f}s")
+
+        async def legacy():
+            now = datetime.now(timezone.utc)
+            cur = await conn.execute(LEGACY_CLAIM_SQL, (worker_id, now, now, now))
+            return len(await cur.fetchall())
+
+        async def batch():
+            cur = await conn.execute(CLAIM_SQL, batch_params)
+            return len(await cur.fetchall())
+
+        print(f"{args.claims} claims each:")
+        await measure("legacy", conn, args.claims, legacy)
+        await measure("batch", conn, args.claims, batch)
+
+        if args.explain:
+            now = datetime.now(timezone.utc)
+            print("legacy plan:")
+            print(await explain(conn, LEGACY_CLAIM_SQL, (worker_id, now, now, now)))
+            print("batch plan:")
+            print(await explain(conn, CLAIM_SQL, batch_params))
+    finally:
+        await conn.rollback()
+        await conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark job_queue claim latency")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Pending jobs in the backlog")
+    parser.add_argument("--claims", type=int, default=200)
+    parser.add_argument("--explain", action="store_true", help="Print EXPLAIN ANALYZE for both claims")
+    asyncio.run(main(parser.parse_args()))
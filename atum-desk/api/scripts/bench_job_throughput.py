@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Benchmark job worker throughput on short, database-only jobs
+(METRICS_SNAPSHOT / CLEANUP_LOGS style).
+
+  legacy  - one job at a time: claim, completion and every job_events row
+            each committed in their own transaction (pre-batching worker)
+  batched - JobWorker: batch claims, concurrent jobs, one transaction per
+            job and write-behind job_events
+
+Jobs use the BENCH_SNAPSHOT type and a throwaway organization; all of them
+and their events are deleted at the end. Run against a database without
+other workers (they would fail BENCH_SNAPSHOT jobs as an unknown type).
+
+Usage:
+    python scripts/bench_job_throughput.py --jobs 2000 --concurrency 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from uuid import uuid4
+
+# Add api directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from psycopg import AsyncConnection
+
+import job_worker
+from job_worker import DATABASE_URL, JobWorker, _job_conn
+
+BENCH_TYPE = "BENCH_SNAPSHOT"
+job_worker.JOB_TYPES[BENCH_TYPE] = "handle_bench_snapshot"
+
+LEGACY_CLAIM_SQL = """
+    UPDATE job_queue
+    SET status = 'RUNNING',
+        locked_by = %s::uuid,
+        locked_at = now(),
+        lease_expires_at = now() + interval '5 minutes',
+        updated_at = now()
+    WHERE id = (
+        SELECT id FROM job_queue
+        WHERE status = 'PENDING'
+        AND job_type = %s
+        ORDER BY
+            CASE priority
+                WHEN 'urgent' THEN 1
+                WHEN 'high' THEN 2
+                WHEN 'medium' THEN 3
+                ELSE 4
+            END,
+            created_at
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING id, organization_id, job_type, payload
+"""
+
+
+class BenchWorker(JobWorker):
+    async def handle_bench_snapshot(self, job):
+        """Read-only aggregate, like METRICS_SNAPSHOT without its insert"""
+        async with self.conn.cursor() as cur:
+            await cur.execute(
+                "SELECT status, COUNT(*) FROM job_queue WHERE organization_id = %s::uuid GROUP BY status",
+                (job["organization_id"],),
+            )
+            await cur.fetchall()
+        await self.complete_job(job["id"], True)
+        return True
+
+
+class LegacyWorker(BenchWorker):
+    """Pre-batching lifecycle: a commit for every write, jobs run serially"""
+
+    async def complete_job(self, job_id, success=True, error=None):
+        async with self.conn.cursor() as cur:
+            await cur.execute(
+                "UPDATE job_queue SET status = %s, last_error = %s, updated_at = now() WHERE id = %s::uuid",
+                ('DONE' if success else 'FAILED', error, job_id),
+            )
+            await self.conn.commit()
+        await self.log_event(job_id, "completed" if success else "failed", {"error": error})
+
+    async def log_event(self, job_id, event, details=None):
+        async with self.conn.cursor() as cur:
+            await cur.execute(
+                "INSERT INTO job_events (id, job_id, event, details, created_at) VALUES (%s, %s, %s, %s, %s)",
+                (str(uuid4()), job_id, event, json.dumps(details) if details else None,
+                 datetime.now(timezone.utc)),
+            )
+            await self.conn.commit()
+
+    async def run(self):
+        conn = await AsyncConnection.connect(DATABASE_URL, autocommit=False)
+        token = _job_conn.set(conn)
+        try:
+            while True:
+                async with conn.cursor() as cur:
+                    await cur.execute(LEGACY_CLAIM_SQL, (self.worker_id, BENCH_TYPE))
+                    row = await cur.fetchone()
+                await conn.commit()
+                if not row:
+                    return
+                await self.process_job({
+                    "id": str(row[0]),
+                    "organization_id": str(row[1]),
+                    "job_type": row[2],
+                    "payload": row[3] or {},
+                })
+        finally:
+            _job_conn.reset(token)
+            await conn.close()
+
+
+async def enqueue(conn, org_id, jobs):
+    await conn.execute("""
+        INSERT INTO job_queue (id, organization_id, job_type, payload, status, priority, created_at, updated_at)
+        SELECT gen_random_uuid(), %s::uuid, %s, '{}'::jsonb, 'PENDING', 'medium', now(), now()
+        FROM generate_series(1, %s)
+    """, (org_id, BENCH_TYPE, jobs))
+    await conn.commit()
+
+
+async def wait_until_done(conn, org_id, worker):
+    while True:
+        cur = await conn.execute(
+            "SELECT count(*) FROM job_queue WHERE organization_id = %s::uuid AND status IN ('PENDING', 'RUNNING')",
+            (org_id,),
+        )
+        remaining = (await cur.fetchone())[0]
+        await conn.commit()
+        if remaining == 0:
+            worker.stop()
+            return
+        await asyncio.sleep(0.05)
+
+
+async def bench(label, conn, org_id, jobs, worker, watch):
+    await enqueue(conn, org_id, jobs)
+    start = time.perf_counter()
+    if watch:
+        await asyncio.gather(worker.run(), wait_until_done(conn, org_id, worker))
+    else:
+        await worker.run()
+    elapsed = time.perf_counter() - start
+
+    cur = await conn.execute("""
+        SELECT count(*) FROM job_events e JOIN job_queue q ON q.id = e.job_id
+        WHERE q.organization_id = %s::uuid
+    """, (org_id,))
+    events = (await cur.fetchone())[0]
+    await conn.commit()
+    rate = jobs / elapsed
+    print(f"  {label:<8} {jobs} jobs in {elapsed:6.2f}s  {rate:8.0f} jobs/s  events={events}")
+    return rate
+
+
+async def cleanup(conn, org_ids):
+    await conn.execute("""
+        DELETE FROM job_events WHERE job_id IN (
+            SELECT id FROM job_queue WHERE organization_id = ANY(%s::uuid[])
+        )
+    """, (org_ids,))
+    await conn.execute("DELETE FROM job_queue WHERE organization_id = ANY(%s::uuid[])", (org_ids,))
+    await conn.commit()
+
+
+async def main(args):
+    legacy_org, batched_org = str(uuid4()), str(uuid4())
+    conn = await AsyncConnection.connect(DATABASE_URL, autocommit=False)
+    try:
+        legacy = await bench("legacy", conn, legacy_org, args.jobs, LegacyWorker(), watch=False)
+        worker = BenchWorker(concurrency=args.concurrency, type_limits={BENCH_TYPE: args.concurrency})
+        batched = await bench("batched", conn, batched_org, args.jobs, worker, watch=True)
+        print(f"  speedup  {batched / legacy:.1f}x")
+    finally:
+        await cleanup(conn, [legacy_org, batched_org])
+        await conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark job worker throughput")
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Benchmark filtered vector search: recall@k and latency against exact search.
+
+Loads clustered synthetic embeddings for one large tenant and many small
+tenants into rag_chunks, then compares for each tenant:
+  legacy   - shared HNSW index with post-filtering (pre-planner query)
+  planned  - RAGStore.search_similar (exact / shared + over-fetch)
+  partial  - RAGStore.search_similar after building the large tenant's
+             partial HNSW index
+Everything written (rows and the partial index) is removed at the end.
+
+Usage:
+    python scripts/bench_rag_ann.py --large 50000 --small-orgs 50 --small-size 200
+"""
+import argparse
+import asyncio
+import math
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+
+# Add api directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+
+from app.config import get_settings
+from app.db.vector import register_vector_types, to_vector
+from app.services.rag.store import RAGStore, RAG_EMBED_DIM
+from app.services.rag.ann_index import create_partial_index, drop_partial_index, get_ann_planner
+
+CLUSTERS = 64
+
+
+def unit(vector):
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return [x / norm for x in vector]
+
+
+def make_vectors(rng, centers, n):
+    out = []
+    for _ in range(n):
+        center = rng.choice(centers)
+        out.append(unit([c + rng.gauss(0, 0.35) for c in center]))
+    return out
+
+
+def as_literal(vector):
+    return "[" + ",".join(f"{x:.6f}" for x in vector) + "]"
+
+
+async def load_tenant(session_factory, org_id, vectors, per_doc=100):
+    async with session_factory() as session:
+        store = RAGStore(session)
+        for start in range(0, len(vectors), per_doc):
+            doc_id = await store.upsert_document(
+                organization_id=org_id,
+                source_type="kb",
+                source_id=uuid.uuid4(),
+                title=f"bench doc {start}",
+                visibility="internal",
+            )
+            chunks = [
+                {"content": f"bench chunk {start + i}", "token_count": 3, "embedding": v}
+                for i, v in enumerate(vectors[start:start + per_doc])
+            ]
+            await store.insert_chunks(doc_id, org_id, chunks)
+
+
+async def legacy_search(session, org_id, query, top_k):
+    """The pre-planner query: shared index, tenant filter applied after the scan"""
+    result = await session.execute(text("""
+        SELECT c.id
+        FROM rag_chunks c
+        WHERE c.organization_id = :org_id
+        ORDER BY c.embedding <=> CAST(:query AS vector)
+        LIMIT :top_k
+    """), {"org_id": org_id, "query": as_literal(query), "top_k": top_k})
+    return [row[0] for row in result]
+
+
+async def measure(label, session_factory, org_id, queries, top_k, search):
+    recalls, latencies = [], []
+    async with session_factory() as session:
+        store = RAGStore(session)
+        for query in queries:
+            truth = {
+                r["chunk_id"]
+                for r in await store._search_exact(org_id, to_vector(query), top_k, None)
+            }
+            start = time.perf_counter()
+            found = await search(session, store, query)
+            latencies.append((time.perf_counter() - start) * 1000)
+            recalls.append(len(truth & set(found)) / max(len(truth), 1))
+            await session.commit()
+
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"  {label:<10} recall@{top_k}={statistics.mean(recalls):.3f}  "
+          f"p50={statistics.median(latencies):.1f}ms  p95={p95:.1f}ms")
+
+
+async def bench_tenant(name, session_factory, org_id, queries, top_k, ef_search, include_legacy=True):
+    print(f"{name} ({org_id})")
+
+    async def legacy(session, store, query):
+        return await legacy_search(session, org_id, query, top_k)
+
+    async def planned(session, store, query):
+        results = await store.search_similar(org_id, query, top_k=top_k, ef_search=ef_search)
+        return [r["chunk_id"] for r in results]
+
+    if include_legacy:
+        await measure("legacy", session_factory, org_id, queries, top_k, legacy)
+    await measure("planned", session_factory, org_id, queries, top_k, planned)
+    return planned
+
+
+async def main(args):
+    settings = get_settings()
+    engine = create_async_engine(str(settings.DATABASE_URL), pool_size=2, max_overflow=0)
+    register_vector_types(engine)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    rng = random.Random(7)
+    centers = [unit([rng.gauss(0, 1) for _ in range(RAG_EMBED_DIM)]) for _ in range(CLUSTERS)]
+
+    large_org = uuid.uuid4()
+    small_orgs = [uuid.uuid4() for _ in range(args.small_orgs)]
+    orgs = [large_org] + small_orgs
+
+    try:
+        print(f"Loading {args.large} chunks for the large tenant, "
+              f"{args.small_orgs} x {args.small_size} for small tenants...")
+        await load_tenant(session_factory, large_org, make_vectors(rng, centers, args.large))
+        for org_id in small_orgs:
+            await load_tenant(session_factory, org_id, make_vectors(rng, centers, args.small_size))
+        async with engine.begin() as conn:
+            await conn.execute(text("ANALYZE rag_chunks"))
+
+        queries = make_vectors(rng, centers, args.queries)
+
+        planned = await bench_tenant("large tenant", session_factory, large_org, queries, args.top_k, args.ef_search)
+        for org_id in small_orgs[:3]:
+            await bench_tenant("small tenant", session_factory, org_id, queries, args.top_k, args.ef_search)
+
+        print("Building partial index for the large tenant...")
+        start = time.perf_counter()
+        await create_partial_index(engine, large_org)
+        print(f"  built in {time.perf_counter() - start:.1f}s")
+        get_ann_planner().invalidate()
+        await measure("partial", session_factory, large_org, queries, args.top_k, planned)
+    finally:
+        await drop_partial_index(engine, large_org)
+        async with engine.begin() as conn:
+            await conn.execute(
+                text("DELETE FROM rag_documents WHERE organization_id = ANY(:orgs)"),
+                {"orgs": orgs},
+            )
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark filtered ANN recall and latency")
+    parser.add_argument("--large", type=int, default=50000, help="Chunks for the large tenant")
+    parser.add_argument("--small-orgs", type=int, default=50)
+    parser.add_argument("--small-size", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--ef-search", type=int, default=100)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Benchmark RAG chunk writes: legacy per-row INSERT vs bulk executemany vs
+incremental diff re-index.
+
+Indexes synthetic tickets into a throwaway organization and reports rows/sec.
+Embeddings are deterministic fake vectors so only the database path is
+measured; everything written is deleted at the end.
+
+Usage:
+    python scripts/bench_rag_indexing.py --tickets 10000 --changed-pct 10
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import uuid
+
+# Add api directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+
+from app.config import get_settings
+from app.db.vector import register_vector_types, to_vector
+from app.services.rag.store import RAGStore, RAG_EMBED_DIM
+
+
+def fake_vector(seed: str):
+    rng = random.Random(seed)
+    return [rng.uniform(-1, 1) for _ in range(RAG_EMBED_DIM)]
+
+
+def synthetic_chunks(i: int, revision: int = 0):
+    problem = f"Subject: VPN drops every {i % 60} minutes\n\nDescription: user {i} reports disconnects on build {i % 17}"
+    resolution = f"Resolution: rotated certificate batch {i % 23} (rev {revision})"
+    return [
+        {"content": problem, "token_count": len(problem.split())},
+        {"content": resolution, "token_count": len(resolution.split())},
+    ]
+
+
+class Embedder:
+    def __init__(self):
+        self.calls = 0
+        self.texts = 0
+
+    async def __call__(self, texts):
+        self.calls += 1
+        self.texts += len(texts)
+        return [fake_vector(t) for t in texts]
+
+
+async def legacy_insert(session, doc_id, org_id, chunks):
+    """Pre-bulk insert_chunks: one statement per chunk"""
+    for idx, chunk in enumerate(chunks):
+        await session.execute(text("""
+            INSERT INTO rag_chunks (id, organization_id, document_id, chunk_index, content, embedding, token_count, created_at)
+            VALUES (:id, :org_id, :doc_id, :idx, :content, :embedding, :tokens, now())
+        """), {
+            "id": uuid.uuid4(),
+            "org_id": org_id,
+            "doc_id": doc_id,
+            "idx": idx,
+            "content": chunk["content"],
+            "embedding": to_vector(chunk["embedding"]),
+            "tokens": chunk["token_count"],
+        })
+    await session.commit()
+
+
+async def create_docs(store, org_id, source_type, n):
+    doc_ids = []
+    for i in range(n):
+        doc_ids.append(await store.upsert_document(
+            organization_id=org_id,
+            source_type=source_type,
+            source_id=uuid.uuid4(),
+            title=f"bench ticket {i}",
+            visibility="internal",
+        ))
+    return doc_ids
+
+
+def report(label, rows, elapsed, extra=""):
+    rate = rows / elapsed if elapsed else 0.0
+    print(f"{label:<22} {rows:>8} rows  {elapsed:>8.2f}s  {rate:>10.0f} rows/s  {extra}")
+
+
+async def main(args):
+    settings = get_settings()
+    org_id = uuid.uuid4()
+    engine = create_async_engine(
+        str(settings.DATABASE_URL),
+        pool_size=1,
+        max_overflow=0,
+        connect_args={"options": f"-c app.current_org={org_id}"},
+    )
+    register_vector_types(engine)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    print(f"Benchmark org {org_id}: {args.tickets} tickets, {args.changed_pct}% changed on re-index")
+
+    try:
+        async with session_factory() as session:
+            store = RAGStore(session)
+
+            # 1. Legacy per-row inserts
+            doc_ids = await create_docs(store, org_id, "bench_legacy", args.tickets)
+            batches = []
+            for i in range(args.tickets):
+                chunks = synthetic_chunks(i)
+                for chunk in chunks:
+                    chunk["embedding"] = fake_vector(chunk["content"])
+                batches.append(chunks)
+            rows = sum(len(c) for c in batches)
+
+            start = time.perf_counter()
+            for doc_id, chunks in zip(doc_ids, batches):
+                await legacy_insert(session, doc_id, org_id, chunks)
+            report("legacy per-row", rows, time.perf_counter() - start)
+
+            # 2. Bulk executemany
+            doc_ids = await create_docs(store, org_id, "bench_bulk", args.tickets)
+            start = time.perf_counter()
+            for doc_id, chunks in zip(doc_ids, batches):
+                await store.insert_chunks(doc_id, org_id, chunks)
+            report("bulk insert_chunks", rows, time.perf_counter() - start)
+
+            # 3. Full re-index through sync_chunks (nothing changed)
+            embedder = Embedder()
+            start = time.perf_counter()
+            for i, doc_id in enumerate(doc_ids):
+                await store.sync_chunks(doc_id, org_id, synthetic_chunks(i), embedder)
+            report("re-index unchanged", rows, time.perf_counter() - start, f"embedded={embedder.texts}")
+
+            # 4. Re-index with a fraction of tickets changed
+            embedder = Embedder()
+            rng = random.Random(42)
+            changed = set(rng.sample(range(args.tickets), args.tickets * args.changed_pct // 100))
+            start = time.perf_counter()
+            for i, doc_id in enumerate(doc_ids):
+                await store.sync_chunks(doc_id, org_id, synthetic_chunks(i, 1 if i in changed else 0), embedder)
+            report("re-index changed", rows, time.perf_counter() - start, f"embedded={embedder.texts}")
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text("DELETE FROM rag_documents WHERE organization_id = :org_id"), {"org_id": org_id})
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark RAG chunk indexing")
+    parser.add_argument("--tickets", type=int, default=10000)
+    parser.add_argument("--changed-pct", type=int, default=10)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark rule evaluation (no database needed).
+
+  legacy    - every rule's conditions interpreted per ticket (getattr +
+              str().lower() equality, the pre-compilation RulesService loop);
+              run on a sample and extrapolated
+  compiled  - RuleSet.match_many: compiled predicates, candidates from the
+              field index only
+
+Rules mostly test equality / membership on priority, category, channel and
+status, with a share of regex-only rules that cannot be indexed. Each rule
+is indexed on its highest-cardinality field (category here).
+
+Usage:
+    python scripts/bench_rule_engine.py --rules 5000 --tickets 100000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+# Add api directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.rule_engine import RuleSet, compile_rule
+
+PRIORITIES = ["low", "medium", "high", "urgent"]
+STATUSES = ["new", "accepted", "assigned", "in_progress", "waiting_customer"]
+CHANNELS = ["email", "portal", "phone", "chat", "api"]
+CATEGORIES = [f"category-{i}" for i in range(200)]
+WORDS = ["vpn", "printer", "outage", "password", "invoice", "laptop", "email", "access", "slow", "crash",
+         "refund", "login", "license", "backup", "wifi", "monitor", "phone", "upgrade", "sync", "timeout",
+         "billing", "export", "report", "server", "mailbox", "calendar", "scanner", "token", "proxy", "disk"]
+
+
+def make_rules(n, rng):
+    rules = []
+    for i in range(n):
+        kind = rng.random()
+        if kind < 0.6:
+            conditions = {"category": rng.choice(CATEGORIES), "priority": rng.choice(PRIORITIES)}
+        elif kind < 0.8:
+            conditions = {
+                "channel": rng.choice(CHANNELS),
+                "category": rng.choice(CATEGORIES),
+                "status": {"in": rng.sample(STATUSES, 2)},
+            }
+        elif kind < 0.95:
+            conditions = {"category": rng.choice(CATEGORIES)}
+        else:
+            conditions = {"subject": {"regex": rng.choice(WORDS)}}
+        rules.append((f"rule-{i}", f"rule {i}", conditions, i))
+    return rules
+
+
+def make_tickets(n, rng):
+    return [
+        SimpleNamespace(
+            id=i,
+            priority=rng.choice(PRIORITIES),
+            status=rng.choice(STATUSES),
+            channel=rng.choice(CHANNELS),
+            category=rng.choice(CATEGORIES),
+            subject=" ".join(rng.sample(WORDS, 3)),
+        )
+        for i in range(n)
+    ]
+
+
+def legacy_matches(ticket, conditions):
+    """Pre-compilation RulesService._matches_condition (equality only)"""
+    for field, expected_value in conditions.items():
+        actual_value = getattr(ticket, field.lower(), None)
+        if hasattr(actual_value, "value"):
+            actual_value = actual_value.value
+        if isinstance(expected_value, dict):
+            # Operator conditions did not exist; evaluate them the new way so
+            # both sides produce the same matches
+            return None
+        if str(expected_value).lower() != str(actual_value).lower():
+            return False
+    return True
+
+
+def main(args):
+    rng = random.Random(42)
+    raw_rules = make_rules(args.rules, rng)
+    tickets = make_tickets(args.tickets, rng)
+
+    t0 = time.perf_counter()
+    rule_set = RuleSet(compile_rule(*r) for r in raw_rules)
+    compile_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    results = rule_set.match_many(tickets)
+    compiled_s = time.perf_counter() - t0
+    matches = sum(len(m) for m in results)
+
+    sample = min(args.tickets, args.legacy_sample)
+    by_id = {rule.id: rule for rule in rule_set.rules}
+    t0 = time.perf_counter()
+    for ticket, expected in zip(tickets[:sample], results[:sample]):
+        legacy = []
+        for rule_id, _, conditions, _ in raw_rules:
+            matched = legacy_matches(ticket, conditions)
+            if matched is None:
+                matched = by_id[rule_id].predicate(ticket)
+            if matched:
+                legacy.append(rule_id)
+        assert legacy == [r.id for r in expected]
+    legacy_s = (time.perf_counter() - t0) * args.tickets / sample
+
+    print(f"{args.rules} rules x {args.tickets} tickets, {matches} matches")
+    print(f"  compile   {compile_s:8.3f}s")
+    print(f"  compiled  {compiled_s:8.2f}s  ({args.tickets / compiled_s:,.0f} tickets/s)")
+    print(f"  legacy    {legacy_s:8.2f}s  (extrapolated from {sample}, results match)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark compiled rule evaluation")
+    parser.add_argument("--rules", type=int, default=5000)
+    parser.add_argument("--tickets", type=int, default=100_000)
+    parser.add_argument("--legacy-sample", type=int, default=500)
+    main(parser.parse_args())
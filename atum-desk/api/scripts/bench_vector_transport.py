@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: text vs binary pgvector parameters.
+
+Measures the client-side CPU to encode one embedding and the bytes sent for
+it: the old '[0.1,0.2,...]' literal against a NumPy float32 buffer in
+pgvector's binary format. With --db it also times real round-trips
+(SELECT param <=> param) on both paths, which includes server-side parsing.
+
+Usage:
+    python scripts/bench_vector_transport.py --dim 1536 --iterations 2000 [--db]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+# Add api directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from pgvector import Vector
+
+
+def text_encode(values):
+    """The pre-binary path: Python floats formatted into a vector literal"""
+    return ("[" + ",".join(str(x) for x in values) + "]").encode()
+
+
+def binary_encode(values):
+    return Vector(np.asarray(values, dtype=np.float32)).to_binary()
+
+
+def time_per_call(fn, arg, iterations):
+    start = time.process_time()
+    for _ in range(iterations):
+        fn(arg)
+    return (time.process_time() - start) / iterations * 1e6
+
+
+async def round_trips(dim, iterations):
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from app.config import get_settings
+    from app.db.vector import register_vector_types, to_vector
+
+    engine = create_async_engine(str(get_settings().DATABASE_URL), pool_size=1, max_overflow=0)
+    register_vector_types(engine)
+    rng = random.Random(3)
+    vector = [rng.uniform(-1, 1) for _ in range(dim)]
+    literal = text_encode(vector).decode()
+    array = to_vector(vector)
+
+    async def measure(label, sql, params):
+        latencies = []
+        async with engine.connect() as conn:
+            for _ in range(iterations):
+                start = time.perf_counter()
+                await conn.execute(text(sql), params)
+                latencies.append((time.perf_counter() - start) * 1000)
+        print(f"  {label:<8} p50={statistics.median(latencies):.3f}ms  mean={statistics.mean(latencies):.3f}ms")
+
+    try:
+        print("Round-trip (SELECT q <=> q):")
+        await measure("text", "SELECT CAST(:q AS vector) <=> CAST(:q AS vector)", {"q": literal})
+        await measure("binary", "SELECT :q <=> :q", {"q": array})
+    finally:
+        await engine.dispose()
+
+
+def main(args):
+    rng = random.Random(3)
+    vector = [rng.uniform(-1, 1) for _ in range(args.dim)]
+
+    text_bytes = len(text_encode(vector))
+    binary_bytes = len(binary_encode(vector))
+    text_us = time_per_call(text_encode, vector, args.iterations)
+    binary_us = time_per_call(binary_encode, vector, args.iterations)
+    # Vectors already held as float32 (embedding client output) skip the list conversion
+    array = np.asarray(vector, dtype=np.float32)
+    array_us = time_per_call(lambda a: Vector(a).to_binary(), array, args.iterations)
+
+    print(f"dim={args.dim}, {args.iterations} iterations")
+    print(f"  {'text':<16} {text_bytes:>8} bytes  {text_us:>9.1f} us/encode")
+    print(f"  {'binary (list)':<16} {binary_bytes:>8} bytes  {binary_us:>9.1f} us/encode")
+    print(f"  {'binary (ndarray)':<16} {binary_bytes:>8} bytes  {array_us:>9.1f} us/encode")
+    print(f"  bytes on wire: {text_bytes / binary_bytes:.1f}x smaller, "
+          f"encode CPU: {text_us / max(binary_us, 1e-9):.1f}x less")
+
+    if args.db:
+        asyncio.run(round_trips(args.dim, min(args.iterations, 500)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare text and binary pgvector parameters")
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--db", action="store_true", help="Also time round-trips against DATABASE_URL")
+    main(parser.parse_args())
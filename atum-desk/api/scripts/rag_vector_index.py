@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Switch the shared rag_chunks HNSW index between full-precision vector and
+halfvec storage. halfvec halves index memory; rag_chunks keeps float32
+vectors either way, so exact search and re-ranking are unaffected.
+
+After switching, set RAG_HALFVEC_INDEX to match (queries must use the same
+expression as the index) and rebuild any per-tenant partial indexes.
+
+Usage:
+    python scripts/rag_vector_index.py --storage halfvec
+    python scripts/rag_vector_index.py --storage vector
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+# Add api directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import get_settings
+from app.services.rag.ann_index import rebuild_global_index
+
+
+async def main(args):
+    settings = get_settings()
+    engine = create_async_engine(str(settings.DATABASE_URL), pool_size=1, max_overflow=0)
+    try:
+        name = await rebuild_global_index(engine, halfvec=args.storage == "halfvec")
+        async with engine.connect() as conn:
+            result = await conn.execute(text("""
+                SELECT c.relname, pg_relation_size(c.oid)
+                FROM pg_class c
+                WHERE c.relname LIKE 'ix_rag_chunks_hnsw%'
+                ORDER BY c.relname
+            """))
+            for relname, size in result:
+                print(f"{relname:<50} {size / 1024 / 1024:>10.1f} MB")
+        print(f"Global index: {name}. Set RAG_HALFVEC_INDEX={'true' if args.storage == 'halfvec' else 'false'}")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the shared HNSW index as vector or halfvec")
+    parser.add_argument("--storage", choices=["vector", "halfvec"], required=True)
+    asyncio.run(main(parser.parse_args()))
@@ -2,17 +2,17 @@ import asyncio
 import logging
 import sys
 import os
-from datetime import datetime
-from sqlalchemy import select, text
-from time import sleep
+import time
+from sqlalchemy import select
 
 # Add path
 sys.path.append(os.getcwd())
 
-from app.db.base import AsyncSessionLocal
-from app.models.ticket import Ticket, TicketStatus
+from app.config import get_settings
+from app.db.base import AsyncSessionLocal, engine
 from app.models.organization import Organization
-from app.services.sla_service import SLAService
+from app.services.sla_breach_engine import run_pass
+from app.services import sla_risk
 
 # Setup logging
 logging.basicConfig(
@@ -21,68 +21,65 @@ logging.basicConfig(
 )
 logger = logging.getLogger("SLAWorker")
 
+settings = get_settings()
+PASS_INTERVAL = 60  # seconds between breach passes
+
 
 async def run_worker():
     logger.info("Starting SLA Worker...")
+    stats_refreshed_at = None
     
     while True:
-        processed_count = 0
-        skipped_null_sla_count = 0
-        skipped_paused_count = 0
-        
         try:
             async with AsyncSessionLocal() as db:
                 # Get all active organizations
-                org_query = select(Organization.id, Organization.name).where(
+                org_query = select(Organization.id).where(
                     Organization.is_active == True
                 )
                 org_result = await db.execute(org_query)
-                organizations = org_result.all()
-                
-                logger.info(f"Processing SLA for {len(organizations)} organizations...")
-                
-                # Process org-by-org with proper RLS context
-                for org_id, org_name in organizations:
-                    # Set org context for this org's tickets
-                    await db.execute(text(f"SET LOCAL app.current_org = '{org_id}'"))
-                    logger.debug(f"Processing SLA for org: {org_name} ({org_id})")
-                    
-                    sla_service = SLAService(db)
-                    
-                    # Fetch tickets for this org that have SLA started
-                    query = select(Ticket.id, Ticket.status, Ticket.sla_started_at, Ticket.sla_paused_at, Ticket.sla_paused_duration).where(
-                        Ticket.organization_id == org_id,
-                        Ticket.sla_started_at.is_not(None),
-                        Ticket.status.notin_([TicketStatus.CLOSED, TicketStatus.RESOLVED])
-                    )
-                    result = await db.execute(query)
-                    tickets = result.all()
-                    
-                    for tid, status, sla_started_at, sla_paused_at, sla_paused_duration in tickets:
-                        # Skip if SLA never started
-                        if sla_started_at is None:
-                            skipped_null_sla_count += 1
-                            continue
-                        
-                        # Skip if ticket is in WAITING_CUSTOMER (paused state)
-                        if status == TicketStatus.WAITING_CUSTOMER:
-                            skipped_paused_count += 1
-                            continue
-                        
-                        # Process active ticket
-                        await sla_service.check_breaches(tid)
-                        processed_count += 1
-                    
-                    logger.debug(f"Completed SLA for org: {org_name}, tickets processed: {len(tickets)}")
-                    
-                    # Clear org context for next org
-                    await db.execute(text("SET LOCAL app.current_org = NULL"))
+                org_ids = org_result.scalars().all()
+            
+            # Set-based pass: per org (with its RLS context), one
+            # UPDATE ... RETURNING per batch of tickets whose next_sla_deadline
+            # has passed, audit rows written by the same statement
+            start = time.perf_counter()
+            summary = await run_pass(
+                engine,
+                org_ids,
+                concurrency=settings.SLA_WORKER_CONCURRENCY,
+                batch_size=settings.SLA_BREACH_BATCH_SIZE,
+            )
+            elapsed = time.perf_counter() - start
             
             # Log summary
-            logger.info(f"SLA Worker Summary: processed={processed_count}, skipped_null_sla={skipped_null_sla_count}, skipped_paused={skipped_paused_count}")
+            logger.info(
+                f"SLA Worker Summary: organizations={summary['organizations']}, "
+                f"breached={summary['breached']}, failed_orgs={summary['failed_orgs']}, "
+                f"elapsed={elapsed:.2f}s"
+            )
+            
+            # Breach-risk scores of every open SLA ticket, for the risk dashboard
+            if settings.AI_SLA_PREDICTION:
+                refresh = (stats_refreshed_at is None or
+                           time.monotonic() - stats_refreshed_at >= settings.SLA_RISK_STATS_REFRESH_MINUTES * 60)
+                risk_start = time.perf_counter()
+                risk = await sla_risk.run_pass(
+                    engine,
+                    org_ids,
+                    refresh_stats=refresh,
+                    concurrency=settings.SLA_WORKER_CONCURRENCY,
+                    batch_size=settings.SLA_BREACH_BATCH_SIZE,
+                )
+                if refresh and not risk["failed_orgs"]:
+                    stats_refreshed_at = time.monotonic()
+                logger.info(
+                    f"SLA Risk Summary: scored={risk['scored']}, updated={risk['updated']}, "
+                    f"at_risk={risk['at_risk']}, stats_refreshed={refresh}, "
+                    f"elapsed={time.perf_counter() - risk_start:.2f}s"
+                )
+                elapsed = time.perf_counter() - start
             
-            # Sleep for 60 seconds
-            await asyncio.sleep(60)
+            await asyncio.sleep(max(PASS_INTERVAL - elapsed, 1))
             
         except Exception as e:
             logger.error(f"Worker crashed: {e}")
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+ATUM DESK - Workflow Scheduler
+Resumes workflow runs suspended at a WAIT step (workflow_waits)
+
+Each pass leases a batch of due waits (FOR UPDATE SKIP LOCKED), resumes the
+runs concurrently through one WorkflowRuntime, then writes their outcomes
+(waiting again / done) and the execution counters in one transaction.
+Leases of crashed schedulers are released so another one picks them up.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import sys
+import time
+from uuid import uuid4
+
+# Add api directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import get_settings
+from app.db.base import engine
+from app.services.workflow_runtime import (
+    RELEASE_LAPSED_SQL, WorkflowRuntime, claim_waits, finish_waits, flush_stats,
+)
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+)
+logger = logging.getLogger("workflow_scheduler")
+
+settings = get_settings()
+LEASE_SECONDS = 300  # a pass must write its outcomes within this
+POLL_INTERVAL = 5  # seconds between passes when nothing was due
+
+
+class WorkflowScheduler:
+    def __init__(self, worker_id: str = None, batch_size: int = None, concurrency: int = None):
+        self.worker_id = worker_id or str(uuid4())
+        self.batch_size = batch_size or settings.WORKFLOW_SCHEDULER_BATCH_SIZE
+        self.concurrency = concurrency or settings.WORKFLOW_SCHEDULER_CONCURRENCY
+        self.runtime = WorkflowRuntime()
+        self.running = True
+        self._wake = asyncio.Event()
+
+    async def run_once(self) -> int:
+        """One pass: claim, resume, write back. Returns runs resumed."""
+        async with engine.begin() as conn:
+            released = (await conn.execute(RELEASE_LAPSED_SQL)).rowcount
+            if released:
+                logger.warning(f"Released {released} waits with lapsed leases")
+            claimed = await claim_waits(conn, self.worker_id, self.batch_size, LEASE_SECONDS)
+        if not claimed:
+            return 0
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def resume(kwargs):
+            async with semaphore:
+                return await self.runtime.run(**kwargs)
+
+        start = time.perf_counter()
+        runs = await asyncio.gather(*(resume(kwargs) for kwargs in claimed))
+        async with engine.begin() as conn:
+            waiting = await finish_waits(conn, self.worker_id, runs)
+            await flush_stats(conn, self.runtime.stats)
+        logger.info(f"Resumed {len(runs)} runs ({waiting} waiting again) in {time.perf_counter() - start:.2f}s")
+        return len(runs)
+
+    def stop(self):
+        self.running = False
+        self._wake.set()
+
+    async def run(self):
+        try:
+            while self.running:
+                try:
+                    resumed = await self.run_once()
+                except Exception as e:
+                    logger.error(f"Scheduler pass failed: {e}")
+                    resumed = 0
+                if resumed >= self.batch_size:
+                    # A full batch may have left more due runs behind it
+                    continue
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            await self.runtime.aclose()
+            await engine.dispose()
+
+
+async def main(args):
+    scheduler = WorkflowScheduler(batch_size=args.batch_size, concurrency=args.concurrency)
+
+    def signal_handler(sig):
+        logger.info(f"Received signal {sig}, shutting down")
+        scheduler.stop()
+
+    loop = asyncio.get_event_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, lambda s=sig: signal_handler(s))
+
+    logger.info(f"Workflow scheduler starting (batch={scheduler.batch_size}, concurrency={scheduler.concurrency})")
+    await scheduler.run()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ATUM DESK workflow WAIT scheduler")
+    parser.add_argument("--batch-size", type=int, default=None, help="Waits claimed per pass")
+    parser.add_argument("--concurrency", type=int, default=None, help="Resumed runs in flight")
+    asyncio.run(main(parser.parse_args()))
@@ -2,10 +2,12 @@
 Workflow Automation Engine - Domain Layer
 Visual workflow builder with triggers, conditions, and actions
 """
+import operator
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from typing import List, Dict, Any, Callable, Optional, Tuple
 from uuid import UUID, uuid4
 
 from src.domain.entities import OrganizationId, TicketId, UserId
@@ -59,6 +61,63 @@ class Operator(Enum):
     IS_NOT_EMPTY = "is_not_empty"
 
 
+@lru_cache(maxsize=1024)
+def _split_path(field_path: str) -> Tuple[str, ...]:
+    return tuple(field_path.split('.'))
+
+
+def field_accessor(field_path: str) -> Callable[[Dict[str, Any]], Any]:
+    """Pre-parsed getter for a dotted context path (e.g. 'ticket.priority')"""
+    parts = _split_path(field_path)
+    # Unrolled for the usual one- and two-level paths
+    if len(parts) == 1:
+        (name,) = parts
+        return lambda context: context.get(name) if isinstance(context, dict) else None
+    if len(parts) == 2:
+        first, second = parts
+
+        def get_nested(context: Dict[str, Any]) -> Any:
+            value = context.get(first) if isinstance(context, dict) else None
+            return value.get(second) if isinstance(value, dict) else None
+        return get_nested
+
+    def get(context: Dict[str, Any]) -> Any:
+        value = context
+        for part in parts:
+            if isinstance(value, dict):
+                value = value.get(part)
+            else:
+                return None
+        return value
+    return get
+
+
+def _ordered(op: Callable[[Any, Any], bool]) -> Callable[[Any, Any], bool]:
+    def test(actual: Any, expected: Any) -> bool:
+        try:
+            return op(actual, expected)
+        except TypeError:  # None or mismatched types never match
+            return False
+    return test
+
+
+_OPERATORS: Dict[Operator, Callable[[Any, Any], bool]] = {
+    Operator.EQUALS: operator.eq,
+    Operator.NOT_EQUALS: operator.ne,
+    Operator.CONTAINS: lambda actual, expected: expected in str(actual),
+    Operator.GREATER_THAN: _ordered(operator.gt),
+    Operator.LESS_THAN: _ordered(operator.lt),
+    Operator.GREATER_EQUAL: _ordered(operator.ge),
+    Operator.LESS_EQUAL: _ordered(operator.le),
+    Operator.IN: lambda actual, expected: actual in expected,
+    Operator.NOT_IN: lambda actual, expected: actual not in expected,
+    Operator.STARTS_WITH: lambda actual, expected: str(actual).startswith(str(expected)),
+    Operator.ENDS_WITH: lambda actual, expected: str(actual).endswith(str(expected)),
+    Operator.IS_EMPTY: lambda actual, expected: not actual,
+    Operator.IS_NOT_EMPTY: lambda actual, expected: bool(actual),
+}
+
+
 @dataclass
 class WorkflowCondition:
     """Condition for workflow branching"""
@@ -69,32 +128,33 @@ class WorkflowCondition:
     
     def evaluate(self, context: Dict[str, Any]) -> bool:
         """Evaluate condition against context"""
-        field_value = self._get_field_value(context, self.field)
-        
+        test = _OPERATORS.get(self.operator)
+        if test is None:
+            return False
+        return test(self._get_field_value(context, self.field), self.value)
+    
+    def compile(self) -> Callable[[Dict[str, Any]], bool]:
+        """Predicate with the field path and operator resolved once"""
+        get = field_accessor(self.field)
+        expected = self.value
+        # Common operators inlined: one call per evaluation instead of two
         if self.operator == Operator.EQUALS:
-            return field_value == self.value
-        elif self.operator == Operator.NOT_EQUALS:
-            return field_value != self.value
-        elif self.operator == Operator.CONTAINS:
-            return self.value in str(field_value)
-        elif self.operator == Operator.GREATER_THAN:
-            return field_value > self.value
-        elif self.operator == Operator.LESS_THAN:
-            return field_value < self.value
-        elif self.operator == Operator.IN:
-            return field_value in self.value
-        elif self.operator == Operator.IS_EMPTY:
-            return not field_value
-        elif self.operator == Operator.IS_NOT_EMPTY:
-            return bool(field_value)
-        
-        return False
+            return lambda context: get(context) == expected
+        if self.operator == Operator.NOT_EQUALS:
+            return lambda context: get(context) != expected
+        if self.operator == Operator.IN:
+            return lambda context: get(context) in expected
+        if self.operator == Operator.NOT_IN:
+            return lambda context: get(context) not in expected
+        test = _OPERATORS.get(self.operator)
+        if test is None:
+            return lambda context: False
+        return lambda context: test(get(context), expected)
     
     def _get_field_value(self, context: Dict[str, Any], field_path: str) -> Any:
         """Get value from nested field path (e.g., 'ticket.priority')"""
-        parts = field_path.split('.')
         value = context
-        for part in parts:
+        for part in _split_path(field_path):
             if isinstance(value, dict):
                 value = value.get(part)
             else:
@@ -102,6 +162,27 @@ class WorkflowCondition:
         return value
 
 
+# Result fields per action type, from the action config
+_ACTION_RESULTS: Dict[ActionType, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    ActionType.UPDATE_TICKET: lambda config: {"updates": config.get("fields", {})},
+    ActionType.ASSIGN_TICKET: lambda config: {"assignee_id": config.get("assignee_id")},
+    ActionType.SEND_EMAIL: lambda config: {"email": {
+        "to": config.get("to"),
+        "subject": config.get("subject"),
+        "body": config.get("body"),
+    }},
+    ActionType.ADD_COMMENT: lambda config: {"comment": config.get("content")},
+    ActionType.SET_PRIORITY: lambda config: {"priority": config.get("priority")},
+    ActionType.SET_STATUS: lambda config: {"status": config.get("status")},
+    ActionType.WAIT: lambda config: {"delay_seconds": config.get("delay", 0)},
+    ActionType.WEBHOOK_CALL: lambda config: {"webhook": {
+        "url": config.get("url"),
+        "method": config.get("method", "POST"),
+        "payload": config.get("payload"),
+    }},
+}
+
+
 @dataclass
 class WorkflowAction:
     """Action to execute in workflow"""
@@ -112,32 +193,9 @@ class WorkflowAction:
     def execute(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Execute action with given context"""
         result = {"success": True, "action": self.action_type.value}
-        
-        if self.action_type == ActionType.UPDATE_TICKET:
-            result["updates"] = self.config.get("fields", {})
-        elif self.action_type == ActionType.ASSIGN_TICKET:
-            result["assignee_id"] = self.config.get("assignee_id")
-        elif self.action_type == ActionType.SEND_EMAIL:
-            result["email"] = {
-                "to": self.config.get("to"),
-                "subject": self.config.get("subject"),
-                "body": self.config.get("body"),
-            }
-        elif self.action_type == ActionType.ADD_COMMENT:
-            result["comment"] = self.config.get("content")
-        elif self.action_type == ActionType.SET_PRIORITY:
-            result["priority"] = self.config.get("priority")
-        elif self.action_type == ActionType.SET_STATUS:
-            result["status"] = self.config.get("status")
-        elif self.action_type == ActionType.WAIT:
-            result["delay_seconds"] = self.config.get("delay", 0)
-        elif self.action_type == ActionType.WEBHOOK_CALL:
-            result["webhook"] = {
-                "url": self.config.get("url"),
-                "method": self.config.get("method", "POST"),
-                "payload": self.config.get("payload"),
-            }
-        
+        build = _ACTION_RESULTS.get(self.action_type)
+        if build is not None:
+            result.update(build(self.config))
         return result
 
 
@@ -154,6 +212,67 @@ class WorkflowStep:
     order: int = 0
 
 
+def _all(checks: List[Callable[[Dict[str, Any]], bool]]) -> Callable[[Dict[str, Any]], bool]:
+    if not checks:
+        return lambda context: True
+    if len(checks) == 1:
+        return checks[0]
+    if len(checks) == 2:
+        first, second = checks
+        return lambda context: first(context) and second(context)
+
+    def check_all(context: Dict[str, Any]) -> bool:
+        for check in checks:
+            if not check(context):
+                return False
+        return True
+    return check_all
+
+
+@dataclass(frozen=True)
+class CompiledStep:
+    """Step with its conditions compiled and jump targets resolved to positions"""
+    step: WorkflowStep
+    position: int
+    condition: Callable[[Dict[str, Any]], bool]
+    next_position: int  # after success (len(steps) = end)
+    failure_position: Optional[int]  # None = stop the run
+
+
+class CompiledWorkflow:
+    """Steps sorted once into an indexed graph: every jump is a list lookup"""
+    
+    def __init__(self, workflow_id: UUID, steps: List[WorkflowStep]):
+        ordered = sorted(steps, key=lambda s: s.order)
+        self.workflow_id = workflow_id
+        self.positions: Dict[UUID, int] = {s.id: i for i, s in enumerate(ordered)}
+        compiled = []
+        for i, step in enumerate(ordered):
+            next_position = i + 1
+            if step.next_step_id:
+                next_position = self.positions.get(step.next_step_id, i + 1)
+            failure_position = None
+            if step.on_failure_step_id:
+                failure_position = self.positions.get(step.on_failure_step_id)
+            compiled.append(CompiledStep(
+                step=step,
+                position=i,
+                condition=_all([c.compile() for c in step.conditions]),
+                next_position=next_position,
+                failure_position=failure_position,
+            ))
+        self.steps: Tuple[CompiledStep, ...] = tuple(compiled)
+    
+    def __len__(self) -> int:
+        return len(self.steps)
+    
+    def position(self, step_id: Optional[UUID]) -> int:
+        """Position of a step (end of workflow when unknown or None)"""
+        if step_id is None:
+            return len(self.steps)
+        return self.positions.get(step_id, len(self.steps))
+
+
 @dataclass
 class Workflow:
     """Workflow definition - Aggregate Root"""
@@ -172,6 +291,17 @@ class Workflow:
     created_by: UserId = field(default=None)
     created_at: datetime = field(default_factory=datetime.utcnow)
     updated_at: datetime = field(default_factory=datetime.utcnow)
+    _compiled: Optional[Tuple[Any, CompiledWorkflow]] = field(default=None, init=False, repr=False, compare=False)
+    
+    def compile(self) -> CompiledWorkflow:
+        """
+        Cached step graph. Rebuilt when the steps change through the methods
+        below (or updated_at is bumped after editing steps in place).
+        """
+        key = (id(self.steps), len(self.steps), self.updated_at)
+        if self._compiled is None or self._compiled[0] != key:
+            self._compiled = (key, CompiledWorkflow(self.id, self.steps))
+        return self._compiled[1]
     
     def add_step(self, step: WorkflowStep) -> None:
         """Add step to workflow"""
@@ -226,25 +356,16 @@ class Workflow:
         results = []
         
         try:
-            # Sort steps by order
-            sorted_steps = sorted(self.steps, key=lambda s: s.order)
+            steps = self.compile().steps
             
-            current_step_idx = 0
-            while current_step_idx < len(sorted_steps):
-                step = sorted_steps[current_step_idx]
+            position = 0
+            while position < len(steps):
+                compiled = steps[position]
+                step = compiled.step
                 
-                if not step.is_enabled:
-                    current_step_idx += 1
-                    continue
-                
-                # Check conditions
-                conditions_met = all(
-                    cond.evaluate(context) for cond in step.conditions
-                )
-                
-                if not conditions_met:
-                    # Skip to next step
-                    current_step_idx += 1
+                # Disabled or conditions not met: skip to next step
+                if not step.is_enabled or not compiled.condition(context):
+                    position += 1
                     continue
                 
                 # Execute action
@@ -259,18 +380,7 @@ class Workflow:
                     
                     # Update context with result
                     context["last_action_result"] = result
-                    
-                    # Determine next step
-                    if step.next_step_id:
-                        # Find next step by ID
-                        for i, s in enumerate(sorted_steps):
-                            if s.id == step.next_step_id:
-                                current_step_idx = i
-                                break
-                        else:
-                            current_step_idx += 1
-                    else:
-                        current_step_idx += 1
+                    position = compiled.next_position
                     
                 except Exception as e:
                     results.append({
@@ -281,15 +391,9 @@ class Workflow:
                     })
                     
                     # Handle failure
-                    if step.on_failure_step_id:
-                        for i, s in enumerate(sorted_steps):
-                            if s.id == step.on_failure_step_id:
-                                current_step_idx = i
-                                break
-                        else:
-                            break
-                    else:
+                    if compiled.failure_position is None:
                         break
+                    position = compiled.failure_position
             
             self.success_count += 1
             return {
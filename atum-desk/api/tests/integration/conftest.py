@@ -0,0 +1,179 @@
+"""
+ATUM DESK - Integration test fixtures
+Stub Ollama HTTP server so AI/RAG clients can be exercised without a model
+"""
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+def fake_embedding(text: str, dim: int = 8):
+    """Deterministic embedding derived from the text hash"""
+    digest = hashlib.sha256(text.encode()).digest()
+    return [b / 255.0 for b in digest[:dim]]
+
+
+def fake_completion(prompt: str):
+    """Deterministic generation: the prompt echoed back word by word"""
+    words = f"echo: {prompt}".split(" ")
+    return [w if i == 0 else " " + w for i, w in enumerate(words)]
+
+
+class StubOllama:
+    """Records requests and tracks peak in-flight concurrency"""
+
+    embedding = staticmethod(fake_embedding)
+    completion = staticmethod(fake_completion)
+
+    def __init__(self):
+        self.batch_supported = True
+        self.delay = 0.0
+        self.token_delay = 0.0
+        self.fail = False
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self.url = None
+
+    def handle(self, path: str, body: dict):
+        with self._lock:
+            self.requests.append((path, body))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.delay:
+                time.sleep(self.delay)
+            if self.fail:
+                return 500, {"error": "model crashed"}
+            if path == "/api/embed":
+                if not self.batch_supported:
+                    return 404, {"error": "not found"}
+                return 200, {"embeddings": [fake_embedding(t) for t in body["input"]]}
+            if path == "/api/embeddings":
+                return 200, {"embedding": fake_embedding(body["prompt"])}
+            if path == "/api/generate":
+                pieces = fake_completion(body["prompt"])
+                lines = [{"model": body["model"], "response": p, "done": False} for p in pieces]
+                lines.append({"model": body["model"], "response": "", "done": True,
+                              "eval_count": len(pieces), "eval_duration": 1_000_000 * len(pieces)})
+                return 200, lines
+            return 404, {"error": "not found"}
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def paths(self):
+        return [path for path, _ in self.requests]
+
+
+@pytest.fixture
+def stub_ollama():
+    stub = StubOllama()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            status, payload = stub.handle(self.path, body)
+            if isinstance(payload, list):
+                self._stream(status, payload)
+                return
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _stream(self, status, lines):
+            """NDJSON over chunked transfer, one line per chunk"""
+            self.send_response(status)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for line in lines:
+                if stub.token_delay:
+                    time.sleep(stub.token_delay)
+                data = json.dumps(line).encode() + b"\n"
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    stub.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield stub
+    server.shutdown()
+    server.server_close()
+
+
+class StubReceiver:
+    """Webhook receiver: configurable delay and status, records every request"""
+
+    def __init__(self):
+        self.delay = 0.0
+        self.status = 200
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self.url = None
+
+    def handle(self, headers: dict, body: bytes) -> int:
+        with self._lock:
+            self.requests.append((headers, body))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.delay:
+                time.sleep(self.delay)
+            return self.status
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+@pytest.fixture
+def stub_receivers():
+    """Factory of independent webhook receivers (one HTTP server each)"""
+    servers = []
+
+    def make():
+        stub = StubReceiver()
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                status = stub.handle(dict(self.headers), self.rfile.read(length))
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        stub.url = f"http://127.0.0.1:{server.server_address[1]}/hook"
+        return stub
+
+    yield make
+    for server in servers:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,179 @@
+"""
+ATUM DESK - Integration Tests for the async RAG embedding client
+"""
+import asyncio
+
+from app.services.rag.embeddings import (
+    OllamaEmbeddingClient, EmbeddingError, close_embedding_client, get_embedding_client,
+)
+from app.services.rag.embedding_cache import EmbeddingCache
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+class TestOllamaEmbeddingClient:
+    """Embedding client against a stub Ollama server"""
+
+    def test_concurrent_callers_share_one_batch_request(self, stub_ollama):
+        """Test: Concurrent embed() calls are coalesced into one /api/embed call"""
+        texts = [f"ticket {i}" for i in range(10)]
+
+        async def scenario():
+            client = OllamaEmbeddingClient(base_url=stub_ollama.url, batch_window_ms=20)
+            try:
+                return await asyncio.gather(*(client.embed(t) for t in texts))
+            finally:
+                await client.aclose()
+
+        vectors = _run(scenario())
+
+        assert vectors == [stub_ollama.embedding(t) for t in texts]
+        assert stub_ollama.paths() == ["/api/embed"]
+        assert stub_ollama.requests[0][1]["input"] == texts
+
+    def test_batches_split_at_max_batch_size(self, stub_ollama):
+        """Test: embed_many() splits large inputs into max_batch_size requests"""
+        texts = [f"chunk {i}" for i in range(10)]
+
+        async def scenario():
+            client = OllamaEmbeddingClient(base_url=stub_ollama.url, max_batch_size=4)
+            try:
+                return await client.embed_many(texts)
+            finally:
+                await client.aclose()
+
+        vectors = _run(scenario())
+
+        assert vectors == [stub_ollama.embedding(t) for t in texts]
+        sizes = sorted(len(body["input"]) for _, body in stub_ollama.requests)
+        assert sizes == [2, 4, 4]
+
+    def test_falls_back_to_single_endpoint(self, stub_ollama):
+        """Test: Servers without /api/embed get per-text /api/embeddings calls"""
+        stub_ollama.batch_supported = False
+        texts = ["alpha", "beta", "gamma"]
+
+        async def scenario():
+            client = OllamaEmbeddingClient(base_url=stub_ollama.url)
+            try:
+                first = await client.embed_many(texts)
+                second = await client.embed("delta")
+                return first, second, client.stats()
+            finally:
+                await client.aclose()
+
+        first, second, stats = _run(scenario())
+
+        assert first == [stub_ollama.embedding(t) for t in texts]
+        assert second == stub_ollama.embedding("delta")
+        assert stats["batch_supported"] is False
+        # Only probed /api/embed once
+        assert stub_ollama.paths().count("/api/embed") == 1
+        assert stub_ollama.paths().count("/api/embeddings") == 4
+
+    def test_upstream_concurrency_is_bounded(self, stub_ollama):
+        """Test: No more than max_concurrency requests are in flight"""
+        stub_ollama.batch_supported = False
+        stub_ollama.delay = 0.05
+
+        async def scenario():
+            client = OllamaEmbeddingClient(base_url=stub_ollama.url, max_concurrency=2)
+            try:
+                return await client.embed_many([f"t{i}" for i in range(6)])
+            finally:
+                await client.aclose()
+
+        vectors = _run(scenario())
+
+        assert len(vectors) == 6
+        assert stub_ollama.max_in_flight <= 2
+
+    def test_backend_error_raises(self, stub_ollama):
+        """Test: Upstream failures surface as EmbeddingError for every caller"""
+        stub_ollama.fail = True
+
+        async def scenario():
+            client = OllamaEmbeddingClient(base_url=stub_ollama.url)
+            try:
+                return await asyncio.gather(
+                    client.embed("a"), client.embed("b"), return_exceptions=True
+                )
+            finally:
+                await client.aclose()
+
+        results = _run(scenario())
+
+        assert all(isinstance(r, EmbeddingError) for r in results)
+        assert len(stub_ollama.requests) == 1
+
+    def test_shared_client_per_event_loop(self):
+        """Test: Each loop gets its own shared client; closing it drops only that loop's"""
+        async def scenario():
+            client = get_embedding_client()
+            assert get_embedding_client() is client
+            await close_embedding_client()
+            assert get_embedding_client() is not client
+            return client
+
+        first = _run(scenario())
+        second = _run(scenario())
+
+        assert first is not second
+        assert first._client is None and second._client is None
+
+
+class TestEmbeddingCache:
+    """Content-hash cache in front of the embedding client"""
+
+    def test_lru_evicts_least_recently_used(self):
+        """Test: The memory tier is bounded and keeps recently used keys"""
+        cache = EmbeddingCache(max_size=2, persist=False)
+        cache.put_local("m", "a", [1.0])
+        cache.put_local("m", "b", [2.0])
+        assert cache.get_local("m", "a") == [1.0]
+
+        cache.put_local("m", "c", [3.0])
+
+        assert len(cache) == 2
+        assert cache.get_local("m", "b") is None
+        assert cache.get_local("m", "a") == [1.0]
+
+    def test_unchanged_text_is_not_re_embedded(self, stub_ollama):
+        """Test: Re-indexing identical chunks hits the cache, new text goes upstream"""
+        cache = EmbeddingCache(max_size=100, persist=False)
+
+        async def scenario():
+            client = OllamaEmbeddingClient(base_url=stub_ollama.url, cache=cache)
+            try:
+                first = await client.embed_many(["subject", "resolution"])
+                second = await client.embed_many(["subject", "new comment", "resolution"])
+                return first, second
+            finally:
+                await client.aclose()
+
+        first, second = _run(scenario())
+
+        assert second == [stub_ollama.embedding(t) for t in ["subject", "new comment", "resolution"]]
+        assert first == [second[0], second[2]]
+        sent = [body["input"] for _, body in stub_ollama.requests]
+        assert sent == [["subject", "resolution"], ["new comment"]]
+        assert cache.stats()["hits"] == 2
+
+    def test_cache_is_keyed_by_model(self, stub_ollama):
+        """Test: The same text under another model is a miss"""
+        cache = EmbeddingCache(max_size=100, persist=False)
+
+        async def scenario():
+            for model in ("model-a", "model-b"):
+                client = OllamaEmbeddingClient(base_url=stub_ollama.url, model=model, cache=cache)
+                try:
+                    await client.embed("same text")
+                finally:
+                    await client.aclose()
+
+        _run(scenario())
+
+        assert len(stub_ollama.requests) == 2
+        assert len(cache) == 2
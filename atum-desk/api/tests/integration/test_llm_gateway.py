@@ -0,0 +1,120 @@
+"""
+ATUM DESK - Integration Tests for the shared LLM gateway
+"""
+import asyncio
+
+import pytest
+
+from app.services.llm_gateway import LLMGateway, LLMError, close_llm_gateway, get_llm_gateway
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+LIMITS = {"fast": 4, "standard": 2, "elite": 1, "reasoning": 1}
+
+
+class TestLLMGateway:
+    """LLM gateway against a stub Ollama server"""
+
+    def test_generate_returns_full_streamed_text(self, stub_ollama):
+        """Test: generate() joins the NDJSON stream and sends options"""
+        async def scenario():
+            gateway = LLMGateway(base_url=stub_ollama.url, limits=LIMITS)
+            try:
+                return await gateway.generate("reset my vpn", model="m", options={"num_predict": 50})
+            finally:
+                await gateway.aclose()
+
+        text = _run(scenario())
+
+        assert text == "echo: reset my vpn"
+        path, body = stub_ollama.requests[0]
+        assert path == "/api/generate"
+        assert body["stream"] is True
+        assert body["options"] == {"num_predict": 50}
+
+    def test_identical_concurrent_prompts_are_coalesced(self, stub_ollama):
+        """Test: Concurrent identical requests share one upstream call"""
+        stub_ollama.delay = 0.1
+
+        async def scenario():
+            gateway = LLMGateway(base_url=stub_ollama.url, limits=LIMITS)
+            try:
+                results = await asyncio.gather(
+                    *(gateway.generate("same prompt", model="m") for _ in range(5)),
+                    gateway.generate("other prompt", model="m"),
+                )
+                return results, gateway.stats()
+            finally:
+                await gateway.aclose()
+
+        results, stats = _run(scenario())
+
+        assert results[:5] == ["echo: same prompt"] * 5
+        assert results[5] == "echo: other prompt"
+        assert len(stub_ollama.requests) == 2
+        assert stats["coalesced"] == 4
+
+    def test_tier_concurrency_limit(self, stub_ollama):
+        """Test: At most the tier's limit of generations run upstream at once"""
+        stub_ollama.delay = 0.05
+
+        async def scenario():
+            gateway = LLMGateway(base_url=stub_ollama.url, limits=LIMITS)
+            try:
+                await asyncio.gather(*(
+                    gateway.generate(f"prompt {i}", model="m", tier="standard") for i in range(6)
+                ))
+            finally:
+                await gateway.aclose()
+
+        _run(scenario())
+
+        assert len(stub_ollama.requests) == 6
+        assert stub_ollama.max_in_flight <= LIMITS["standard"]
+
+    def test_stream_yields_pieces_as_they_arrive(self, stub_ollama):
+        """Test: stream() yields each generated piece in order"""
+        stub_ollama.token_delay = 0.01
+
+        async def scenario():
+            gateway = LLMGateway(base_url=stub_ollama.url, limits=LIMITS)
+            try:
+                return [piece async for piece in gateway.stream("summarize ticket", model="m", tier="fast")]
+            finally:
+                await gateway.aclose()
+
+        pieces = _run(scenario())
+
+        assert pieces == stub_ollama.completion("summarize ticket")
+
+    def test_backend_failure_raises(self, stub_ollama):
+        """Test: Upstream errors surface as LLMError"""
+        stub_ollama.fail = True
+
+        async def scenario():
+            gateway = LLMGateway(base_url=stub_ollama.url, limits=LIMITS)
+            try:
+                await gateway.generate("anything", model="m")
+            finally:
+                await gateway.aclose()
+
+        with pytest.raises(LLMError):
+            _run(scenario())
+
+    def test_shared_gateway_per_event_loop(self):
+        """Test: Each loop gets its own shared gateway; closing it drops only that loop's"""
+        async def scenario():
+            gateway = get_llm_gateway()
+            assert get_llm_gateway() is gateway
+            await close_llm_gateway()
+            assert get_llm_gateway() is not gateway
+            return gateway
+
+        first = _run(scenario())
+        second = _run(scenario())
+
+        assert first is not second
+        assert first._client is None and second._client is None
@@ -0,0 +1,142 @@
+"""
+ATUM DESK - Integration Tests for webhook delivery (outbox worker fan-out)
+"""
+import asyncio
+import hashlib
+import hmac
+from datetime import datetime, timezone
+
+from app.services.webhook_delivery import (
+    CircuitBreaker, Delivery, DeliveryResult, WebhookDispatcher, WebhookStats, retry_delay,
+)
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def _delivery(url: str, n: int = 0, secret: str = "s3cret") -> Delivery:
+    return Delivery(
+        id=f"00000000-0000-0000-0000-{n:012d}",
+        webhook_id="wh-1",
+        url=url,
+        secret=secret,
+        event_type="ticket.created",
+        payload={"id": n},
+        created_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+    )
+
+
+def _dispatch(deliveries, **kwargs):
+    async def scenario():
+        dispatcher = WebhookDispatcher(timeout=2.0, **kwargs)
+        try:
+            return await dispatcher.deliver_many(deliveries)
+        finally:
+            await dispatcher.aclose()
+
+    return _run(scenario())
+
+
+class TestWebhookDispatcher:
+    """Fan-out against local stub receivers"""
+
+    def test_slow_endpoints_are_sent_concurrently(self, stub_receivers):
+        """Test: Deliveries to different endpoints overlap instead of queueing"""
+        slow_a, slow_b = stub_receivers(), stub_receivers()
+        slow_a.delay = slow_b.delay = 0.3
+        deliveries = [_delivery(r.url, i) for i, r in enumerate([slow_a, slow_b] * 3)]
+
+        results = _dispatch(deliveries, endpoint_limit=4)
+
+        assert all(r.ok for r in results)
+        assert len(slow_a.requests) == len(slow_b.requests) == 3
+        # Sequential sends would never have more than one in flight
+        assert slow_a.max_in_flight == slow_b.max_in_flight == 3
+
+    def test_per_endpoint_concurrency_cap(self, stub_receivers):
+        """Test: At most endpoint_limit requests hit one receiver at a time"""
+        receiver = stub_receivers()
+        receiver.delay = 0.05
+
+        results = _dispatch([_delivery(receiver.url, i) for i in range(8)], endpoint_limit=2)
+
+        assert all(r.ok for r in results)
+        assert len(receiver.requests) == 8
+        assert receiver.max_in_flight <= 2
+
+    def test_signed_stable_request(self, stub_receivers):
+        """Test: Body is signed and identical across retries of one delivery"""
+        receiver = stub_receivers()
+        delivery = _delivery(receiver.url, 7)
+
+        _dispatch([delivery])
+        _dispatch([delivery])
+
+        (headers_1, body_1), (headers_2, body_2) = receiver.requests
+        expected = hmac.new(b"s3cret", body_1, hashlib.sha256).hexdigest()
+        assert headers_1["X-Atum-Signature"] == f"sha256={expected}"
+        assert headers_1["X-Atum-Delivery"] == delivery.id
+        assert body_1 == body_2
+
+    def test_error_classification(self, stub_receivers):
+        """Test: 5xx, 429 and timeouts are retried; other 4xx are not"""
+        broken, throttled, rejecting, hanging = (stub_receivers() for _ in range(4))
+        broken.status = 503
+        throttled.status = 429
+        rejecting.status = 400
+        hanging.delay = 3.0
+
+        results = _dispatch([_delivery(r.url) for r in (broken, throttled, rejecting, hanging)])
+
+        assert [r.ok for r in results] == [False] * 4
+        assert [r.retryable for r in results] == [True, True, False, True]
+        assert [r.status_code for r in results] == [503, 429, 400, None]
+
+    def test_circuit_breaker_skips_failing_url(self, stub_receivers):
+        """Test: An open circuit stops requests until a trial succeeds"""
+        receiver = stub_receivers()
+        receiver.status = 500
+        now = [0.0]
+        breaker = CircuitBreaker(threshold=3, reset_seconds=30, clock=lambda: now[0])
+
+        first = _dispatch([_delivery(receiver.url, i) for i in range(6)], endpoint_limit=1, breaker=breaker)
+
+        assert len(receiver.requests) == 3
+        assert [r.skipped for r in first] == [False] * 3 + [True] * 3
+        assert first[-1].retry_after == 30
+
+        receiver.status = 200
+        now[0] = 31.0
+        trial = _dispatch([_delivery(receiver.url, 9)], breaker=breaker)
+
+        assert trial[0].ok
+        assert not breaker.is_open(receiver.url)
+
+
+class TestRetryAndStats:
+    """Backoff schedule and batched webhook stats"""
+
+    def test_retry_delay_grows_with_jitter_and_cap(self):
+        """Test: Delay doubles per attempt, stays within [ceiling/2, ceiling], respects cap"""
+        assert retry_delay(1, 10, 3600, rand=lambda: 0.0) == 5
+        assert retry_delay(1, 10, 3600, rand=lambda: 1.0) == 10
+        assert retry_delay(4, 10, 3600, rand=lambda: 1.0) == 80
+        assert retry_delay(20, 10, 3600, rand=lambda: 1.0) == 3600
+
+    def test_stats_collapse_to_one_row_per_webhook(self):
+        """Test: Failures after the last success are counted, earlier ones reset"""
+        stats = WebhookStats()
+        delivery = _delivery("http://example.invalid/hook")
+        stats.record(DeliveryResult(delivery, ok=False, error="HTTP 500"))
+        stats.record(DeliveryResult(delivery, ok=True, status_code=200))
+        stats.record(DeliveryResult(delivery, ok=False, error="HTTP 502"))
+        stats.record(DeliveryResult(delivery, ok=False, error="circuit open", skipped=True))
+
+        columns = stats.drain()
+
+        assert columns["ids"] == ["wh-1"]
+        assert columns["reset"] == [True]
+        assert columns["failures"] == [1]
+        assert columns["last_error"] == ["HTTP 502"]
+        assert len(stats) == 0
@@ -0,0 +1,170 @@
+"""
+ATUM DESK - Integration Tests for the workflow runtime (compiled graph, async actions, waits)
+"""
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+from app.services.workflow_runtime import (
+    COMPLETED, WAITING, WorkflowRuntime, dump_workflow, load_workflow,
+)
+from src.domain.entities.workflow import (
+    ActionType, Operator, Workflow, WorkflowAction, WorkflowCondition, WorkflowStep,
+)
+
+NOW = datetime(2026, 3, 2, 9, 0, tzinfo=timezone.utc)
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def _step(name, action_type=ActionType.ADD_TAG, conditions=(), **config):
+    return WorkflowStep(name=name, action=WorkflowAction(action_type=action_type, config=config),
+                        conditions=list(conditions))
+
+
+def _workflow(*steps):
+    workflow = Workflow(name="test")
+    for step in steps:
+        workflow.add_step(step)
+    return workflow
+
+
+def _execute(workflow, context, **kwargs):
+    async def scenario():
+        runtime = WorkflowRuntime(clock=lambda: NOW, **kwargs)
+        try:
+            run = await runtime.run(workflow, context)
+            return run, runtime.stats.drain()
+        finally:
+            await runtime.aclose()
+
+    return _run(scenario())
+
+
+class TestCompiledWorkflow:
+    """Step graph built once per workflow version"""
+
+    def test_jumps_and_failure_branch(self):
+        """Test: next_step_id skips ahead, a failing step takes on_failure_step_id"""
+        start, skipped, broken, recover = _step("start"), _step("skipped"), _step("broken"), _step("recover")
+        start.next_step_id = broken.id
+        broken.action.action_type = ActionType.WEBHOOK_CALL  # no url -> fails
+        broken.on_failure_step_id = recover.id
+        workflow = _workflow(start, skipped, broken, recover)
+
+        run, _ = _execute(workflow, {})
+
+        assert run.status == COMPLETED
+        assert [(r["step_name"], r["success"]) for r in run.results] == [
+            ("start", True), ("broken", False), ("recover", True),
+        ]
+
+    def test_execute_uses_cached_graph_until_steps_change(self):
+        """Test: Workflow.execute compiles once and picks up added steps"""
+        high = WorkflowCondition(field="ticket.priority", operator=Operator.IN, value=["high", "urgent"])
+        workflow = _workflow(_step("escalate", ActionType.SET_PRIORITY, [high], priority="urgent"))
+        plan = workflow.compile()
+
+        assert workflow.execute({"ticket": {"priority": "high"}})["results"][0]["result"]["priority"] == "urgent"
+        assert workflow.execute({"ticket": {"priority": "low"}})["results"] == []
+        assert workflow.compile() is plan
+
+        workflow.add_step(_step("tag"))
+        assert workflow.compile() is not plan
+        assert len(workflow.execute({"ticket": {"priority": "low"}})["results"]) == 1
+
+    def test_ordered_operators_do_not_raise_on_missing_field(self):
+        """Test: Comparisons against a missing field are simply false"""
+        condition = WorkflowCondition(field="ticket.age_hours", operator=Operator.GREATER_THAN, value=4)
+
+        assert condition.evaluate({"ticket": {}}) is False
+        assert condition.compile()({"ticket": {"age_hours": 5}}) is True
+
+
+class TestAsyncActions:
+    """WEBHOOK_CALL / SEND_EMAIL do real I/O"""
+
+    def test_webhook_call_posts_payload(self, stub_receivers):
+        """Test: The webhook step sends its payload and a non-2xx response fails the step"""
+        ok, down = stub_receivers(), stub_receivers()
+        down.status = 503
+        workflow = _workflow(
+            _step("notify", ActionType.WEBHOOK_CALL, url=ok.url, payload={"ticket": 42}),
+            _step("notify-down", ActionType.WEBHOOK_CALL, url=down.url, payload={}),
+        )
+
+        run, _ = _execute(workflow, {})
+
+        assert [r["success"] for r in run.results] == [True, False]
+        (_, body), = ok.requests
+        assert json.loads(body) == {"ticket": 42}
+
+    def test_runs_overlap_on_slow_receiver(self, stub_receivers):
+        """Test: run_many keeps several webhook steps in flight"""
+        receiver = stub_receivers()
+        receiver.delay = 0.2
+        workflow = _workflow(_step("notify", ActionType.WEBHOOK_CALL, url=receiver.url, payload={}))
+
+        async def scenario():
+            runtime = WorkflowRuntime(endpoint_limit=4)
+            try:
+                return await runtime.run_many([(workflow, {}) for _ in range(8)])
+            finally:
+                await runtime.aclose()
+
+        runs = _run(scenario())
+
+        assert all(r.results[0]["success"] for r in runs)
+        assert receiver.max_in_flight == 4
+
+    def test_send_email_awaits_sender(self):
+        """Test: SEND_EMAIL hands the rendered message to the async sender"""
+        sent = []
+
+        async def sender(to, subject, body):
+            sent.append((to, subject, body))
+
+        workflow = _workflow(_step("mail", ActionType.SEND_EMAIL, to="a@example.com", subject="Hi", body="x"))
+
+        run, _ = _execute(workflow, {}, send_email=sender)
+
+        assert run.results[0]["success"]
+        assert sent == [("a@example.com", "Hi", "x")]
+
+
+class TestDurableWait:
+    """WAIT suspends the run; it resumes from the persisted snapshot"""
+
+    def test_wait_suspends_and_resumes(self):
+        """Test: A run waits, survives serialisation, and finishes once"""
+        workflow = _workflow(_step("before"), _step("pause", ActionType.WAIT, delay=3600), _step("after"))
+
+        run, stats = _execute(workflow, {"ticket": {"id": "t-1"}})
+
+        assert run.status == WAITING
+        assert run.resume_at == NOW + timedelta(hours=1)
+        assert [r["step_name"] for r in run.results] == ["before", "pause"]
+        assert stats["executions"] == [1] and stats["successes"] == [0]
+
+        # What workflow_waits stores and the scheduler loads back
+        restored = load_workflow(json.loads(json.dumps(dump_workflow(workflow))))
+        context = json.loads(json.dumps(run.context, default=str))
+        results = json.loads(json.dumps(run.results, default=str))
+
+        async def resume():
+            runtime = WorkflowRuntime()
+            try:
+                resumed = await runtime.run(restored, context, resume_step_id=run.resume_step_id,
+                                            results=results, wait_id=run.wait_id)
+                return resumed, runtime.stats.drain()
+            finally:
+                await runtime.aclose()
+
+        resumed, stats = _run(resume())
+
+        assert resumed.status == COMPLETED
+        assert resumed.wait_id == run.wait_id
+        assert [r["step_name"] for r in resumed.results] == ["before", "pause", "after"]
+        assert stats["executions"] == [0] and stats["successes"] == [1]
@@ -0,0 +1,63 @@
+"""
+ATUM DESK - Unit Tests for the agent load index used by smart assignment
+"""
+from app.services.agent_load import AgentLoadIndex, agent_score
+
+
+def _index(*rows):
+    return AgentLoadIndex(rows, loaded_at=0.0)
+
+
+class TestAgentLoadIndex:
+    """Heap selection over per-agent counts"""
+
+    def test_best_matches_linear_scoring(self):
+        """Test: The heap picks the same top score as scoring every agent"""
+        rows = [(f"a{i}", "agent" if i % 3 else "manager", i % 20, (i * 7) % 60) for i in range(200)]
+        index = _index(*rows)
+
+        for priority in ("urgent", "high", "medium"):
+            best = index.best(priority)
+            cls = priority if priority != "medium" else "other"
+            top = max(agent_score(role, cls, open_, resolved) for _, role, open_, resolved in rows)
+            row = next(r for r in rows if r[0] == best)
+            assert agent_score(row[1], cls, row[2], row[3]) == top
+            assert index.top(priority, 1) == [(best, top)]
+
+    def test_ties_go_to_least_loaded_and_picks_spread(self):
+        """Test: Clamped equal scores prefer fewer open tickets; picks update the counts"""
+        index = _index(("busy", "agent", 3, 50), ("idle", "agent", 0, 50))
+
+        # Both clamp to 100 until 8+ open tickets: idle catches up, then id order
+        assert [index.pick("low") for _ in range(4)] == ["idle", "idle", "idle", "busy"]
+        assert (index.agents["idle"].open, index.agents["busy"].open) == (3, 4)
+
+    def test_urgent_prefers_managers(self):
+        """Test: Role only matters for urgent tickets"""
+        index = _index(("agent", "agent", 10, 0), ("manager", "manager", 10, 0))
+
+        assert index.best("urgent") == "manager"
+        assert index.best("low") == "agent"  # tie, id order
+
+    def test_status_events_move_counts(self):
+        """Test: Resolving frees capacity; reassignment moves the ticket between agents"""
+        index = _index(("a", "agent", 16, 0), ("b", "agent", 16, 0))
+
+        index.apply("a", "in_progress", "a", "resolved")
+        assert (index.agents["a"].open, index.agents["a"].resolved) == (15, 1)
+        assert index.best("low") == "a"
+
+        index.apply("a", "new", "b", "in_progress")
+        assert (index.agents["a"].open, index.agents["b"].open) == (14, 17)
+
+        index.remove("a")
+        assert index.best("low") == "b"
+
+    def test_copy_is_independent(self):
+        """Test: Picks on a copy (an uncommitted batch) leave the original counts alone"""
+        index = _index(("a", "agent", 1, 5), ("b", "agent", 2, 5))
+        plan = index.copy()
+
+        assert [plan.pick("low") for _ in range(3)] == ["a", "a", "b"]
+        assert (index.agents["a"].open, index.agents["b"].open) == (1, 2)
+        assert plan.loaded_at == index.loaded_at
@@ -0,0 +1,72 @@
+"""
+ATUM DESK - Unit Tests for the AI response cache (memory tier)
+"""
+import asyncio
+import time
+
+from app.services.ai_response_cache import AIResponseCache, response_key
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+PARAMS = {"temperature": 0.2, "num_predict": 256}
+
+
+class TestAIResponseCache:
+    """LRU + TTL behaviour without the Postgres tier"""
+
+    def test_key_covers_full_prompt(self):
+        """Test: Prompts sharing a long prefix get different keys"""
+        preamble = "You are a support assistant. " * 40
+        assert len(preamble) > 500
+        assert response_key("m", preamble + "ticket A", PARAMS) != response_key("m", preamble + "ticket B", PARAMS)
+
+    def test_key_covers_model_and_params(self):
+        """Test: Model and generation params are part of the key"""
+        base = response_key("m", "prompt", PARAMS)
+        assert response_key("other", "prompt", PARAMS) != base
+        assert response_key("m", "prompt", {**PARAMS, "temperature": 0.9}) != base
+        assert response_key("m", "prompt", dict(reversed(list(PARAMS.items())))) == base
+
+    def test_hit_and_miss(self):
+        """Test: put() then get() hits; other prompts miss"""
+        cache = AIResponseCache(max_size=10, ttl_seconds=60, persist=False)
+
+        async def scenario():
+            await cache.put("m", "prompt", PARAMS, "answer")
+            return await cache.get("m", "prompt", PARAMS), await cache.get("m", "prompt 2", PARAMS)
+
+        hit, miss = _run(scenario())
+
+        assert hit == "answer"
+        assert miss is None
+        assert cache.stats()["hit_rate"] == 0.5
+
+    def test_lru_eviction_is_bounded(self):
+        """Test: The memory tier never exceeds max_size and evicts least recently used"""
+        cache = AIResponseCache(max_size=3, ttl_seconds=60, persist=False)
+        for i in range(3):
+            cache.put_local(f"k{i}", f"v{i}")
+        cache.get_local("k0")
+        cache.put_local("k3", "v3")
+
+        assert len(cache) == 3
+        assert cache.get_local("k1") is None
+        assert cache.get_local("k0") == "v0"
+
+    def test_expired_entries_are_dropped(self):
+        """Test: Entries past their TTL miss and are removed"""
+        cache = AIResponseCache(max_size=10, ttl_seconds=60, persist=False)
+        cache.put_local("old", "stale", expires_at=time.time() - 1)
+
+        assert cache.get_local("old") is None
+        assert len(cache) == 0
+
+    def test_empty_responses_not_cached(self):
+        """Test: Failed or empty generations are never cached"""
+        cache = AIResponseCache(max_size=10, ttl_seconds=60, persist=False)
+        _run(cache.put("m", "prompt", PARAMS, ""))
+
+        assert len(cache) == 0
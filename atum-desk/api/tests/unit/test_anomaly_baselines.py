@@ -0,0 +1,142 @@
+"""
+ATUM DESK - Unit Tests for the online anomaly baselines
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.services.anomaly_baselines import (
+    HOUR, MIN_OBSERVATIONS, RETRACT_ANOMALY_SQL, SAVE_ANOMALIES_SQL, SAVE_BASELINES_SQL, OnlineAnomalyDetector,
+    OrgBaseline, baseline_rows, retraction_rows, slot, summarize,
+)
+
+MONDAY_10 = datetime(2026, 3, 2, 10, tzinfo=timezone.utc)
+DAY = timedelta(days=1)
+
+
+def _warm(detector, org="org", created=20):
+    """
+    Weekday 10:00 baselines from Monday to Friday (`created` tickets, 2
+    urgent, 18 resolved, no breaches) -> the next Monday 10:00
+    """
+    assert MIN_OBSERVATIONS <= 5
+    for d in range(5):
+        detector.replay(org, [(MONDAY_10 + d * DAY, created, 2, 18, 0)])
+        detector.advance_org(org, MONDAY_10 + d * DAY + HOUR)
+    return MONDAY_10 + 7 * DAY
+
+
+class TestOnlineAnomalyDetector:
+    """Seasonal EWMA baselines fed hour by hour"""
+
+    def test_closed_spike_is_flagged_and_clamped(self):
+        """Test: A burst scores against its slot and moves the baseline only to the threshold"""
+        detector = OnlineAnomalyDetector()
+        hour = _warm(detector)
+        detector.replay("org", [(hour, 60, 2, 18, 0)])
+        detector.advance_org("org", hour + HOUR)
+
+        [anomaly] = detector.anomalies("org")
+        assert (anomaly["metric"], anomaly["value"], anomaly["partial"]) == ("created", 60.0, False)
+        assert anomaly["z_score"] == pytest.approx((60 - 20) / 20 ** 0.5, abs=0.01)
+        assert detector.orgs["org"].mean[0, slot(hour)] < 24
+
+    def test_open_hour_spike_and_retraction(self):
+        """Test: Running totals flag a spike early; closing back inside the baseline retracts it"""
+        detector = OnlineAnomalyDetector()
+        hour = _warm(detector)
+        detector.drain_anomalies()
+
+        detector.observe("org", hour + timedelta(minutes=20), [45, 2, 5, 0])
+        [anomaly] = detector.anomalies("org")
+        assert anomaly["partial"] and anomaly["bucket"] == hour
+        assert not any(a["metric"] == "resolved" for a in detector.anomalies("org"))
+
+        detector.observe("org", hour, [22, 2, 18, 0])  # tickets deleted before the hour ended
+        detector.advance(hour + HOUR)
+        found, retracted = detector.drain_anomalies()
+        assert (found, retracted) == ([], [("org", "created", hour)])
+        assert detector.anomalies("org") == []
+
+    def test_silent_hour_is_a_drop(self):
+        """Test: Hours without events close as zeros; drops are reported once closed"""
+        detector = OnlineAnomalyDetector()
+        hour = _warm(detector, created=40)
+        detector.advance(hour + HOUR)
+
+        types = {a["metric"] for a in detector.anomalies("org")}
+        assert types == {"created", "resolved"}
+        payload = summarize(reversed(detector.anomalies("org")), days=7)
+        assert payload["anomaly_count"] == 2
+        assert {a["type"] for a in payload["anomalies"]} == {"volume_drop", "resolution_drop"}
+        assert payload["severity_counts"] == {"high": 1, "medium": 1}
+
+    def test_state_round_trip_and_late_hours(self):
+        """Test: Saved baselines restore; totals for already-closed hours are ignored"""
+        detector = OnlineAnomalyDetector()
+        hour = _warm(detector)
+        states = detector.drain_baselines()
+
+        restored = OnlineAnomalyDetector()
+        restored.load("org", states["org"])
+        assert restored.orgs["org"].last_closed == hour - 3 * DAY
+        assert restored.orgs["org"].mean.tolist() == detector.orgs["org"].mean.tolist()
+
+        restored.observe("org", hour - 3 * DAY, [99, 0, 0, 0])
+        assert restored.late == 1 and restored.orgs["org"].pending == {}
+        assert OrgBaseline.from_state({"metrics": ["other"]}).last_closed is None
+
+    def test_drained_rows_bind_to_the_statements(self):
+        """Test: Drained anomalies, retractions and baselines carry every placeholder psycopg expects"""
+        from psycopg._queries import PostgresQuery
+        from psycopg.adapt import Transformer
+
+        detector = OnlineAnomalyDetector()
+        hour = _warm(detector)
+        detector.observe("org", hour, [45, 2, 5, 0])
+        found, _ = detector.drain_anomalies()
+        detector.observe("org", hour, [22, 2, 18, 0])
+        detector.advance(hour + HOUR)
+        _, retracted = detector.drain_anomalies()
+        assert found and retracted
+
+        query = PostgresQuery(Transformer())
+        for row in found:
+            query.convert(SAVE_ANOMALIES_SQL, row)
+        for row in retraction_rows(retracted):
+            query.convert(RETRACT_ANOMALY_SQL, row)
+        query.convert(SAVE_BASELINES_SQL, baseline_rows(detector.drain_baselines(), hour))
+
+    def test_failed_save_is_requeued(self):
+        """Test: A drain put back is drained again; newer changes of the same hour win"""
+        detector = OnlineAnomalyDetector()
+        hour = _warm(detector)
+        detector.drain_anomalies()
+        detector.observe("org", hour, [45, 2, 5, 0])
+        found, retracted = detector.drain_anomalies()
+
+        detector.requeue(found, retracted)
+        assert detector.drain_anomalies() == (found, [])
+
+        detector.observe("org", hour, [50, 2, 5, 0])
+        detector.requeue(found, retracted)
+        [anomaly], _ = detector.drain_anomalies()
+        assert anomaly["value"] == 50.0
+
+    def test_stored_partial_anomalies_settle_after_restart(self):
+        """Test: Open-hour anomalies saved before a restart are retracted once their hour closes normally"""
+        detector = OnlineAnomalyDetector()
+        hour = _warm(detector)
+        states = detector.drain_baselines()
+
+        restored = OnlineAnomalyDetector()
+        restored.load("org", states["org"])
+        restored.load_partial("org", "created", hour - 3 * DAY, 45.0, 20.0, 5.59)  # closed before the restart
+        restored.load_partial("org", "created", hour, 45.0, 20.0, 5.59)
+        assert [a["bucket"] for a in restored.anomalies("org")] == [hour]
+
+        restored.observe("org", hour, [22, 2, 18, 0])
+        restored.advance(hour + HOUR)
+        found, retracted = restored.drain_anomalies()
+        assert found == [] and sorted(retracted) == [("org", "created", hour - 3 * DAY), ("org", "created", hour)]
+        assert restored.anomalies("org") == []
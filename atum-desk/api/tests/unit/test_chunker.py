@@ -0,0 +1,135 @@
+"""
+ATUM DESK - Unit Tests for the RAG chunker
+"""
+import tracemalloc
+
+from app.services.rag.chunker import (
+    ChunkSpec, iter_chunks, chunk_text, estimate_tokens, get_chunk_spec,
+)
+
+
+class TestEstimateTokens:
+    """Unit tests for the token approximation"""
+
+    def test_counts_words_punctuation_and_digits(self):
+        """Test: Short words are one token, punctuation and digit groups count"""
+        assert estimate_tokens("reset my vpn") == 3
+        assert estimate_tokens("error 404!") == 3
+        assert estimate_tokens("123456789") == 3
+
+    def test_long_words_cost_more(self):
+        """Test: Long identifiers are more than one token"""
+        assert estimate_tokens("internationalization") > 1
+
+
+class TestChunker:
+    """Unit tests for structure-preserving chunking"""
+
+    def test_short_text_is_one_unchanged_chunk(self):
+        """Test: Text under the limit is returned as-is"""
+        text = "Subject: VPN drops\n\nDescription: every 10 minutes"
+        chunks = chunk_text(text, "ticket")
+
+        assert len(chunks) == 1
+        assert chunks[0]["content"] == text
+
+    def test_headings_start_chunks_and_prefix_continuations(self):
+        """Test: A heading opens a new chunk and labels the chunks under it"""
+        body = "\n\n".join(f"Step {i} " + "restart the service " * 10 for i in range(6))
+        text = f"# Intro\n\nShort intro.\n\n## Fix\n\n{body}"
+
+        chunks = list(iter_chunks(text, ChunkSpec(max_tokens=80, overlap_tokens=0)))
+
+        assert chunks[0]["content"] == "# Intro\n\nShort intro."
+        assert len(chunks) > 2
+        assert all(c["content"].startswith("## Fix\n\n") for c in chunks[1:])
+
+    def test_heading_without_body_is_its_own_chunk(self):
+        """Test: Headings with nothing under them are still indexed"""
+        assert [c["content"] for c in chunk_text("# Runbooks\n\n## VPN")] == ["# Runbooks", "## VPN"]
+
+        chunks = chunk_text("# Network\n## VPN\n\nReconnect the client.")
+        assert [c["content"] for c in chunks] == ["# Network", "## VPN\n\nReconnect the client."]
+        assert chunks[0]["token_count"] == estimate_tokens("# Network")
+
+    def test_code_block_is_not_split(self):
+        """Test: A fenced block that fits is kept whole, blank lines included"""
+        code = "```bash\nsystemctl stop atum\n\nsystemctl start atum\n```"
+        text = "Intro " * 30 + "\n\n" + code + "\n\nAfter."
+
+        chunks = list(iter_chunks(text, ChunkSpec(max_tokens=40, overlap_tokens=0)))
+
+        assert any(code in c["content"] for c in chunks)
+
+    def test_nothing_is_truncated(self):
+        """Test: Long documents are fully indexed (no 10-chunk cap)"""
+        words = [f"w{i}" for i in range(20000)]
+        text = "\n\n".join(" ".join(words[i:i + 50]) + "." for i in range(0, len(words), 50))
+
+        chunks = chunk_text(text, "kb")
+        indexed = " ".join(c["content"] for c in chunks)
+
+        assert len(chunks) > 10
+        assert all(w in indexed for w in (words[0], words[10000], words[-1]))
+        assert all(c["token_count"] <= get_chunk_spec("kb").max_tokens for c in chunks)
+
+    def test_overlap_repeats_tail_of_previous_chunk(self):
+        """Test: Sentences at the end of a chunk are repeated in the next"""
+        text = " ".join(f"Sentence number {i} ends here." for i in range(100))
+
+        chunks = list(iter_chunks(text, ChunkSpec(max_tokens=60, overlap_tokens=15, markdown=False)))
+
+        assert len(chunks) > 1
+        last_sentence = "Sentence" + chunks[0]["content"].rsplit("Sentence", 1)[1]
+        assert last_sentence in chunks[1]["content"]
+        assert not chunks[1]["content"].startswith("Sentence number 0 ")
+
+    def test_max_chunks_limit(self):
+        """Test: Per-source-type limit caps the chunk count"""
+        text = "\n\n".join("para " * 100 for _ in range(20))
+
+        chunks = list(iter_chunks(text, ChunkSpec(max_tokens=120, overlap_tokens=0, max_chunks=3)))
+
+        assert len(chunks) == 3
+
+    def test_large_article_constant_memory(self):
+        """Test: A 5 MB KB article is chunked lazily in bounded memory"""
+        section = "## Section\n\n" + ("Lorem ipsum dolor sit amet, consectetur elit. " * 20 + "\n\n") * 5
+        article = section * (5_000_000 // len(section) + 1)
+
+        tracemalloc.start()
+        try:
+            count = sum(1 for _ in iter_chunks(article, get_chunk_spec("kb")))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert count > 1000
+        assert peak < 1_000_000
+
+    def test_single_large_paragraph_and_fence_constant_memory(self):
+        """Test: A 2 MB paragraph without blank lines, or one 2 MB fence, is chunked in bounded memory"""
+        line = "Lorem ipsum dolor sit amet, consectetur elit.\n"
+        size = 2_000_000 // len(line)
+        paragraph = (line for _ in range(size))
+        fence = (l for part in (["```\n"], (line for _ in range(size)), ["```\n"]) for l in part)
+
+        for lines in (paragraph, fence):
+            tracemalloc.start()
+            try:
+                count = sum(1 for _ in iter_chunks(lines, get_chunk_spec("kb")))
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+            assert count > 500
+            assert peak < 1_000_000
+
+    def test_long_paragraph_parts_keep_line_breaks(self):
+        """Test: A paragraph split while streaming still joins its lines with newlines"""
+        lines = [f"step {i} restart the service" for i in range(60)]
+
+        chunks = list(iter_chunks("\n".join(lines), ChunkSpec(max_tokens=40, overlap_tokens=0)))
+
+        assert len(chunks) > 1
+        assert "\n".join(c["content"] for c in chunks) == "\n".join(lines)
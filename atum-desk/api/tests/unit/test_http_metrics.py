@@ -0,0 +1,112 @@
+"""
+ATUM DESK - Unit Tests for HTTP metrics middleware and the sampling profiler
+"""
+import asyncio
+import threading
+import time
+
+import httpx
+from fastapi import Depends, FastAPI, HTTPException, Request
+
+from app.middleware.metrics import MetricsMiddleware
+from app.services.profiler import ProfilerBusy, collapse, sample
+
+
+def _app(recorded):
+    app = FastAPI()
+
+    def authenticated(request: Request):
+        # What get_current_user leaves for the middleware
+        request.state.organization_id = request.headers.get("x-org")
+
+    @app.get("/api/v1/tickets/{ticket_id}", dependencies=[Depends(authenticated)])
+    async def get_ticket(ticket_id: str):
+        if ticket_id == "missing":
+            raise HTTPException(status_code=404)
+        return {"id": ticket_id}
+
+    @app.get("/metrics")
+    async def metrics():
+        return {}
+
+    app.add_middleware(MetricsMiddleware, org_tiers={"org-gold": "gold"},
+                       record=lambda labels, elapsed: recorded.append(labels))
+    return app
+
+
+def _get(app, *paths, headers=None):
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            for path in paths:
+                await client.get(path, headers=headers or {})
+
+    asyncio.run(scenario())
+
+
+class TestMetricsMiddleware:
+    """Labels stay bounded whatever the traffic"""
+
+    def test_route_template_status_class_and_tier(self):
+        """Test: Raw paths collapse to the route template; orgs map to tiers"""
+        recorded = []
+        app = _app(recorded)
+
+        _get(app, "/api/v1/tickets/1", "/api/v1/tickets/2", headers={"x-org": "org-gold"})
+        _get(app, "/api/v1/tickets/missing", headers={"x-org": "org-123"})
+        _get(app, "/api/v1/tickets/3")
+
+        assert recorded == [
+            ("GET", "/api/v1/tickets/{ticket_id}", "2xx", "gold"),
+            ("GET", "/api/v1/tickets/{ticket_id}", "2xx", "gold"),
+            ("GET", "/api/v1/tickets/{ticket_id}", "4xx", "default"),
+            ("GET", "/api/v1/tickets/{ticket_id}", "2xx", "none"),
+        ]
+
+    def test_unmatched_and_excluded_paths(self):
+        """Test: Unknown paths share one label; the scrape endpoint is not recorded"""
+        recorded = []
+        app = _app(recorded)
+
+        _get(app, "/wp-admin/1", "/wp-admin/2", "/metrics")
+
+        assert recorded == [("GET", "unmatched", "4xx", "none")] * 2
+
+
+class TestSamplingProfiler:
+    """Collapsed stacks from a live thread"""
+
+    def test_busy_thread_shows_up_in_collapsed_stacks(self):
+        """Test: A CPU-bound function appears with its callers, root first"""
+        stop = threading.Event()
+
+        def spin_hot_loop():
+            while not stop.is_set():
+                sum(range(1000))
+
+        worker = threading.Thread(target=spin_hot_loop, name="busy")
+        worker.start()
+        try:
+            stacks, rounds = sample(0.2, interval=0.002)
+        finally:
+            stop.set()
+            worker.join()
+
+        assert rounds > 10
+        busy = [s for s in stacks if s.startswith("busy;")]
+        assert busy and all(";spin_hot_loop (" in s for s in busy)
+        line = collapse(stacks).splitlines()[0]
+        assert line.rsplit(" ", 1)[1].isdigit()
+
+    def test_one_capture_at_a_time(self):
+        """Test: A second concurrent capture is refused"""
+        first = threading.Thread(target=sample, args=(0.3,))
+        first.start()
+        time.sleep(0.05)
+        try:
+            sample(0.1)
+            raise AssertionError("second capture should be refused")
+        except ProfilerBusy:
+            pass
+        finally:
+            first.join()
@@ -0,0 +1,103 @@
+"""
+ATUM DESK - Unit Tests for the authenticated principal cache
+"""
+import asyncio
+
+from sqlalchemy import Boolean, Column, String
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import declarative_base
+
+from app.auth.principal_cache import PrincipalCache, attach, snapshot
+
+Base = declarative_base()
+
+
+class Principal(Base):
+    __tablename__ = "principals"
+    id = Column(String, primary_key=True)
+    role = Column(String)
+    is_active = Column(Boolean)
+    backup_codes = Column(JSONB)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _cache(ttl=30.0, **kwargs):
+    clock = FakeClock()
+    cache = PrincipalCache(ttl=ttl, clock=clock, **kwargs)
+    cache.active = True
+    return cache, clock
+
+
+class TestPrincipalCache:
+    """TTL, token keying and invalidation"""
+
+    def test_hit_until_ttl(self):
+        """Test: An entry is served for its TTL, per token iat"""
+        cache, clock = _cache(ttl=30)
+        cache.put("u1", 1000, {"role": "agent"}, cache.epoch)
+
+        assert cache.get("u1", 1000) == {"role": "agent"}
+        assert cache.get("u1", 2000) is None  # another token of the user
+        clock.now = 31
+        assert cache.get("u1", 1000) is None
+
+    def test_invalidation_wins_over_inflight_lookup(self):
+        """Test: A lookup that began before an invalidation does not store stale values"""
+        cache, _ = _cache()
+        cache.put("u1", 1, {"is_active": True}, cache.epoch)
+        epoch = cache.epoch  # request starts its SELECT ...
+
+        cache.invalidate("u1")  # ... user deactivated meanwhile
+        cache.put("u1", 1, {"is_active": True}, epoch)
+
+        assert cache.get("u1", 1) is None
+
+    def test_inactive_or_disabled_cache_never_answers(self):
+        """Test: Nothing is cached without a listener, or with TTL 0"""
+        cache, _ = _cache()
+        cache.active = False
+        cache.put("u1", 1, {}, cache.epoch)
+        assert cache.get("u1", 1) is None
+
+        disabled, _ = _cache(ttl=0)
+        disabled.put("u1", 1, {}, disabled.epoch)
+        assert disabled.get("u1", 1) is None
+
+    def test_bounded_lru(self):
+        """Test: Least recently used users are dropped beyond max_users"""
+        cache, _ = _cache(max_users=2)
+        for user in ("a", "b"):
+            cache.put(user, 1, {}, cache.epoch)
+        cache.get("a", 1)
+        cache.put("c", 1, {}, cache.epoch)
+
+        assert len(cache) == 2
+        assert cache.get("b", 1) is None and cache.get("a", 1) == {}
+
+
+class TestAttach:
+    """Cached values become a session-attached instance without a query"""
+
+    def test_attach_is_persistent_and_isolated(self):
+        """Test: The attached instance is clean, and its JSON values are copies"""
+        source = Principal(id="u1", role="agent", is_active=True, backup_codes=["a", "b"])
+        values = snapshot(source)
+
+        async def scenario():
+            session = AsyncSession()  # no bind: any SQL would fail
+            user = await attach(session, Principal, values)
+            user.backup_codes.append("c")
+            return session, user
+
+        session, user = asyncio.run(scenario())
+
+        assert user in session and user.role == "agent"
+        assert values["backup_codes"] == ["a", "b"]
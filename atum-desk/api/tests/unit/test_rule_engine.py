@@ -0,0 +1,100 @@
+"""
+ATUM DESK - Unit Tests for the compiled rule engine
+"""
+from enum import Enum
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.rule_engine import RuleCompileError, RuleSet, compile_conditions, compile_rule
+
+
+class Priority(Enum):
+    HIGH = "high"
+    LOW = "low"
+
+
+def _ticket(**fields):
+    base = {"priority": Priority.LOW, "status": "new", "subject": "", "tags": [], "score": None}
+    return SimpleNamespace(**{**base, **fields})
+
+
+def _matches(conditions, ticket) -> bool:
+    predicate, _ = compile_conditions(conditions)
+    return predicate(ticket)
+
+
+class TestConditions:
+    """Condition compilation and operators"""
+
+    def test_legacy_equality_is_case_insensitive(self):
+        """Test: Plain values keep the old str().lower() equality, enums by value"""
+        assert _matches({"Priority": "HIGH"}, _ticket(priority=Priority.HIGH))
+        assert not _matches({"priority": "high"}, _ticket())
+        assert _matches({}, _ticket())
+
+    def test_operators(self):
+        """Test: Comparison, set, regex, contains and exists operators"""
+        ticket = _ticket(priority=Priority.HIGH, subject="VPN outage in Berlin", tags=["Network"], score=0.8)
+
+        assert _matches({"score": {"gte": 0.8, "lt": 1}}, ticket)
+        assert not _matches({"score": {"gt": 0.8}}, ticket)
+        assert _matches({"priority": {"in": ["high", "urgent"]}}, ticket)
+        assert _matches({"status": {"not_in": ["closed"]}}, ticket)
+        assert _matches({"subject": {"regex": r"\bvpn\b"}}, ticket)
+        assert _matches({"tags": {"contains": "network"}}, ticket)
+        assert _matches({"assigned_to": {"exists": False}}, ticket)
+        assert not _matches({"score": {"gt": 0.5}}, _ticket())
+
+    def test_mapping_tickets(self):
+        """Test: Plain dicts evaluate like ORM objects"""
+        assert _matches({"priority": "high", "subject": {"regex": "vpn"}}, {"priority": "HIGH", "subject": "vpn down"})
+
+    def test_invalid_rules_fail_at_compile_time(self):
+        """Test: Unknown operators and bad regexes are rejected once, up front"""
+        with pytest.raises(RuleCompileError):
+            compile_conditions({"priority": {"like": "h%"}})
+        with pytest.raises(RuleCompileError):
+            compile_conditions({"subject": {"regex": "("}})
+
+
+class TestRuleSet:
+    """Indexed candidate selection"""
+
+    def _rule_set(self):
+        return RuleSet([
+            compile_rule("r3", "catch-all vpn", {"subject": {"regex": "vpn"}}, 3),
+            compile_rule("r1", "high", {"priority": "high"}, 1),
+            compile_rule("r2", "high or urgent new", {"priority": {"in": ["high", "urgent"]}, "status": "new"}, 2),
+            compile_rule("r4", "low", {"priority": "low"}, 4),
+        ])
+
+    def test_only_candidates_are_tested_in_order(self):
+        """Test: Indexed rules for other values are never candidates; order follows execution_order"""
+        rule_set = self._rule_set()
+        ticket = _ticket(priority=Priority.HIGH, subject="vpn")
+
+        assert [rule_set.rules[p].id for p in rule_set.candidates(ticket)] == ["r1", "r2", "r3"]
+        assert [r.id for r in rule_set.match(ticket)] == ["r1", "r2", "r3"]
+
+    def test_later_rules_see_earlier_actions(self):
+        """Test: iter_matches re-derives candidates after a rule with actions fires"""
+        rule_set = RuleSet([
+            compile_rule("a", "escalate", {"subject": {"regex": "outage"}}, 1, [("set_priority", {"value": "high"})]),
+            compile_rule("b", "page on-call", {"priority": "high"}, 2),
+        ])
+        ticket = _ticket(subject="outage")
+
+        matched = []
+        for rule in rule_set.iter_matches(ticket):
+            matched.append(rule.id)
+            if rule.actions:
+                ticket.priority = Priority.HIGH
+
+        assert matched == ["a", "b"]
+
+    def test_match_many(self):
+        """Test: Bulk evaluation returns per-ticket matches"""
+        results = self._rule_set().match_many([_ticket(), _ticket(priority=Priority.HIGH, status="open")])
+
+        assert [[r.id for r in matches] for matches in results] == [["r4"], ["r1"]]
@@ -0,0 +1,51 @@
+"""
+ATUM DESK - Unit Tests for the daily sentiment rollups
+"""
+from datetime import date
+
+import pytest
+
+from app.services.sentiment_rollups import (
+    bucket, daily_series, profile_label, signed_score, split_trend, totals,
+)
+
+D1, D2, D3 = date(2026, 3, 1), date(2026, 3, 2), date(2026, 3, 3)
+
+
+class TestSentimentRollups:
+    """Profiles and trends from per-day rows"""
+
+    def test_job_output_to_bucket_and_signed_score(self):
+        """Test: Labels pick the bucket and the sign; garbage scores fall back"""
+        assert (bucket("Angry"), signed_score("angry", 0.9)) == ("negative", -0.9)
+        assert (bucket("positive"), signed_score("positive", 1.7)) == ("positive", 1.0)
+        assert (bucket(None), signed_score("neutral", 0.8)) == ("neutral", 0.0)
+        assert signed_score("negative", "n/a") == -0.5
+
+    def test_profile_from_totals(self):
+        """Test: Distribution and profile add up over days"""
+        rows = [(D1, 1, 0, 2, -1.2, 3), (D2, 0, 1, 1, -0.5, 2)]
+        summary = totals(rows)
+
+        assert summary["tickets"] == 5
+        assert summary["distribution"] == {"positive": 1, "neutral": 1, "negative": 3}
+        assert summary["mean_score"] == pytest.approx(-1.7 / 5)
+        assert profile_label(summary["distribution"], 5) == "frustrated"
+
+    def test_trend_compares_newer_half_with_older_half(self):
+        """Test: The middle day is split pro rata; fewer than 5 tickets is stable"""
+        # 6 tickets: older half = day 1 (2) + one of day 2's two; newer = the other + day 3 (2)
+        declining = [(D1, 0, 0, 0, 1.6, 2), (D2, 0, 0, 0, 0.0, 2), (D3, 0, 0, 0, -1.6, 2)]
+        assert split_trend(declining) == "declining"
+        assert split_trend([(D1, 0, 0, 0, -2.0, 2), (D3, 0, 0, 0, 2.0, 4)]) == "improving"
+        assert split_trend([(D1, 0, 0, 0, -2.0, 2), (D3, 0, 0, 0, 2.0, 2)]) == "stable"
+
+    def test_daily_series_fills_empty_days(self):
+        """Test: One entry per day, days without tickets have no score"""
+        series = daily_series([(D1, 0, 0, 0, 0.5, 2), (D3, 0, 0, 0, -0.3, 1)], D1, 3)
+
+        assert series == [
+            {"date": "2026-03-01", "sentiment_score": 0.25, "ticket_count": 2},
+            {"date": "2026-03-02", "sentiment_score": None, "ticket_count": 0},
+            {"date": "2026-03-03", "sentiment_score": -0.3, "ticket_count": 1},
+        ]
@@ -0,0 +1,91 @@
+"""
+ATUM DESK - Unit Tests for SLA business-hours calendars
+"""
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+
+from app.services.sla_calendar import BusinessCalendar, CONTINUOUS, parse_weekly_hours
+
+OFFICE = parse_weekly_hours({day: [["09:00", "17:00"]] for day in ("mon", "tue", "wed", "thu", "fri")})
+HOUR = 3600
+
+
+def _office(**kwargs) -> BusinessCalendar:
+    return BusinessCalendar(weekly_hours=OFFICE, origin=date(2026, 1, 1), **kwargs)
+
+
+class TestBusinessCalendar:
+    """Deadline arithmetic over working-interval arrays"""
+
+    def test_continuous_matches_timedelta(self):
+        """Test: A 24/7 calendar is plain time arithmetic"""
+        start = datetime(2026, 3, 10, 23, 30)
+        assert CONTINUOUS.add_business_seconds(start, 5 * HOUR) == start + timedelta(hours=5)
+
+    def test_deadline_skips_nights_and_weekend(self):
+        """Test: Friday 16:00 + 2 business hours is Monday 10:00"""
+        calendar = _office()
+        friday = datetime(2026, 3, 13, 16, 0)
+
+        assert calendar.add_business_seconds(friday, 2 * HOUR) == datetime(2026, 3, 16, 10, 0)
+        # Starting outside hours counts from the next opening
+        assert calendar.add_business_seconds(datetime(2026, 3, 14, 12, 0), HOUR) == datetime(2026, 3, 16, 10, 0)
+
+    def test_deadline_at_close_stays_same_day(self):
+        """Test: Work ending exactly at closing time is due at closing time"""
+        calendar = _office()
+        assert calendar.add_business_seconds(datetime(2026, 3, 10, 9, 0), 8 * HOUR) == datetime(2026, 3, 10, 17, 0)
+
+    def test_holidays_are_skipped(self):
+        """Test: Holidays contribute no working time"""
+        calendar = _office(holidays=[date(2026, 3, 16)])
+        friday = datetime(2026, 3, 13, 16, 0)
+
+        assert calendar.add_business_seconds(friday, 2 * HOUR) == datetime(2026, 3, 17, 10, 0)
+
+    def test_local_timezone_and_dst(self):
+        """Test: Hours are local to the calendar timezone across a DST change"""
+        calendar = _office(timezone="Europe/Berlin")
+        # 09:00 Berlin is 08:00 UTC before 29 March 2026 and 07:00 UTC after
+        assert calendar.add_business_seconds(datetime(2026, 3, 27, 8, 0), HOUR) == datetime(2026, 3, 27, 9, 0)
+        assert calendar.add_business_seconds(datetime(2026, 3, 27, 15, 30), HOUR) == datetime(2026, 3, 30, 7, 30)
+
+    def test_pause_shifts_remaining_time(self):
+        """Test: Resuming grants the working time left at pause again"""
+        calendar = _office()
+        target = datetime(2026, 3, 10, 15, 0)
+
+        shifted = calendar.shift_for_pause(target, datetime(2026, 3, 10, 13, 0), datetime(2026, 3, 11, 9, 0))
+
+        assert shifted == datetime(2026, 3, 11, 11, 0)
+        # A target that had already passed when paused is unchanged
+        assert calendar.shift_for_pause(target, datetime(2026, 3, 10, 16, 0), datetime(2026, 3, 11, 9, 0)) == target
+
+    def test_aware_datetimes_round_trip(self):
+        """Test: Aware inputs give aware results"""
+        start = datetime(2026, 3, 13, 16, 0, tzinfo=timezone.utc)
+        assert _office().add_business_seconds(start, 2 * HOUR) == datetime(2026, 3, 16, 10, 0, tzinfo=timezone.utc)
+
+    def test_horizon_extends_on_demand(self):
+        """Test: Deadlines beyond the expanded range trigger re-expansion"""
+        calendar = BusinessCalendar(weekly_hours=OFFICE, origin=date(2026, 1, 1), horizon_days=7)
+        start = datetime(2026, 1, 5, 9, 0)
+
+        due = calendar.add_business_seconds(start, 8 * HOUR * 500)
+
+        assert calendar.business_seconds_between(start, due) == 8 * HOUR * 500
+
+    def test_vectorised_matches_scalar(self):
+        """Test: The numpy path returns the same deadlines as bisect"""
+        calendar = _office(holidays=[date(2026, 4, 3)])
+        rng = np.random.default_rng(7)
+        base = datetime(2026, 3, 1, tzinfo=timezone.utc).timestamp()
+        starts = base + rng.uniform(0, 60 * 86400, 500)
+        seconds = rng.uniform(0, 40 * HOUR, 500)
+
+        many = calendar.add_business_seconds_many(starts, seconds)
+
+        for start, secs, due in zip(starts[:50], seconds[:50], many[:50]):
+            expected = calendar.add_business_seconds(datetime.fromtimestamp(start, timezone.utc), secs)
+            assert abs(expected.timestamp() - due) < 1e-3
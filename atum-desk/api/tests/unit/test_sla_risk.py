@@ -0,0 +1,46 @@
+"""
+ATUM DESK - Unit Tests for batch SLA breach-risk scoring
+"""
+import pytest
+
+from app.services.sla_risk import score_rows, will_breach
+
+NOW = 1_800_000_000.0
+HOUR = 3600.0
+
+
+def _row(due_in_hours, age_hours=1.0, priority="medium", assigned=True, escalation=0, waiting=False):
+    return ("t", NOW + due_in_hours * HOUR, NOW - age_hours * HOUR, priority, assigned, escalation, waiting, None)
+
+
+class TestScoreRows:
+    """One vectorised pass gives SLABreachPredictor's probabilities"""
+
+    def test_shortfall_uses_recent_average(self):
+        """Test: Less time left than the average resolution scores by the shortfall"""
+        stats = {"medium": 10.0}
+        scores = score_rows([_row(5), _row(9.5), _row(0.1)], stats, now=NOW)
+
+        assert scores[0] == pytest.approx(0.8)  # (10 - 5) / 10 + 0.3
+        assert scores[1] == pytest.approx(0.35)
+        assert scores[2] == pytest.approx(0.95)  # capped
+
+    def test_factor_risk_when_time_is_enough(self):
+        """Test: With enough time, half the factor risk; priority defaults apply without stats"""
+        rows = [
+            _row(100),  # no factors
+            _row(100, age_hours=30, assigned=False, priority="high"),  # 0.3 + 0.2 + 0.2
+            _row(100, escalation=2, waiting=True),  # 0.2 + 0.15
+            _row(100, age_hours=30, assigned=False, priority="urgent", escalation=5),  # capped at 1
+        ]
+        scores = score_rows(rows, {}, now=NOW)
+
+        assert scores.tolist() == pytest.approx([0.0, 0.35, 0.175, 0.5])
+        # high: 4h default average < 100h left, so only risk > 0.7 predicts a breach
+        assert not will_breach(scores[1], 100, 4)
+        assert will_breach(scores[3], 100, 4)
+
+    def test_overdue_and_empty(self):
+        """Test: Past-due tickets score 0; no rows, no scores"""
+        assert score_rows([_row(-1, assigned=False)], {"medium": 10.0}, now=NOW).tolist() == [0.0]
+        assert len(score_rows([], {}, now=NOW)) == 0
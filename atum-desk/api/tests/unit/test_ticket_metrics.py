@@ -0,0 +1,96 @@
+"""
+ATUM DESK - Unit Tests for the ticket metric rollups and volume forecasts
+"""
+from datetime import date
+
+import numpy as np
+import pytest
+
+from app.services.forecasting import holt_winters, volume_outlook
+from app.services.ticket_metrics import (
+    FORECAST_HORIZON, agent_summary, forecast_record, priority_distribution, trend_series,
+)
+
+D1, D2, D3, D4 = (date(2026, 3, d) for d in (1, 2, 3, 4))
+
+
+def _day(day, low=0, medium=0, high=0, urgent=0, resolved=0, seconds=0.0, met=0, breached=0):
+    return (day, low + medium + high + urgent, low, medium, high, urgent, resolved, seconds, met, breached)
+
+
+class TestHoltWinters:
+    """Weekly-seasonal forecasts from daily counts"""
+
+    def test_recovers_weekly_pattern(self):
+        """Test: A clean weekly cycle is forecast close to the cycle"""
+        week = np.array([40, 42, 38, 41, 39, 8, 6], dtype=float)
+        fit = holt_winters(np.tile(week, 12), 14)
+
+        assert fit["method"] == "holt_winters"
+        assert fit["forecast"] == pytest.approx(np.tile(week, 2).tolist(), abs=2.0)
+        assert fit["mae"] < 2.0
+
+    def test_short_history_uses_recent_mean(self):
+        """Test: Under two weeks of history, the last week's mean; none, zeros"""
+        fit = holt_winters([1, 2, 3, 4, 5, 6, 7, 8, 9, 10], 3)
+        assert (fit["method"], fit["forecast"]) == ("mean", [7.0, 7.0, 7.0])
+        assert holt_winters([], 2)["forecast"] == [0.0, 0.0]
+
+    def test_outlook_totals_and_trend(self):
+        """Test: Horizon total vs the same number of recent days"""
+        outlook = volume_outlook([10] * 7, [13] * 7, mae=1.3, days=7)
+        assert outlook == {"predicted": 91, "confidence": 0.9, "trend": "increasing"}
+        assert volume_outlook([10] * 7, [10.2] * 7, 0.0, 7)["trend"] == "stable"
+        assert volume_outlook([], [], 0.0, 7) == {"predicted": 0, "confidence": 0.05, "trend": "stable"}
+
+    def test_forecast_record_skips_days_before_first_ticket(self):
+        """Test: Leading empty days are not fitted; missing days inside count as 0"""
+        today = date(2026, 3, 20)
+        rows = [(date(2026, 3, d), 5) for d in range(1, 20) if d != 10]
+        record = forecast_record("org", rows, today)
+
+        assert record["last_day"] == date(2026, 3, 19)
+        assert len(record["forecast"]) == FORECAST_HORIZON
+        assert record["history"][-11:] == [5, 0] + [5] * 9
+        assert record["method"] == "holt_winters"
+
+
+class TestRollupReads:
+    """Endpoint payloads from daily rollup rows"""
+
+    def test_ticket_trend_fills_gaps_and_compares_halves(self):
+        """Test: One point per day; newer half vs older half"""
+        rows = [_day(D1, medium=4), _day(D3, high=3, urgent=3)]
+        payload = trend_series("tickets", rows, D1, 4)
+
+        assert [t["value"] for t in payload["trends"]] == [4, 0, 6, 0]
+        assert payload["summary"] == {"trend": "increasing", "change_percent": 50.0}
+
+    def test_priority_and_sla_trends(self):
+        """Test: Dominant priority per day (ties go up), SLA compliance per day"""
+        rows = [
+            _day(D1, low=2, high=2, resolved=4, met=3, breached=1),
+            _day(D2, medium=3, urgent=1, resolved=2, met=1, breached=1),
+        ]
+        priority = trend_series("priority", rows, D1, 2)
+        assert [t["value"] for t in priority["trends"]] == ["high", "medium"]
+        assert priority["summary"]["trend"] == "decreasing"
+
+        sla = trend_series("sla", rows, D1, 2)
+        assert [t["value"] for t in sla["trends"]] == [75.0, 50.0]
+        assert sla["summary"] == {"trend": "decreasing", "change_percent": -33.3}
+
+    def test_distribution_and_agents(self):
+        """Test: Priority shares; agents ranked by resolutions"""
+        assert priority_distribution([_day(D1, low=1, high=3), _day(D4)]) == {
+            "low": 25.0, "medium": 0.0, "high": 75.0, "urgent": 0.0,
+        }
+        summary = agent_summary([
+            ("a", "Ada", 4, 4 * 7200.0, 3, 1),
+            ("b", "Bo", 6, 6 * 10800.0, 6, 0),
+            ("c", "Cy", 0, 0.0, 0, 0),
+        ])
+        assert [a["name"] for a in summary["agents"]] == ["Bo", "Ada"]
+        assert summary["agents"][1]["avg_resolution_hours"] == 2.0
+        assert summary["agents"][1]["sla_compliance"] == 75.0
+        assert summary["summary"] == {"top_performer": "Bo", "most_efficient": "Ada"}
@@ -147,10 +147,10 @@ export default function AISmartInsights() {
               </div>
 
               <div className="p-4 bg-[var(--atum-bg)] rounded-lg border border-[var(--atum-border)]">
-                <div className="font-medium mb-2">Category Distribution</div>
+                <div className="font-medium mb-2">Priority Distribution</div>
                 <div className="flex flex-wrap gap-2">
-                  {predictions?.category_distribution && Object.entries(predictions.category_distribution).map(([cat, count]) => (
-                    <span key={cat} className="px-2 py-1 bg-[var(--atum-bg-2)] rounded text-xs">{cat}: {count}%</span>
+                  {predictions?.priority_distribution && Object.entries(predictions.priority_distribution).map(([priority, share]) => (
+                    <span key={priority} className="px-2 py-1 bg-[var(--atum-bg-2)] rounded text-xs">{priority}: {share}%</span>
                   ))}
                 </div>
               </div>